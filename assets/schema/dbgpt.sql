@@ -57,12 +57,38 @@ CREATE TABLE IF NOT EXISTS `document_chunk`
     `content`      longtext     NOT NULL COMMENT 'chunk content',
     `questions`    text         NULL COMMENT 'chunk related questions',
     `meta_info`    text NOT NULL COMMENT 'metadata info',
+    `chunk_hash`   varchar(64)  NULL COMMENT 'content hash of the chunk',
+    `vector_id`    varchar(255) NULL COMMENT 'chunk id in the index store',
     `gmt_created`  timestamp NULL DEFAULT CURRENT_TIMESTAMP COMMENT 'created time',
     `gmt_modified` timestamp NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT 'update time',
     PRIMARY KEY (`id`),
     KEY            `idx_document_id` (`document_id`) COMMENT 'index:document_id'
 ) ENGINE=InnoDB AUTO_INCREMENT=1 DEFAULT CHARSET=utf8mb4 COMMENT='knowledge document chunk detail';
 
+CREATE TABLE IF NOT EXISTS `knowledge_ingestion_job`
+(
+    `id`               int          NOT NULL AUTO_INCREMENT COMMENT 'auto increment id',
+    `space_id`         varchar(100) NOT NULL COMMENT 'knowledge space id',
+    `space_name`       varchar(100) NULL COMMENT 'knowledge space name',
+    `doc_id`           int          NOT NULL COMMENT 'knowledge document id',
+    `doc_name`         varchar(100) NULL COMMENT 'document path name',
+    `status`           varchar(50)  NOT NULL COMMENT 'status TODO,RUNNING,FAILED,FINISHED',
+    `chunk_parameters` text         NULL COMMENT 'chunk parameters, JSON format',
+    `total_chunks`     int          NULL DEFAULT 0 COMMENT 'total chunks of the document',
+    `processed_chunks` int          NULL DEFAULT 0 COMMENT 'chunks persisted into the index store',
+    `vector_ids`       longtext     NULL COMMENT 'vector ids persisted',
+    `attempts`         int          NULL DEFAULT 0 COMMENT 'times the job has been started',
+    `error`            text         NULL COMMENT 'error message',
+    `gmt_started`      timestamp    NULL COMMENT 'last start time',
+    `gmt_finished`     timestamp    NULL COMMENT 'finish time',
+    `gmt_created`      timestamp    NULL DEFAULT CURRENT_TIMESTAMP COMMENT 'created time',
+    `gmt_modified`     timestamp    NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT 'update time',
+    PRIMARY KEY (`id`),
+    KEY                `idx_space_id` (`space_id`) COMMENT 'index:space_id',
+    KEY                `idx_doc_id` (`doc_id`) COMMENT 'index:doc_id',
+    KEY                `idx_status` (`status`) COMMENT 'index:status'
+) ENGINE=InnoDB AUTO_INCREMENT=1 DEFAULT CHARSET=utf8mb4 COMMENT='knowledge document ingestion job';
+
 
 CREATE TABLE IF NOT EXISTS `connect_config`
 (
@@ -6,4 +6,34 @@ ALTER TABLE `gpts_messages`
     MODIFY COLUMN `action_report` longtext COMMENT 'Current conversation action report';
 
 ALTER TABLE `dbgpt_serve_flow`
-    MODIFY COLUMN `flow_data` longtext null COMMENT 'Flow data, JSON format';
\ No newline at end of file
+    MODIFY COLUMN `flow_data` longtext null COMMENT 'Flow data, JSON format';
+
+-- Add the persistent queue of the knowledge document ingestion jobs
+CREATE TABLE IF NOT EXISTS `knowledge_ingestion_job`
+(
+    `id`               int          NOT NULL AUTO_INCREMENT COMMENT 'auto increment id',
+    `space_id`         varchar(100) NOT NULL COMMENT 'knowledge space id',
+    `space_name`       varchar(100) NULL COMMENT 'knowledge space name',
+    `doc_id`           int          NOT NULL COMMENT 'knowledge document id',
+    `doc_name`         varchar(100) NULL COMMENT 'document path name',
+    `status`           varchar(50)  NOT NULL COMMENT 'status TODO,RUNNING,FAILED,FINISHED',
+    `chunk_parameters` text         NULL COMMENT 'chunk parameters, JSON format',
+    `total_chunks`     int          NULL DEFAULT 0 COMMENT 'total chunks of the document',
+    `processed_chunks` int          NULL DEFAULT 0 COMMENT 'chunks persisted into the index store',
+    `vector_ids`       longtext     NULL COMMENT 'vector ids persisted',
+    `attempts`         int          NULL DEFAULT 0 COMMENT 'times the job has been started',
+    `error`            text         NULL COMMENT 'error message',
+    `gmt_started`      timestamp    NULL COMMENT 'last start time',
+    `gmt_finished`     timestamp    NULL COMMENT 'finish time',
+    `gmt_created`      timestamp    NULL DEFAULT CURRENT_TIMESTAMP COMMENT 'created time',
+    `gmt_modified`     timestamp    NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT 'update time',
+    PRIMARY KEY (`id`),
+    KEY                `idx_space_id` (`space_id`) COMMENT 'index:space_id',
+    KEY                `idx_doc_id` (`doc_id`) COMMENT 'index:doc_id',
+    KEY                `idx_status` (`status`) COMMENT 'index:status'
+) ENGINE=InnoDB AUTO_INCREMENT=1 DEFAULT CHARSET=utf8mb4 COMMENT='knowledge document ingestion job';
+
+-- Add the content hash and the index store id of the chunks for the incremental sync
+ALTER TABLE `document_chunk`
+    ADD COLUMN `chunk_hash` varchar(64) NULL COMMENT 'content hash of the chunk' AFTER `meta_info`,
+    ADD COLUMN `vector_id` varchar(255) NULL COMMENT 'chunk id in the index store' AFTER `chunk_hash`;
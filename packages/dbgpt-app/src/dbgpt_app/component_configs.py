@@ -45,7 +45,9 @@ def initialize_components(
 
     system_app.register_instance(multi_agents)
 
-    _initialize_embedding_model(system_app, default_embedding_name)
+    _initialize_embedding_model(
+        system_app, default_embedding_name, _embedding_cache_config(web_config)
+    )
     _initialize_rerank_model(system_app, default_rerank_name)
     _initialize_model_cache(system_app, web_config)
     _initialize_awel(system_app, web_config.awel_dirs)
@@ -73,7 +75,34 @@ def _initialize_model_cache(system_app: SystemApp, web_config: ServiceWebParamet
     else:
         persist_dir = f"{MODEL_DISK_CACHE_DIR}_{web_config.port}"
     persist_dir = resolve_root_path(persist_dir)
-    initialize_cache(system_app, storage_type, max_memory_mb, persist_dir)
+    initialize_cache(
+        system_app,
+        storage_type,
+        max_memory_mb,
+        persist_dir,
+        cache_policy=web_config.model_cache.cache_policy,
+        ttl_seconds=web_config.model_cache.ttl_seconds,
+        enable_semantic_cache=web_config.model_cache.enable_semantic_cache,
+        semantic_cache_threshold=web_config.model_cache.semantic_cache_threshold,
+        semantic_cache_max_entries=web_config.model_cache.semantic_cache_max_entries,
+    )
+
+
+def _embedding_cache_config(web_config: ServiceWebParameters) -> Optional[dict]:
+    model_cache = web_config.model_cache
+    if not model_cache or not model_cache.enable_embedding_cache:
+        return None
+    persist_dir = None
+    if model_cache.storage_type == "disk":
+        if model_cache.persist_dir:
+            persist_dir = f"{model_cache.persist_dir}_embedding"
+        else:
+            persist_dir = f"{MODEL_DISK_CACHE_DIR}_embedding_{web_config.port}"
+        persist_dir = resolve_root_path(persist_dir)
+    return {
+        "max_memory_mb": model_cache.max_memory_mb or 256,
+        "persist_dir": persist_dir,
+    }
 
 
 def _initialize_awel(system_app: SystemApp, awel_dirs: Optional[str] = None):
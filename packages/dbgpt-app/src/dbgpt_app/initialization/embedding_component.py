@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Optional, Type
+from typing import Any, Dict, Optional, Type
 
 from dbgpt.component import ComponentType, SystemApp
 from dbgpt.core import Embeddings, RerankEmbeddings
@@ -16,10 +16,15 @@ logger = logging.getLogger(__name__)
 def _initialize_embedding_model(
     system_app: SystemApp,
     default_embedding_name: Optional[str] = None,
+    embedding_cache_config: Optional[Dict[str, Any]] = None,
 ):
     if default_embedding_name:
         logger.info("Register remote RemoteEmbeddingFactory")
-        system_app.register(RemoteEmbeddingFactory, model_name=default_embedding_name)
+        system_app.register(
+            RemoteEmbeddingFactory,
+            model_name=default_embedding_name,
+            cache_config=embedding_cache_config,
+        )
 
 
 def _initialize_rerank_model(
@@ -34,9 +39,17 @@ def _initialize_rerank_model(
 
 
 class RemoteEmbeddingFactory(EmbeddingFactory):
-    def __init__(self, system_app, model_name: str = None, **kwargs: Any) -> None:
+    def __init__(
+        self,
+        system_app,
+        model_name: str = None,
+        cache_config: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
         super().__init__(system_app=system_app)
         self._default_model_name = model_name
+        self._cache_config = cache_config
+        self._cached_embeddings: Optional[Embeddings] = None
         self.kwargs = kwargs
         self.system_app = system_app
 
@@ -55,7 +68,17 @@ class RemoteEmbeddingFactory(EmbeddingFactory):
             ComponentType.WORKER_MANAGER_FACTORY, WorkerManagerFactory
         ).create()
         # Ignore model_name args
-        return RemoteEmbeddings(self._default_model_name, worker_manager)
+        embeddings = RemoteEmbeddings(self._default_model_name, worker_manager)
+        if not self._cache_config:
+            return embeddings
+        if not self._cached_embeddings:
+            from dbgpt.storage.cache.embedding_cache import CachedEmbeddings
+
+            # All the embeddings created by current factory share the same cache
+            self._cached_embeddings = CachedEmbeddings.from_config(
+                embeddings, model_name=self._default_model_name, **self._cache_config
+            )
+        return self._cached_embeddings
 
 
 class RemoteRerankEmbeddingFactory(RerankEmbeddingFactory):
@@ -3,15 +3,17 @@ import logging
 import traceback
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any, AsyncIterator, Dict, Optional, Type, TypeVar, Union
+from typing import Any, AsyncIterator, Dict, List, Optional, Type, TypeVar, Union
 
 from dbgpt._private.config import Config
 from dbgpt.component import ComponentType, SystemApp
 from dbgpt.core import (
+    BaseMessage,
     ChatPromptTemplate,
     HumanPromptTemplate,
     LLMClient,
     MessagesPlaceholder,
+    ModelMessageRoleType,
     ModelOutput,
     ModelRequest,
     ModelRequestContext,
@@ -36,12 +38,17 @@ from dbgpt.util.retry import async_retry
 from dbgpt.util.tracer import root_tracer, trace
 from dbgpt_app.scene.base import AppScenePromptTemplateAdapter, ChatScene
 from dbgpt_app.scene.operators.app_operator import (
-    AppChatComposerOperator,
     ChatComposerInput,
-    build_cached_chat_operator,
+    get_cached_chat_operator,
+    get_chat_composer_pipeline,
+    get_chat_pipeline_cache,
 )
 from dbgpt_serve.conversation.serve import Serve as ConversationServe
-from dbgpt_serve.core.config import BufferWindowGPTsAppMemoryConfig, GPTsAppCommonConfig
+from dbgpt_serve.core.config import (
+    BufferWindowGPTsAppMemoryConfig,
+    GPTsAppCommonConfig,
+    TokenBufferGPTsAppMemoryConfig,
+)
 from dbgpt_serve.file.serve import Serve as FileServe
 from dbgpt_serve.prompt.service.service import Service as PromptService
 
@@ -222,16 +229,34 @@ class BaseChat(ABC):
             worker_manager, auto_convert_message=self.auto_convert_message
         )
 
+    def _llm_client_key(self) -> Any:
+        """Return the key of the LLM client, the equal keys share one model DAG."""
+        worker_manager = self.system_app.get_component(
+            ComponentType.WORKER_MANAGER_FACTORY, WorkerManagerFactory
+        ).create()
+        return worker_manager, self.auto_convert_message
+
     async def call_llm_operator(self, request: ModelRequest) -> ModelOutput:
-        llm_task = build_cached_chat_operator(self.llm_client, False, self.system_app)
+        llm_task = get_cached_chat_operator(
+            self.llm_client, False, self.system_app, self._llm_client_key()
+        )
         return await llm_task.call(call_data=request)
 
     async def call_streaming_operator(
         self, request: ModelRequest
     ) -> AsyncIterator[ModelOutput]:
-        llm_task = build_cached_chat_operator(self.llm_client, True, self.system_app)
-        async for out in await llm_task.call_stream(call_data=request):
-            yield out
+        llm_task = get_cached_chat_operator(
+            self.llm_client, True, self.system_app, self._llm_client_key()
+        )
+        event_loop_task_id = llm_task.current_event_loop_task_id
+        try:
+            async for out in await llm_task.call_stream(call_data=request):
+                yield out
+        finally:
+            # The dag context of a streaming call is not released by the runner,
+            # release it here, otherwise the shared dag keeps all of them.
+            if event_loop_task_id in llm_task.dag._event_loop_task_id_to_ctx:
+                await llm_task.dag._after_dag_end(event_loop_task_id)
 
     def do_action(self, prompt_response):
         return prompt_response
@@ -301,6 +326,45 @@ class BaseChat(ABC):
             return self._chat_param.app_config.memory
         return BufferWindowGPTsAppMemoryConfig()
 
+    async def _load_history_messages(self) -> List[BaseMessage]:
+        """Load the history messages of the conversation.
+
+        With the token buffer memory, the history is the token budgeted window of the
+        conversation, it's maintained incrementally across the turns.
+        """
+        history = self.current_message.get_history_message()
+        memory = self.memory_config()
+        if not isinstance(memory, TokenBufferGPTsAppMemoryConfig):
+            return history
+        window = self.current_message.get_history_window(
+            self.llm_model,
+            memory.max_token_limit,
+            self.llm_client.count_tokens,
+            self._summarize_history if memory.summarize_evicted else None,
+        )
+        return await window.update(history)
+
+    async def _summarize_history(
+        self, summary: Optional[str], messages: List[BaseMessage]
+    ) -> str:
+        """Fold the messages evicted from the history window into the summary."""
+        prompt = (
+            "Summarize the conversation below concisely, keep the facts, decisions "
+            "and open questions needed to continue it."
+        )
+        if summary:
+            prompt += f"\n\nPrevious summary:\n{summary}"
+        prompt += f"\n\nConversation:\n{BaseMessage.messages_to_string(messages)}"
+        request = ModelRequest.build_request(
+            self.llm_model,
+            messages=[ModelMessage(role=ModelMessageRoleType.HUMAN, content=prompt)],
+        )
+        output = await self.llm_client.generate(request)
+        if not output.success:
+            logger.warning(f"Summarize the history failed: {output.text}")
+            return summary or ""
+        return output.text
+
     def parse_user_input(self) -> Dict[str, Any]:
         """Parse user input to a dictionary.
 
@@ -315,7 +379,7 @@ class BaseChat(ABC):
     async def _build_model_request(self) -> ModelRequest:
         input_values = await self.generate_input_values()
         # Load history
-        self.history_messages = self.current_message.get_history_message()
+        self.history_messages = await self._load_history_messages()
         self.current_message.start_new_round()
         self.current_message.add_user_message(self.current_user_input.content)
         self.current_message.start_date = datetime.datetime.now().strftime(
@@ -330,23 +394,26 @@ class BaseChat(ABC):
             chat_mode=self.chat_mode.value(),
             span_id=root_tracer.get_current_span_id(),
         )
-        node = AppChatComposerOperator(
-            model=self.llm_model,
-            temperature=self.llm_temperature(),
-            max_new_tokens=self.llm_max_new_tokens(),
+        pipeline = get_chat_composer_pipeline(
+            chat_mode=self.chat_mode.value(),
             prompt=self.prompt_template.prompt,
             llm_client=self.llm_client,
             memory=self.memory_config(),
-            message_version=self._message_version,
-            echo=self.llm_echo,
-            streaming=self.prompt_template.stream_out,
+            model=self.llm_model,
             str_history=self.prompt_template.str_history,
-            request_context=req_ctx,
         )
         node_input = ChatComposerInput(
             messages=self.history_messages, prompt_dict=input_values
         )
-        model_request: ModelRequest = await node.call(call_data=node_input)
+        model_request: ModelRequest = await pipeline.compose(
+            node_input,
+            temperature=self.llm_temperature(),
+            max_new_tokens=self.llm_max_new_tokens(),
+            echo=self.llm_echo,
+            request_context=req_ctx,
+        )
+        pipeline_metrics = get_chat_pipeline_cache().metrics
+        logger.debug(f"Chat pipeline cache metrics: {pipeline_metrics.to_dict()}")
         model_request.context.cache_enable = self.model_cache_enable
         if model_request.messages:
             for msg in model_request.messages:
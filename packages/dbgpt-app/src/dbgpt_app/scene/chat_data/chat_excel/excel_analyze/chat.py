@@ -65,6 +65,7 @@ class ChatExcel(BaseChat):
             table_name=self._curr_table,
             duckdb_extensions_dir=self.curr_config.duckdb_extensions_dir,
             force_install=self.curr_config.force_install,
+            import_cache_dir=os.path.join(DATA_DIR, "_chat_excel_tmp", "_import_cache"),
         )
 
         self.api_call = ApiCall()
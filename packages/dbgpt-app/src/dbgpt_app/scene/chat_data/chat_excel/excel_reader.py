@@ -1,19 +1,33 @@
-import io
+import hashlib
 import logging
 import os
-from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional
+import re
+import uuid
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, NamedTuple, Optional
 
 import chardet
 import duckdb
-import numpy as np
 import pandas as pd
 import sqlparse
 
-from dbgpt.util.file_client import FileClient
-from dbgpt.util.pd_utils import csv_colunm_foramt
-
 logger = logging.getLogger(__name__)
 
+# The bytes to detect the encoding of a csv file
+_ENCODING_SAMPLE_BYTES = 1024 * 1024
+# The rows to sniff the column types
+_TYPE_SAMPLE_ROWS = 10000
+# The rows of every chunk read by pandas
+_LOAD_CHUNK_ROWS = 50000
+# The candidate column types, in order of preference
+_CANDIDATE_TYPES = ["BIGINT", "DOUBLE", "DATE", "TIMESTAMP"]
+# Bump it when the loaded tables changed, to invalidate the import cache
+_IMPORT_CACHE_VERSION = 1
+# The max databases kept in the import cache
+_IMPORT_CACHE_MAX_FILES = 32
+_IMPORT_CACHE_TABLE = "imported_table"
+# The column names generated for the columns without header, by pandas or DuckDB
+_GENERATED_COLUMN_PATTERN = re.compile(r"(Unnamed: \d+|column\d+)(\.\d+)?")
+
 if TYPE_CHECKING:
     from duckdb import DuckDBPyConnection
 
@@ -103,78 +117,284 @@ def is_chinese(text):
     return False
 
 
-def read_from_df(
-    db: "DuckDBPyConnection",
-    file_path,
-    file_name: str,
-    table_name: str,
-):
-    file_client = FileClient()
-    file_info = file_client.read_file(conv_uid=None, file_key=file_path)
-
-    result = chardet.detect(file_info)
-    encoding = result["encoding"]
-    confidence = result["confidence"]
-
+def detect_encoding(file_path: str, sample_bytes: int = _ENCODING_SAMPLE_BYTES) -> str:
+    """Detect the encoding of a text file from its first bytes."""
+    detector = chardet.UniversalDetector()
+    read_bytes = 0
+    with open(file_path, "rb") as f:
+        while read_bytes < sample_bytes and not detector.done:
+            block = f.read(min(64 * 1024, sample_bytes - read_bytes))
+            if not block:
+                break
+            read_bytes += len(block)
+            detector.feed(block)
+    detector.close()
+    encoding = detector.result.get("encoding")
+    confidence = detector.result.get("confidence")
     logger.info(
-        f"File Info:{len(file_info)},Detected Encoding: {encoding} "
+        f"Sampled {read_bytes} bytes of {file_path}, Detected Encoding: {encoding} "
         f"(Confidence: {confidence})"
     )
-    # read excel file
-    if file_name.endswith(".xlsx") or file_name.endswith(".xls"):
-        df_tmp = pd.read_excel(file_info, index_col=False)
-        df = pd.read_excel(
-            file_info,
-            index_col=False,
-            converters={i: csv_colunm_foramt for i in range(df_tmp.shape[1])},
-        )
-    elif file_name.endswith(".csv"):
-        df_tmp = pd.read_csv(
-            file_info if isinstance(file_info, str) else io.BytesIO(file_info),
-            index_col=False,
-            encoding=encoding,
-        )
-        df = pd.read_csv(
-            file_info if isinstance(file_info, str) else io.BytesIO(file_info),
+    if not encoding or encoding.lower() == "ascii":
+        # The non-ascii characters may appear after the sample
+        return "utf-8"
+    if encoding.lower() == "gb2312":
+        # GB18030 is the superset of GB2312 and GBK
+        return "gb18030"
+    return encoding
+
+
+def file_hash(file_path: str) -> str:
+    """Return the sha256 hash of the file content."""
+    hasher = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _unique_columns(names: List[Any]) -> List[str]:
+    columns: List[str] = []
+    for i, name in enumerate(names):
+        column = str(name) if name is not None and str(name) else f"Unnamed: {i}"
+        new_column = column
+        index = 1
+        while new_column in columns:
+            new_column = f"{column}.{index}"
+            index += 1
+        columns.append(new_column)
+    return columns
+
+
+def _iter_excel_chunks(file_path: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Read the first sheet of a xlsx file row by row."""
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = _unique_columns(list(header))
+        batch: List[List[Optional[str]]] = []
+        for row in rows:
+            values = [None if v is None else str(v) for v in row[: len(columns)]]
+            values.extend([None] * (len(columns) - len(values)))
+            batch.append(values)
+            if len(batch) >= chunk_rows:
+                yield pd.DataFrame(batch, columns=columns, dtype=object)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=columns, dtype=object)
+    finally:
+        workbook.close()
+
+
+def _iter_chunks(
+    file_path: str,
+    file_name: str,
+    encoding: Optional[str] = None,
+    chunk_rows: int = _LOAD_CHUNK_ROWS,
+) -> Iterator[pd.DataFrame]:
+    """Read the file in chunks, all the values are read as strings."""
+    if file_name.endswith(".csv"):
+        encoding = encoding or detect_encoding(file_path)
+        yield from pd.read_csv(
+            file_path,
             index_col=False,
+            dtype=str,
             encoding=encoding,
-            converters={i: csv_colunm_foramt for i in range(df_tmp.shape[1])},
+            encoding_errors="replace",
+            chunksize=chunk_rows,
         )
+    elif file_name.endswith(".xlsx"):
+        yield from _iter_excel_chunks(file_path, chunk_rows)
+    elif file_name.endswith(".xls"):
+        # The legacy xls format can't be read in streaming
+        yield pd.read_excel(file_path, index_col=False, dtype=str)
     else:
         raise ValueError("Unsupported file format.")
 
-    df.replace("", np.nan, inplace=True)
 
-    unnamed_columns_tmp = [
-        col
-        for col in df_tmp.columns
-        if col.startswith("Unnamed") and df_tmp[col].isnull().all()
+def _load_as_varchar(
+    db: "DuckDBPyConnection", file_path: str, file_name: str, table_name: str
+) -> List[str]:
+    """Load the file to a table whose columns are all VARCHAR.
+
+    Return the columns of the table.
+    """
+    encoding = detect_encoding(file_path) if file_name.endswith(".csv") else None
+    if encoding == "utf-8":
+        try:
+            # The native reader of DuckDB is much faster than pandas
+            escaped_path = file_path.replace("'", "''")
+            db.execute(
+                f"CREATE TABLE {table_name} AS SELECT * FROM "
+                f"read_csv('{escaped_path}', header=true, all_varchar=true)"
+            )
+            return [
+                desc[0] for desc in db.sql(f"SELECT * FROM {table_name}").description
+            ]
+        except Exception as e:
+            logger.warning(f"Error while reading csv with DuckDB: {str(e)}")
+            db.execute(f"DROP TABLE IF EXISTS {table_name}")
+
+    columns: Optional[List[str]] = None
+    for chunk in _iter_chunks(file_path, file_name, encoding):
+        if columns is None:
+            columns = [str(c) for c in chunk.columns]
+            column_defs = ", ".join(f"{_quote(c)} VARCHAR" for c in columns)
+            db.execute(f"CREATE TABLE {table_name} ({column_defs})")
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        db.register("_excel_chunk_df", chunk)
+        try:
+            db.execute(f"INSERT INTO {table_name} SELECT * FROM _excel_chunk_df")
+        finally:
+            db.unregister("_excel_chunk_df")
+    if columns is None:
+        raise ValueError(f"Can't read any data from file: {file_name}")
+    return columns
+
+
+def _value_expr(column: str) -> str:
+    return f"NULLIF(trim({_quote(column)}), '')"
+
+
+def _typed_value_expr(column: str, column_type: str) -> str:
+    value = _value_expr(column)
+    if column_type in ("BIGINT", "DOUBLE"):
+        # Remove the currency symbols and the thousands separators
+        value = (
+            f"CASE WHEN regexp_matches({value}, '[$¥]') "
+            f"THEN regexp_replace({value}, '[$¥,]', '', 'g') ELSE {value} END"
+        )
+    return value
+
+
+def _valid_expr(column: str, column_type: str) -> str:
+    value = _typed_value_expr(column, column_type)
+    if column_type == "BIGINT":
+        # Casting '1.5' to BIGINT rounds it
+        return f"TRY_CAST({value} AS BIGINT) = TRY_CAST({value} AS DOUBLE)"
+    if column_type == "DATE":
+        # Casting a timestamp string to DATE truncates it
+        return f"CAST(TRY_CAST({value} AS TIMESTAMP) AS TIME) = TIME '00:00:00'"
+    return f"TRY_CAST({value} AS {column_type}) IS NOT NULL"
+
+
+def _invalid_counts(
+    db: "DuckDBPyConnection",
+    from_exp: str,
+    column_types: Dict[str, str],
+) -> Dict[str, int]:
+    """Count the non-null values which can't be cast to the column types."""
+    if not column_types:
+        return {}
+    columns = list(column_types.keys())
+    exprs = [
+        f"count(*) FILTER (WHERE {_value_expr(c)} IS NOT NULL "
+        f"AND ({_valid_expr(c, column_types[c])}) IS NOT TRUE)"
+        for c in columns
     ]
-    df_tmp.drop(columns=unnamed_columns_tmp, inplace=True)
+    row = db.sql(f"SELECT {', '.join(exprs)} FROM {from_exp}").fetchone()
+    return dict(zip(columns, row))
+
+
+def _resolve_candidates(
+    db: "DuckDBPyConnection", from_exp: str, candidates: Dict[str, List[str]]
+) -> None:
+    """Drop the leading candidate types which any value can't be cast to."""
+    pending = [c for c, types in candidates.items() if types]
+    while pending:
+        column_types = {c: candidates[c][0] for c in pending}
+        invalid = _invalid_counts(db, from_exp, column_types)
+        pending = []
+        for c, n in invalid.items():
+            if n > 0:
+                candidates[c].pop(0)
+                if candidates[c]:
+                    pending.append(c)
+
+
+def _infer_column_types(
+    db: "DuckDBPyConnection",
+    table_name: str,
+    value_counts: Dict[str, int],
+    sample_rows: int = _TYPE_SAMPLE_ROWS,
+) -> Dict[str, str]:
+    """Infer the column types from a sample, then verify them on all the rows.
+
+    Most columns are settled by the sample, so all the rows are usually scanned
+    only once.
+
+    Args:
+        db (DuckDBPyConnection): The DuckDB connection.
+        table_name (str): The table with VARCHAR columns.
+        value_counts (Dict[str, int]): The non-empty values of every column, the
+            empty columns are VARCHAR.
+        sample_rows (int): The rows to sniff the types.
+    """
+    candidates = {
+        c: list(_CANDIDATE_TYPES) if n else [] for c, n in value_counts.items()
+    }
+    _resolve_candidates(
+        db, f"(SELECT * FROM {table_name} LIMIT {sample_rows}) AS sample", candidates
+    )
+    _resolve_candidates(db, table_name, candidates)
+    return {c: types[0] if types else "VARCHAR" for c, types in candidates.items()}
 
-    df = df[df_tmp.columns.values]
 
-    columns_map = {}
-    for column_name in df_tmp.columns:
-        df[column_name] = df[column_name].astype(str)
-        columns_map.update({column_name: excel_colunm_format(column_name)})
-        try:
-            df[column_name] = pd.to_datetime(df[column_name]).dt.strftime("%Y-%m-%d")
-        except ValueError:
-            try:
-                df[column_name] = pd.to_numeric(df[column_name])
-            except ValueError:
-                try:
-                    df[column_name] = df[column_name].astype(str)
-                except Exception:
-                    print("Can't transform column: " + column_name)
-
-    df = df.rename(columns=lambda x: x.strip().replace(" ", "_"))
-    # write data in duckdb
-    db.register("temp_df_table", df)
-    # The table is explicitly created due to the issue at
-    # https://github.com/eosphoros-ai/DB-GPT/issues/2437.
-    db.execute(f"CREATE TABLE {table_name} AS SELECT * FROM temp_df_table")
+def read_from_df(
+    db: "DuckDBPyConnection",
+    file_path,
+    file_name: str,
+    table_name: str,
+):
+    """Load the file to a table in streaming.
+
+    The file is loaded to a staging table with VARCHAR columns in chunks, the
+    column types are sniffed from a sample and verified in DuckDB before creating
+    the table.
+    """
+    staging_table = f"{table_name}_staging"
+    db.execute(f"DROP TABLE IF EXISTS {staging_table}")
+    columns = _load_as_varchar(db, file_path, file_name, staging_table)
+    try:
+        exprs = [f"count({_value_expr(c)})" for c in columns]
+        row = db.sql(f"SELECT {', '.join(exprs)} FROM {staging_table}").fetchone()
+        # Drop the empty columns without header
+        value_counts = {
+            c: n
+            for c, n in zip(columns, row)
+            if n or not _GENERATED_COLUMN_PATTERN.fullmatch(c)
+        }
+        columns = list(value_counts.keys())
+        column_types = _infer_column_types(db, staging_table, value_counts)
+        select_exprs = []
+        for column in columns:
+            column_type = column_types[column]
+            new_column = _quote(excel_colunm_format(column))
+            if column_type == "VARCHAR":
+                select_exprs.append(f"{_value_expr(column)} AS {new_column}")
+            else:
+                value = _typed_value_expr(column, column_type)
+                select_exprs.append(
+                    f"TRY_CAST({value} AS {column_type}) AS {new_column}"
+                )
+        logger.info(f"Column types of {file_name}: {column_types}")
+        # The table is explicitly created due to the issue at
+        # https://github.com/eosphoros-ai/DB-GPT/issues/2437.
+        db.execute(
+            f"CREATE TABLE {table_name} AS SELECT {', '.join(select_exprs)} "
+            f"FROM {staging_table}"
+        )
+    finally:
+        db.execute(f"DROP TABLE IF EXISTS {staging_table}")
     return table_name
 
 
@@ -222,6 +442,114 @@ def read_direct(
         return read_from_df(db, file_path, file_name, table_name)
 
 
+def _read_file(
+    db: "DuckDBPyConnection",
+    file_path: str,
+    file_name: str,
+    table_name: str,
+    read_type: str = "df",
+):
+    if read_type == "df":
+        return read_from_df(db, file_path, file_name, table_name)
+    return read_direct(db, file_path, file_name, table_name)
+
+
+def _copy_cached_table(db: "DuckDBPyConnection", cache_path: str, table_name: str):
+    escaped_path = cache_path.replace("'", "''")
+    db.execute(f"ATTACH '{escaped_path}' AS _excel_import_cache (READ_ONLY)")
+    try:
+        db.execute(
+            f"CREATE TABLE {table_name} AS SELECT * FROM "
+            f"_excel_import_cache.main.{_IMPORT_CACHE_TABLE}"
+        )
+    finally:
+        db.execute("DETACH _excel_import_cache")
+
+
+def _prune_import_cache(cache_dir: str, max_files: int = _IMPORT_CACHE_MAX_FILES):
+    """Remove the least recently used databases out of the max files."""
+    cache_files = [
+        os.path.join(cache_dir, f)
+        for f in os.listdir(cache_dir)
+        if f.endswith(".duckdb")
+    ]
+    if len(cache_files) <= max_files:
+        return
+    cache_files.sort(key=os.path.getmtime)
+    for cache_file in cache_files[: len(cache_files) - max_files]:
+        try:
+            os.remove(cache_file)
+        except OSError as e:
+            logger.warning(f"Error while removing import cache {cache_file}: {str(e)}")
+
+
+def _load_extensions(
+    db: "DuckDBPyConnection", duckdb_extensions_dir: Optional[List[str]]
+) -> None:
+    """Load the installed extensions of the directories to the connection."""
+    for extension_dir in duckdb_extensions_dir or []:
+        if not os.path.exists(extension_dir):
+            continue
+        for f in os.listdir(extension_dir):
+            if not f.endswith((".duckdb_extension.gz", ".duckdb_extension")):
+                continue
+            extension_name = f.split(".")[0]
+            try:
+                db.load_extension(extension_name)
+            except Exception as e:
+                logger.warning(
+                    f"Error while loading extension {extension_name}: {str(e)}"
+                )
+
+
+def read_with_cache(
+    db: "DuckDBPyConnection",
+    file_path: str,
+    file_name: str,
+    table_name: str,
+    cache_dir: str,
+    read_type: str = "df",
+    duckdb_extensions_dir: Optional[List[str]] = None,
+):
+    """Load the file to a table, the imported table is cached by the file hash.
+
+    Opening the same file again copies the table from the cached database instead
+    of importing the file. The file is imported in a new connection, the
+    extensions of `duckdb_extensions_dir` are loaded to it first.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_key = f"{file_hash(file_path)}_{read_type}_v{_IMPORT_CACHE_VERSION}"
+    cache_path = os.path.join(cache_dir, f"{cache_key}.duckdb")
+    if os.path.exists(cache_path):
+        try:
+            _copy_cached_table(db, cache_path, table_name)
+            # Mark it as recently used
+            os.utime(cache_path)
+            logger.info(f"Loaded {file_name} from import cache {cache_path}")
+            return table_name
+        except Exception as e:
+            logger.warning(f"Error while reading import cache {cache_path}: {str(e)}")
+            db.execute(f"DROP TABLE IF EXISTS {table_name}")
+
+    # Import to a temporary database, then publish it atomically
+    tmp_path = f"{cache_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        cache_db = duckdb.connect(database=tmp_path, read_only=False)
+        try:
+            _load_extensions(cache_db, duckdb_extensions_dir)
+            _read_file(cache_db, file_path, file_name, _IMPORT_CACHE_TABLE, read_type)
+        finally:
+            cache_db.close()
+        os.replace(tmp_path, cache_path)
+    finally:
+        for path in (tmp_path, f"{tmp_path}.wal"):
+            if os.path.exists(path):
+                os.remove(path)
+    _prune_import_cache(cache_dir)
+    _copy_cached_table(db, cache_path, table_name)
+    return table_name
+
+
 class ExcelReader:
     def __init__(
         self,
@@ -234,6 +562,7 @@ class ExcelReader:
         duckdb_extensions_dir: Optional[List[str]] = None,
         force_install: bool = False,
         show_columns: bool = False,
+        import_cache_dir: Optional[str] = None,
     ):
         if not file_name:
             file_name = os.path.basename(file_path)
@@ -254,10 +583,18 @@ class ExcelReader:
 
         if not db_exists:
             curr_table = self.temp_table_name
-            if read_type == "df":
-                read_from_df(self.db, file_path, file_name, curr_table)
+            if import_cache_dir:
+                read_with_cache(
+                    self.db,
+                    file_path,
+                    file_name,
+                    curr_table,
+                    import_cache_dir,
+                    read_type=read_type,
+                    duckdb_extensions_dir=duckdb_extensions_dir,
+                )
             else:
-                read_direct(self.db, file_path, file_name, curr_table)
+                _read_file(self.db, file_path, file_name, curr_table, read_type)
         else:
             curr_table = self.table_name
 
@@ -0,0 +1,112 @@
+import os
+
+import duckdb
+import pytest
+
+from .. import excel_reader
+from ..excel_reader import ExcelReader, read_from_df
+
+_CSV = (
+    "id,price,date,updated at,name,\n"
+    '1,"$1,000.5",2023-01-05,2023-01-05 10:00:00,苹果,\n'
+    "2,12,2023/01/06,2023-01-06 11:30:00,香蕉,\n"
+    "3,,2023-01-07,,,\n"
+)
+
+
+@pytest.fixture
+def db():
+    conn = duckdb.connect(":memory:")
+    yield conn
+    conn.close()
+
+
+def _write_csv(tmp_path, encoding: str) -> str:
+    file_path = os.path.join(tmp_path, f"data_{encoding}.csv")
+    with open(file_path, "w", encoding=encoding) as f:
+        f.write(_CSV)
+    return file_path
+
+
+def _column_types(db, table_name: str):
+    return {row[0]: row[1] for row in db.sql(f"DESCRIBE {table_name}").fetchall()}
+
+
+@pytest.mark.parametrize("encoding", ["utf-8", "gbk"])
+def test_read_csv_in_chunks(db, tmp_path, monkeypatch, encoding):
+    # Force the chunked loading and the type verification on all the rows
+    monkeypatch.setattr(excel_reader, "_LOAD_CHUNK_ROWS", 2)
+    monkeypatch.setattr(excel_reader, "_TYPE_SAMPLE_ROWS", 1)
+    file_path = _write_csv(tmp_path, encoding)
+    read_from_df(db, file_path, "data.csv", "test_table")
+
+    assert _column_types(db, "test_table") == {
+        "id": "BIGINT",
+        "price": "DOUBLE",
+        "date": "DATE",
+        "updated_at": "TIMESTAMP",
+        "name": "VARCHAR",
+    }
+    rows = db.sql("SELECT id, price, name FROM test_table ORDER BY id").fetchall()
+    assert rows == [(1, 1000.5, "苹果"), (2, 12.0, "香蕉"), (3, None, None)]
+
+
+def test_sample_type_falls_back(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(excel_reader, "_TYPE_SAMPLE_ROWS", 1)
+    file_path = os.path.join(tmp_path, "data.csv")
+    with open(file_path, "w") as f:
+        f.write("code\n1\n2.5\nA3\n")
+    read_from_df(db, file_path, "data.csv", "test_table")
+    assert _column_types(db, "test_table") == {"code": "VARCHAR"}
+    assert db.sql("SELECT count(*) FROM test_table").fetchone()[0] == 3
+
+
+def test_import_cache(tmp_path, monkeypatch):
+    file_path = _write_csv(tmp_path, "utf-8")
+    cache_dir = os.path.join(tmp_path, "cache")
+    reader = ExcelReader("conv1", file_path, import_cache_dir=cache_dir)
+    _, rows = reader.run("SELECT count(*) FROM temp_table", "temp_table")
+    assert rows == [(3,)]
+    reader.close()
+    assert len(os.listdir(cache_dir)) == 1
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("The file should not be imported again")
+
+    monkeypatch.setattr(excel_reader, "_read_file", _fail)
+    reader = ExcelReader("conv2", file_path, import_cache_dir=cache_dir)
+    _, rows = reader.run("SELECT id FROM temp_table ORDER BY id", "temp_table")
+    assert rows == [(1,), (2,), (3,)]
+    reader.close()
+
+
+def test_keep_empty_named_columns(db, tmp_path):
+    file_path = os.path.join(tmp_path, "data.csv")
+    with open(file_path, "w") as f:
+        f.write("id,columns,column_name,,\n1,,,,\n2,,,,\n")
+    read_from_df(db, file_path, "data.csv", "test_table")
+    # Only the columns without header are dropped
+    assert list(_column_types(db, "test_table")) == ["id", "columns", "column_name"]
+
+
+def test_import_cache_loads_extensions(tmp_path, monkeypatch):
+    loaded = []
+
+    def _load_extensions(conn, duckdb_extensions_dir):
+        loaded.append((conn, duckdb_extensions_dir))
+
+    monkeypatch.setattr(excel_reader, "_load_extensions", _load_extensions)
+    monkeypatch.setattr(ExcelReader, "install_extension", lambda *args: 0)
+    file_path = _write_csv(tmp_path, "utf-8")
+    extensions_dir = [str(tmp_path / "extensions")]
+    reader = ExcelReader(
+        "conv1",
+        file_path,
+        duckdb_extensions_dir=extensions_dir,
+        import_cache_dir=os.path.join(tmp_path, "cache"),
+    )
+    reader.close()
+    # The extensions are loaded to the connection importing the file
+    assert len(loaded) == 1
+    assert loaded[0][0] is not reader.db
+    assert loaded[0][1] == extensions_dir
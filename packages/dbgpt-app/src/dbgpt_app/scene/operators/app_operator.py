@@ -1,5 +1,9 @@
 import dataclasses
-from typing import Any, Dict, List, Optional
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, TypeVar
 
 from dbgpt import SystemApp
 from dbgpt.component import ComponentType
@@ -38,6 +42,10 @@ from dbgpt_serve.core.config import (
     TokenBufferGPTsAppMemoryConfig,
 )
 
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
 
 @dataclasses.dataclass
 class ChatComposerInput:
@@ -84,7 +92,14 @@ class AppChatComposerOperator(MapOperator[ChatComposerInput, ModelRequest]):
         self._echo = echo
         self._streaming = streaming
         self._request_context = request_context
-        self._sub_compose_dag = self._build_composer_dag()
+        self._sub_compose_dag = _build_composer_dag(
+            prompt=prompt,
+            llm_client=llm_client,
+            memory=memory,
+            model=model,
+            history_key=history_key,
+            str_history=str_history,
+        )
 
     async def map(self, input_value: ChatComposerInput) -> ModelRequest:
         end_node: BaseOperator = self._sub_compose_dag.leaf_nodes[0]
@@ -104,45 +119,258 @@ class AppChatComposerOperator(MapOperator[ChatComposerInput, ModelRequest]):
         )
         return model_request
 
-    def _build_composer_dag(self) -> DAG:
-        with DAG("dbgpt_awel_app_chat_history_prompt_composer") as composer_dag:
-            input_task = InputOperator(input_source=SimpleCallDataInputSource())
-            # History transform task
-            if isinstance(self._memory, BufferWindowGPTsAppMemoryConfig):
-                history_transform_task = BufferedConversationMapperOperator(
-                    keep_start_rounds=self._memory.keep_start_rounds,
-                    keep_end_rounds=self._memory.keep_end_rounds,
-                )
-            elif isinstance(self._memory, TokenBufferGPTsAppMemoryConfig):
-                history_transform_task = TokenBufferedConversationMapperOperator(
-                    model=self._model_name,
-                    llm_client=self._llm_client,
-                    max_token_limit=self._memory.max_token_limit,
-                )
-            else:
-                raise ValueError(
-                    f"Unsupported memory configuration: {self._memory.__class__}"
-                )
-            history_prompt_build_task = HistoryPromptBuilderOperator(
-                prompt=self._prompt_template,
-                history_key=self._history_key,
-                check_storage=False,
-                str_history=self._str_history,
-            )
-            # Build composer dag
-            (
-                input_task
-                >> MapOperator(lambda x: x.messages)
-                >> history_transform_task
-                >> history_prompt_build_task
+
+class AppChatComposerPipeline:
+    """The compiled composer pipeline of the app chat.
+
+    The composer DAG only depends on the prompt, the memory config and the model, so
+    it is built once and shared by the concurrent requests, the per-request data(
+    messages, input values and request context) is passed when it's called.
+    """
+
+    def __init__(
+        self,
+        prompt: ChatPromptTemplate,
+        llm_client: LLMClient,
+        memory: BaseGPTsAppMemoryConfig,
+        model: str,
+        history_key: str = "chat_history",
+        str_history: bool = False,
+    ):
+        self._model_name = model
+        self._dag = _build_composer_dag(
+            prompt=prompt,
+            llm_client=llm_client,
+            memory=memory,
+            model=model,
+            history_key=history_key,
+            str_history=str_history,
+        )
+        self._end_node: BaseOperator = self._dag.leaf_nodes[0]
+
+    @property
+    def dag(self) -> DAG:
+        """Return the composer DAG."""
+        return self._dag
+
+    async def compose(
+        self,
+        input_value: ChatComposerInput,
+        temperature: float,
+        max_new_tokens: int,
+        echo: bool = False,
+        request_context: Optional[ModelRequestContext] = None,
+    ) -> ModelRequest:
+        """Compose the model request of one chat call."""
+        if not request_context:
+            request_context = ModelRequestContext(stream=True)
+        # Every call runs in its own dag context
+        messages = await self._end_node.call(call_data=input_value)
+        return ModelRequest.build_request(
+            model=self._model_name,
+            messages=messages,
+            context=request_context,
+            temperature=temperature,
+            max_new_tokens=max_new_tokens,
+            span_id=request_context.span_id,
+            echo=echo,
+        )
+
+
+def _build_composer_dag(
+    prompt: ChatPromptTemplate,
+    llm_client: LLMClient,
+    memory: BaseGPTsAppMemoryConfig,
+    model: str,
+    history_key: str = "chat_history",
+    str_history: bool = False,
+) -> DAG:
+    with DAG("dbgpt_awel_app_chat_history_prompt_composer") as composer_dag:
+        input_task = InputOperator(input_source=SimpleCallDataInputSource())
+        # History transform task
+        if isinstance(memory, BufferWindowGPTsAppMemoryConfig):
+            history_transform_task = BufferedConversationMapperOperator(
+                keep_start_rounds=memory.keep_start_rounds,
+                keep_end_rounds=memory.keep_end_rounds,
             )
-            (
-                input_task
-                >> MapOperator(lambda x: x.prompt_dict)
-                >> history_prompt_build_task
+        elif isinstance(memory, TokenBufferGPTsAppMemoryConfig):
+            history_transform_task = TokenBufferedConversationMapperOperator(
+                model=model,
+                llm_client=llm_client,
+                max_token_limit=memory.max_token_limit,
             )
+        else:
+            raise ValueError(f"Unsupported memory configuration: {memory.__class__}")
+        history_prompt_build_task = HistoryPromptBuilderOperator(
+            prompt=prompt,
+            history_key=history_key,
+            check_storage=False,
+            str_history=str_history,
+        )
+        # Build composer dag
+        (
+            input_task
+            >> MapOperator(lambda x: x.messages)
+            >> history_transform_task
+            >> history_prompt_build_task
+        )
+        (
+            input_task
+            >> MapOperator(lambda x: x.prompt_dict)
+            >> history_prompt_build_task
+        )
+
+    return composer_dag
+
 
-        return composer_dag
+@dataclasses.dataclass
+class ChatPipelineCacheMetrics:
+    """Hit/miss metrics of the chat pipeline cache."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Return the hit rate of the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dict."""
+        data = dataclasses.asdict(self)
+        data["hit_rate"] = self.hit_rate
+        return data
+
+
+class ChatPipelineCache:
+    """The LRU cache of the compiled chat pipelines.
+
+    The key of a pipeline contains the fingerprints of everything it is built from,
+    so a changed prompt or app config just builds a new pipeline, and the stale one
+    is evicted when it's the least recently used.
+    """
+
+    def __init__(self, max_size: int = 128):
+        self._max_size = max_size
+        self._pipelines: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._metrics = ChatPipelineCacheMetrics()
+
+    def get_or_build(self, key: Hashable, builder: Callable[[], T]) -> T:
+        """Return the pipeline of the key, build it if it's not cached."""
+        with self._lock:
+            if key in self._pipelines:
+                self._pipelines.move_to_end(key)
+                self._metrics.hits += 1
+                return self._pipelines[key]
+            self._metrics.misses += 1
+            pipeline = builder()
+            self._pipelines[key] = pipeline
+            while len(self._pipelines) > self._max_size:
+                self._pipelines.popitem(last=False)
+                self._metrics.evictions += 1
+            return pipeline
+
+    def clear(self) -> None:
+        """Remove all the cached pipelines."""
+        with self._lock:
+            self._pipelines.clear()
+
+    def __len__(self) -> int:
+        return len(self._pipelines)
+
+    @property
+    def metrics(self) -> ChatPipelineCacheMetrics:
+        """Return the metrics of the cache."""
+        return self._metrics
+
+
+_CHAT_PIPELINE_CACHE = ChatPipelineCache()
+
+
+def get_chat_pipeline_cache() -> ChatPipelineCache:
+    """Return the global chat pipeline cache."""
+    return _CHAT_PIPELINE_CACHE
+
+
+def _fingerprint(value: Any) -> str:
+    return hashlib.sha256(repr(value).encode("utf-8")).hexdigest()
+
+
+def get_chat_composer_pipeline(
+    chat_mode: str,
+    prompt: ChatPromptTemplate,
+    llm_client: LLMClient,
+    memory: BaseGPTsAppMemoryConfig,
+    model: str,
+    history_key: str = "chat_history",
+    str_history: bool = False,
+    cache: Optional[ChatPipelineCache] = None,
+) -> AppChatComposerPipeline:
+    """Return the cached composer pipeline, build it if it's not cached.
+
+    The pipeline is keyed by the chat mode, the model and the fingerprints of the
+    prompt and the memory config.
+    """
+    if cache is None:
+        cache = _CHAT_PIPELINE_CACHE
+    key = (
+        "composer",
+        chat_mode,
+        model,
+        history_key,
+        str_history,
+        _fingerprint(prompt),
+        _fingerprint(memory),
+    )
+    return cache.get_or_build(
+        key,
+        lambda: AppChatComposerPipeline(
+            prompt=prompt,
+            llm_client=llm_client,
+            memory=memory,
+            model=model,
+            history_key=history_key,
+            str_history=str_history,
+        ),
+    )
+
+
+def get_cached_chat_operator(
+    llm_client: LLMClient,
+    is_streaming: bool,
+    system_app: SystemApp,
+    client_key: Hashable,
+    cache: Optional[ChatPipelineCache] = None,
+) -> BaseOperator:
+    """Return the cached model DAG operator, build it if it's not cached.
+
+    Args:
+        llm_client (LLMClient): The LLM client for processing data using the model.
+        is_streaming (bool): Whether the model is a streaming model.
+        system_app (SystemApp): The system app.
+        client_key (Hashable): The key of the LLM client, the clients with the same
+            key share one DAG.
+        cache (ChatPipelineCache, optional): The pipeline cache, defaults to the
+            global one.
+
+    Returns:
+        BaseOperator: The join node of the DAG, see :func:`build_cached_chat_operator`
+    """
+    if cache is None:
+        cache = _CHAT_PIPELINE_CACHE
+    cache_manager: CacheManager = system_app.get_component(
+        ComponentType.MODEL_CACHE_MANAGER, CacheManager
+    )
+    key = ("llm", is_streaming, client_key, cache_manager)
+    return cache.get_or_build(
+        key,
+        lambda: build_cached_chat_operator(
+            llm_client, is_streaming, system_app, cache_manager
+        ),
+    )
 
 
 def build_cached_chat_operator(
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from dbgpt.core import (
+    ChatPromptTemplate,
+    HumanPromptTemplate,
+    MessagesPlaceholder,
+    ModelRequestContext,
+    SystemPromptTemplate,
+)
+from dbgpt.core.interface.message import AIMessage, HumanMessage
+from dbgpt_serve.core.config import BufferWindowGPTsAppMemoryConfig
+
+from ..app_operator import (
+    ChatComposerInput,
+    ChatPipelineCache,
+    get_chat_composer_pipeline,
+)
+
+
+def _prompt(system: str = "You are a helpful assistant.") -> ChatPromptTemplate:
+    return ChatPromptTemplate(
+        messages=[
+            SystemPromptTemplate.from_template(system),
+            MessagesPlaceholder(variable_name="chat_history"),
+            HumanPromptTemplate.from_template("{input}"),
+        ]
+    )
+
+
+def _get_pipeline(cache, prompt=None, memory=None):
+    return get_chat_composer_pipeline(
+        chat_mode="chat_normal",
+        prompt=prompt or _prompt(),
+        llm_client=None,
+        memory=memory or BufferWindowGPTsAppMemoryConfig(),
+        model="mock_model",
+        cache=cache,
+    )
+
+
+def test_pipeline_cache_key():
+    cache = ChatPipelineCache()
+    pipeline = _get_pipeline(cache)
+    # An equal prompt built by another request reuses the pipeline
+    assert _get_pipeline(cache) is pipeline
+    # A changed prompt or memory config builds a new pipeline
+    assert _get_pipeline(cache, prompt=_prompt("Be brief.")) is not pipeline
+    assert (
+        _get_pipeline(cache, memory=BufferWindowGPTsAppMemoryConfig(keep_end_rounds=2))
+        is not pipeline
+    )
+    metrics = cache.metrics.to_dict()
+    assert metrics["hits"] == 1
+    assert metrics["misses"] == 3
+    assert metrics["hit_rate"] == 0.25
+
+
+def test_pipeline_cache_eviction():
+    cache = ChatPipelineCache(max_size=2)
+    first = _get_pipeline(cache, prompt=_prompt("1"))
+    _get_pipeline(cache, prompt=_prompt("2"))
+    _get_pipeline(cache, prompt=_prompt("3"))
+    assert len(cache) == 2
+    assert cache.metrics.evictions == 1
+    assert _get_pipeline(cache, prompt=_prompt("1")) is not first
+
+
+@pytest.mark.asyncio
+async def test_concurrent_compose():
+    pipeline = _get_pipeline(
+        ChatPipelineCache(), memory=BufferWindowGPTsAppMemoryConfig(keep_end_rounds=2)
+    )
+
+    async def compose(i: int):
+        history = [
+            HumanMessage(content=f"question {i}", round_index=1),
+            AIMessage(content=f"answer {i}", round_index=1),
+        ]
+        return await pipeline.compose(
+            ChatComposerInput(messages=history, prompt_dict={"input": f"input {i}"}),
+            temperature=0.1 * i,
+            max_new_tokens=i,
+            request_context=ModelRequestContext(stream=False, user_name=f"user{i}"),
+        )
+
+    requests = await asyncio.gather(*[compose(i) for i in range(10)])
+    for i, request in enumerate(requests):
+        contents = [m.content for m in request.messages]
+        assert contents[1:] == [f"question {i}", f"answer {i}", f"input {i}"]
+        assert request.max_new_tokens == i
+        assert request.context.user_name == f"user{i}"
+    # The dag contexts of the calls are released
+    assert not pipeline.dag._event_loop_task_id_to_ctx
@@ -6,7 +6,7 @@ import logging
 from asyncio import Queue
 from collections import defaultdict
 from concurrent.futures import Executor, ThreadPoolExecutor
-from typing import Dict, List, Optional, Union
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Union
 
 from dbgpt.util.executor_utils import blocking_func_to_async
 from dbgpt.vis.client import VisAgentMessages, VisAgentPlans, VisAppLink, vis_client
@@ -15,12 +15,25 @@ from ...action.base import ActionOutput
 from ...schema import Status
 from .base import GptsMessage, GptsMessageMemory, GptsPlansMemory
 from .default_gpts_memory import DefaultGptsMessageMemory, DefaultGptsPlansMemory
+from .message_view import MessageView, MessageViewPatch
 
 NONE_GOAL_PREFIX: str = "none_goal_count_"
 
 logger = logging.getLogger(__name__)
 
 
+def _message_key(message: GptsMessage) -> Hashable:
+    """Return the key of the message fields which are rendered."""
+    return (
+        message.sender,
+        message.receiver,
+        message.model_name,
+        message.content,
+        message.action_report,
+        message.resource_info,
+    )
+
+
 class GptsMemory:
     """GPTs memory."""
 
@@ -42,6 +55,7 @@ class GptsMemory:
         self.channels: defaultdict = defaultdict(Queue)
         self.enable_vis_map: defaultdict = defaultdict(bool)
         self.start_round_map: defaultdict = defaultdict(int)
+        self.views: defaultdict = defaultdict(MessageView)
 
     @property
     def plans_memory(self) -> GptsPlansMemory:
@@ -65,6 +79,7 @@ class GptsMemory:
         self.enable_vis_map[conv_id] = enable_vis_message
         self.messages_cache[conv_id] = history_messages if history_messages else []
         self.start_round_map[conv_id] = start_round
+        self.views[conv_id] = MessageView()
 
     def enable_vis_message(self, conv_id):
         """Enable conversation message vis tag."""
@@ -92,26 +107,60 @@ class GptsMemory:
         start_round = self.start_round_map.pop(conv_id)  # noqa
         del start_round
 
+        # clear the rendered view
+        self.views.pop(conv_id, None)
+
     async def push_message(self, conv_id: str, temp_msg: Optional[str] = None):
-        """Push conversation message."""
+        """Push conversation message.
+
+        Only the new or changed segments of the conversation are rendered, and the
+        patch of the view is put on the queue.
+        """
         queue = self.queue(conv_id)
+        view: MessageView = self.views[conv_id]
         enable_vis_tag = self.enable_vis_message(conv_id=conv_id)
+        message_count = len(self.messages_cache[conv_id])
+        # The streaming message doesn't change the messages, reuse their segments
+        if not temp_msg or not message_count or view.message_count != message_count:
+            if enable_vis_tag:
+                view.message_segments = await self._app_link_vis_segments(conv_id, view)
+            else:
+                view.message_segments = await self._simple_message_segments(
+                    conv_id, view
+                )
+            view.message_count = message_count
+        segments = list(view.message_segments)
         if enable_vis_tag:
             # 如果有临时消息内容需要push 拼接再最末尾，否则直接从短期记忆中发布最后消息
-            message_view = await self.app_link_chat_message(conv_id)
             if temp_msg:
-                temp_view = await self.agent_stream_message(temp_msg)
-                message_view = message_view + "\n" + temp_view
-            await queue.put(message_view)
-
+                segments.append(await self.agent_stream_message(temp_msg))
         else:
             # 非VIS消息模式，直接推送简单消息列表即可，不做任何处理
-            message_views = await self.simple_message(conv_id)
             if temp_msg:
                 temp_view = await self.agent_stream_message(temp_msg, False)
                 if temp_view and len(temp_view) > 0:
-                    message_views.extend(temp_view)
-            await queue.put(message_views)
+                    segments.extend(temp_view)
+        patch = view.update(segments)
+        if patch and queue is not None:
+            self._put_patch(queue, view, patch)
+
+    def _put_patch(self, queue: Queue, view: MessageView, patch: MessageViewPatch):
+        """Put the patch on the queue.
+
+        The patches which are not consumed yet are merged with the new one, so a
+        slow consumer only gets the latest view instead of a backlog.
+        """
+        pending: List[Any] = []
+        while not queue.empty():
+            pending.append(queue.get_nowait())
+            queue.task_done()
+        if all(isinstance(item, MessageViewPatch) for item in pending):
+            start = min([patch.start] + [item.start for item in pending])
+            patch = MessageViewPatch(patch.seq, start, view.segments[start:])
+            pending = []
+        for item in pending:
+            queue.put_nowait(item)
+        queue.put_nowait(patch)
 
     async def complete(self, conv_id: str):
         """Complete conversation message."""
@@ -178,7 +227,39 @@ class GptsMemory:
         # Just use the action_output now
         return [m["action_output"] for m in new_list if m["action_output"]]
 
-    async def _message_group_vis_build(self, message_group, vis_items: list):
+    async def _render_vis(
+        self,
+        view: Optional[MessageView],
+        key: Hashable,
+        func: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Render the vis segment, reuse the rendered one of the view if possible."""
+        if view is None:
+            return await func()
+        return await view.render(key, func)
+
+    async def _render_agents_vis(
+        self,
+        view: Optional[MessageView],
+        messages: List[GptsMessage],
+        is_last_message: bool = False,
+    ) -> str:
+        key = ("agents", is_last_message, tuple(_message_key(m) for m in messages))
+        return await self._render_vis(
+            view, key, lambda: self._messages_to_agents_vis(messages, is_last_message)
+        )
+
+    async def _render_plan_vis(
+        self, view: Optional[MessageView], plans: List[Dict]
+    ) -> str:
+        key = ("plans", tuple(tuple(plan.values()) for plan in plans))
+        return await self._render_vis(
+            view, key, lambda: self._messages_to_plan_vis(plans)
+        )
+
+    async def _message_group_vis_build(
+        self, message_group, vis_items: list, view: Optional[MessageView] = None
+    ) -> List[str]:
         num: int = 0
         if message_group:
             last_goal = next(reversed(message_group))
@@ -192,10 +273,10 @@ class GptsMemory:
             for key, value in message_group.items():
                 num = num + 1
                 if key.startswith(NONE_GOAL_PREFIX):
-                    vis_items.append(await self._messages_to_plan_vis(plan_temps))
+                    vis_items.append(await self._render_plan_vis(view, plan_temps))
                     plan_temps = []
                     num = 0
-                    vis_items.append(await self._messages_to_agents_vis(value))
+                    vis_items.append(await self._render_agents_vis(view, value))
                 else:
                     num += 1
                     plan_temps.append(
@@ -204,18 +285,18 @@ class GptsMemory:
                             "num": num,
                             "status": "complete",
                             "agent": value[0].receiver if value else "",
-                            "markdown": await self._messages_to_agents_vis(value),
+                            "markdown": await self._render_agents_vis(view, value),
                         }
                     )
                     need_show_singe_last_message = True
 
             if len(plan_temps) > 0:
-                vis_items.append(await self._messages_to_plan_vis(plan_temps))
+                vis_items.append(await self._render_plan_vis(view, plan_temps))
             if need_show_singe_last_message and last_goal_message:
                 vis_items.append(
-                    await self._messages_to_agents_vis([last_goal_message], True)
+                    await self._render_agents_vis(view, [last_goal_message], True)
                 )
-        return "\n".join(vis_items)
+        return vis_items
 
     async def agent_stream_message(
         self,
@@ -267,6 +348,11 @@ class GptsMemory:
 
     async def simple_message(self, conv_id: str):
         """Get agent simple message."""
+        return await self._simple_message_segments(conv_id)
+
+    async def _simple_message_segments(
+        self, conv_id: str, view: Optional[MessageView] = None
+    ) -> List[Dict]:
         messages_cache = self.messages_cache[conv_id]
         if messages_cache and len(messages_cache) > 0:
             messages = messages_cache
@@ -279,28 +365,39 @@ class GptsMemory:
         for message in messages:
             if message.sender == "Human":
                 continue
-
-            action_report_str = message.action_report
-            view_info = message.content
-            action_out = None
-            if action_report_str and len(action_report_str) > 0:
-                action_out = ActionOutput.from_dict(json.loads(action_report_str))
-            if action_out is not None:
-                view_info = action_out.content
-
             simple_message_list.append(
-                {
-                    "sender": message.sender,
-                    "receiver": message.receiver,
-                    "model": message.model_name,
-                    "markdown": view_info,
-                }
+                await self._render_vis(
+                    view,
+                    ("simple", _message_key(message)),
+                    lambda message=message: self._message_to_simple(message),
+                )
             )
 
         return simple_message_list
 
+    async def _message_to_simple(self, message: GptsMessage) -> Dict:
+        action_report_str = message.action_report
+        view_info = message.content
+        action_out = None
+        if action_report_str and len(action_report_str) > 0:
+            action_out = ActionOutput.from_dict(json.loads(action_report_str))
+        if action_out is not None:
+            view_info = action_out.content
+
+        return {
+            "sender": message.sender,
+            "receiver": message.receiver,
+            "model": message.model_name,
+            "markdown": view_info,
+        }
+
     async def app_link_chat_message(self, conv_id: str):
         """Get app link chat message."""
+        return "\n".join(await self._app_link_vis_segments(conv_id))
+
+    async def _app_link_vis_segments(
+        self, conv_id: str, view: Optional[MessageView] = None
+    ) -> List[str]:
         messages = []
         if conv_id in self.messages_cache:
             messages_cache = self.messages_cache[conv_id]
@@ -362,13 +459,22 @@ class GptsMemory:
 
         vis_items: list = []
         if app_link_message:
+            link_key = (
+                "app_link",
+                _message_key(app_link_message),
+                _message_key(app_lanucher_message) if app_lanucher_message else None,
+            )
             vis_items.append(
-                await self._messages_to_app_link_vis(
-                    app_link_message, app_lanucher_message
+                await self._render_vis(
+                    view,
+                    link_key,
+                    lambda: self._messages_to_app_link_vis(
+                        app_link_message, app_lanucher_message
+                    ),
                 )
             )
 
-        return await self._message_group_vis_build(temp_group, vis_items)
+        return await self._message_group_vis_build(temp_group, vis_items, view)
 
     async def _messages_to_agents_vis(
         self, messages: List[GptsMessage], is_last_message: bool = False
@@ -449,8 +555,30 @@ class GptsMemory:
     async def chat_messages(
         self,
         conv_id: str,
+        delta: bool = False,
+        snapshot_interval: int = 50,
     ):
-        """Get chat messages."""
+        """Get chat messages.
+
+        Args:
+            conv_id (str): The conversation id
+            delta (bool): Yield the patches(:class:`MessageViewPatch`) of the view
+                instead of the full view. The first patch and every
+                `snapshot_interval` patches are full snapshots.
+            snapshot_interval (int): The number of the patches between two full
+                snapshots in the delta mode.
+        """
+        view: Optional[MessageView] = self.views.get(conv_id)
+        # A late subscriber starts from the full snapshot of the current view
+        segments: List[Any] = list(view.segments) if view else []
+        seq = view.seq if view else 0
+        patches_since_snapshot: Optional[int] = None
+        if seq > 0:
+            patches_since_snapshot = 0
+            if delta:
+                yield MessageViewPatch(seq, 0, list(segments))
+            else:
+                yield self._full_view(conv_id, segments)
         while True:
             queue = self.queue(conv_id)
             if not queue:
@@ -459,6 +587,27 @@ class GptsMemory:
             if item == "[DONE]":
                 queue.task_done()
                 break
+            if not isinstance(item, MessageViewPatch):
+                yield item
+                continue
+            if item.seq <= seq:
+                # Already in the view when subscribing
+                continue
+            item.apply(segments)
+            seq = item.seq
+            if not delta:
+                yield self._full_view(conv_id, segments)
+            elif (
+                patches_since_snapshot is None
+                or patches_since_snapshot >= snapshot_interval
+            ):
+                patches_since_snapshot = 0
+                yield MessageViewPatch(seq, 0, list(segments))
             else:
+                patches_since_snapshot += 1
                 yield item
-                await asyncio.sleep(0.005)
+
+    def _full_view(self, conv_id: str, segments: List[Any]) -> Union[str, List]:
+        if self.enable_vis_message(conv_id):
+            return "\n".join(segments)
+        return list(segments)
@@ -0,0 +1,88 @@
+"""The incremental view of the GPTs messages for streaming."""
+
+import dataclasses
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+
+@dataclasses.dataclass
+class MessageViewPatch:
+    """A patch of the message view.
+
+    The segments of the view from ``start`` are replaced by ``segments``, a patch
+    starts from 0 is a full snapshot.
+    """
+
+    seq: int
+    start: int
+    segments: List[Any]
+
+    @property
+    def is_snapshot(self) -> bool:
+        """Whether the patch is a full snapshot."""
+        return self.start == 0
+
+    def apply(self, segments: List[Any]) -> None:
+        """Apply the patch to the segments in place."""
+        del segments[self.start :]
+        segments.extend(self.segments)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the patch to a dict."""
+        return dataclasses.asdict(self)
+
+
+class MessageView:
+    """The rendered segments of a conversation.
+
+    A segment(an agent message group, a plan or the streaming message) is rendered
+    once and reused while its inputs don't change, so every push only renders the
+    new or changed segments, and the patch starts from the first changed segment.
+    """
+
+    def __init__(self):
+        """Create a new MessageView."""
+        self.seq = 0
+        self.segments: List[Any] = []
+        # The segments rendered from the messages, without the streaming message
+        self.message_segments: List[Any] = []
+        self.message_count = -1
+        self._render_cache: Dict[Hashable, Any] = {}
+        self._next_render_cache: Dict[Hashable, Any] = {}
+
+    async def render(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the rendered segment of the key, render it if it's changed."""
+        if key in self._next_render_cache:
+            return self._next_render_cache[key]
+        if key in self._render_cache:
+            value = self._render_cache[key]
+        else:
+            value = await func()
+        self._next_render_cache[key] = value
+        return value
+
+    def update(self, segments: List[Any]) -> Optional[MessageViewPatch]:
+        """Replace the segments of the view.
+
+        Returns:
+            Optional[MessageViewPatch]: The patch, None if nothing is changed.
+        """
+        # Only keep the segments rendered this time
+        if self._next_render_cache:
+            self._render_cache, self._next_render_cache = self._next_render_cache, {}
+        start = 0
+        limit = min(len(self.segments), len(segments))
+        # The unchanged segments are the same objects, the comparison is cheap
+        while start < limit and (
+            self.segments[start] is segments[start]
+            or self.segments[start] == segments[start]
+        ):
+            start += 1
+        if start == len(segments) == len(self.segments):
+            return None
+        self.seq += 1
+        self.segments = segments
+        return MessageViewPatch(self.seq, start, segments[start:])
+
+    def snapshot(self) -> MessageViewPatch:
+        """Return the full snapshot of the view."""
+        return MessageViewPatch(self.seq, 0, list(self.segments))
@@ -0,0 +1,89 @@
+from typing import List
+
+import pytest
+
+from ..base import GptsMessage
+from ..gpts_memory import GptsMemory
+from ..message_view import MessageViewPatch
+
+
+def _message(content: str, goal: str = None, sender: str = "Coder") -> GptsMessage:
+    return GptsMessage(
+        conv_id="conv1",
+        sender=sender,
+        receiver="Human",
+        role="assistant",
+        content=content,
+        current_goal=goal,
+    )
+
+
+async def _drain(memory: GptsMemory, conv_id: str, **kwargs) -> List:
+    await memory.complete(conv_id)
+    return [item async for item in memory.chat_messages(conv_id, **kwargs)]
+
+
+@pytest.mark.asyncio
+async def test_only_changed_segments_are_rendered(mocker):
+    memory = GptsMemory()
+    memory.init("conv1")
+    render = mocker.spy(memory, "_messages_to_agents_vis")
+
+    for i in range(10):
+        await memory.append_message("conv1", _message(f"message {i}"))
+    # Every message is rendered once, the old ones are reused
+    assert render.call_count == 10
+
+    render.reset_mock()
+    for i in range(5):
+        await memory.push_message("conv1", f"streaming {i}")
+    assert render.call_count == 0
+
+    items = await _drain(memory, "conv1")
+    # The patches which are not consumed are merged into one
+    assert len(items) == 1
+    assert items[0] == await memory.app_link_chat_message("conv1") + (
+        "\n" + await memory.agent_stream_message("streaming 4")
+    )
+
+
+@pytest.mark.asyncio
+async def test_delta_patches():
+    memory = GptsMemory()
+    memory.init("conv1")
+    await memory.append_message("conv1", _message("first", goal="goal1"))
+    await memory.append_message("conv1", _message("second", goal="goal2"))
+    subscriber = memory.chat_messages("conv1", delta=True, snapshot_interval=2)
+    # A late subscriber gets the full snapshot first
+    snapshot = await subscriber.__anext__()
+    assert snapshot.is_snapshot
+    segments: List[str] = list(snapshot.segments)
+
+    patches: List[MessageViewPatch] = []
+    for i in range(4):
+        await memory.push_message("conv1", f"streaming {i}")
+        patch = await subscriber.__anext__()
+        patch.apply(segments)
+        patches.append(patch)
+    await memory.complete("conv1")
+    assert [item async for item in subscriber] == []
+
+    # The first patch is merged with the ones pushed before subscribing
+    assert [p.is_snapshot for p in patches] == [True, False, True, False]
+    # Only the streaming message is changed
+    assert len(patches[1].segments) == 1
+    assert "\n".join(segments) == await memory.app_link_chat_message("conv1") + (
+        "\n" + await memory.agent_stream_message("streaming 3")
+    )
+
+
+@pytest.mark.asyncio
+async def test_simple_messages():
+    memory = GptsMemory()
+    memory.init("conv1", enable_vis_message=False)
+    await memory.append_message("conv1", _message("hello", sender="Human"))
+    await memory.append_message("conv1", _message("hi"))
+    await memory.push_message("conv1", "streaming")
+    items = await _drain(memory, "conv1")
+    assert [m["markdown"] for m in items[-1]] == ["hi", "streaming"]
+    assert items[-1][:1] == await memory.simple_message("conv1")
@@ -22,6 +22,7 @@ from typing import (
     Optional,
     Sequence,
     Set,
+    Tuple,
     Union,
     cast,
 )
@@ -622,6 +623,11 @@ class DAGVariables:
         return self._cached_provider
 
 
+_CURRENT_TASK_CONTEXT: contextvars.ContextVar[
+    Optional[Tuple["DAGContext", TaskContext]]
+] = contextvars.ContextVar("current_task_context", default=None)
+
+
 class DAGContext:
     """The context of current DAG, created when the DAG is running.
 
@@ -670,7 +676,15 @@ class DAGContext:
 
     @property
     def current_task_context(self) -> TaskContext:
-        """Return the current task context."""
+        """Return the current task context.
+
+        When nodes run in parallel, every node runs in its own asyncio task, so the
+        task context set in the current asyncio task takes precedence over the last
+        one set on this DAG context.
+        """
+        curr = _CURRENT_TASK_CONTEXT.get()
+        if curr is not None and curr[0] is self:
+            return curr[1]
         if not self._curr_task_ctx:
             raise RuntimeError("Current task context not set")
         return self._curr_task_ctx
@@ -684,10 +698,10 @@ class DAGContext:
         """Set the current task context.
 
         When the task is running, the current task context
-        will be set to the task context.
-
-        TODO: We should support parallel task running in the future.
+        will be set to the task context. The task context is bound to the current
+        asyncio task, so parallel running tasks don't overwrite each other.
         """
+        _CURRENT_TASK_CONTEXT.set((self, _curr_task_ctx))
         self._curr_task_ctx = _curr_task_ctx
 
     def get_task_output(self, task_name: str) -> TaskOutput:
@@ -798,8 +812,21 @@ class DAG:
         tags: Optional[Dict[str, str]] = None,
         description: Optional[str] = None,
         default_dag_variables: Optional[DAGVariables] = None,
+        max_concurrency: Optional[int] = None,
     ) -> None:
-        """Initialize a DAG."""
+        """Initialize a DAG.
+
+        Args:
+            dag_id (str): The DAG id.
+            resource_group (Optional[ResourceGroup]): The resource group.
+            tags (Optional[Dict[str, str]]): The tags of the DAG.
+            description (Optional[str]): The description of the DAG.
+            default_dag_variables (Optional[DAGVariables]): The default DAG variables.
+            max_concurrency (Optional[int]): The max number of nodes which can run
+                in parallel in one workflow run, None means use the runner's default.
+        """
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be greater than 0")
         self._dag_id = dag_id
         self._tags: Dict[str, str] = tags or {}
         self._description = description
@@ -812,6 +839,7 @@ class DAG:
         self._lock = asyncio.Lock()
         self._event_loop_task_id_to_ctx: Dict[int, DAGContext] = {}
         self._default_dag_variables = default_dag_variables
+        self._max_concurrency = max_concurrency
 
     def _append_node(self, node: DAGNode) -> None:
         if node.node_id in self.node_map:
@@ -848,6 +876,11 @@ class DAG:
         """Return the description of current DAG."""
         return self._description
 
+    @property
+    def max_concurrency(self) -> Optional[int]:
+        """Return the max number of nodes which can run in parallel."""
+        return self._max_concurrency
+
     @property
     def dev_mode(self) -> bool:
         """Whether the current DAG is in dev mode.
@@ -4,15 +4,21 @@ This runner will run the workflow in the current process.
 """
 
 import asyncio
+import heapq
 import logging
 import traceback
-from typing import Any, Dict, List, Optional, Set, cast
+from typing import Any, Dict, List, Optional, Set, Tuple, cast
 
 from dbgpt.component import SystemApp
 from dbgpt.util.tracer import root_tracer
 
 from ..dag.base import DAGContext, DAGVar, DAGVariables
-from ..operators.base import CALL_DATA, BaseOperator, WorkflowRunner
+from ..operators.base import (
+    CALL_DATA,
+    CURRENT_DAG_CONTEXT,
+    BaseOperator,
+    WorkflowRunner,
+)
 from ..operators.common_operator import BranchOperator
 from ..task.base import SKIP_DATA, TaskContext, TaskState
 from ..task.task_impl import DefaultInputContext, DefaultTaskContext, SimpleTaskOutput
@@ -22,10 +28,23 @@ logger = logging.getLogger(__name__)
 
 
 class DefaultWorkflowRunner(WorkflowRunner):
-    """The default workflow runner."""
+    """The default workflow runner.
 
-    def __init__(self):
-        """Init the default workflow runner."""
+    The runner schedules the upstream nodes of the end node in topological order,
+    all nodes whose upstream nodes have finished run in parallel.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None):
+        """Init the default workflow runner.
+
+        Args:
+            max_concurrency (Optional[int], optional): The default max number of
+                nodes which can run in parallel in one workflow run, it can be
+                overridden by `DAG.max_concurrency`. None means no limit.
+        """
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be greater than 0")
+        self._max_concurrency = max_concurrency
         self._running_dag_ctx: Dict[str, DAGContext] = {}
         self._task_log_index_map: Dict[str, int] = {}
         self._lock = asyncio.Lock()
@@ -100,6 +119,12 @@ class DefaultWorkflowRunner(WorkflowRunner):
             # Save dag context
             await node.dag._save_dag_ctx(dag_ctx)
         await job_manager.before_dag_run()
+        # The nodes run in their own asyncio tasks, make the DAG context visible in
+        # the caller's task too (e.g. for the `after_dag_end` callbacks).
+        CURRENT_DAG_CONTEXT.set(dag_ctx)
+        max_concurrency = self._max_concurrency
+        if node.dag and node.dag.max_concurrency:
+            max_concurrency = node.dag.max_concurrency
 
         with root_tracer.start_span(
             "dbgpt.awel.workflow.run_workflow",
@@ -109,11 +134,21 @@ class DefaultWorkflowRunner(WorkflowRunner):
                 "streaming_call": streaming_call,
                 "awel_node_id": node.node_id,
                 "awel_node_name": node.node_name,
+                "max_concurrency": max_concurrency,
             },
         ):
-            await self._execute_node(
-                job_manager, node, dag_ctx, node_outputs, skip_node_ids, system_app
+            await self._execute_dag(
+                job_manager,
+                node,
+                dag_ctx,
+                node_outputs,
+                skip_node_ids,
+                system_app,
+                max_concurrency,
             )
+        if node.node_id in node_outputs:
+            # The end node is the current task context of the returned DAG context
+            dag_ctx.set_current_task_context(node_outputs[node.node_id])
         if not streaming_call and node.dag and exist_dag_ctx is None:
             # streaming call not work for dag end
             # if exist_dag_ctx is not None, it means current dag is a sub dag
@@ -122,6 +157,79 @@ class DefaultWorkflowRunner(WorkflowRunner):
         #     del self._running_dag_ctx[node.dag.dag_id]
         return dag_ctx
 
+    async def _execute_dag(
+        self,
+        job_manager: JobManager,
+        end_node: BaseOperator,
+        dag_ctx: DAGContext,
+        node_outputs: Dict[str, TaskContext],
+        skip_node_ids: Set[str],
+        system_app: Optional[SystemApp],
+        max_concurrency: Optional[int] = None,
+    ):
+        """Run the end node and all its upstream nodes.
+
+        A node is ready when all its upstream nodes have finished, ready nodes run
+        concurrently in their own asyncio tasks (at most `max_concurrency` at the
+        same time). Ready nodes are started in the depth-first order of the
+        upstream nodes, so with `max_concurrency=1` the execution order is the same
+        as running the upstream nodes one by one.
+        """
+        nodes = _upstream_post_order(end_node, node_outputs)
+        if not nodes:
+            return
+        order: Dict[str, int] = {n.node_id: i for i, n in enumerate(nodes)}
+        waiting: Dict[str, int] = {}
+        downstream: Dict[str, List[BaseOperator]] = {n.node_id: [] for n in nodes}
+        ready: List[Tuple[int, str]] = []
+        for n in nodes:
+            upstream_ids = {
+                u.node_id
+                for u in n.upstream
+                if isinstance(u, BaseOperator) and u.node_id in order
+            }
+            for upstream_id in upstream_ids:
+                downstream[upstream_id].append(n)
+            waiting[n.node_id] = len(upstream_ids)
+            if not upstream_ids:
+                heapq.heappush(ready, (order[n.node_id], n.node_id))
+
+        limit = max_concurrency or len(nodes)
+        running: Dict[asyncio.Task, BaseOperator] = {}
+        try:
+            while ready or running:
+                while ready and len(running) < limit:
+                    _, node_id = heapq.heappop(ready)
+                    node = nodes[order[node_id]]
+                    task = asyncio.create_task(
+                        self._execute_node(
+                            job_manager,
+                            node,
+                            dag_ctx,
+                            node_outputs,
+                            skip_node_ids,
+                            system_app,
+                        )
+                    )
+                    running[task] = node
+                done, _ = await asyncio.wait(
+                    running.keys(), return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    node = running.pop(task)
+                    # Raise the exception of the failed node
+                    task.result()
+                    for child in downstream[node.node_id]:
+                        waiting[child.node_id] -= 1
+                        if waiting[child.node_id] == 0:
+                            heapq.heappush(ready, (order[child.node_id], child.node_id))
+        finally:
+            if running:
+                # Some node failed or current workflow is cancelled
+                for task in running:
+                    task.cancel()
+                await asyncio.gather(*running.keys(), return_exceptions=True)
+
     async def _execute_node(
         self,
         job_manager: JobManager,
@@ -135,20 +243,6 @@ class DefaultWorkflowRunner(WorkflowRunner):
         if node.node_id in node_outputs:
             return
 
-        # Run all upstream nodes
-        # TODO: run in parallel, there are some code to be changed:
-        #  dag_ctx.set_current_task_context(task_ctx)
-        for upstream_node in node.upstream:
-            if isinstance(upstream_node, BaseOperator):
-                await self._execute_node(
-                    job_manager,
-                    upstream_node,
-                    dag_ctx,
-                    node_outputs,
-                    skip_node_ids,
-                    system_app,
-                )
-
         inputs = [
             node_outputs[upstream_node.node_id] for upstream_node in node.upstream
         ]
@@ -212,6 +306,38 @@ class DefaultWorkflowRunner(WorkflowRunner):
             raise e
 
 
+def _upstream_post_order(
+    end_node: BaseOperator, node_outputs: Dict[str, TaskContext]
+) -> List[BaseOperator]:
+    """Return the nodes to run in depth-first post order.
+
+    The nodes which already have outputs(and their upstream nodes) are excluded.
+    """
+    result: List[BaseOperator] = []
+    if end_node.node_id in node_outputs:
+        return result
+    visited: Set[str] = {end_node.node_id}
+    stack: List[Tuple[BaseOperator, int]] = [(end_node, 0)]
+    while stack:
+        node, idx = stack.pop()
+        upstream = node.upstream
+        while idx < len(upstream):
+            upstream_node = upstream[idx]
+            idx += 1
+            if (
+                isinstance(upstream_node, BaseOperator)
+                and upstream_node.node_id not in visited
+                and upstream_node.node_id not in node_outputs
+            ):
+                visited.add(upstream_node.node_id)
+                stack.append((node, idx))
+                stack.append((upstream_node, 0))
+                break
+        else:
+            result.append(node)
+    return result
+
+
 def _skip_current_downstream_by_node_name(
     branch_node: BranchOperator, skip_nodes: List[str], skip_node_ids: Set[str]
 ):
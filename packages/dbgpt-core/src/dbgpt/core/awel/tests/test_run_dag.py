@@ -1,3 +1,4 @@
+import asyncio
 from typing import List
 
 import pytest
@@ -6,6 +7,7 @@ from .. import (
     DAG,
     BranchOperator,
     DAGContext,
+    DefaultWorkflowRunner,
     InputOperator,
     JoinOperator,
     MapOperator,
@@ -138,3 +140,69 @@ async def test_branch_node(
         assert res.current_task_context.current_state == TaskState.SUCCESS
         expect_res = 999 if is_odd else 888
         assert res.current_task_context.task_output.output == expect_res
+
+
+class _SleepMapOperator(MapOperator[int, int]):
+    def __init__(self, running: List[int], delay: float = 0.05, **kwargs):
+        super().__init__(**kwargs)
+        self._running = running
+        self._delay = delay
+
+    async def map(self, x: int) -> int:
+        self._running[0] += 1
+        self._running[1] = max(self._running[1], self._running[0])
+        await asyncio.sleep(self._delay)
+        self._running[0] -= 1
+        return x + 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "input_node, max_concurrency, expect_max_running",
+    [
+        ({"outputs": [1]}, None, 3),
+        ({"outputs": [1]}, 2, 2),
+        ({"outputs": [1]}, 1, 1),
+    ],
+    indirect=["input_node"],
+)
+async def test_parallel_upstream_nodes(
+    input_node: InputOperator, max_concurrency: int, expect_max_running: int
+):
+    # [current running nodes, max running nodes]
+    running = [0, 0]
+
+    def join_func(o1, o2, o3) -> int:
+        return o1 + o2 + o3
+
+    with DAG("test_parallel_upstream_nodes", max_concurrency=max_concurrency):
+        join_node = JoinOperator(join_func)
+        for i in range(3):
+            input_node >> _SleepMapOperator(running, task_name=f"map_{i}") >> join_node
+
+        res: DAGContext[int] = await DefaultWorkflowRunner().execute_workflow(join_node)
+        assert res.current_task_context.current_state == TaskState.SUCCESS
+        assert res.current_task_context.task_output.output == 6
+        assert running[1] == expect_max_running
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "input_node",
+    [
+        ({"outputs": [1]}),
+    ],
+    indirect=["input_node"],
+)
+async def test_parallel_node_failed(runner: WorkflowRunner, input_node: InputOperator):
+    def raise_error(x: int) -> int:
+        raise ValueError("map error")
+
+    with DAG("test_parallel_node_failed"):
+        join_node = JoinOperator(lambda o1, o2: o1 + o2)
+        slow_node = _SleepMapOperator([0, 0], delay=10)
+        input_node >> slow_node >> join_node
+        input_node >> MapOperator(raise_error) >> join_node
+
+        with pytest.raises(ValueError, match="map error"):
+            await asyncio.wait_for(runner.execute_workflow(join_node), timeout=5)
@@ -28,6 +28,7 @@ class CachePolicy(str, Enum):
 
     LRU = "lru"
     FIFO = "fifo"
+    LFU = "lfu"
 
 
 @dataclass
@@ -36,6 +37,9 @@ class CacheConfig:
 
     retrieval_policy: Optional[RetrievalPolicy] = RetrievalPolicy.EXACT_MATCH
     cache_policy: Optional[CachePolicy] = CachePolicy.LRU
+    ttl: Optional[float] = None
+    """The seconds to keep the cached value, None means the default of the storage.
+    """
 
 
 class CacheKey(Serializable, ABC, Generic[K]):
@@ -1,14 +1,17 @@
 """File storage interface."""
 
+import asyncio
 import dataclasses
 import hashlib
 import io
+import json
 import logging
 import os
+import threading
 import uuid
 from abc import ABC, abstractmethod
 from io import BytesIO
-from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, BinaryIO, Dict, Iterator, List, Optional, Tuple
 from urllib.parse import parse_qs, urlencode, urlparse
 
 import requests
@@ -256,6 +259,80 @@ class StorageBackend(ABC):
             int: The save chunk size
         """
 
+    def load_range(
+        self, fm: FileMetadata, start: int = 0, end: Optional[int] = None
+    ) -> BinaryIO:
+        """Load the file data from the start offset.
+
+        The returned data is positioned at ``start``, it may contain the bytes after
+        ``end``, the caller stops reading at ``end``.
+
+        Args:
+            fm (FileMetadata): The file metadata
+            start (int): The start offset
+            end (Optional[int]): The end offset(exclusive), None means the end of
+                the file
+
+        Returns:
+            BinaryIO: The file data
+        """
+        file_data = self.load(fm)
+        if start:
+            file_data.seek(start)
+        return file_data
+
+    async def aload_chunks(
+        self,
+        fm: FileMetadata,
+        chunk_size: int,
+        start: int = 0,
+        end: Optional[int] = None,
+    ) -> AsyncIterator[bytes]:
+        """Load the file data by chunks asynchronously.
+
+        The default implementation reads every chunk in the default executor, so a
+        thread is only taken while a chunk is read, not for the whole transfer.
+
+        Args:
+            fm (FileMetadata): The file metadata
+            chunk_size (int): The chunk size
+            start (int): The start offset
+            end (Optional[int]): The end offset(exclusive), None means the end of
+                the file
+        """
+        loop = asyncio.get_running_loop()
+        file_data = await loop.run_in_executor(None, self.load_range, fm, start, end)
+        stream = FileStream(file_data, fm, start, end, verify=False)
+        try:
+            while chunk := await loop.run_in_executor(None, stream.read, chunk_size):
+                yield chunk
+        finally:
+            stream.close()
+
+    async def asave(
+        self,
+        bucket: str,
+        file_id: str,
+        file_data: BinaryIO,
+        public_url: bool = False,
+        public_url_expire: Optional[int] = None,
+    ) -> str:
+        """Save the file data to the storage backend asynchronously.
+
+        The default implementation runs :meth:`save` in the default executor.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            lambda: self.save(
+                bucket,
+                file_id,
+                file_data,
+                public_url=public_url,
+                public_url_expire=public_url_expire,
+            ),
+        )
+
 
 class LocalFileStorage(StorageBackend):
     """Local file storage backend."""
@@ -299,6 +376,38 @@ class LocalFileStorage(StorageBackend):
         file_path = os.path.join(bucket_path, fm.file_id)
         return open(file_path, "rb")  # noqa: SIM115
 
+    async def aload_chunks(
+        self,
+        fm: FileMetadata,
+        chunk_size: int,
+        start: int = 0,
+        end: Optional[int] = None,
+    ) -> AsyncIterator[bytes]:
+        """Load the file data by chunks asynchronously.
+
+        The chunks of a local file are read in the event loop, every read is bounded
+        by the chunk size, and the loop is released between the chunks.
+        """
+        async for chunk in _aiter_local_file(
+            self.load_range(fm, start, end), chunk_size, start, end
+        ):
+            yield chunk
+
+    async def asave(
+        self,
+        bucket: str,
+        file_id: str,
+        file_data: BinaryIO,
+        public_url: bool = False,
+        public_url_expire: Optional[int] = None,
+    ) -> str:
+        """Save the file data to the local storage backend asynchronously."""
+        bucket_path = os.path.join(self.base_path, bucket)
+        os.makedirs(bucket_path, exist_ok=True)
+        file_path = os.path.join(bucket_path, file_id)
+        await _awrite_local_file(file_path, file_data, self.save_chunk_size)
+        return file_path
+
     def delete(self, fm: FileMetadata) -> bool:
         """Delete the file data from the local storage backend."""
         bucket_path = os.path.join(self.base_path, fm.bucket)
@@ -309,6 +418,33 @@ class LocalFileStorage(StorageBackend):
         return False
 
 
+async def _aiter_local_file(
+    file_data: BinaryIO, chunk_size: int, start: int = 0, end: Optional[int] = None
+) -> AsyncIterator[bytes]:
+    stream = FileStream(file_data, None, start, end, verify=False)
+    try:
+        while chunk := stream.read(chunk_size):
+            yield chunk
+            # Release the event loop between the chunks
+            await asyncio.sleep(0)
+    finally:
+        stream.close()
+
+
+async def _awrite_local_file(
+    file_path: str, file_data: BinaryIO, chunk_size: int
+) -> None:
+    with open(file_path, "wb") as f:
+        while chunk := file_data.read(chunk_size):
+            f.write(chunk)
+            await asyncio.sleep(0)
+
+
+def _http_range(start: int, end: Optional[int]) -> str:
+    """Return the value of the HTTP Range header, the end of it is inclusive."""
+    return f"bytes={start}-{'' if end is None else end - 1}"
+
+
 def calculate_file_hash(file_data: BinaryIO, buffer_size: int) -> str:
     """Calculate the MD5 hash of the file data."""
     hasher = hashlib.md5()
@@ -319,6 +455,277 @@ def calculate_file_hash(file_data: BinaryIO, buffer_size: int) -> str:
     return hasher.hexdigest()
 
 
+_NO_HASH = "-1"
+
+
+class FileIntegrityError(ValueError):
+    """The file data doesn't match the hash in its metadata."""
+
+
+class _HashingReader:
+    """Wrap a file object, hash the bytes while they are read from the start.
+
+    The hash is only valid if the bytes are read sequentially from the start, seeking
+    back to the start resets the hash.
+    """
+
+    def __init__(self, file_data: BinaryIO):
+        self._raw = file_data
+        self._hasher = hashlib.md5()
+        self._hashed_size = 0
+        self._pos = file_data.tell()
+
+    @property
+    def hashed_size(self) -> int:
+        """Return the number of the bytes hashed from the start."""
+        return self._hashed_size
+
+    def hexdigest(self) -> str:
+        """Return the hash of the bytes read."""
+        return self._hasher.hexdigest()
+
+    def read(self, size: Optional[int] = None) -> bytes:
+        """Read the data and hash it."""
+        data = self._raw.read(None if size is None or size < 0 else size)
+        if self._pos == self._hashed_size:
+            self._hasher.update(data)
+            self._hashed_size += len(data)
+        self._pos += len(data)
+        return data
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """Seek to the position, seeking to the start resets the hash."""
+        self._raw.seek(offset, whence)
+        self._pos = self._raw.tell()
+        if self._pos == 0:
+            self._hasher = hashlib.md5()
+            self._hashed_size = 0
+        return self._pos
+
+    def tell(self) -> int:
+        """Return the current position."""
+        return self._pos
+
+    def __getattr__(self, name: str) -> Any:
+        """Delegate the other attributes to the wrapped file object."""
+        return getattr(self._raw, name)
+
+
+class FileStream:
+    """The readable stream of a stored file.
+
+    The hash is verified while the stream is consumed: the bytes read from the start
+    are hashed, and a :class:`FileIntegrityError` is raised when the end of the file
+    is reached with a different hash, so the file is read only once. A range stream
+    is not verified.
+    """
+
+    def __init__(
+        self,
+        file_data: BinaryIO,
+        metadata: Optional[FileMetadata],
+        start: int = 0,
+        end: Optional[int] = None,
+        verify: bool = True,
+        chunk_size: int = 1024 * 1024,
+    ):
+        """Create a file stream.
+
+        Args:
+            file_data (BinaryIO): The file data, positioned at ``start``
+            metadata (Optional[FileMetadata]): The file metadata, required to verify
+                the hash
+            start (int): The start offset of the range
+            end (Optional[int]): The end offset(exclusive) of the range, None means
+                the end of the file
+            verify (bool): Whether to verify the hash of the file
+            chunk_size (int): The chunk size of the iteration
+        """
+        self.metadata = metadata
+        self.chunk_size = chunk_size
+        self._raw = file_data
+        self._remaining = None if end is None else max(end - start, 0)
+        verify = (
+            verify
+            and metadata is not None
+            and start == 0
+            and end is None
+            and metadata.file_hash not in ("", _NO_HASH)
+        )
+        self._reader: Optional[_HashingReader] = (
+            _HashingReader(file_data) if verify else None
+        )
+        self._verified = False
+
+    @property
+    def verified(self) -> bool:
+        """Whether the hash of the whole file has been verified."""
+        return self._verified
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        """Read the data, verify the hash when the end of the file is reached."""
+        if size is None or size < 0:
+            size = -1 if self._remaining is None else self._remaining
+        elif self._remaining is not None:
+            size = min(size, self._remaining)
+        if size == 0:
+            return b""
+        reader = self._reader or self._raw
+        data = reader.read() if size == -1 else reader.read(size)
+        if self._remaining is not None:
+            self._remaining -= len(data)
+        if not data or size == -1:
+            self._verify()
+        return data
+
+    def _verify(self) -> None:
+        reader = self._reader
+        if not reader or self._verified or reader.hashed_size != reader.tell():
+            # Not verifiable if the file is not read sequentially from the start
+            return
+        if reader.hexdigest() != self.metadata.file_hash:  # type: ignore
+            raise FileIntegrityError("File integrity check failed. Hash mismatch.")
+        self._verified = True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """Seek to the position, only supported by the stream of the whole file."""
+        if self._remaining is not None:
+            raise io.UnsupportedOperation("Range stream is not seekable")
+        if self._reader:
+            return self._reader.seek(offset, whence)
+        self._raw.seek(offset, whence)
+        return self._raw.tell()
+
+    def tell(self) -> int:
+        """Return the current position."""
+        return self._reader.tell() if self._reader else self._raw.tell()
+
+    def iter_chunks(self, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+        """Iterate the data by chunks."""
+        chunk_size = chunk_size or self.chunk_size
+        while chunk := self.read(chunk_size):
+            yield chunk
+
+    def __iter__(self) -> Iterator[bytes]:
+        """Iterate the data by chunks."""
+        return self.iter_chunks()
+
+    def close(self) -> None:
+        """Close the stream."""
+        self._raw.close()
+
+    def __enter__(self) -> "FileStream":
+        """Enter the context manager."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        """Exit the context manager."""
+        self.close()
+
+
+class AsyncFileStream:
+    """The async readable stream of a stored file.
+
+    The async counterpart of :class:`FileStream`, the chunks come from an async
+    iterator and the hash is verified when the iteration is finished.
+    """
+
+    def __init__(
+        self,
+        chunks: AsyncIterator[bytes],
+        metadata: FileMetadata,
+        verify: bool = True,
+    ):
+        """Create an async file stream."""
+        self.metadata = metadata
+        self._chunks = chunks
+        self._verify = verify and metadata.file_hash not in ("", _NO_HASH)
+        self._verified = False
+
+    @property
+    def verified(self) -> bool:
+        """Whether the hash of the whole file has been verified."""
+        return self._verified
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        """Iterate the data by chunks."""
+        hasher = hashlib.md5()
+        async for chunk in self._chunks:
+            if self._verify:
+                hasher.update(chunk)
+            yield chunk
+        if self._verify:
+            if hasher.hexdigest() != self.metadata.file_hash:
+                raise FileIntegrityError("File integrity check failed. Hash mismatch.")
+            self._verified = True
+
+    async def read(self) -> bytes:
+        """Read all the data."""
+        return b"".join([chunk async for chunk in self])
+
+    async def aclose(self) -> None:
+        """Close the stream."""
+        aclose = getattr(self._chunks, "aclose", None)
+        if aclose:
+            await aclose()
+
+
+class _LocalFileHashIndex:
+    """The hashes of the local files.
+
+    A hash is trusted while the modified time and the size of the file don't change,
+    so the cached files are not hashed again on every access. The index is persisted
+    to a json file.
+    """
+
+    def __init__(self, index_path: str):
+        self._index_path = index_path
+        self._entries: Optional[Dict[str, List[Any]]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, List[Any]]:
+        if self._entries is None:
+            self._entries = {}
+            if os.path.exists(self._index_path):
+                try:
+                    with open(self._index_path, "r") as f:
+                        self._entries = json.load(f)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Ignore broken file hash index: {e}")
+        return self._entries
+
+    def get(self, file_path: str) -> Optional[str]:
+        """Return the trusted hash of the file, None if it's unknown or changed."""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._load().get(os.path.abspath(file_path))
+        if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return entry[2]
+        return None
+
+    def put(self, file_path: str, file_hash: str) -> None:
+        """Record the hash of the file."""
+        stat = os.stat(file_path)
+        with self._lock:
+            entries = self._load()
+            entries[os.path.abspath(file_path)] = [
+                stat.st_mtime_ns,
+                stat.st_size,
+                file_hash,
+            ]
+            # Drop the entries of the removed files
+            for path in [p for p in entries if not os.path.exists(p)]:
+                del entries[path]
+            os.makedirs(os.path.dirname(self._index_path), exist_ok=True)
+            tmp_path = f"{self._index_path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self._index_path)
+
+
 class FileStorageSystem:
     """File storage system."""
 
@@ -343,41 +750,23 @@ class FileStorageSystem:
             return "-1"
         return calculate_file_hash(file_data, self._save_chunk_size)
 
-    @trace("file_storage_system.save_file")
-    def save_file(
+    def _get_backend(self, storage_type: str) -> StorageBackend:
+        backend = self.storage_backends.get(storage_type)
+        if not backend:
+            raise ValueError(f"Unsupported storage type: {storage_type}")
+        return backend
+
+    def _build_metadata(
         self,
         bucket: str,
+        file_id: str,
         file_name: str,
         file_data: BinaryIO,
+        saved_data: BinaryIO,
         storage_type: str,
+        storage_path: str,
         custom_metadata: Optional[Dict[str, Any]] = None,
-        file_id: Optional[str] = None,
-        public_url: bool = False,
-        public_url_expire: Optional[int] = None,
-    ) -> str:
-        """Save the file data to the storage backend."""
-        file_id = str(uuid.uuid4()) if not file_id else file_id
-        backend = self.storage_backends.get(storage_type)
-        if not backend:
-            raise ValueError(f"Unsupported storage type: {storage_type}")
-
-        with root_tracer.start_span(
-            "file_storage_system.save_file.backend_save",
-            metadata={
-                "bucket": bucket,
-                "file_id": file_id,
-                "file_name": file_name,
-                "storage_type": storage_type,
-            },
-        ):
-            storage_path = backend.save(
-                bucket,
-                file_id,
-                file_data,
-                public_url=public_url,
-                public_url_expire=public_url_expire,
-            )
-
+    ) -> FileMetadata:
         file_data.seek(0, 2)  # Move to the end of the file
         file_size = file_data.tell()  # Get the file size
         file_data.seek(0)  # Reset file pointer
@@ -392,12 +781,19 @@ class FileStorageSystem:
         with root_tracer.start_span(
             "file_storage_system.save_file.calculate_hash",
         ):
-            file_hash = self._calculate_file_hash(file_data)
+            if (
+                isinstance(saved_data, _HashingReader)
+                and saved_data.hashed_size == file_size
+            ):
+                # Hashed while the backend read it
+                file_hash = saved_data.hexdigest()
+            else:
+                file_hash = self._calculate_file_hash(file_data)
         uri = FileStorageURI(
             storage_type, bucket, file_id, custom_params=custom_metadata
         )
 
-        metadata = FileMetadata(
+        return FileMetadata(
             file_id=file_id,
             bucket=bucket,
             file_name=file_name,
@@ -409,18 +805,104 @@ class FileStorageSystem:
             file_hash=file_hash,
         )
 
+    @trace("file_storage_system.save_file")
+    def save_file(
+        self,
+        bucket: str,
+        file_name: str,
+        file_data: BinaryIO,
+        storage_type: str,
+        custom_metadata: Optional[Dict[str, Any]] = None,
+        file_id: Optional[str] = None,
+        public_url: bool = False,
+        public_url_expire: Optional[int] = None,
+    ) -> str:
+        """Save the file data to the storage backend.
+
+        The hash is calculated while the backend reads the data, the data is only
+        read again if the backend doesn't read it sequentially.
+        """
+        file_id = str(uuid.uuid4()) if not file_id else file_id
+        backend = self._get_backend(storage_type)
+        saved_data = _HashingReader(file_data) if self.check_hash else file_data
+
+        with root_tracer.start_span(
+            "file_storage_system.save_file.backend_save",
+            metadata={
+                "bucket": bucket,
+                "file_id": file_id,
+                "file_name": file_name,
+                "storage_type": storage_type,
+            },
+        ):
+            storage_path = backend.save(
+                bucket,
+                file_id,
+                saved_data,  # type: ignore
+                public_url=public_url,
+                public_url_expire=public_url_expire,
+            )
+
+        metadata = self._build_metadata(
+            bucket,
+            file_id,
+            file_name,
+            file_data,
+            saved_data,  # type: ignore
+            storage_type,
+            storage_path,
+            custom_metadata,
+        )
         self.metadata_storage.save(metadata)
-        return str(uri)
+        return metadata.uri
 
-    @trace("file_storage_system.get_file")
-    def get_file(self, uri: str) -> Tuple[BinaryIO, FileMetadata]:
-        """Get the file data from the storage backend."""
+    async def asave_file(
+        self,
+        bucket: str,
+        file_name: str,
+        file_data: BinaryIO,
+        storage_type: str,
+        custom_metadata: Optional[Dict[str, Any]] = None,
+        file_id: Optional[str] = None,
+        public_url: bool = False,
+        public_url_expire: Optional[int] = None,
+    ) -> str:
+        """Save the file data to the storage backend asynchronously.
+
+        The async counterpart of :meth:`save_file`, the data is written by
+        :meth:`StorageBackend.asave`.
+        """
+        file_id = str(uuid.uuid4()) if not file_id else file_id
+        backend = self._get_backend(storage_type)
+        saved_data = _HashingReader(file_data) if self.check_hash else file_data
+        storage_path = await backend.asave(
+            bucket,
+            file_id,
+            saved_data,  # type: ignore
+            public_url=public_url,
+            public_url_expire=public_url_expire,
+        )
+        metadata = self._build_metadata(
+            bucket,
+            file_id,
+            file_name,
+            file_data,
+            saved_data,  # type: ignore
+            storage_type,
+            storage_path,
+            custom_metadata,
+        )
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.metadata_storage.save, metadata)
+        return metadata.uri
+
+    def _load_metadata(self, uri: str) -> FileMetadata:
         if FileStorageURI.is_local_file(uri):
             local_file_name = uri.split("/")[-1]
             if not os.path.exists(uri):
                 raise FileNotFoundError(f"File not found: {uri}")
 
-            dummy_metadata = FileMetadata(
+            return FileMetadata(
                 file_id=local_file_name,
                 bucket="dummy_bucket",
                 file_name=local_file_name,
@@ -431,9 +913,6 @@ class FileStorageSystem:
                 custom_metadata={},
                 file_hash="",
             )
-            logger.info(f"Reading local file: {uri}")
-            return open(uri, "rb"), dummy_metadata  # noqa: SIM115
-
         parsed_uri = FileStorageURI.parse(uri)
         metadata = self.metadata_storage.load(
             FileMetadataIdentifier(
@@ -443,10 +922,21 @@ class FileStorageSystem:
         )
         if not metadata:
             raise FileNotFoundError(f"No metadata found for URI: {uri}")
+        return metadata
 
-        backend = self.storage_backends.get(metadata.storage_type)
-        if not backend:
-            raise ValueError(f"Unsupported storage type: {metadata.storage_type}")
+    @trace("file_storage_system.get_file")
+    def get_file(self, uri: str) -> Tuple[BinaryIO, FileMetadata]:
+        """Get the file data from the storage backend.
+
+        The hash is verified before the data is returned, use :meth:`open_file` to
+        verify it while the data is consumed.
+        """
+        metadata = self._load_metadata(uri)
+        if FileStorageURI.is_local_file(uri):
+            logger.info(f"Reading local file: {uri}")
+            return open(uri, "rb"), metadata  # noqa: SIM115
+
+        backend = self._get_backend(metadata.storage_type)
 
         with root_tracer.start_span(
             "file_storage_system.get_file.backend_load",
@@ -463,11 +953,86 @@ class FileStorageSystem:
             "file_storage_system.get_file.verify_hash",
         ):
             calculated_hash = self._calculate_file_hash(file_data)
-        if calculated_hash != "-1" and calculated_hash != metadata.file_hash:
-            raise ValueError("File integrity check failed. Hash mismatch.")
+        if calculated_hash != _NO_HASH and calculated_hash != metadata.file_hash:
+            raise FileIntegrityError("File integrity check failed. Hash mismatch.")
 
         return file_data, metadata
 
+    @trace("file_storage_system.open_file")
+    def open_file(
+        self, uri: str, start: int = 0, end: Optional[int] = None
+    ) -> Tuple[FileStream, FileMetadata]:
+        """Open the file as a stream.
+
+        The hash of the whole file is verified while the stream is consumed, a
+        :class:`FileIntegrityError` is raised by the read reaching the end of the
+        file if it doesn't match.
+
+        Args:
+            uri (str): The file URI
+            start (int): The start offset of the range
+            end (Optional[int]): The end offset(exclusive) of the range, None means
+                the end of the file
+
+        Returns:
+            Tuple[FileStream, FileMetadata]: The file stream and metadata
+        """
+        metadata = self._load_metadata(uri)
+        if FileStorageURI.is_local_file(uri):
+            file_data: BinaryIO = open(uri, "rb")  # noqa: SIM115
+            if start:
+                file_data.seek(start)
+        else:
+            backend = self._get_backend(metadata.storage_type)
+            file_data = backend.load_range(metadata, start, end)
+        stream = FileStream(
+            file_data,
+            metadata,
+            start,
+            end,
+            verify=self.check_hash,
+            chunk_size=self._save_chunk_size,
+        )
+        return stream, metadata
+
+    async def aget_file(
+        self,
+        uri: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+    ) -> Tuple[AsyncFileStream, FileMetadata]:
+        """Get the file data from the storage backend asynchronously.
+
+        The async counterpart of :meth:`open_file`, the data is loaded by
+        :meth:`StorageBackend.aload_chunks` and the hash of the whole file is
+        verified when the iteration is finished.
+
+        Args:
+            uri (str): The file URI
+            start (int): The start offset of the range
+            end (Optional[int]): The end offset(exclusive) of the range, None means
+                the end of the file
+            chunk_size (Optional[int]): The chunk size, defaults to the save chunk
+                size
+
+        Returns:
+            Tuple[AsyncFileStream, FileMetadata]: The async file stream and metadata
+        """
+        chunk_size = chunk_size or self._save_chunk_size
+        loop = asyncio.get_running_loop()
+        metadata = await loop.run_in_executor(None, self._load_metadata, uri)
+        if FileStorageURI.is_local_file(uri):
+            file_data: BinaryIO = open(uri, "rb")  # noqa: SIM115
+            if start:
+                file_data.seek(start)
+            chunks = _aiter_local_file(file_data, chunk_size, start, end)
+        else:
+            backend = self._get_backend(metadata.storage_type)
+            chunks = backend.aload_chunks(metadata, chunk_size, start, end)
+        verify = self.check_hash and start == 0 and end is None
+        return AsyncFileStream(chunks, metadata, verify=verify), metadata
+
     def get_file_metadata(self, bucket: str, file_id: str) -> Optional[FileMetadata]:
         """Get the file metadata.
 
@@ -576,9 +1141,14 @@ class FileStorageClient(BaseComponent):
         storage_system: Optional[FileStorageSystem] = None,
         save_chunk_size: int = 1024 * 1024,
         default_storage_type: Optional[str] = None,
+        cache_path: Optional[str] = None,
     ):
         """Initialize the file storage client."""
         super().__init__(system_app=system_app)
+        if not cache_path:
+            from pathlib import Path
+
+            cache_path = str(Path.home() / ".cache" / "dbgpt" / "files")
         if not storage_system:
             from pathlib import Path
 
@@ -598,6 +1168,10 @@ class FileStorageClient(BaseComponent):
         self._storage_system = storage_system
         self.save_chunk_size = save_chunk_size
         self.default_storage_type = default_storage_type
+        self.cache_path = cache_path
+        self._hash_index = _LocalFileHashIndex(
+            os.path.join(cache_path, ".file_hash_index.json")
+        )
 
     def init_app(self, system_app: SystemApp):
         """Initialize the application."""
@@ -704,36 +1278,114 @@ class FileStorageClient(BaseComponent):
             raise FileNotFoundError(f"File not found: {uri}")
 
         extension = os.path.splitext(file_metadata.file_name)[1]
+        file_hash = file_metadata.file_hash
         if dest_path:
             target_path = dest_path
         elif dest_dir:
             os.makedirs(dest_dir, exist_ok=True)
             target_path = os.path.join(dest_dir, file_metadata.file_id + extension)
         else:
-            from pathlib import Path
-
-            # Write to system temp directory
-            base_path = str(Path.home() / ".cache" / "dbgpt" / "files")
-            os.makedirs(base_path, exist_ok=True)
-            target_path = os.path.join(base_path, file_metadata.file_id + extension)
-        file_hash = file_metadata.file_hash
+            # The cached files are addressed by the content hash, so the same content
+            # is only downloaded once
+            os.makedirs(self.cache_path, exist_ok=True)
+            cache_name = (
+                file_hash if file_hash not in ("", _NO_HASH) else file_metadata.file_id
+            )
+            target_path = os.path.join(self.cache_path, cache_name + extension)
         if os.path.exists(target_path) and cache:
-            logger.debug(f"File {target_path} already exists, begin hash check")
-            with open(target_path, "rb") as f:
-                if file_hash == calculate_file_hash(f, self.save_chunk_size):
-                    logger.info(f"File {uri} already exists at {target_path}")
-                    return target_path, file_metadata
+            local_hash = self._hash_index.get(target_path)
+            if local_hash is None:
+                logger.debug(f"File {target_path} already exists, begin hash check")
+                with open(target_path, "rb") as f:
+                    local_hash = calculate_file_hash(f, self.save_chunk_size)
+                self._hash_index.put(target_path, local_hash)
+            if file_hash == local_hash:
+                logger.info(f"File {uri} already exists at {target_path}")
+                return target_path, file_metadata
         logger.info(f"Downloading file {uri} to {target_path}")
-        file_data, _ = self.storage_system.get_file(uri)
-
-        with open(target_path, "wb") as f:
-            while True:
-                chunk = file_data.read(self.save_chunk_size)
-                if not chunk:
-                    break
-                f.write(chunk)
+        stream, _ = self.storage_system.open_file(uri)
+        tmp_path = f"{target_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with stream, open(tmp_path, "wb") as f:
+                for chunk in stream.iter_chunks(self.save_chunk_size):
+                    f.write(chunk)
+            os.replace(tmp_path, target_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        if stream.verified:
+            self._hash_index.put(target_path, file_hash)
         return target_path, file_metadata
 
+    def open_file(
+        self, uri: str, start: int = 0, end: Optional[int] = None
+    ) -> Tuple[FileStream, FileMetadata]:
+        """Open the file as a stream, the hash is verified while it's consumed.
+
+        Args:
+            uri (str): The file URI
+            start (int): The start offset of the range
+            end (Optional[int]): The end offset(exclusive) of the range, None means
+                the end of the file
+
+        Returns:
+            Tuple[FileStream, FileMetadata]: The file stream and metadata
+        """
+        return self.storage_system.open_file(uri, start, end)
+
+    async def aget_file(
+        self,
+        uri: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+    ) -> Tuple[AsyncFileStream, FileMetadata]:
+        """Get the file data from the storage system asynchronously.
+
+        Args:
+            uri (str): The file URI
+            start (int): The start offset of the range
+            end (Optional[int]): The end offset(exclusive) of the range, None means
+                the end of the file
+            chunk_size (Optional[int]): The chunk size
+
+        Returns:
+            Tuple[AsyncFileStream, FileMetadata]: The async file stream and metadata
+        """
+        return await self.storage_system.aget_file(uri, start, end, chunk_size)
+
+    async def asave_file(
+        self,
+        bucket: str,
+        file_name: str,
+        file_data: BinaryIO,
+        storage_type: Optional[str] = None,
+        custom_metadata: Optional[Dict[str, Any]] = None,
+        file_id: Optional[str] = None,
+    ) -> str:
+        """Save the file data to the storage system asynchronously.
+
+        Args:
+            bucket (str): The bucket name
+            file_name (str): The file name
+            file_data (BinaryIO): The file data
+            storage_type (str): The storage type
+            custom_metadata (Dict[str, Any], optional): Custom metadata. Defaults to
+                None.
+            file_id(str, optional): The file ID. Defaults to None. If not provided, a
+                random UUID will be generated.
+
+        Returns:
+            str: The file URI
+        """
+        if not storage_type:
+            storage_type = self.default_storage_type
+        if not storage_type:
+            raise ValueError("Storage type not provided")
+        return await self.storage_system.asave_file(
+            bucket, file_name, file_data, storage_type, custom_metadata, file_id
+        )
+
     def get_file(self, uri: str) -> Tuple[BinaryIO, FileMetadata]:
         """Get the file data from the storage system.
 
@@ -913,7 +1565,7 @@ class SimpleDistributedStorage(StorageBackend):
                 raise FileNotFoundError(f"File {file_id} not found on the local node")
         else:
             response = requests.get(
-                f"http://{node_address}{self._api_prefix}/{bucket}/{file_id}",
+                self._remote_file_url(node_address, bucket, file_id),
                 timeout=self._transfer_timeout,
                 stream=True,
             )
@@ -923,6 +1575,98 @@ class SimpleDistributedStorage(StorageBackend):
                 response.iter_content(chunk_size=self._transfer_chunk_size)
             )
 
+    def _remote_file_url(self, node_address: str, bucket: str, file_id: str) -> str:
+        return f"http://{node_address}{self._api_prefix}/{bucket}/{file_id}"
+
+    def load_range(
+        self, fm: FileMetadata, start: int = 0, end: Optional[int] = None
+    ) -> BinaryIO:
+        """Load the file data from the start offset.
+
+        The range of a remote file is requested with the HTTP ``Range`` header.
+        """
+        node_address = self._parse_node_address(fm)
+        if (not start and end is None) or node_address == self.node_address:
+            return super().load_range(fm, start, end)
+        response = requests.get(
+            self._remote_file_url(node_address, fm.bucket, fm.file_id),
+            headers={"Range": _http_range(start, end)},
+            timeout=self._transfer_timeout,
+            stream=True,
+        )
+        response.raise_for_status()
+        file_data = StreamedBytesIO(
+            response.iter_content(chunk_size=self._transfer_chunk_size)
+        )
+        if response.status_code != 206 and start:
+            # The remote node ignores the range, skip the bytes before the start
+            file_data.seek(start)
+        return file_data
+
+    async def aload_chunks(
+        self,
+        fm: FileMetadata,
+        chunk_size: int,
+        start: int = 0,
+        end: Optional[int] = None,
+    ) -> AsyncIterator[bytes]:
+        """Load the file data by chunks asynchronously.
+
+        A local file is read in the event loop, and a remote file is streamed with
+        aiohttp.
+        """
+        node_address = self._parse_node_address(fm)
+        if node_address == self.node_address:
+            async for chunk in _aiter_local_file(
+                self.load_range(fm, start, end), chunk_size, start, end
+            ):
+                yield chunk
+            return
+
+        import aiohttp
+
+        headers = {}
+        if start or end is not None:
+            headers["Range"] = _http_range(start, end)
+        timeout = aiohttp.ClientTimeout(total=self._transfer_timeout)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with session.get(
+                self._remote_file_url(node_address, fm.bucket, fm.file_id),
+                headers=headers,
+            ) as response:
+                response.raise_for_status()
+                # Skip the bytes before the start if the remote node ignores the range
+                skip = start if response.status != 206 else 0
+                remaining = None if end is None else end - start
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    if skip:
+                        skipped = min(skip, len(chunk))
+                        chunk, skip = chunk[skipped:], skip - skipped
+                    if remaining is not None:
+                        chunk = chunk[:remaining]
+                        remaining -= len(chunk)
+                    if chunk:
+                        yield chunk
+                    if remaining == 0:
+                        break
+
+    async def asave(
+        self,
+        bucket: str,
+        file_id: str,
+        file_data: BinaryIO,
+        public_url: bool = False,
+        public_url_expire: Optional[int] = None,
+    ) -> str:
+        """Save the file data to the distributed storage backend asynchronously.
+
+        Just save the file locally.
+        """
+        file_path = self._get_file_path(bucket, file_id, self.node_address)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        await _awrite_local_file(file_path, file_data, self.save_chunk_size)
+        return f"distributed://{self.node_address}/{bucket}/{file_id}"
+
     def delete(self, fm: FileMetadata) -> bool:
         """Delete the file data from the distributed storage backend.
 
@@ -948,7 +1692,7 @@ class SimpleDistributedStorage(StorageBackend):
         else:
             try:
                 response = requests.delete(
-                    f"http://{node_address}{self._api_prefix}/{bucket}/{file_id}",
+                    self._remote_file_url(node_address, bucket, file_id),
                     timeout=self._transfer_timeout,
                 )
                 response.raise_for_status()
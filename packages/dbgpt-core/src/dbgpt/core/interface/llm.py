@@ -1,5 +1,6 @@
 """The interface for LLM."""
 
+import asyncio
 import collections
 import copy
 import logging
@@ -1089,6 +1090,22 @@ class LLMClient(ABC):
             int: The number of tokens.
         """
 
+    async def count_tokens(self, model: str, prompts: List[str]) -> List[int]:
+        """Count the number of tokens of the prompts concurrently.
+
+        Args:
+            model(str): The model name.
+            prompts(List[str]): The prompts.
+
+        Returns:
+            List[int]: The number of tokens of every prompt.
+        """
+        return list(
+            await asyncio.gather(
+                *[self.count_token(model, prompt) for prompt in prompts]
+            )
+        )
+
     async def covert_message(
         self,
         request: ModelRequest,
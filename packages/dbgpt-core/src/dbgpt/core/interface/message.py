@@ -2,10 +2,26 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import threading
 from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
 from collections.abc import Iterable
 from datetime import datetime
-from typing import Callable, Dict, List, Optional, Tuple, Union, cast
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
 
 from dbgpt._private.pydantic import BaseModel, Field, model_to_dict
 from dbgpt.core.interface.media import MediaContent
@@ -1347,6 +1363,45 @@ class StorageConversation(OnceConversation, StorageItem):
         if not conversation.param_value:
             conversation.param_value = param_value
 
+    def get_history_window(
+        self,
+        model_name: str,
+        max_token_limit: int,
+        token_counter: TokenCounter,
+        summarizer: Optional[HistorySummarizer] = None,
+    ) -> "ConversationTokenWindow":
+        """Return the token budgeted history window of the conversation.
+
+        The window is kept across the requests of the conversation, so only the new
+        messages are counted every turn.
+
+        Examples:
+            .. code-block:: python
+
+                window = conversation.get_history_window("gpt-4o", 4096, token_counter)
+                history = await window.update(conversation.get_history_message())
+
+        Args:
+            model_name (str): The model name to count the tokens
+            max_token_limit (int): The token budget of the history
+            token_counter (TokenCounter): The function to count the tokens
+            summarizer (Optional[HistorySummarizer]): The function to fold the
+                evicted rounds into the rolling summary, None means the evicted rounds
+                are dropped
+
+        Returns:
+            ConversationTokenWindow: The history window
+        """
+        key = (self.conv_uid, model_name, max_token_limit, summarizer is not None)
+        return _HISTORY_WINDOWS.get_or_create(
+            key,
+            lambda: ConversationTokenWindow(
+                model_name, max_token_limit, token_counter, summarizer
+            ),
+            token_counter,
+            summarizer,
+        )
+
     def delete(self) -> None:
         """Delete all the messages and conversation."""
         # Delete messages first
@@ -1390,6 +1445,249 @@ class StorageConversation(OnceConversation, StorageItem):
         )
 
 
+TokenCounter = Callable[[str, List[str]], Awaitable[List[int]]]
+"""Count the tokens of the prompts with the model, -1 for the failed ones."""
+
+HistorySummarizer = Callable[[Optional[str], List[BaseMessage]], Awaitable[str]]
+"""Fold the messages into the previous summary, return the new summary."""
+
+
+class _TokenCountCache:
+    """The LRU cache of the token counts, keyed by the model and the text digest."""
+
+    def __init__(self, max_size: int = 100000):
+        self._max_size = max_size
+        self._counts: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str]) -> Optional[int]:
+        with self._lock:
+            count = self._counts.get(key)
+            if count is not None:
+                self._counts.move_to_end(key)
+            return count
+
+    def put(self, key: Tuple[str, str], count: int) -> None:
+        with self._lock:
+            self._counts[key] = count
+            self._counts.move_to_end(key)
+            while len(self._counts) > self._max_size:
+                self._counts.popitem(last=False)
+
+
+_TOKEN_COUNTS = _TokenCountCache()
+
+
+def _message_text(message: BaseMessage) -> str:
+    return _messages_to_str([message])
+
+
+async def count_message_tokens(
+    model_name: str, messages: List[BaseMessage], token_counter: TokenCounter
+) -> List[int]:
+    """Count the tokens of every message.
+
+    The counts are cached by the model and the message content, so a message is only
+    counted once, and the uncached messages are counted in one call.
+
+    Args:
+        model_name (str): The model name
+        messages (List[BaseMessage]): The messages
+        token_counter (TokenCounter): The function to count the tokens
+
+    Returns:
+        List[int]: The token count of every message, 0 if the counting failed
+    """
+    counts: List[int] = []
+    missing: Dict[Tuple[str, str], List[int]] = {}
+    missing_texts: List[str] = []
+    for i, message in enumerate(messages):
+        text = _message_text(message)
+        key = (model_name, hashlib.md5(text.encode("utf-8")).hexdigest())
+        count = _TOKEN_COUNTS.get(key) if text else 0
+        counts.append(count or 0)
+        if count is None:
+            if key not in missing:
+                missing[key] = []
+                missing_texts.append(text)
+            missing[key].append(i)
+    if missing_texts:
+        results = await token_counter(model_name, missing_texts)
+        for (key, indexes), count in zip(missing.items(), results):
+            if count < 0:
+                # Don't cache the failed counting
+                continue
+            _TOKEN_COUNTS.put(key, count)
+            for i in indexes:
+                counts[i] = count
+    return counts
+
+
+class ConversationTokenWindow:
+    """The sliding window of the history messages under a token budget.
+
+    The window is maintained incrementally: the new messages are counted and
+    appended, then the oldest rounds are evicted by subtracting their counted tokens,
+    so a turn costs O(new messages) instead of counting the whole history again. The
+    evicted rounds can be folded into a rolling summary, which is put before the
+    messages of the window.
+    """
+
+    summary_template: str = "The summary of the earlier conversation:\n{summary}"
+
+    def __init__(
+        self,
+        model_name: str,
+        max_token_limit: int,
+        token_counter: TokenCounter,
+        summarizer: Optional[HistorySummarizer] = None,
+    ):
+        """Create a new window."""
+        if max_token_limit < 0:
+            raise ValueError("Max token limit can't be negative")
+        self.model_name = model_name
+        self.max_token_limit = max_token_limit
+        self.token_counter = token_counter
+        self.summarizer = summarizer
+        self.summary: Optional[str] = None
+        self._summary_tokens = 0
+        self._summary_round_index = 0
+        self._rounds: Deque[List[BaseMessage]] = deque()
+        self._round_tokens: Deque[int] = deque()
+        self._window_tokens = 0
+        # The number of the history messages consumed, include the evicted ones
+        self._consumed = 0
+        self._last_signature: Optional[Tuple[Any, ...]] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def tokens(self) -> int:
+        """Return the tokens of the window, include the summary."""
+        return self._window_tokens + self._summary_tokens
+
+    def _reset(self) -> None:
+        self.summary = None
+        self._summary_tokens = 0
+        self._rounds.clear()
+        self._round_tokens.clear()
+        self._window_tokens = 0
+        self._consumed = 0
+        self._last_signature = None
+
+    async def update(self, messages: List[BaseMessage]) -> List[BaseMessage]:
+        """Update the window with the whole history messages.
+
+        The messages consumed last time are skipped, if the history doesn't continue
+        the consumed messages, the window is built again.
+
+        Args:
+            messages (List[BaseMessage]): The history messages
+
+        Returns:
+            List[BaseMessage]: The messages in the window, see :meth:`messages`
+        """
+        async with self._lock:
+            if self._consumed > len(messages) or (
+                self._consumed
+                and _message_signature(messages[self._consumed - 1])
+                != self._last_signature
+            ):
+                self._reset()
+            new_messages = messages[self._consumed :]
+            if new_messages:
+                counts = await count_message_tokens(
+                    self.model_name, new_messages, self.token_counter
+                )
+                for message, count in zip(new_messages, counts):
+                    if (
+                        not self._rounds
+                        or self._rounds[-1][-1].round_index != message.round_index
+                    ):
+                        self._rounds.append([])
+                        self._round_tokens.append(0)
+                    self._rounds[-1].append(message)
+                    self._round_tokens[-1] += count
+                    self._window_tokens += count
+                self._consumed = len(messages)
+                self._last_signature = _message_signature(messages[-1])
+            await self._evict()
+            return self.messages()
+
+    async def _evict(self) -> None:
+        while True:
+            evicted: List[BaseMessage] = []
+            while self._rounds and self.tokens > self.max_token_limit:
+                evicted.extend(self._rounds.popleft())
+                self._window_tokens -= self._round_tokens.popleft()
+            if not evicted or not self.summarizer:
+                return
+            self.summary = await self.summarizer(self.summary, evicted)
+            self._summary_round_index = evicted[-1].round_index
+            self._summary_tokens = (
+                await count_message_tokens(
+                    self.model_name, [self._summary_message()], self.token_counter
+                )
+            )[0]
+            if self.tokens <= self.max_token_limit:
+                return
+
+    def messages(self) -> List[BaseMessage]:
+        """Return the messages in the window.
+
+        The rolling summary is a system message before the messages, it has the
+        round index of the latest evicted round.
+        """
+        messages: List[BaseMessage] = []
+        if self.summary:
+            messages.append(self._summary_message())
+        for round_messages in self._rounds:
+            messages.extend(round_messages)
+        return messages
+
+    def _summary_message(self) -> SystemMessage:
+        return SystemMessage(
+            content=self.summary_template.format(summary=self.summary),
+            round_index=self._summary_round_index,
+        )
+
+
+def _message_signature(message: BaseMessage) -> Tuple[Any, ...]:
+    return message.index, message.round_index, message.type, str(message.content)
+
+
+class _HistoryWindowCache:
+    """The LRU cache of the history windows of the conversations."""
+
+    def __init__(self, max_size: int = 1024):
+        self._max_size = max_size
+        self._windows: "OrderedDict[Hashable, ConversationTokenWindow]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_create(
+        self,
+        key: Hashable,
+        factory: Callable[[], ConversationTokenWindow],
+        token_counter: TokenCounter,
+        summarizer: Optional[HistorySummarizer] = None,
+    ) -> ConversationTokenWindow:
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None:
+                window = factory()
+                self._windows[key] = window
+                while len(self._windows) > self._max_size:
+                    self._windows.popitem(last=False)
+            else:
+                self._windows.move_to_end(key)
+                # Use the functions of the current request
+                window.token_counter = token_counter
+                window.summarizer = summarizer
+            return window
+
+
+_HISTORY_WINDOWS = _HistoryWindowCache()
+
+
 def _conversation_to_dict(once: OnceConversation) -> Dict:
     start_str: str = ""
     if hasattr(once, "start_date") and once.start_date:
@@ -20,9 +20,9 @@ from dbgpt.core.awel import BaseOperator, MapOperator
 from dbgpt.core.awel.flow import IOField, OperatorCategory, Parameter, ViewMetadata
 from dbgpt.core.interface.message import (
     BaseMessage,
-    _messages_to_str,
     _MultiRoundMessageMapper,
     _split_messages_by_round,
+    count_message_tokens,
 )
 from dbgpt.util.i18n_utils import _
 
@@ -558,28 +558,30 @@ class TokenBufferedConversationMapperOperator(ConversationMapperOperator):
         super().__init__(**kwargs)
 
     async def map_messages(self, messages: List[BaseMessage]) -> List[BaseMessage]:
-        """Map multi round messages to a list of BaseMessage."""
+        """Map multi round messages to a list of BaseMessage.
+
+        Every message is counted once(the counts are cached by the content), and the
+        tokens of the evicted rounds are subtracted without counting again.
+        """
         eviction_policy = self._eviction_policy or self.eviction_policy
         messages_by_round: List[List[BaseMessage]] = _split_messages_by_round(messages)
-        messages_str = _messages_to_str(_merge_multi_round_messages(messages_by_round))
         model_name = self._model
         if not model_name:
             model_name = await self.current_dag_context.get_from_share_data(
                 self.SHARE_DATA_KEY_CONV_MODEL_NAME
             )
-        # Fist time, we count the token of the messages
-        current_tokens = await self._llm_client.count_token(model_name, messages_str)
+        counts = await count_message_tokens(
+            model_name, messages, self._llm_client.count_tokens
+        )
+        message_tokens = {id(m): count for m, count in zip(messages, counts)}
+        current_tokens = sum(counts)
 
-        while current_tokens > self._max_token_limit:
+        while current_tokens > self._max_token_limit and messages_by_round:
             # Evict the messages by round after all tokens are not greater than the max
             # token limit
-            # TODO: We should find a high performance way to do this
             messages_by_round = eviction_policy(messages_by_round)
-            messages_str = _messages_to_str(
-                _merge_multi_round_messages(messages_by_round)
-            )
-            current_tokens = await self._llm_client.count_token(
-                model_name, messages_str
+            current_tokens = sum(
+                message_tokens.get(id(m), 0) for m in sum(messages_by_round, [])
             )
         message_mapper = self._message_mapper or self.map_multi_round_messages
         return message_mapper(messages_by_round)
@@ -118,6 +118,28 @@ class StorageItemAdapter(Generic[T, TDataRepresentation]):
             Any: The query for the resource identifier
         """
 
+    def get_query_for_identifiers(
+        self,
+        storage_format: Type[TDataRepresentation],
+        resource_ids: List[ResourceIdentifier],
+        **kwargs,
+    ) -> Any:
+        """Get one query for multiple resource identifiers.
+
+        Override it to load, update or delete the data in bulk with a set-based
+        query, e.g. an `IN` query. None is returned by default, which means the
+        storage builds the query from :meth:`get_query_for_identifier`.
+
+        Args:
+            storage_format (Type[TDataRepresentation]): The storage format
+            resource_ids (List[ResourceIdentifier]): The resource identifiers
+            kwargs: The additional arguments
+
+        Returns:
+            Any: The query for the resource identifiers
+        """
+        return None
+
 
 class DefaultStorageItemAdapter(StorageItemAdapter[T, T]):
     """Default storage item adapter.
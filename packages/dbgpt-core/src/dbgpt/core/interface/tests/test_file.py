@@ -6,6 +6,7 @@ from unittest import mock
 import pytest
 
 from ..file import (
+    FileIntegrityError,
     FileMetadata,
     FileMetadataIdentifier,
     FileStorageClient,
@@ -504,3 +505,142 @@ def test_simple_distributed_storage_delete_file_remote(
         f"http://{remote_node_address}/api/v2/serve/file/files/{bucket}/{file_id}",
         timeout=360,
     )
+
+
+def _tamper(storage_system, bucket, uri):
+    metadata = storage_system.metadata_storage.load(
+        FileMetadataIdentifier(file_id=uri.split("/")[-1], bucket=bucket), FileMetadata
+    )
+    with open(metadata.storage_path, "wb") as f:
+        f.write(b"Tampered content")
+
+
+def test_open_file_verifies_hash_while_reading(file_storage_client, sample_file_path):
+    bucket = "test-bucket"
+    uri = file_storage_client.upload_file(
+        bucket=bucket, file_path=sample_file_path, storage_type="local"
+    )
+    with mock.patch(
+        "dbgpt.core.interface.file.calculate_file_hash"
+    ) as mock_calculate_hash:
+        stream, metadata = file_storage_client.open_file(uri)
+        with stream:
+            assert b"".join(stream.iter_chunks(4)) == b"Sample file content"
+        # The data is hashed while it's read, not read again
+        mock_calculate_hash.assert_not_called()
+    assert stream.verified
+    assert metadata.file_size == len(b"Sample file content")
+
+    _tamper(file_storage_client.storage_system, bucket, uri)
+    stream, _ = file_storage_client.open_file(uri)
+    with pytest.raises(FileIntegrityError, match="Hash mismatch"):
+        with stream:
+            stream.read()
+
+
+def test_open_file_range(file_storage_client, sample_file_path):
+    uri = file_storage_client.upload_file(
+        bucket="test-bucket", file_path=sample_file_path, storage_type="local"
+    )
+    stream, _ = file_storage_client.open_file(uri, start=7, end=11)
+    with stream:
+        assert stream.read() == b"file"
+        assert stream.read() == b""
+    assert not stream.verified
+
+    stream, _ = file_storage_client.open_file(uri, start=7)
+    with stream:
+        assert list(stream.iter_chunks(8)) == [b"file con", b"tent"]
+
+
+def test_save_file_hashes_in_one_pass(file_storage_client):
+    data = io.BytesIO(b"x" * 1000)
+    with mock.patch(
+        "dbgpt.core.interface.file.calculate_file_hash"
+    ) as mock_calculate_hash:
+        uri = file_storage_client.save_file("test-bucket", "x.bin", data, "local")
+        mock_calculate_hash.assert_not_called()
+    metadata = file_storage_client.storage_system.get_file_metadata_by_uri(uri)
+    assert metadata.file_hash == hashlib.md5(b"x" * 1000).hexdigest()
+    assert metadata.file_size == 1000
+
+
+@pytest.mark.asyncio
+async def test_async_save_and_get_file(file_storage_client):
+    content = os.urandom(10000)
+    uri = await file_storage_client.asave_file(
+        "test-bucket", "random.bin", io.BytesIO(content), "local"
+    )
+    stream, metadata = await file_storage_client.aget_file(uri, chunk_size=1024)
+    assert metadata.file_hash == hashlib.md5(content).hexdigest()
+    assert [len(chunk) async for chunk in stream][:2] == [1024, 1024]
+    assert stream.verified
+
+    stream, _ = await file_storage_client.aget_file(uri, start=100, end=3000)
+    assert await stream.read() == content[100:3000]
+
+    _tamper(file_storage_client.storage_system, "test-bucket", uri)
+    stream, _ = await file_storage_client.aget_file(uri)
+    with pytest.raises(FileIntegrityError):
+        await stream.read()
+
+
+def test_download_file_trusts_indexed_hash(
+    file_storage_system, sample_file_path, tmpdir
+):
+    client = FileStorageClient(
+        storage_system=file_storage_system, cache_path=str(tmpdir.join("cache"))
+    )
+    uri = client.upload_file(
+        bucket="test-bucket", file_path=sample_file_path, storage_type="local"
+    )
+    path, metadata = client.download_file(uri)
+    # The cached file is addressed by the content hash
+    assert os.path.basename(path) == metadata.file_hash + ".txt"
+    with open(path, "rb") as f:
+        assert f.read() == b"Sample file content"
+
+    with mock.patch(
+        "dbgpt.core.interface.file.calculate_file_hash"
+    ) as mock_calculate_hash:
+        with mock.patch.object(file_storage_system, "open_file") as mock_open_file:
+            assert client.download_file(uri)[0] == path
+        mock_calculate_hash.assert_not_called()
+        mock_open_file.assert_not_called()
+
+    # The changed local file is downloaded again
+    with open(path, "wb") as f:
+        f.write(b"Changed")
+    client.download_file(uri)
+    with open(path, "rb") as f:
+        assert f.read() == b"Sample file content"
+
+
+@mock.patch("requests.get")
+def test_simple_distributed_storage_load_range_remote(
+    mock_get, distributed_storage_backend
+):
+    mock_response = mock.Mock(status_code=206)
+    mock_response.iter_content = mock.Mock(return_value=iter([b"file"]))
+    mock_response.raise_for_status = mock.Mock(return_value=None)
+    mock_get.return_value = mock_response
+    metadata = FileMetadata(
+        file_id="test_file",
+        bucket="test-bucket",
+        file_name="test.txt",
+        file_size=19,
+        storage_type="distributed",
+        storage_path="distributed://127.0.0.2:8000/test-bucket/test_file",
+        uri="distributed://127.0.0.2:8000/test-bucket/test_file",
+        custom_metadata={},
+        file_hash="hash",
+    )
+
+    file_data = distributed_storage_backend.load_range(metadata, 7, 11)
+    assert file_data.read() == b"file"
+    mock_get.assert_called_once_with(
+        "http://127.0.0.2:8000/api/v2/serve/file/files/test-bucket/test_file",
+        headers={"Range": "bytes=7-10"},
+        stream=True,
+        timeout=360,
+    )
@@ -15,6 +15,7 @@ from dbgpt.core.interface.message import (
     StorageConversation,
     SystemMessage,
     ViewMessage,
+    count_message_tokens,
     parse_model_messages,
 )
 
@@ -476,3 +477,84 @@ def test_to_openai_messages_convert_to_compatible_format(
         {"role": "assistant", "content": ai_model_message.content},
         {"role": "user", "content": human_model_message.content},
     ]
+
+
+class _WordCounter:
+    """Count the words as the tokens, record the counted prompts."""
+
+    def __init__(self):
+        self.prompts = []
+
+    async def __call__(self, model, prompts):
+        self.prompts.extend(prompts)
+        return [len(prompt.split()) for prompt in prompts]
+
+
+def _add_round(conversation: StorageConversation, text: str):
+    conversation.start_new_round()
+    conversation.add_user_message(f"{text} question")
+    conversation.add_ai_message(f"{text} answer")
+    conversation.end_current_round()
+
+
+@pytest.mark.asyncio
+async def test_count_message_tokens_cached():
+    counter = _WordCounter()
+    messages = [HumanMessage(content="cached one"), AIMessage(content="cached two")]
+    assert await count_message_tokens("count-model", messages, counter) == [3, 3]
+    assert await count_message_tokens("count-model", messages, counter) == [3, 3]
+    assert counter.prompts == ["Human: cached one", "AI: cached two"]
+
+
+@pytest.mark.asyncio
+async def test_history_window_incremental(conversation_identifier):
+    conversation = StorageConversation(conversation_identifier.conv_uid)
+    counter = _WordCounter()
+    # Every round has 6 tokens: "Human: r0 question" and "AI: r0 answer"
+    window = conversation.get_history_window("window-model", 12, counter)
+    _add_round(conversation, "r0")
+    _add_round(conversation, "r1")
+    history = await window.update(conversation.get_history_message())
+    assert [m.content for m in history] == [
+        "r0 question",
+        "r0 answer",
+        "r1 question",
+        "r1 answer",
+    ]
+    assert window.tokens == 12
+
+    _add_round(conversation, "r2")
+    counter.prompts.clear()
+    history = await window.update(conversation.get_history_message())
+    # Only the new messages are counted, the oldest round is evicted
+    assert counter.prompts == ["Human: r2 question", "AI: r2 answer"]
+    assert [m.round_index for m in history] == [2, 2, 3, 3]
+
+    # The same window is returned for the conversation
+    assert conversation.get_history_window("window-model", 12, counter) is window
+    # A diverged history builds the window again
+    history = await window.update(conversation.get_history_message()[:2])
+    assert [m.content for m in history] == ["r0 question", "r0 answer"]
+
+
+@pytest.mark.asyncio
+async def test_history_window_rolling_summary(conversation_identifier):
+    conversation = StorageConversation(conversation_identifier.conv_uid)
+    folded = []
+
+    async def summarizer(summary, messages):
+        folded.append([m.content for m in messages])
+        return "s"
+
+    window = conversation.get_history_window(
+        "window-model", 16, _WordCounter(), summarizer
+    )
+    for i in range(3):
+        _add_round(conversation, f"r{i}")
+    history = await window.update(conversation.get_history_message())
+    # The summary takes the room of one more round, which is folded too
+    assert folded == [["r0 question", "r0 answer"], ["r1 question", "r1 answer"]]
+    assert isinstance(history[0], SystemMessage)
+    assert history[0].content.endswith("s")
+    assert [m.round_index for m in history] == [2, 3, 3]
+    assert window.tokens <= 16
@@ -9,6 +9,7 @@ from contextlib import contextmanager
 from dataclasses import dataclass, field
 from functools import wraps
 from typing import (
+    TYPE_CHECKING,
     Any,
     Dict,
     Generator,
@@ -38,6 +39,9 @@ from dbgpt_ext.datasource.schema import DBType
 
 from ..parameter import BaseDatasourceParameters
 
+if TYPE_CHECKING:
+    from .schema_snapshot import TableSchema
+
 logger = logging.getLogger(__name__)
 
 
@@ -48,6 +52,30 @@ def _format_index(index: sqlalchemy.engine.interfaces.ReflectedIndex) -> str:
     )
 
 
+def _normalize_indexes(indexes: List[Any]) -> List[Dict[str, Any]]:
+    """Convert the indexes to dicts with name and column names.
+
+    Some dialects return the indexes as tuples of name and definition, e.g.
+    ("idx_id", "CREATE INDEX idx_id ON t USING btree (id)").
+    """
+    result = []
+    for index in indexes:
+        if isinstance(index, (tuple, list)):
+            index_name, index_creation_command = index
+            column_names = re.findall(r"\(([^)]+)\)", index_creation_command)
+            if column_names:
+                result.append({"name": index_name, "column_names": column_names})
+        else:
+            result.append(
+                {
+                    "name": index["name"],
+                    "column_names": list(index["column_names"]),
+                    "unique": bool(index.get("unique", False)),
+                }
+            )
+    return result
+
+
 @dataclass
 class RDBMSDatasourceParameters(BaseDatasourceParameters):
     """RDBMS datasource parameters."""
@@ -222,6 +250,14 @@ class RDBMSConnector(BaseConnector):
         """Return string representation of dialect to use."""
         return self._engine.dialect.name
 
+    @property
+    def is_temporary(self) -> bool:
+        """Whether the database is temporary, e.g. an in-memory SQLite database."""
+        database = self._engine.url.database
+        return self.dialect == "sqlite" and (
+            not database or database == ":memory:" or "mode=memory" in database
+        )
+
     def _sync_tables_from_db(self) -> Iterable[str]:
         """Read table information from database."""
         # TODO Use a background thread to refresh periodically
@@ -856,6 +892,56 @@ class RDBMSConnector(BaseConnector):
         """
         return self._inspector.get_table_comment(table_name)
 
+    def get_table_ddl_versions(self) -> Optional[Dict[str, str]]:
+        """Return the DDL versions of all the tables in one query.
+
+        The version of a table changes when its columns, indexes or comment are
+        changed, it is used to refresh the schema snapshot incrementally.
+
+        Returns:
+            Optional[Dict[str, str]]: The versions of the tables, None if not
+                supported by the dialect.
+        """
+        return None
+
+    def get_table_schemas(
+        self, table_names: Optional[List[str]] = None
+    ) -> Dict[str, "TableSchema"]:
+        """Return the columns, indexes and comments of the tables.
+
+        The dialects override it to load all the tables with a few queries, the
+        default implementation reflects the tables one by one.
+
+        Args:
+            table_names (Optional[List[str]]): The tables, all usable tables if None.
+
+        Returns:
+            Dict[str, TableSchema]: The schemas of the tables.
+        """
+        from .schema_snapshot import TableSchema
+
+        if table_names is None:
+            table_names = list(self.get_table_names())
+        schemas = {}
+        for table_name in table_names:
+            columns = []
+            for column in self.get_columns(table_name):
+                column = dict(column)
+                if "type" in column:
+                    column["type"] = str(column["type"])
+                columns.append(column)
+            try:
+                comment = self.get_table_comment(table_name).get("text")
+            except Exception:
+                comment = None
+            schemas[table_name] = TableSchema(
+                name=table_name,
+                columns=columns,
+                indexes=_normalize_indexes(self.get_indexes(table_name)),
+                comment=comment,
+            )
+        return schemas
+
     def get_column_comments(self, db_name: str, table_name: str):
         """Return column comments."""
         with self.session_scope() as session:
@@ -0,0 +1,337 @@
+"""Schema metadata snapshot of the RDBMS datasources.
+
+Building the table summaries of a database reflects the columns, the indexes and
+the comment of every table, which is thousands of round-trips for a warehouse with
+thousands of tables. The snapshot keeps the schema of all the tables of a
+datasource, it is loaded by the bulk introspection of the connector(a few
+queries for all the tables), kept in memory(optionally persisted to disk), and
+refreshed incrementally: only the tables whose DDL version changed are
+introspected again.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    from .base import RDBMSConnector
+
+logger = logging.getLogger(__name__)
+
+_SNAPSHOT_FORMAT_VERSION = 1
+
+
+@dataclass
+class TableSchema:
+    """The schema metadata of a table."""
+
+    name: str
+    # The columns, e.g. [{"name": "id", "type": "INTEGER", "comment": "ID"}]
+    columns: List[Dict[str, Any]] = field(default_factory=list)
+    # The indexes, e.g. [{"name": "idx_id", "column_names": ["id"]}]
+    indexes: List[Dict[str, Any]] = field(default_factory=list)
+    comment: Optional[str] = None
+    # The DDL version of the table, see `RDBMSConnector.get_table_ddl_versions`
+    ddl_version: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dict."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TableSchema":
+        """Create from dict."""
+        return cls(**data)
+
+
+@dataclass
+class SchemaSnapshot:
+    """The schema snapshot of all the tables of a datasource."""
+
+    datasource: str
+    # Increased every time the schema changes
+    version: int = 0
+    tables: Dict[str, TableSchema] = field(default_factory=dict)
+    refreshed_at: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dict."""
+        return {
+            "format_version": _SNAPSHOT_FORMAT_VERSION,
+            "datasource": self.datasource,
+            "version": self.version,
+            "refreshed_at": self.refreshed_at,
+            "tables": [table.to_dict() for table in self.tables.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SchemaSnapshot":
+        """Create from dict."""
+        if data.get("format_version") != _SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported snapshot format: {data.get('format_version')}"
+            )
+        tables = [TableSchema.from_dict(table) for table in data["tables"]]
+        return cls(
+            datasource=data["datasource"],
+            version=data["version"],
+            tables={table.name: table for table in tables},
+            refreshed_at=data["refreshed_at"],
+        )
+
+    def view(self) -> "SchemaSnapshotView":
+        """Return a read-only view with the schema methods of the connector."""
+        return SchemaSnapshotView(self)
+
+
+class SchemaSnapshotView:
+    """Read the schema from a snapshot with the same methods of the connector.
+
+    The summary builders only call `get_table_names`, `get_columns`, `get_indexes`
+    and `get_table_comment`, so they can read from the view without any
+    round-trip to the database.
+    """
+
+    def __init__(self, snapshot: SchemaSnapshot):
+        """Create a new SchemaSnapshotView."""
+        self._snapshot = snapshot
+
+    @property
+    def snapshot(self) -> SchemaSnapshot:
+        """Return the snapshot."""
+        return self._snapshot
+
+    def _get_table(self, table_name: str) -> TableSchema:
+        table = self._snapshot.tables.get(table_name)
+        if table is None:
+            raise ValueError(f"Table {table_name} not found in the schema snapshot")
+        return table
+
+    def get_table_names(self) -> Iterable[str]:
+        """Get names of tables available."""
+        return list(self._snapshot.tables)
+
+    def get_columns(self, table_name: str) -> List[Dict]:
+        """Get columns about specified table."""
+        return self._get_table(table_name).columns
+
+    def get_indexes(self, table_name: str) -> List[Dict]:
+        """Get table indexes about specified table."""
+        return self._get_table(table_name).indexes
+
+    def get_table_comment(self, table_name: str) -> Dict:
+        """Get table comment, eg: {"text": "comment"}."""
+        return {"text": self._get_table(table_name).comment}
+
+
+class SchemaSnapshotManager:
+    """Manage the schema snapshots of the datasources.
+
+    The snapshot of a datasource is checked at most once every `check_interval`
+    seconds. If the connector can return the DDL versions of its tables in one
+    query, only the changed tables are introspected again; otherwise the whole
+    snapshot is reloaded after `max_age` seconds.
+
+    The snapshots of the temporary databases(e.g. in-memory databases) are never
+    kept, they are small and their keys are never reused.
+    """
+
+    def __init__(
+        self,
+        persist_dir: Optional[str] = None,
+        check_interval: float = 60,
+        max_age: float = 3600,
+    ):
+        """Create a new SchemaSnapshotManager.
+
+        Args:
+            persist_dir (Optional[str]): The directory to persist the snapshots,
+                only kept in memory if None.
+            check_interval (float): The min seconds between two DDL version checks.
+            max_age (float): The max seconds to keep a snapshot of a connector
+                without DDL versions.
+        """
+        self._persist_dir = persist_dir
+        self._check_interval = check_interval
+        self._max_age = max_age
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._snapshots: Dict[str, SchemaSnapshot] = {}
+        self._checked_at: Dict[str, float] = {}
+
+    @staticmethod
+    def datasource_key(conn: "RDBMSConnector") -> str:
+        """Return the key of the datasource of the connector."""
+        url = conn._engine.url.render_as_string(hide_password=True)
+        raw = f"{conn.dialect}\x00{url}\x00{conn._schema or ''}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    def get_snapshot(
+        self, conn: "RDBMSConnector", force_refresh: bool = False
+    ) -> SchemaSnapshot:
+        """Return the up-to-date schema snapshot of the connector.
+
+        Args:
+            conn (RDBMSConnector): The connector.
+            force_refresh (bool): Reload all the tables from the database.
+        """
+        if conn.is_temporary:
+            return self._full_refresh(self.datasource_key(conn), conn, None, False)
+        key = self.datasource_key(conn)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            now = time.time()
+            snapshot = self._snapshots.get(key)
+            if snapshot is None and not force_refresh:
+                snapshot = self._load(key)
+            if (
+                snapshot is not None
+                and not force_refresh
+                and now - self._checked_at.get(key, 0) < self._check_interval
+            ):
+                return snapshot
+            if snapshot is None or force_refresh:
+                snapshot = self._full_refresh(key, conn, snapshot)
+            else:
+                snapshot = self._incremental_refresh(conn, snapshot)
+            self._snapshots[key] = snapshot
+            self._checked_at[key] = now
+            return snapshot
+
+    def invalidate(self, conn: "RDBMSConnector") -> None:
+        """Check the DDL versions of the connector on the next access."""
+        self._checked_at.pop(self.datasource_key(conn), None)
+
+    def _full_refresh(
+        self,
+        key: str,
+        conn: "RDBMSConnector",
+        previous: Optional[SchemaSnapshot],
+        persist: bool = True,
+    ) -> SchemaSnapshot:
+        table_names = list(conn.get_table_names())
+        versions = conn.get_table_ddl_versions() or {}
+        tables = conn.get_table_schemas(table_names)
+        for name, table in tables.items():
+            table.ddl_version = versions.get(name)
+        snapshot = SchemaSnapshot(
+            datasource=key,
+            version=previous.version + 1 if previous else 1,
+            tables={name: tables[name] for name in table_names if name in tables},
+            refreshed_at=time.time(),
+        )
+        logger.info(
+            f"Loaded the schema snapshot of {len(snapshot.tables)} tables, "
+            f"version: {snapshot.version}"
+        )
+        if persist:
+            self._save(snapshot)
+        return snapshot
+
+    def _incremental_refresh(
+        self, conn: "RDBMSConnector", snapshot: SchemaSnapshot
+    ) -> SchemaSnapshot:
+        versions = conn.get_table_ddl_versions()
+        if versions is None and time.time() - snapshot.refreshed_at > self._max_age:
+            return self._full_refresh(snapshot.datasource, conn, snapshot)
+
+        table_names = list(conn.get_table_names())
+        changed = []
+        for name in table_names:
+            table = snapshot.tables.get(name)
+            if table is None or (
+                versions is not None and table.ddl_version != versions.get(name)
+            ):
+                changed.append(name)
+        removed = set(snapshot.tables) - set(table_names)
+        if not changed and not removed:
+            return snapshot
+
+        tables = conn.get_table_schemas(changed) if changed else {}
+        for name, table in tables.items():
+            table.ddl_version = versions.get(name) if versions else None
+        merged = {}
+        for name in table_names:
+            table = tables.get(name) or snapshot.tables.get(name)
+            if table is not None:
+                merged[name] = table
+        new_snapshot = SchemaSnapshot(
+            datasource=snapshot.datasource,
+            version=snapshot.version + 1,
+            tables=merged,
+            refreshed_at=snapshot.refreshed_at,
+        )
+        logger.info(
+            f"Refreshed the schema snapshot, changed tables: {len(changed)}, removed "
+            f"tables: {len(removed)}, version: {new_snapshot.version}"
+        )
+        self._save(new_snapshot)
+        return new_snapshot
+
+    def _snapshot_path(self, key: str) -> Optional[str]:
+        if not self._persist_dir:
+            return None
+        return os.path.join(self._persist_dir, f"{key}.json")
+
+    def _load(self, key: str) -> Optional[SchemaSnapshot]:
+        path = self._snapshot_path(key)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return SchemaSnapshot.from_dict(json.load(f))
+        except Exception as e:
+            logger.warning(f"Load schema snapshot from {path} failed: {e}")
+            return None
+
+    def _save(self, snapshot: SchemaSnapshot) -> None:
+        path = self._snapshot_path(snapshot.datasource)
+        if not path:
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot.to_dict(), f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+
+
+_DEFAULT_MANAGER: Optional[SchemaSnapshotManager] = None
+
+
+def initialize_schema_snapshot_manager(
+    persist_dir: Optional[str] = None,
+    check_interval: float = 60,
+    max_age: float = 3600,
+) -> SchemaSnapshotManager:
+    """Replace the default schema snapshot manager.
+
+    Args:
+        persist_dir (Optional[str]): The directory to persist the snapshots, only
+            kept in memory if None.
+        check_interval (float): The min seconds between two DDL version checks.
+        max_age (float): The max seconds to keep a snapshot of a connector
+            without DDL versions.
+    """
+    global _DEFAULT_MANAGER
+    _DEFAULT_MANAGER = SchemaSnapshotManager(
+        persist_dir=persist_dir, check_interval=check_interval, max_age=max_age
+    )
+    return _DEFAULT_MANAGER
+
+
+def get_schema_snapshot_manager() -> SchemaSnapshotManager:
+    """Return the default schema snapshot manager.
+
+    The snapshots are only kept in memory unless the manager is initialized with
+    a `persist_dir` by `initialize_schema_snapshot_manager`.
+    """
+    global _DEFAULT_MANAGER
+    if _DEFAULT_MANAGER is None:
+        _DEFAULT_MANAGER = SchemaSnapshotManager()
+    return _DEFAULT_MANAGER
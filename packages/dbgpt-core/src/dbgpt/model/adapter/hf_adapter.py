@@ -97,6 +97,46 @@ class HFLLMDeployModelParameters(LLMDeployModelParameters):
             "valid_values": ["flash_attention_2"],
         },
     )
+    continuous_batching: Optional[bool] = field(
+        default=False,
+        metadata={
+            "help": _(
+                "Whether to decode the concurrent requests in one batch, the new "
+                "requests join the running batch between the decoding steps. The "
+                "concurrent requests are still limited by `concurrency`. Only for "
+                "the text-only models."
+            )
+        },
+    )
+    max_batch_tokens: Optional[int] = field(
+        default=4096,
+        metadata={
+            "help": _(
+                "The max tokens of the running batch(the number of sequences times "
+                "the longest sequence), only valid when continuous_batching is True."
+            )
+        },
+    )
+    max_batch_size: Optional[int] = field(
+        default=8,
+        metadata={
+            "help": _(
+                "The max sequences of the running batch, only valid when "
+                "continuous_batching is True."
+            )
+        },
+    )
+    batch_fairness: Optional[str] = field(
+        default="fcfs",
+        metadata={
+            "help": _(
+                "The policy to admit the waiting requests into the running batch, "
+                "fcfs admits them in arrival order, shortest_first admits the "
+                "shortest prompts first without starving the long ones."
+            ),
+            "valid_values": ["fcfs", "shortest_first"],
+        },
+    )
 
     @property
     def real_model_path(self) -> Optional[str]:
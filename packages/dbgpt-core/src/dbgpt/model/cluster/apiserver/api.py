@@ -48,7 +48,12 @@ from dbgpt.core.schema.api import (
 from dbgpt.model.base import ModelInstance
 from dbgpt.model.cluster.manager_base import WorkerManager, WorkerManagerFactory
 from dbgpt.model.cluster.registry import ModelRegistry
-from dbgpt.model.parameter import ModelAPIServerParameters, WorkerType
+from dbgpt.model.parameter import (
+    HttpPoolParameters,
+    ModelAPIServerParameters,
+    WorkerType,
+)
+from dbgpt.model.utils.stream_utils import StreamDeltaDecoder
 from dbgpt.util.chat_util import transform_to_sse
 from dbgpt.util.fastapi import create_app
 from dbgpt.util.tracer import initialize_tracer, root_tracer, trace
@@ -301,6 +306,8 @@ class APIServer(BaseComponent):
             n (int): How many completions to generate for each prompt.
         """
         worker_manager = self.get_worker_manager()
+        # Receive only the new text of every step
+        params = {**params, "incremental": True}
         id = f"chatcmpl-{shortuuid.random()}"
         finish_stream_events = []
         curr_usage = UsageInfo()
@@ -324,11 +331,7 @@ class APIServer(BaseComponent):
             )
             yield transform_to_sse(chunk)
 
-            delta_text = ""
-            previous_text = ""
-            thinking_text = ""
-            previous_thinking_text = ""
-            full_text = ""
+            decoder = StreamDeltaDecoder()
 
             span = root_tracer.start_span(
                 "API.chat_completion_stream_generator",
@@ -344,24 +347,7 @@ class APIServer(BaseComponent):
                     yield transform_to_sse(model_output.to_dict())
                     yield transform_to_sse("[DONE]")
                     return
-                if model_output.has_text:
-                    full_text = model_output.text
-                    decoded_unicode = model_output.text.replace("\ufffd", "")
-                    delta_text = decoded_unicode[len(previous_text) :]
-                    previous_text = (
-                        decoded_unicode
-                        if len(decoded_unicode) > len(previous_text)
-                        else previous_text
-                    )
-                if model_output.has_thinking:
-                    decoded_unicode = model_output.thinking_text.replace("\ufffd", "")
-                    thinking_text = decoded_unicode[len(previous_thinking_text) :]
-                    previous_thinking_text = (
-                        decoded_unicode
-                        if len(decoded_unicode) > len(previous_thinking_text)
-                        else previous_thinking_text
-                    )
-
+                delta_text, thinking_text = decoder.decode(model_output)
                 if not delta_text:
                     delta_text = None
                 if not thinking_text:
@@ -399,7 +385,7 @@ class APIServer(BaseComponent):
                 yield transform_to_sse(chunk)
             span.end(
                 metadata={
-                    "full_text": full_text,
+                    "full_text": decoder.text,
                 }
             )
 
@@ -802,7 +788,12 @@ async def create_relevance(
     )
 
 
-def _initialize_all(controller_addr: str, system_app: SystemApp):
+def _initialize_all(
+    controller_addr: str,
+    system_app: SystemApp,
+    instance_selector: Optional[str] = None,
+    http_pool_params: Optional[HttpPoolParameters] = None,
+):
     from dbgpt.model.cluster.controller.controller import ModelRegistryClient
     from dbgpt.model.cluster.worker.manager import _DefaultWorkerManagerFactory
     from dbgpt.model.cluster.worker.remote_manager import RemoteWorkerManager
@@ -818,7 +809,11 @@ def _initialize_all(controller_addr: str, system_app: SystemApp):
     registry = system_app.get_component(
         ComponentType.MODEL_REGISTRY, ModelRegistry, default_component=None
     )
-    worker_manager = RemoteWorkerManager(registry)
+    worker_manager = RemoteWorkerManager(
+        registry,
+        http_pool_params=http_pool_params,
+        instance_selector=instance_selector,
+    )
 
     # Register worker manager component if not exist
     system_app.get_component(
@@ -891,7 +886,12 @@ def initialize_apiserver(
         logger.warning(message)
         return create_error_response(ErrorCode.VALIDATION_TYPE_ERROR, message)
 
-    _initialize_all(apiserver_params.controller_addr, system_app)
+    _initialize_all(
+        apiserver_params.controller_addr,
+        system_app,
+        instance_selector=apiserver_params.instance_selector,
+        http_pool_params=apiserver_params.http_pool,
+    )
 
     if not embedded_mod:
         import uvicorn
@@ -34,6 +34,9 @@ class PromptRequest(BaseModel):
     frequency_penalty: Optional[float] = None
     chat_model: Optional[bool] = True
     """Whether to use chat model"""
+    incremental: bool = False
+    """Whether to return only the new text of every step in the stream, with a full
+    output now and then"""
 
 
 class EmbeddingsRequest(BaseModel):
@@ -91,13 +91,26 @@ class WorkerManager(ABC):
 
     @abstractmethod
     async def select_one_instance(
-        self, worker_type: str, model_name: str, healthy_only: bool = True
+        self,
+        worker_type: str,
+        model_name: str,
+        healthy_only: bool = True,
+        affinity_key: Optional[str] = None,
     ) -> WorkerRunData:
-        """Asynchronous select one instance"""
+        """Asynchronous select one instance
+
+        Args:
+            affinity_key (Optional[str]): The requests with the same affinity key
+                prefer the same instance, if the instance selector supports it.
+        """
 
     @abstractmethod
     def sync_select_one_instance(
-        self, worker_type: str, model_name: str, healthy_only: bool = True
+        self,
+        worker_type: str,
+        model_name: str,
+        healthy_only: bool = True,
+        affinity_key: Optional[str] = None,
     ) -> WorkerRunData:
         """Select one instance"""
 
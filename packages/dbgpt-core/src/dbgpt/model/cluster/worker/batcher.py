@@ -0,0 +1,263 @@
+"""Merge the concurrent embedding and rerank requests into batches.
+
+The embedding model handles a batch of texts in one forward pass, so merging the
+concurrent requests of a model instance increases the throughput a lot,
+especially on CPU-only deployments.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from dbgpt.model.cluster.manager_base import WorkerRunData
+from dbgpt.model.cluster.worker.instance_selector import InstanceStatsRegistry
+from dbgpt.model.parameter import WorkerType
+from dbgpt.util.tracer import root_tracer
+
+logger = logging.getLogger(__name__)
+
+# The upper bounds of the histogram buckets
+_HISTOGRAM_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+EmbeddingsFunc = Callable[[WorkerRunData, Dict[str, Any]], Awaitable[List[List[float]]]]
+
+
+class _Histogram:
+    def __init__(self) -> None:
+        self._counts = [0] * (len(_HISTOGRAM_BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value: int) -> None:
+        index = len(_HISTOGRAM_BUCKETS)
+        for i, bound in enumerate(_HISTOGRAM_BUCKETS):
+            if value <= bound:
+                index = i
+                break
+        self._counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def to_dict(self) -> Dict[str, Any]:
+        buckets = {f"le_{b}": c for b, c in zip(_HISTOGRAM_BUCKETS, self._counts)}
+        buckets["le_inf"] = self._counts[-1]
+        return {"count": self.count, "sum": self.sum, "buckets": buckets}
+
+
+class BatchStats:
+    """The statistics of the batches of a model instance."""
+
+    def __init__(self) -> None:
+        """Create a new BatchStats."""
+        self.queue_depth = 0
+        self.total_requests = 0
+        self.total_batches = 0
+        self.batch_size = _Histogram()
+        """The texts of every batch."""
+        self.queue_depth_histogram = _Histogram()
+        """The queue depth observed by every new request."""
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the statistics as a dict."""
+        return {
+            "queue_depth": self.queue_depth,
+            "total_requests": self.total_requests,
+            "total_batches": self.total_batches,
+            "batch_size": self.batch_size.to_dict(),
+            "queue_depth_histogram": self.queue_depth_histogram.to_dict(),
+        }
+
+
+@dataclass
+class _PendingRequest:
+    params: Dict[str, Any]
+    future: asyncio.Future
+
+    @property
+    def size(self) -> int:
+        return len(self.params["input"])
+
+
+class _BatchQueue:
+    def __init__(self, worker_run_data: WorkerRunData) -> None:
+        self.worker_run_data = worker_run_data
+        self.pending: Deque[_PendingRequest] = deque()
+        self.pending_size = 0
+        self.wakeup = asyncio.Event()
+        self.dispatcher: Optional[asyncio.Task] = None
+        self.stats = BatchStats()
+
+
+class EmbeddingBatcher:
+    """Merge the concurrent requests of a text2vec or reranker instance.
+
+    The requests are merged until the texts reach `max_batch_size` or the first
+    request has waited `max_wait_ms`, and more requests are merged while all the
+    concurrency slots of the instance are busy. The reranker requests are merged
+    only if they have the same query.
+    """
+
+    def __init__(
+        self,
+        embeddings_func: EmbeddingsFunc,
+        max_batch_size: int = 32,
+        max_wait_ms: Optional[float] = 5.0,
+    ) -> None:
+        """Create a new EmbeddingBatcher.
+
+        Args:
+            embeddings_func (EmbeddingsFunc): The function to run a merged request
+                on the instance, the concurrency slot is acquired by the batcher.
+            max_batch_size (int): The max texts of a batch, a larger request is
+                run alone.
+            max_wait_ms (Optional[float]): The max milliseconds to wait for more
+                requests.
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be greater than 0")
+        self._embeddings_func = embeddings_func
+        self._max_batch_size = max_batch_size
+        self._max_wait = max(max_wait_ms or 0, 0) / 1000
+        self._queues: Dict[str, _BatchQueue] = {}
+        self._running: Set[asyncio.Task] = set()
+
+    async def submit(
+        self, worker_run_data: WorkerRunData, params: Dict[str, Any]
+    ) -> List[List[float]]:
+        """Submit a request and wait for its result."""
+        key = InstanceStatsRegistry.instance_key(worker_run_data)
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = _BatchQueue(worker_run_data)
+            self._queues[key] = queue
+        # The remote worker manager builds a new run data for every lookup
+        queue.worker_run_data = worker_run_data
+        request = _PendingRequest(
+            params=params, future=asyncio.get_running_loop().create_future()
+        )
+        queue.pending.append(request)
+        queue.pending_size += request.size
+        queue.stats.total_requests += 1
+        queue.stats.queue_depth = len(queue.pending)
+        queue.stats.queue_depth_histogram.observe(len(queue.pending))
+        queue.wakeup.set()
+        if queue.dispatcher is None or queue.dispatcher.done():
+            queue.dispatcher = asyncio.create_task(self._dispatch(queue))
+        return await request.future
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return the batch statistics of every instance."""
+        return {k: q.stats.to_dict() for k, q in self._queues.items()}
+
+    async def close(self) -> None:
+        """Cancel the pending requests and the running batches."""
+        tasks = list(self._running)
+        for queue in self._queues.values():
+            if queue.dispatcher is not None:
+                tasks.append(queue.dispatcher)
+            while queue.pending:
+                queue.pending.popleft().future.cancel()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._queues.clear()
+
+    async def _dispatch(self, queue: _BatchQueue) -> None:
+        loop = asyncio.get_running_loop()
+        while queue.pending:
+            deadline = loop.time() + self._max_wait
+            while queue.pending_size < self._max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                queue.wakeup.clear()
+                try:
+                    await asyncio.wait_for(queue.wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            worker_run_data = queue.worker_run_data
+            semaphore = worker_run_data.semaphore
+            if semaphore is not None:
+                # Keep merging the new requests while the instance is busy
+                await semaphore.acquire()
+            batch = self._pop_batch(queue)
+            if not batch:
+                if semaphore is not None:
+                    semaphore.release()
+                continue
+            task = asyncio.create_task(
+                self._run_batch(worker_run_data, batch, queue.stats, semaphore)
+            )
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    def _pop_batch(self, queue: _BatchQueue) -> List[_PendingRequest]:
+        batch: List[_PendingRequest] = []
+        size = 0
+        while queue.pending:
+            request = queue.pending[0]
+            if batch and size + request.size > self._max_batch_size:
+                break
+            queue.pending.popleft()
+            queue.pending_size -= request.size
+            if request.future.done():
+                # Cancelled by the caller
+                continue
+            batch.append(request)
+            size += request.size
+        queue.stats.queue_depth = len(queue.pending)
+        return batch
+
+    async def _run_batch(
+        self,
+        worker_run_data: WorkerRunData,
+        batch: List[_PendingRequest],
+        stats: BatchStats,
+        semaphore: Optional[asyncio.Semaphore],
+    ) -> None:
+        try:
+            groups: Dict[Optional[str], List[_PendingRequest]] = {}
+            for request in batch:
+                groups.setdefault(request.params.get("query"), []).append(request)
+            for requests in groups.values():
+                stats.total_batches += 1
+                stats.batch_size.observe(sum(r.size for r in requests))
+                await self._run_group(worker_run_data, requests)
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+
+    async def _run_group(
+        self, worker_run_data: WorkerRunData, requests: List[_PendingRequest]
+    ) -> None:
+        texts: List[str] = []
+        for request in requests:
+            texts.extend(request.params["input"])
+        params = {**requests[0].params, "input": texts}
+        is_rerank = params.get("worker_type") == WorkerType.RERANKER.value
+        try:
+            with root_tracer.start_span(
+                "dbgpt.model.cluster.worker.embedding_batch",
+                requests[0].params.get("span_id"),
+                metadata={"requests": len(requests), "texts": len(texts)},
+            ):
+                results = await self._embeddings_func(worker_run_data, params)
+            # The reranker returns the scores of all texts in one list
+            values = results[0] if is_rerank else results
+            if len(values) != len(texts):
+                raise ValueError(
+                    f"Expect {len(texts)} results of the batch, but got {len(values)}"
+                )
+        except Exception as e:
+            for request in requests:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+        offset = 0
+        for request in requests:
+            result = values[offset : offset + request.size]
+            offset += request.size
+            if not request.future.done():
+                request.future.set_result([result] if is_rerank else result)
@@ -0,0 +1,581 @@
+"""Iteration-level (continuous) batching for the local huggingface models.
+
+Without batching, every request of a local model runs its own `generate` call, so
+the concurrent requests are decoded one after another. The engine decodes all the
+running sequences with one batched forward pass per step, and admits the waiting
+requests between two steps, so a new request doesn't wait for the running
+requests to finish.
+
+The running sequences are left-padded into one batch: the KV cache of the newly
+admitted sequences is padded and concatenated to the batch after their prefill,
+and the rows of the finished sequences are removed from the batch. It works with
+the models whose KV cache is `[batch, heads, seq_len, head_dim]` per layer, which
+is the layout of the decoder-only models of transformers.
+"""
+
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+from dbgpt.core import ModelOutput
+from dbgpt.model.cluster.worker.batcher import _Histogram
+from dbgpt.model.utils.parse_utils import (
+    _DEFAULT_THINK_END_TOKEN,
+    _DEFAULT_THINK_START_TOKEN,
+    parse_chat_message,
+)
+
+logger = logging.getLogger(__name__)
+
+FAIRNESS_POLICIES = ("fcfs", "shortest_first")
+
+
+@dataclass
+class _Sequence:
+    prompt_ids: List[int]
+    max_new_tokens: int
+    temperature: float = 0.7
+    top_p: float = 1.0
+    do_sample: bool = True
+    stop_token_ids: Set[int] = field(default_factory=set)
+    custom_stop_words: List[str] = field(default_factory=list)
+    generated: List[int] = field(default_factory=list)
+    # The text of the generated tokens sent to the consumer
+    text: str = ""
+    arrival_step: int = 0
+    finish_reason: Optional[str] = None
+    cancelled: bool = False
+    loop: Optional[asyncio.AbstractEventLoop] = None
+    queue: Optional[asyncio.Queue] = None
+
+    @property
+    def num_tokens(self) -> int:
+        return len(self.prompt_ids) + len(self.generated)
+
+    @property
+    def done(self) -> bool:
+        return self.cancelled or self.finish_reason is not None
+
+
+def _partial_stop_len(text: str, stop_words: List[str]) -> int:
+    """Return the length of the longest suffix of text which prefixes a stop word."""
+    max_len = 0
+    for stop_word in stop_words:
+        for i in range(min(len(text), len(stop_word) - 1), max_len, -1):
+            if stop_word.startswith(text[-i:]):
+                max_len = i
+                break
+    return max_len
+
+
+class BatchScheduler:
+    """Decide which waiting sequences join the running batch.
+
+    The running batch is left-padded, so its cost is the number of sequences
+    times the longest sequence. A waiting sequence is admitted only if the padded
+    batch stays within `max_batch_tokens` and `max_batch_size`, a sequence longer
+    than `max_batch_tokens` runs alone.
+
+    Fairness policies:
+        - fcfs: admit in arrival order, a sequence never overtakes an earlier one.
+        - shortest_first: admit the shortest prompts first to fit more sequences
+            in the batch, a sequence waiting for more than `max_wait_steps`
+            decoding steps is admitted first and can't be overtaken anymore.
+    """
+
+    def __init__(
+        self,
+        max_batch_tokens: int = 4096,
+        max_batch_size: int = 8,
+        policy: str = "fcfs",
+        max_wait_steps: int = 64,
+    ) -> None:
+        """Create a new BatchScheduler."""
+        if policy not in FAIRNESS_POLICIES:
+            raise ValueError(
+                f"Invalid fairness policy {policy}, valid values: {FAIRNESS_POLICIES}"
+            )
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be greater than 0")
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.policy = policy
+        self.max_wait_steps = max_wait_steps
+        self.waiting: List[_Sequence] = []
+        self.running: List[_Sequence] = []
+        self.step = 0
+
+    def add(self, seq: _Sequence) -> None:
+        """Add a new sequence to the waiting queue."""
+        seq.arrival_step = self.step
+        self.waiting.append(seq)
+
+    def has_work(self) -> bool:
+        """Whether there are waiting or running sequences."""
+        return bool(self.waiting or self.running)
+
+    def _starving(self, seq: _Sequence) -> bool:
+        return self.step - seq.arrival_step >= self.max_wait_steps
+
+    def _candidates(self) -> List[_Sequence]:
+        if self.policy == "fcfs":
+            return list(self.waiting)
+        starving = [s for s in self.waiting if self._starving(s)]
+        others = sorted(
+            (s for s in self.waiting if not self._starving(s)),
+            key=lambda s: len(s.prompt_ids),
+        )
+        return starving + others
+
+    def schedule(self) -> List[_Sequence]:
+        """Move the admitted sequences from the waiting queue to the running batch.
+
+        Returns:
+            List[_Sequence]: The admitted sequences.
+        """
+        self.waiting = [s for s in self.waiting if not s.cancelled]
+        admitted: List[_Sequence] = []
+        size = len(self.running)
+        max_len = max((s.num_tokens for s in self.running), default=0)
+        for seq in self._candidates():
+            if size >= self.max_batch_size:
+                break
+            new_max_len = max(max_len, len(seq.prompt_ids))
+            if size and (size + 1) * new_max_len > self.max_batch_tokens:
+                if self.policy == "fcfs" or self._starving(seq):
+                    break
+                continue
+            admitted.append(seq)
+            size += 1
+            max_len = new_max_len
+        for seq in admitted:
+            self.waiting.remove(seq)
+            self.running.append(seq)
+        return admitted
+
+    def finish(self, seqs: List[_Sequence]) -> None:
+        """Remove the finished sequences from the running batch."""
+        finished = set(map(id, seqs))
+        self.running = [s for s in self.running if id(s) not in finished]
+
+    def advance(self) -> None:
+        """Called after every decoding step."""
+        self.step += 1
+
+
+@dataclass
+class _Batch:
+    seqs: List[_Sequence]
+    # Tuple of (key, value) per layer, [batch, heads, seq_len, head_dim]
+    past: Any
+    # [batch, seq_len], 0 for the left paddings
+    attention_mask: Any
+    # [batch, 1], the last sampled tokens
+    next_tokens: Any
+
+
+def _to_legacy_cache(past):
+    if hasattr(past, "to_legacy_cache"):
+        return past.to_legacy_cache()
+    return tuple(past)
+
+
+def _from_legacy_cache(past):
+    try:
+        from transformers import DynamicCache
+
+        return DynamicCache.from_legacy_cache(past)
+    except (ImportError, AttributeError):
+        return past
+
+
+def _filter_batch(batch: _Batch, keep: List[int]) -> _Batch:
+    """Keep the rows of the batch, and trim the columns only padded in all rows."""
+    import torch
+
+    index = torch.tensor(keep, device=batch.attention_mask.device)
+    mask = batch.attention_mask.index_select(0, index)
+    start = int(mask.any(dim=0).int().argmax())
+    past = tuple(
+        (k.index_select(0, index)[:, :, start:], v.index_select(0, index)[:, :, start:])
+        for k, v in batch.past
+    )
+    return _Batch(
+        seqs=[batch.seqs[i] for i in keep],
+        past=past,
+        attention_mask=mask[:, start:],
+        next_tokens=batch.next_tokens.index_select(0, index),
+    )
+
+
+def _merge_batches(a: _Batch, b: _Batch) -> _Batch:
+    """Left-pad the two batches to the same length and concatenate them."""
+    import torch
+    import torch.nn.functional as F
+
+    length = max(a.attention_mask.shape[1], b.attention_mask.shape[1])
+
+    def _pad_mask(mask):
+        return F.pad(mask, (length - mask.shape[1], 0))
+
+    def _pad_kv(kv):
+        # Pad the seq_len dimension on the left
+        return F.pad(kv, (0, 0, length - kv.shape[2], 0))
+
+    past = tuple(
+        (
+            torch.cat([_pad_kv(ka), _pad_kv(kb)], dim=0),
+            torch.cat([_pad_kv(va), _pad_kv(vb)], dim=0),
+        )
+        for (ka, va), (kb, vb) in zip(a.past, b.past)
+    )
+    return _Batch(
+        seqs=a.seqs + b.seqs,
+        past=past,
+        attention_mask=torch.cat(
+            [_pad_mask(a.attention_mask), _pad_mask(b.attention_mask)], dim=0
+        ),
+        next_tokens=torch.cat([a.next_tokens, b.next_tokens], dim=0),
+    )
+
+
+def _sample_token(seq: _Sequence, logits) -> int:
+    import torch
+
+    if not seq.do_sample or seq.temperature <= 1e-5:
+        return int(torch.argmax(logits))
+    probs = torch.softmax(logits.float() / seq.temperature, dim=-1)
+    if seq.top_p < 1.0:
+        sorted_probs, sorted_indices = torch.sort(probs, descending=True)
+        cumulative = torch.cumsum(sorted_probs, dim=-1)
+        sorted_probs[cumulative - sorted_probs > seq.top_p] = 0
+        index = torch.multinomial(sorted_probs / sorted_probs.sum(), 1)
+        return int(sorted_indices[index])
+    return int(torch.multinomial(probs, 1))
+
+
+class ContinuousBatchingEngine:
+    """Decode the concurrent requests of a local huggingface model in batches.
+
+    The decoding loop runs in a dedicated thread, every request streams the text
+    deltas of its sequence to its own asyncio queue.
+    """
+
+    def __init__(
+        self,
+        model,
+        tokenizer,
+        device: Optional[str] = None,
+        max_batch_tokens: int = 4096,
+        max_batch_size: int = 8,
+        policy: str = "fcfs",
+        max_wait_steps: int = 64,
+    ) -> None:
+        """Create a new ContinuousBatchingEngine.
+
+        Args:
+            model: The huggingface causal language model.
+            tokenizer: The tokenizer of the model.
+            device (Optional[str]): The device of the inputs, the device of the
+                model by default.
+            max_batch_tokens (int): The max tokens of the padded running batch.
+            max_batch_size (int): The max sequences of the running batch.
+            policy (str): The fairness policy, see :class:`BatchScheduler`.
+            max_wait_steps (int): The max decoding steps a sequence waits before
+                it can't be overtaken, only for the shortest_first policy.
+        """
+        self._model = model
+        self._tokenizer = tokenizer
+        self._device = device or getattr(model, "device", None)
+        self._scheduler = BatchScheduler(
+            max_batch_tokens, max_batch_size, policy, max_wait_steps
+        )
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        self._batch: Optional[_Batch] = None
+        self._eos_token_ids = self._get_eos_token_ids()
+        pad_token_id = getattr(tokenizer, "pad_token_id", None)
+        if pad_token_id is None:
+            pad_token_id = next(iter(self._eos_token_ids), 0)
+        self._pad_token_id = pad_token_id
+        self.total_requests = 0
+        self.total_steps = 0
+        self.batch_size = _Histogram()
+        """The running sequences of every decoding step."""
+
+    def _get_eos_token_ids(self) -> Set[int]:
+        eos_token_ids: Set[int] = set()
+        generation_config = getattr(self._model, "generation_config", None)
+        for value in (
+            getattr(generation_config, "eos_token_id", None),
+            getattr(self._tokenizer, "eos_token_id", None),
+        ):
+            if isinstance(value, int):
+                eos_token_ids.add(value)
+            elif value:
+                eos_token_ids.update(value)
+        return eos_token_ids
+
+    def start(self) -> None:
+        """Start the decoding thread."""
+        if self._thread is not None:
+            return
+        self._stopped = False
+        self._thread = threading.Thread(
+            target=self._run, name="continuous-batching", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the decoding thread, the unfinished requests are failed."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        error = RuntimeError("The continuous batching engine is stopped")
+        with self._cond:
+            seqs = self._scheduler.waiting + self._scheduler.running
+            self._scheduler.waiting = []
+            self._scheduler.running = []
+        for seq in seqs:
+            self._send(seq, error)
+        self._batch = None
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return the metrics of the engine."""
+        with self._cond:
+            waiting = len(self._scheduler.waiting)
+            running = len(self._scheduler.running)
+        return {
+            "waiting": waiting,
+            "running": running,
+            "total_requests": self.total_requests,
+            "total_steps": self.total_steps,
+            "batch_size": self.batch_size.to_dict(),
+        }
+
+    async def generate_stream(
+        self, model, tokenizer, params: Dict, device, context_len: int = 4096
+    ) -> AsyncIterator[ModelOutput]:
+        """Generate the stream of a request.
+
+        It has the same signature of the generate stream functions of the model
+        adapters, the model and the tokenizer of the engine are used.
+        """
+        if params.get("audios") or params.get("images") or params.get("videos"):
+            raise ValueError("Continuous batching doesn't support the media inputs")
+        prompt = params["prompt"]
+        echo = params.get("echo", False)
+        think_start_token = params.get("think_start_token", _DEFAULT_THINK_START_TOKEN)
+        think_end_token = params.get("think_end_token", _DEFAULT_THINK_END_TOKEN)
+        is_reasoning_model = params.get("is_reasoning_model", False)
+        reasoning_patterns = [{"start": think_start_token, "end": think_end_token}]
+
+        prompt_ids = list(self._tokenizer(prompt).input_ids)
+        max_new_tokens = int(params.get("max_new_tokens", 4096))
+        max_new_tokens = max(1, min(max_new_tokens, context_len - len(prompt_ids)))
+        seq = _Sequence(
+            prompt_ids=prompt_ids,
+            max_new_tokens=max_new_tokens,
+            temperature=float(params.get("temperature", 0.7)),
+            top_p=float(params.get("top_p", 1.0)),
+            do_sample=params.get("do_sample", True) is not False,
+            stop_token_ids=set(params.get("stop_token_ids") or []),
+            custom_stop_words=params.get("custom_stop_words") or [],
+            loop=asyncio.get_running_loop(),
+            queue=asyncio.Queue(),
+        )
+        self.submit(seq)
+        text = prompt if echo else ""
+        try:
+            while True:
+                item = await seq.queue.get()
+                if isinstance(item, BaseException):
+                    raise item
+                delta, finish_reason = item
+                text += delta
+                output_text = text
+                if prompt.rstrip().endswith(think_start_token) and is_reasoning_model:
+                    output_text = think_start_token + "\n" + output_text
+                msg = parse_chat_message(
+                    output_text,
+                    extract_reasoning=is_reasoning_model,
+                    reasoning_patterns=reasoning_patterns,
+                )
+                completion_tokens = len(seq.generated)
+                usage = {
+                    "prompt_tokens": len(prompt_ids),
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": len(prompt_ids) + completion_tokens,
+                }
+                yield ModelOutput.build(
+                    msg.content,
+                    msg.reasoning_content,
+                    error_code=0,
+                    usage=usage,
+                    finish_reason=finish_reason,
+                    is_reasoning_model=is_reasoning_model,
+                )
+                if finish_reason is not None:
+                    break
+        finally:
+            if seq.finish_reason is None:
+                # The consumer is gone, drop the sequence on the next step
+                seq.cancelled = True
+
+    def submit(self, seq: _Sequence) -> None:
+        """Add a sequence to the waiting queue."""
+        if self._thread is None:
+            raise RuntimeError("The continuous batching engine is not started")
+        with self._cond:
+            self._scheduler.add(seq)
+            self.total_requests += 1
+            self._cond.notify_all()
+
+    def _send(self, seq: _Sequence, item: Any) -> None:
+        try:
+            seq.loop.call_soon_threadsafe(seq.queue.put_nowait, item)
+        except RuntimeError:
+            # The event loop of the consumer is closed
+            seq.cancelled = True
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopped and not self._scheduler.has_work():
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                admitted = self._scheduler.schedule()
+            try:
+                self._step(admitted)
+            except Exception as e:
+                logger.exception(f"Continuous batching step failed: {e}")
+                with self._cond:
+                    seqs = list(self._scheduler.running)
+                    self._scheduler.finish(seqs)
+                for seq in seqs:
+                    seq.finish_reason = "error"
+                    self._send(seq, e)
+                self._batch = None
+
+    def _step(self, admitted: List[_Sequence]) -> None:
+        import torch
+
+        with torch.inference_mode():
+            batch = self._batch
+            if batch is not None:
+                self._decode(batch)
+                batch = self._remove_finished(batch)
+            if admitted:
+                new_batch = self._remove_finished(self._prefill(admitted))
+                if batch is None:
+                    batch = new_batch
+                elif new_batch is not None:
+                    batch = _merge_batches(batch, new_batch)
+            self._batch = batch
+        self.total_steps += 1
+        if batch is not None:
+            self.batch_size.observe(len(batch.seqs))
+        with self._cond:
+            self._scheduler.advance()
+
+    def _forward(self, input_ids, attention_mask, past_key_values=None):
+        position_ids = (attention_mask.long().cumsum(dim=-1) - 1).clamp(min=0)
+        if past_key_values is not None:
+            position_ids = position_ids[:, -input_ids.shape[1] :]
+            past_key_values = _from_legacy_cache(past_key_values)
+        outputs = self._model(
+            input_ids=input_ids,
+            attention_mask=attention_mask,
+            position_ids=position_ids,
+            past_key_values=past_key_values,
+            use_cache=True,
+        )
+        return outputs.logits[:, -1, :], _to_legacy_cache(outputs.past_key_values)
+
+    def _prefill(self, seqs: List[_Sequence]) -> _Batch:
+        import torch
+
+        length = max(len(seq.prompt_ids) for seq in seqs)
+        input_ids = [
+            [self._pad_token_id] * (length - len(seq.prompt_ids)) + seq.prompt_ids
+            for seq in seqs
+        ]
+        attention_mask = [
+            [0] * (length - len(seq.prompt_ids)) + [1] * len(seq.prompt_ids)
+            for seq in seqs
+        ]
+        input_ids = torch.tensor(input_ids, device=self._device)
+        attention_mask = torch.tensor(attention_mask, device=self._device)
+        logits, past = self._forward(input_ids, attention_mask)
+        return _Batch(
+            seqs=seqs,
+            past=past,
+            attention_mask=attention_mask,
+            next_tokens=self._sample(seqs, logits),
+        )
+
+    def _decode(self, batch: _Batch) -> None:
+        import torch
+
+        attention_mask = torch.cat(
+            [
+                batch.attention_mask,
+                batch.attention_mask.new_ones((len(batch.seqs), 1)),
+            ],
+            dim=1,
+        )
+        logits, past = self._forward(batch.next_tokens, attention_mask, batch.past)
+        batch.past = past
+        batch.attention_mask = attention_mask
+        batch.next_tokens = self._sample(batch.seqs, logits)
+
+    def _sample(self, seqs: List[_Sequence], logits):
+        import torch
+
+        tokens = []
+        for i, seq in enumerate(seqs):
+            token = _sample_token(seq, logits[i])
+            tokens.append([token])
+            if not seq.cancelled:
+                self._on_token(seq, token)
+        return torch.tensor(tokens, device=logits.device)
+
+    def _on_token(self, seq: _Sequence, token: int) -> None:
+        seq.generated.append(token)
+        if token in seq.stop_token_ids or token in self._eos_token_ids:
+            seq.finish_reason = "stop"
+        text = self._tokenizer.decode(seq.generated, skip_special_tokens=True)
+        for stop_word in seq.custom_stop_words:
+            index = text.find(stop_word)
+            if index >= 0:
+                text = text[:index]
+                seq.finish_reason = "stop"
+        if seq.finish_reason is None and len(seq.generated) >= seq.max_new_tokens:
+            seq.finish_reason = "length"
+        if seq.finish_reason is None and text.endswith("\ufffd"):
+            # Wait for the rest bytes of the multi-byte character
+            return
+        if seq.finish_reason is None:
+            # Hold back the text which may be the beginning of a stop word
+            text = text[: len(text) - _partial_stop_len(text, seq.custom_stop_words)]
+        delta = text[len(seq.text) :]
+        if delta or seq.finish_reason is not None:
+            seq.text = text
+            self._send(seq, (delta, seq.finish_reason))
+
+    def _remove_finished(self, batch: _Batch) -> Optional[_Batch]:
+        keep = [i for i, seq in enumerate(batch.seqs) if not seq.done]
+        if len(keep) == len(batch.seqs):
+            return batch
+        with self._cond:
+            self._scheduler.finish([seq for seq in batch.seqs if seq.done])
+        if not keep:
+            return None
+        return _filter_batch(batch, keep)
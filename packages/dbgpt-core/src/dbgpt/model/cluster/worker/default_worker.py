@@ -20,6 +20,7 @@ from dbgpt.model.adapter.loader import ModelLoader
 from dbgpt.model.adapter.model_adapter import get_llm_model_adapter
 from dbgpt.model.cluster.worker_base import ModelWorker
 from dbgpt.model.proxy.base import TiktokenProxyTokenizer
+from dbgpt.model.utils.stream_utils import StreamDeltaEncoder
 from dbgpt.util.executor_utils import blocking_func_to_async_no_executor
 from dbgpt.util.model_utils import _clear_model_cache, _get_current_cuda_memory
 from dbgpt.util.parameter_utils import _get_dict_from_obj
@@ -43,6 +44,8 @@ class DefaultModelWorker(ModelWorker):
         self.llm_adapter: LLMModelAdapter = None
         self._support_async = False
         self._support_generate_func = False
+        self._continuous_batching = False
+        self._batch_engine = None
         self.context_len = 4096
         self._device = get_device()
         # Use tiktoken to count token if model doesn't support
@@ -80,6 +83,13 @@ class DefaultModelWorker(ModelWorker):
         # self._param_cls = self.llm_adapter.model_param_class(model_type)
         self._support_async = self.llm_adapter.support_async()
         self._support_generate_func = self.llm_adapter.support_generate_function()
+        self._continuous_batching = (
+            bool(getattr(deploy_model_params, "continuous_batching", False))
+            and not self._support_async
+        )
+        if self._continuous_batching:
+            # The batching engine streams the outputs asynchronously
+            self._support_async = True
 
         logger.info(
             f"model_name: {self.model_name}, model_path: {model_path}, "
@@ -144,11 +154,28 @@ class DefaultModelWorker(ModelWorker):
                 self.context_len = self._model_params.max_context_size
             elif hasattr(self._model_params, "model_max_length"):
                 self.context_len = self._model_params.model_max_length
+            if self._continuous_batching:
+                from dbgpt.model.cluster.worker.continuous_batcher import (
+                    ContinuousBatchingEngine,
+                )
+
+                self._batch_engine = ContinuousBatchingEngine(
+                    self.model,
+                    self.tokenizer,
+                    device=self._device,
+                    max_batch_tokens=self._model_params.max_batch_tokens,
+                    max_batch_size=self._model_params.max_batch_size,
+                    policy=self._model_params.batch_fairness,
+                )
+                self._batch_engine.start()
 
     def stop(self) -> None:
         if not self.model:
             logger.warning("Model has been stopped!!")
             return
+        if self._batch_engine:
+            self._batch_engine.stop()
+            self._batch_engine = None
         del self.model
         del self.tokenizer
         self.model = None
@@ -173,6 +200,7 @@ class DefaultModelWorker(ModelWorker):
             previous_response = ""
             last_metrics = ModelInferenceMetrics.create_metrics()
             is_first_generate = True
+            encoder = StreamDeltaEncoder() if params.get("incremental") else None
 
             context_len = params.get("context_len") or self.context_len
             for output in generate_stream_func(
@@ -189,12 +217,15 @@ class DefaultModelWorker(ModelWorker):
                     model_context,
                     last_metrics,
                     is_first_generate,
+                    encoder=encoder,
                 )
                 if is_first_generate:
                     is_first_generate = False
                 previous_response = output_str
                 last_metrics = current_metrics
                 yield model_output
+            if encoder:
+                previous_response = encoder.full_text()
             logger.info(
                 f"\n\nfull stream output:\n{previous_response}\n\nmodel "
                 f"generate_stream params:\n{params}\n"
@@ -302,6 +333,7 @@ class DefaultModelWorker(ModelWorker):
 
             last_metrics = ModelInferenceMetrics.create_metrics()
             is_first_generate = True
+            encoder = StreamDeltaEncoder() if params.get("incremental") else None
             async for output in generate_stream_func(
                 self.model, self.tokenizer, params, get_device(), context_len
             ):
@@ -316,6 +348,7 @@ class DefaultModelWorker(ModelWorker):
                     model_context,
                     last_metrics,
                     is_first_generate,
+                    encoder=encoder,
                 )
                 if is_first_generate:
                     is_first_generate = False
@@ -323,6 +356,8 @@ class DefaultModelWorker(ModelWorker):
                 previous_response = output_str
                 last_metrics = current_metrics
                 yield model_output
+            if encoder:
+                previous_response = encoder.full_text()
             logger.info(
                 f"\n\nfull stream output:\n{previous_response}\n\nmodel "
                 f"generate_stream params:\n{params}\n"
@@ -402,6 +437,13 @@ class DefaultModelWorker(ModelWorker):
                 logger.info(
                     "current generate function is asynchronous generate function"
                 )
+            elif self._batch_engine:
+                func = self._batch_engine.generate_stream
+                func_type = "continuous batching generate stream"
+                logger.info(
+                    "current generate stream function is continuous batching generate "
+                    "stream function"
+                )
             else:
                 func = self.llm_adapter.get_async_generate_stream_function(
                     self.model, self._model_params
@@ -465,7 +507,13 @@ class DefaultModelWorker(ModelWorker):
         model_context,
         last_metrics: ModelInferenceMetrics,
         is_first_generate: bool,
+        encoder: Optional[StreamDeltaEncoder] = None,
     ):
+        """Handle the output of a step.
+
+        If the encoder is provided, the returned model output is incremental, and
+        the full output isn't concatenated.
+        """
         finish_reason = None
         usage = None
         if isinstance(output, dict):
@@ -490,15 +538,25 @@ class DefaultModelWorker(ModelWorker):
             model_output = ModelOutput.build(output)
         else:
             raise ValueError(f"Invalid output type: {type(output)}")
-        current_output = ""
-        if model_output.has_thinking:
-            current_output = model_output.thinking_text or ""
-        if model_output.has_text:
-            current_output += model_output.text
-        incremental_output = current_output[len(previous_response) :]
+        collect_gpu_infos = True
+        if encoder:
+            model_output = encoder.encode(model_output)
+            incremental_output = encoder.new_text
+            current_output = ""
+            # Query the GPU memory only with the full outputs
+            collect_gpu_infos = not model_output.incremental
+        else:
+            current_output = ""
+            if model_output.has_thinking:
+                current_output = model_output.thinking_text or ""
+            if model_output.has_text:
+                current_output += model_output.text
+            incremental_output = current_output[len(previous_response) :]
         print(incremental_output, end="", flush=True)
 
-        metrics = _new_metrics_from_model_output(last_metrics, is_first_generate, usage)
+        metrics = _new_metrics_from_model_output(
+            last_metrics, is_first_generate, usage, collect_gpu_infos=collect_gpu_infos
+        )
         model_output.metrics = metrics
         model_output.model_context = model_context
         return model_output, incremental_output, current_output, metrics
@@ -539,6 +597,7 @@ def _new_metrics_from_model_output(
     last_metric: ModelInferenceMetrics,
     is_first_generate: bool,
     usage: Optional[Dict] = None,
+    collect_gpu_infos: bool = True,
 ) -> ModelInferenceMetrics:
     metrics = ModelInferenceMetrics.create_metrics(last_metric)
     metrics.collect_index = last_metric.collect_index + 1
@@ -598,6 +657,8 @@ def _new_metrics_from_model_output(
             # Calculate decode speed if not provided
             metrics.decode_tokens_per_second = metrics.completion_tokens / duration
 
+    if not collect_gpu_infos:
+        return metrics
     current_gpu_infos = _get_current_cuda_memory()
     metrics.current_gpu_infos = current_gpu_infos
     if not metrics.avg_gpu_infos:
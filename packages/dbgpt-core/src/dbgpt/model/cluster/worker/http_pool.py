@@ -0,0 +1,219 @@
+"""Long-lived HTTP connection pools for the remote model workers.
+
+The remote worker manager builds a new :class:`RemoteModelWorker` every time it
+looks up the instances of a model, so the connections are pooled per worker
+address here and shared by all the remote worker objects of the same address.
+"""
+
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Optional, Tuple
+
+from dbgpt.model.parameter import HttpPoolParameters
+from dbgpt.util.tracer import root_tracer
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PoolState:
+    """The clients and the utilization of one worker address."""
+
+    async_client: Optional["httpx.AsyncClient"] = None
+    loop: Optional[asyncio.AbstractEventLoop] = None
+    sync_client: Optional["httpx.Client"] = None
+    in_flight: int = 0
+    total_requests: int = 0
+
+
+class HttpClientPool:
+    """HTTP clients pooled by worker address.
+
+    The async client is bound to the event loop which creates it, a new client is
+    created when it is used in another event loop.
+    """
+
+    def __init__(self, params: Optional[HttpPoolParameters] = None) -> None:
+        """Create a new HttpClientPool."""
+        self._params = params or HttpPoolParameters()
+        self._states: Dict[str, _PoolState] = {}
+        self._lock = threading.Lock()
+        self._http2 = self._params.http2 and _h2_available()
+
+    @property
+    def params(self) -> HttpPoolParameters:
+        """Return the parameters of the pool."""
+        return self._params
+
+    def _client_kwargs(self, timeout: float) -> Dict[str, Any]:
+        import httpx
+
+        limits = httpx.Limits(
+            max_connections=self._params.max_connections,
+            max_keepalive_connections=self._params.max_keepalive_connections,
+            keepalive_expiry=self._params.keepalive_expiry,
+        )
+        return {
+            "limits": limits,
+            "timeout": httpx.Timeout(timeout, connect=self._params.connect_timeout),
+            "http2": self._http2,
+        }
+
+    def _get_state(self, base_url: str) -> _PoolState:
+        state = self._states.get(base_url)
+        if not state:
+            state = _PoolState()
+            self._states[base_url] = state
+        return state
+
+    def get_async_client(
+        self, base_url: str, timeout: float = 3600
+    ) -> "httpx.AsyncClient":
+        """Return the async client of the worker address."""
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._get_state(base_url)
+            if (
+                state.async_client is None
+                or state.async_client.is_closed
+                or state.loop is not loop
+            ):
+                state.async_client = httpx.AsyncClient(**self._client_kwargs(timeout))
+                state.loop = loop
+            return state.async_client
+
+    def get_client(self, base_url: str, timeout: float = 3600) -> "httpx.Client":
+        """Return the sync client of the worker address."""
+        import httpx
+
+        with self._lock:
+            state = self._get_state(base_url)
+            if state.sync_client is None or state.sync_client.is_closed:
+                state.sync_client = httpx.Client(**self._client_kwargs(timeout))
+            return state.sync_client
+
+    def stats(self, base_url: str) -> Dict[str, Any]:
+        """Return the utilization of the pool of the worker address."""
+        state = self._states.get(base_url)
+        if not state:
+            return {"in_flight": 0, "total_requests": 0, "connections": 0}
+        return {
+            "in_flight": state.in_flight,
+            "total_requests": state.total_requests,
+            "connections": _connection_count(state.async_client)
+            + _connection_count(state.sync_client),
+            "max_connections": self._params.max_connections,
+            "http2": self._http2,
+        }
+
+    @contextmanager
+    def track(self, base_url: str, endpoint: str) -> Iterator[None]:
+        """Track a request to the worker address and trace the pool utilization."""
+        with self._lock:
+            state = self._get_state(base_url)
+            state.in_flight += 1
+            state.total_requests += 1
+        metadata = {"url": base_url + endpoint, **self.stats(base_url)}
+        metadata = {f"pool_{k}" if k != "url" else k: v for k, v in metadata.items()}
+        try:
+            with root_tracer.start_span(
+                "dbgpt.model.cluster.remote_worker.request", metadata=metadata
+            ):
+                yield
+        finally:
+            with self._lock:
+                state.in_flight -= 1
+
+    def close(self, base_url: Optional[str] = None) -> None:
+        """Close the clients of the worker address, or all clients if not given.
+
+        It is safe to call in any thread, the async clients are closed in their
+        own event loops.
+        """
+        with self._lock:
+            if base_url is None:
+                states = list(self._states.values())
+                self._states.clear()
+            else:
+                state = self._states.pop(base_url, None)
+                states = [state] if state else []
+        for state in states:
+            if state.sync_client is not None:
+                state.sync_client.close()
+            _close_async_client(state.async_client, state.loop)
+
+    async def aclose(self, base_url: Optional[str] = None) -> None:
+        """Close the clients and wait the async clients of current loop closed."""
+        with self._lock:
+            if base_url is None:
+                states = list(self._states.values())
+                self._states.clear()
+            else:
+                state = self._states.pop(base_url, None)
+                states = [state] if state else []
+        loop = asyncio.get_running_loop()
+        for state in states:
+            if state.sync_client is not None:
+                state.sync_client.close()
+            if state.async_client is not None and state.loop is loop:
+                await state.async_client.aclose()
+            else:
+                _close_async_client(state.async_client, state.loop)
+
+
+def _close_async_client(
+    client: Optional["httpx.AsyncClient"], loop: Optional[asyncio.AbstractEventLoop]
+) -> None:
+    if client is None or client.is_closed or loop is None or loop.is_closed():
+        return
+    try:
+        running_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        running_loop = None
+    if running_loop is loop:
+        loop.create_task(client.aclose())
+    elif loop.is_running():
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+
+
+def _connection_count(client: Any) -> int:
+    """Return the connection count of the httpx client, 0 if unknown."""
+    if client is None:
+        return 0
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections: Tuple = getattr(pool, "connections", ())
+    return len(connections)
+
+
+def _h2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+
+        return True
+    except ImportError:
+        logger.warning(
+            "HTTP/2 is enabled but the `h2` package is not installed, fall back to "
+            "HTTP/1.1, please run `pip install httpx[http2]`"
+        )
+        return False
+
+
+_DEFAULT_POOL: Optional[HttpClientPool] = None
+_DEFAULT_POOL_LOCK = threading.Lock()
+
+
+def default_http_pool() -> HttpClientPool:
+    """Return the process-wide default HTTP client pool."""
+    global _DEFAULT_POOL
+    with _DEFAULT_POOL_LOCK:
+        if _DEFAULT_POOL is None:
+            _DEFAULT_POOL = HttpClientPool()
+        return _DEFAULT_POOL
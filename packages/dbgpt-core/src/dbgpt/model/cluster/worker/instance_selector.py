@@ -0,0 +1,333 @@
+"""Select one worker instance from the instances of a model.
+
+The selectors use the live statistics of every instance (requests in flight and
+the EWMA latency observed from the finished requests) to spread the load.
+"""
+
+import hashlib
+import logging
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Type
+
+from dbgpt.core import ModelInferenceMetrics
+from dbgpt.model.cluster.manager_base import WorkerRunData
+
+logger = logging.getLogger(__name__)
+
+# The max characters of the prompt prefix used as the affinity key
+_AFFINITY_PREFIX_CHARS = 512
+
+
+@dataclass
+class InstanceStats:
+    """The live statistics of a worker instance."""
+
+    in_flight: int = 0
+    total_requests: int = 0
+    failed_requests: int = 0
+    ewma_latency_ms: Optional[float] = None
+    """The EWMA latency, milliseconds per completion token for LLM requests if the
+    token count is known, otherwise milliseconds per request."""
+
+
+class _RequestTracker:
+    def __init__(self) -> None:
+        self.metrics: Optional[ModelInferenceMetrics] = None
+        self.failed = False
+
+
+class InstanceStatsRegistry:
+    """The statistics of the worker instances.
+
+    The statistics are keyed by the worker key and the address of the instance,
+    because the remote worker manager builds new :class:`WorkerRunData` objects
+    every time it looks up the instances.
+    """
+
+    def __init__(self, ewma_alpha: float = 0.3) -> None:
+        """Create a new InstanceStatsRegistry.
+
+        Args:
+            ewma_alpha (float): The weight of the latest latency in the EWMA.
+        """
+        self._ewma_alpha = ewma_alpha
+        self._stats: Dict[str, InstanceStats] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def instance_key(worker_run_data: WorkerRunData) -> str:
+        """Return the key of the instance."""
+        return (
+            f"{worker_run_data.worker_key}@{worker_run_data.host}:"
+            f"{worker_run_data.port}"
+        )
+
+    def get(self, worker_run_data: WorkerRunData) -> InstanceStats:
+        """Return the statistics of the instance."""
+        key = self.instance_key(worker_run_data)
+        stats = self._stats.get(key)
+        if stats is None:
+            with self._lock:
+                stats = self._stats.setdefault(key, InstanceStats())
+        return stats
+
+    @contextmanager
+    def track(self, worker_run_data: WorkerRunData) -> Iterator[_RequestTracker]:
+        """Track a request to the instance.
+
+        Set the `metrics` of the yielded tracker to the inference metrics of the
+        last model output to observe the latency per completion token.
+        """
+        stats = self.get(worker_run_data)
+        with self._lock:
+            stats.in_flight += 1
+            stats.total_requests += 1
+        tracker = _RequestTracker()
+        start = time.perf_counter()
+        try:
+            yield tracker
+        except Exception:
+            # The stream closed by the client(GeneratorExit) or the cancelled
+            # request(CancelledError) is not a failure of the instance
+            tracker.failed = True
+            raise
+        finally:
+            latency_ms = (time.perf_counter() - start) * 1000
+            metrics = tracker.metrics
+            if metrics and metrics.completion_tokens and metrics.start_time_ms:
+                end_time_ms = metrics.end_time_ms or metrics.current_time_ms
+                if end_time_ms:
+                    latency_ms = (
+                        end_time_ms - metrics.start_time_ms
+                    ) / metrics.completion_tokens
+            with self._lock:
+                stats.in_flight -= 1
+                if tracker.failed:
+                    stats.failed_requests += 1
+                elif stats.ewma_latency_ms is None:
+                    stats.ewma_latency_ms = latency_ms
+                else:
+                    stats.ewma_latency_ms = (
+                        self._ewma_alpha * latency_ms
+                        + (1 - self._ewma_alpha) * stats.ewma_latency_ms
+                    )
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Return the statistics of all instances."""
+        with self._lock:
+            return {k: vars(v).copy() for k, v in self._stats.items()}
+
+
+class InstanceSelector(ABC):
+    """Select one instance from the instances of a model."""
+
+    name: str
+
+    @abstractmethod
+    def select(
+        self,
+        instances: List[WorkerRunData],
+        stats: InstanceStatsRegistry,
+        affinity_key: Optional[str] = None,
+    ) -> WorkerRunData:
+        """Select one instance.
+
+        Args:
+            instances (List[WorkerRunData]): The instances, not empty.
+            stats (InstanceStatsRegistry): The statistics of the instances.
+            affinity_key (Optional[str]): The key of the session or prompt prefix,
+                the requests with the same key prefer the same instance.
+        """
+
+
+class RandomSelector(InstanceSelector):
+    """Select an instance randomly."""
+
+    name = "random"
+
+    def select(
+        self,
+        instances: List[WorkerRunData],
+        stats: InstanceStatsRegistry,
+        affinity_key: Optional[str] = None,
+    ) -> WorkerRunData:
+        """Select an instance randomly."""
+        return random.choice(instances)
+
+
+class LeastRequestsSelector(InstanceSelector):
+    """Select the instance with the least requests in flight."""
+
+    name = "least_requests"
+
+    def select(
+        self,
+        instances: List[WorkerRunData],
+        stats: InstanceStatsRegistry,
+        affinity_key: Optional[str] = None,
+    ) -> WorkerRunData:
+        """Select the instance with the least requests in flight."""
+        min_in_flight = min(stats.get(ins).in_flight for ins in instances)
+        candidates = [
+            ins for ins in instances if stats.get(ins).in_flight == min_in_flight
+        ]
+        return random.choice(candidates)
+
+
+class PowerOfTwoSelector(InstanceSelector):
+    """Sample two instances randomly and select the less loaded one."""
+
+    name = "power_of_two"
+
+    def select(
+        self,
+        instances: List[WorkerRunData],
+        stats: InstanceStatsRegistry,
+        affinity_key: Optional[str] = None,
+    ) -> WorkerRunData:
+        """Select the less loaded one of two random instances."""
+        if len(instances) == 1:
+            return instances[0]
+        first, second = random.sample(instances, 2)
+        if stats.get(second).in_flight < stats.get(first).in_flight:
+            return second
+        return first
+
+
+class EWMALatencySelector(InstanceSelector):
+    """Select the instance with the lowest expected latency.
+
+    The cost of an instance is its EWMA latency multiplied by the requests in
+    flight(plus the new one). The instances without latency are tried first.
+    """
+
+    name = "ewma_latency"
+
+    def select(
+        self,
+        instances: List[WorkerRunData],
+        stats: InstanceStatsRegistry,
+        affinity_key: Optional[str] = None,
+    ) -> WorkerRunData:
+        """Select the instance with the lowest expected latency."""
+        costs = []
+        for ins in instances:
+            ins_stats = stats.get(ins)
+            latency = ins_stats.ewma_latency_ms or 0.0
+            costs.append(latency * (ins_stats.in_flight + 1))
+        min_cost = min(costs)
+        candidates = [ins for ins, c in zip(instances, costs) if c == min_cost]
+        return random.choice(candidates)
+
+
+class AffinitySelector(InstanceSelector):
+    """Route the requests with the same affinity key to the same instance.
+
+    The requests of the same conversation or with the same prompt prefix go to the
+    same instance to reuse its KV cache. The instance is picked by rendezvous
+    hashing, so only the keys of a removed instance move. When the preferred
+    instance is overloaded, or there is no affinity key, the fallback selector is
+    used.
+    """
+
+    name = "affinity"
+
+    def __init__(
+        self,
+        fallback: Optional[InstanceSelector] = None,
+        max_load_factor: float = 2.0,
+    ) -> None:
+        """Create a new AffinitySelector.
+
+        Args:
+            fallback (Optional[InstanceSelector]): The fallback selector, defaults
+                to :class:`LeastRequestsSelector`.
+            max_load_factor (float): The preferred instance is overloaded if its
+                requests in flight exceed this factor of the average(plus one).
+        """
+        self._fallback = fallback or LeastRequestsSelector()
+        self._max_load_factor = max_load_factor
+
+    def select(
+        self,
+        instances: List[WorkerRunData],
+        stats: InstanceStatsRegistry,
+        affinity_key: Optional[str] = None,
+    ) -> WorkerRunData:
+        """Select the preferred instance of the affinity key."""
+        if not affinity_key or len(instances) == 1:
+            return self._fallback.select(instances, stats, affinity_key)
+
+        def _weight(ins: WorkerRunData) -> bytes:
+            key = f"{affinity_key}|{stats.instance_key(ins)}"
+            return hashlib.md5(key.encode("utf-8")).digest()
+
+        preferred = max(instances, key=_weight)
+        avg_in_flight = sum(stats.get(ins).in_flight for ins in instances) / len(
+            instances
+        )
+        if stats.get(preferred).in_flight > self._max_load_factor * avg_in_flight + 1:
+            return self._fallback.select(instances, stats, affinity_key)
+        return preferred
+
+
+_SELECTORS: Dict[str, Type[InstanceSelector]] = {
+    cls.name: cls
+    for cls in [
+        RandomSelector,
+        LeastRequestsSelector,
+        PowerOfTwoSelector,
+        EWMALatencySelector,
+        AffinitySelector,
+    ]
+}
+
+
+def instance_selector_names() -> List[str]:
+    """Return the names of all the instance selectors."""
+    return list(_SELECTORS.keys())
+
+
+def create_instance_selector(name: Optional[str] = None) -> InstanceSelector:
+    """Create an instance selector by name, defaults to random."""
+    if not name:
+        return RandomSelector()
+    if name not in _SELECTORS:
+        raise ValueError(
+            f"Unknown instance selector {name}, supported: {instance_selector_names()}"
+        )
+    return _SELECTORS[name]()
+
+
+def affinity_key_from_params(params: Dict[str, Any]) -> Optional[str]:
+    """Return the affinity key of a model request.
+
+    The conversation id is used if it exists, otherwise the prefix of the prompt.
+    """
+    context = params.get("context")
+    if isinstance(context, dict) and context.get("conv_uid"):
+        return str(context["conv_uid"])
+    prefix = params.get("prompt") or ""
+    if not prefix:
+        parts = []
+        size = 0
+        for message in params.get("messages") or []:
+            if isinstance(message, dict):
+                content = message.get("content")
+            else:
+                content = getattr(message, "content", None)
+            if not isinstance(content, str):
+                continue
+            parts.append(content)
+            size += len(content)
+            if size >= _AFFINITY_PREFIX_CHARS:
+                break
+        prefix = "\n".join(parts)
+    if not prefix:
+        return None
+    return hashlib.md5(prefix[:_AFFINITY_PREFIX_CHARS].encode("utf-8")).hexdigest()
@@ -3,7 +3,6 @@ import itertools
 import json
 import logging
 import os
-import random
 import sys
 import time
 import traceback
@@ -42,6 +41,13 @@ from dbgpt.model.cluster.manager_base import (
 )
 from dbgpt.model.cluster.registry import ModelRegistry
 from dbgpt.model.cluster.storage import ModelStorage, ModelStorageItem
+from dbgpt.model.cluster.worker.batcher import EmbeddingBatcher
+from dbgpt.model.cluster.worker.instance_selector import (
+    InstanceSelector,
+    InstanceStatsRegistry,
+    affinity_key_from_params,
+    create_instance_selector,
+)
 from dbgpt.model.cluster.worker_base import ModelWorker
 from dbgpt.model.parameter import (
     ModelsDeployParameters,
@@ -95,6 +101,9 @@ class LocalWorkerManager(WorkerManager):
         host: str = None,
         port: int = None,
         model_storage: Optional[ModelStorage] = None,
+        instance_selector: Optional[Union[str, InstanceSelector]] = None,
+        micro_batch_max_size: Optional[int] = None,
+        micro_batch_max_wait_ms: Optional[float] = 5.0,
     ) -> None:
         """Create a LocalWorkerManager instance.
 
@@ -109,6 +118,14 @@ class LocalWorkerManager(WorkerManager):
             port (int, optional): Port. Defaults to None.
             model_storage (Optional[ModelStorage], optional): Model storage. Defaults
                 to None. It is used to store model metadata.
+            instance_selector (Optional[Union[str, InstanceSelector]], optional):
+                The instance selector or its name, e.g. "least_requests". Defaults to
+                None, select an instance randomly.
+            micro_batch_max_size (Optional[int], optional): The max texts to merge
+                the concurrent requests of text2vec and reranker models into one
+                batch. Defaults to None, not merge the requests.
+            micro_batch_max_wait_ms (float, optional): The max milliseconds to wait
+                for more requests to merge. Defaults to 5.0.
         """
         self.workers: Dict[str, List[WorkerRunData]] = dict()
         self.executor = ThreadPoolExecutor(max_workers=os.cpu_count() * 5)
@@ -120,6 +137,17 @@ class LocalWorkerManager(WorkerManager):
         self.port = port
         self.model_storage = model_storage
         self.start_listeners = []
+        if not isinstance(instance_selector, InstanceSelector):
+            instance_selector = create_instance_selector(instance_selector)
+        self.instance_selector: InstanceSelector = instance_selector
+        self.instance_stats = InstanceStatsRegistry()
+        self.embedding_batcher: Optional[EmbeddingBatcher] = None
+        if micro_batch_max_size:
+            self.embedding_batcher = EmbeddingBatcher(
+                self._run_embeddings,
+                max_batch_size=micro_batch_max_size,
+                max_wait_ms=micro_batch_max_wait_ms,
+            )
 
         self.run_data = WorkerRunData(
             host=self.host,
@@ -209,6 +237,8 @@ class LocalWorkerManager(WorkerManager):
                     stop_tasks.append(self.deregister_func(self.run_data))
 
             results = await asyncio.gather(*stop_tasks)
+            if self.embedding_batcher:
+                await self.embedding_batcher.close()
             if not results[0].success and not ignore_exception:
                 raise Exception(results[0].message)
 
@@ -403,43 +433,72 @@ class LocalWorkerManager(WorkerManager):
         return self.workers.get(worker_key, [])
 
     def _simple_select(
-        self, worker_type: str, model_name: str, worker_instances: List[WorkerRunData]
+        self,
+        worker_type: str,
+        model_name: str,
+        worker_instances: List[WorkerRunData],
+        affinity_key: Optional[str] = None,
     ) -> WorkerRunData:
         if not worker_instances:
             raise Exception(
                 f"Cound not found worker instances for model name {model_name} and "
                 f"worker type {worker_type}"
             )
-        worker_run_data = random.choice(worker_instances)
-        return worker_run_data
+        if len(worker_instances) == 1:
+            return worker_instances[0]
+        return self.instance_selector.select(
+            worker_instances, self.instance_stats, affinity_key
+        )
 
     async def select_one_instance(
-        self, worker_type: str, model_name: str, healthy_only: bool = True
+        self,
+        worker_type: str,
+        model_name: str,
+        healthy_only: bool = True,
+        affinity_key: Optional[str] = None,
     ) -> WorkerRunData:
         worker_instances = await self.get_model_instances(
             worker_type, model_name, healthy_only
         )
-        return self._simple_select(worker_type, model_name, worker_instances)
+        return self._simple_select(
+            worker_type, model_name, worker_instances, affinity_key
+        )
 
     def sync_select_one_instance(
-        self, worker_type: str, model_name: str, healthy_only: bool = True
+        self,
+        worker_type: str,
+        model_name: str,
+        healthy_only: bool = True,
+        affinity_key: Optional[str] = None,
     ) -> WorkerRunData:
         worker_instances = self.sync_get_model_instances(
             worker_type, model_name, healthy_only
         )
-        return self._simple_select(worker_type, model_name, worker_instances)
+        return self._simple_select(
+            worker_type, model_name, worker_instances, affinity_key
+        )
 
     async def _get_model(self, params: Dict, worker_type: str = "llm") -> WorkerRunData:
         model = params.get("model")
         if not model:
             raise Exception("Model name count not be empty")
-        return await self.select_one_instance(worker_type, model, healthy_only=True)
+        return await self.select_one_instance(
+            worker_type,
+            model,
+            healthy_only=True,
+            affinity_key=affinity_key_from_params(params),
+        )
 
     def _sync_get_model(self, params: Dict, worker_type: str = "llm") -> WorkerRunData:
         model = params.get("model")
         if not model:
             raise Exception("Model name count not be empty")
-        return self.sync_select_one_instance(worker_type, model, healthy_only=True)
+        return self.sync_select_one_instance(
+            worker_type,
+            model,
+            healthy_only=True,
+            affinity_key=affinity_key_from_params(params),
+        )
 
     async def generate_stream(
         self, params: Dict, async_wrapper=None, **kwargs
@@ -457,20 +516,22 @@ class LocalWorkerManager(WorkerManager):
                     error_code=1,
                 )
                 return
-            async with worker_run_data.semaphore:
-                if worker_run_data.worker.support_async():
-                    async for outout in worker_run_data.worker.async_generate_stream(
-                        params
-                    ):
-                        yield outout
-                else:
-                    if not async_wrapper:
-                        from starlette.concurrency import iterate_in_threadpool
+            with self.instance_stats.track(worker_run_data) as tracker:
+                async with worker_run_data.semaphore:
+                    if worker_run_data.worker.support_async():
+                        output_iter = worker_run_data.worker.async_generate_stream(
+                            params
+                        )
+                    else:
+                        if not async_wrapper:
+                            from starlette.concurrency import iterate_in_threadpool
 
-                        async_wrapper = iterate_in_threadpool
-                    async for output in async_wrapper(
-                        worker_run_data.worker.generate_stream(params)
-                    ):
+                            async_wrapper = iterate_in_threadpool
+                        output_iter = async_wrapper(
+                            worker_run_data.worker.generate_stream(params)
+                        )
+                    async for output in output_iter:
+                        tracker.metrics = output.metrics
                         yield output
 
     async def generate(self, params: Dict) -> ModelOutput:
@@ -486,13 +547,16 @@ class LocalWorkerManager(WorkerManager):
                     text=f"**LLMServer Generate Error, Please CheckErrorInfo.**: {e}",
                     error_code=1,
                 )
-            async with worker_run_data.semaphore:
-                if worker_run_data.worker.support_async():
-                    return await worker_run_data.worker.async_generate(params)
-                else:
-                    return await self.run_blocking_func(
-                        worker_run_data.worker.generate, params
-                    )
+            with self.instance_stats.track(worker_run_data) as tracker:
+                async with worker_run_data.semaphore:
+                    if worker_run_data.worker.support_async():
+                        output = await worker_run_data.worker.async_generate(params)
+                    else:
+                        output = await self.run_blocking_func(
+                            worker_run_data.worker.generate, params
+                        )
+                    tracker.metrics = output.metrics
+                    return output
 
     async def embeddings(self, params: Dict) -> List[List[float]]:
         """Embed input"""
@@ -505,18 +569,36 @@ class LocalWorkerManager(WorkerManager):
                 worker_run_data = await self._get_model(params, worker_type=worker_type)
             except Exception as e:
                 raise e
+            if self.embedding_batcher and worker_type in [
+                WorkerType.TEXT2VEC.value,
+                WorkerType.RERANKER.value,
+            ]:
+                return await self.embedding_batcher.submit(worker_run_data, params)
             async with worker_run_data.semaphore:
-                if worker_run_data.worker.support_async():
-                    return await worker_run_data.worker.async_embeddings(params)
-                else:
-                    return await self.run_blocking_func(
-                        worker_run_data.worker.embeddings, params
-                    )
+                return await self._run_embeddings(worker_run_data, params)
+
+    async def _run_embeddings(
+        self, worker_run_data: WorkerRunData, params: Dict
+    ) -> List[List[float]]:
+        with self.instance_stats.track(worker_run_data):
+            if worker_run_data.worker.support_async():
+                return await worker_run_data.worker.async_embeddings(params)
+            else:
+                return await self.run_blocking_func(
+                    worker_run_data.worker.embeddings, params
+                )
+
+    def embedding_batch_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return the micro batch statistics of the embedding instances."""
+        if not self.embedding_batcher:
+            return {}
+        return self.embedding_batcher.stats()
 
     def sync_embeddings(self, params: Dict) -> List[List[float]]:
         worker_type = params.get("worker_type", WorkerType.TEXT2VEC.value)
         worker_run_data = self._sync_get_model(params, worker_type=worker_type)
-        return worker_run_data.worker.embeddings(params)
+        with self.instance_stats.track(worker_run_data):
+            return worker_run_data.worker.embeddings(params)
 
     async def count_token(self, params: Dict) -> int:
         """Count token of prompt"""
@@ -809,17 +891,25 @@ class WorkerManagerAdapter(WorkerManager):
         )
 
     async def select_one_instance(
-        self, worker_type: str, model_name: str, healthy_only: bool = True
+        self,
+        worker_type: str,
+        model_name: str,
+        healthy_only: bool = True,
+        affinity_key: Optional[str] = None,
     ) -> WorkerRunData:
         return await self.worker_manager.select_one_instance(
-            worker_type, model_name, healthy_only
+            worker_type, model_name, healthy_only, affinity_key=affinity_key
         )
 
     def sync_select_one_instance(
-        self, worker_type: str, model_name: str, healthy_only: bool = True
+        self,
+        worker_type: str,
+        model_name: str,
+        healthy_only: bool = True,
+        affinity_key: Optional[str] = None,
     ) -> WorkerRunData:
         return self.worker_manager.sync_select_one_instance(
-            worker_type, model_name, healthy_only
+            worker_type, model_name, healthy_only, affinity_key=affinity_key
         )
 
     async def generate_stream(
@@ -837,6 +927,9 @@ class WorkerManagerAdapter(WorkerManager):
     def sync_embeddings(self, params: Dict) -> List[List[float]]:
         return self.worker_manager.sync_embeddings(params)
 
+    def embedding_batch_stats(self) -> Dict[str, Dict[str, Any]]:
+        return self.worker_manager.embedding_batch_stats()
+
     async def count_token(self, params: Dict) -> int:
         return await self.worker_manager.count_token(params)
 
@@ -904,6 +997,11 @@ async def api_embeddings(request: EmbeddingsRequest):
     return await worker_manager.embeddings(params)
 
 
+@router.get("/worker/embeddings/batch_stats")
+async def api_embedding_batch_stats():
+    return worker_manager.embedding_batch_stats()
+
+
 @router.post("/worker/count_token")
 async def api_count_token(request: CountTokenRequest):
     params = request.dict(exclude_none=True)
@@ -1066,7 +1164,12 @@ def _create_local_model_manager(
             f"controller_addr: {worker_params.controller_addr}"
         )
         return LocalWorkerManager(
-            host=register_host, port=port, model_storage=model_storage
+            host=register_host,
+            port=port,
+            model_storage=model_storage,
+            instance_selector=worker_params.instance_selector,
+            micro_batch_max_size=worker_params.micro_batch_max_size,
+            micro_batch_max_wait_ms=worker_params.micro_batch_max_wait_ms,
         )
     else:
         from dbgpt.model.cluster.controller.controller import ModelRegistryClient
@@ -1101,6 +1204,9 @@ def _create_local_model_manager(
             host=register_host,
             port=port,
             model_storage=model_storage,
+            instance_selector=worker_params.instance_selector,
+            micro_batch_max_size=worker_params.micro_batch_max_size,
+            micro_batch_max_wait_ms=worker_params.micro_batch_max_wait_ms,
         )
 
 
@@ -1275,7 +1381,11 @@ def initialize_worker_manager_in_client(
             raise ValueError("Controller can`t be None")
         logger.info(f"Worker params: {worker_params}")
         client = ModelRegistryClient(worker_params.controller_addr)
-        worker_manager.worker_manager = RemoteWorkerManager(client)
+        worker_manager.worker_manager = RemoteWorkerManager(
+            client,
+            http_pool_params=worker_params.http_pool,
+            instance_selector=worker_params.instance_selector,
+        )
         worker_manager.after_start(start_listener)
         initialize_controller(
             app=app,
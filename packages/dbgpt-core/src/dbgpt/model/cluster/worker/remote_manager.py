@@ -1,5 +1,5 @@
 import asyncio
-from typing import Any, Callable, List
+from typing import Any, Callable, List, Optional
 
 from dbgpt.model.base import ModelInstance, WorkerApplyOutput, WorkerSupportedModel
 from dbgpt.model.cluster.base import (
@@ -9,14 +9,25 @@ from dbgpt.model.cluster.base import (
     WorkerStartupRequest,
 )
 from dbgpt.model.cluster.registry import ModelRegistry
+from dbgpt.model.cluster.worker.http_pool import HttpClientPool, HttpPoolParameters
 from dbgpt.model.cluster.worker.manager import LocalWorkerManager, WorkerRunData, logger
 from dbgpt.model.cluster.worker.remote_worker import RemoteModelWorker
 from dbgpt.model.parameter import WorkerType
 
 
 class RemoteWorkerManager(LocalWorkerManager):
-    def __init__(self, model_registry: ModelRegistry = None) -> None:
-        super().__init__(model_registry=model_registry)
+    def __init__(
+        self,
+        model_registry: ModelRegistry = None,
+        http_pool_params: Optional[HttpPoolParameters] = None,
+        instance_selector: Optional[str] = None,
+    ) -> None:
+        super().__init__(
+            model_registry=model_registry, instance_selector=instance_selector
+        )
+        # Long-lived connections to the remote workers, shared by all the remote
+        # worker instances built by current manager
+        self._http_pool = HttpClientPool(http_pool_params)
 
     async def start(self):
         for listener in self.start_listeners:
@@ -26,7 +37,7 @@ class RemoteWorkerManager(LocalWorkerManager):
                 listener(self)
 
     async def stop(self, ignore_exception: bool = False):
-        pass
+        await self._http_pool.aclose()
 
     async def _fetch_from_worker(
         self,
@@ -39,14 +50,13 @@ class RemoteWorkerManager(LocalWorkerManager):
         success_handler: Callable = None,
         error_handler: Callable = None,
     ) -> Any:
-        # Lazy import to avoid high time cost
-        import httpx
-
-        url = worker_run_data.worker.worker_addr + endpoint
+        worker_addr = worker_run_data.worker.worker_addr
+        url = worker_addr + endpoint
         headers = {**worker_run_data.worker.headers, **(additional_headers or {})}
         timeout = worker_run_data.worker.timeout
 
-        async with httpx.AsyncClient() as client:
+        client = self._http_pool.get_async_client(worker_addr, timeout)
+        with self._http_pool.track(worker_addr, endpoint):
             request = client.build_request(
                 method,
                 url,
@@ -146,7 +156,7 @@ class RemoteWorkerManager(LocalWorkerManager):
         return worker_instances
 
     def _build_single_worker_instance(self, model_name: str, instance: ModelInstance):
-        worker = RemoteModelWorker()
+        worker = RemoteModelWorker(http_pool=self._http_pool)
         worker.load_worker(model_name, host=instance.host, port=instance.port)
         wr = WorkerRunData(
             host=instance.host,
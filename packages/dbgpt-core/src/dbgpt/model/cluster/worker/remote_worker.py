@@ -1,8 +1,9 @@
 import json
 import logging
-from typing import Dict, Iterator, List
+from typing import Any, Dict, Iterator, List, Optional
 
 from dbgpt.core import ModelMetadata, ModelOutput
+from dbgpt.model.cluster.worker.http_pool import HttpClientPool, default_http_pool
 from dbgpt.model.cluster.worker_base import ModelWorker
 from dbgpt.util.tracer import DBGPT_TRACER_SPAN_ID, root_tracer
 
@@ -10,12 +11,14 @@ logger = logging.getLogger(__name__)
 
 
 class RemoteModelWorker(ModelWorker):
-    def __init__(self) -> None:
+    def __init__(self, http_pool: Optional[HttpClientPool] = None) -> None:
         self.headers = {}
         # TODO Configured by ModelParameters
         self.timeout = 3600
         self.host = None
         self.port = None
+        # The connections are shared by all remote workers of the same address
+        self._http_pool = http_pool or default_http_pool()
 
     @property
     def worker_addr(self) -> str:
@@ -36,7 +39,12 @@ class RemoteModelWorker(ModelWorker):
         pass
 
     def stop(self) -> None:
-        raise NotImplementedError("Remote model worker not support stop methods")
+        """Stop model worker
+
+        The pooled connections are shared by other remote workers of the same
+        address, they are closed by the owner of the pool(the remote worker manager).
+        """
+        pass
 
     def generate_stream(self, params: Dict) -> Iterator[ModelOutput]:
         """Generate stream"""
@@ -44,13 +52,12 @@ class RemoteModelWorker(ModelWorker):
 
     async def async_generate_stream(self, params: Dict) -> Iterator[ModelOutput]:
         """Asynchronous generate stream"""
-        import httpx
-
-        async with httpx.AsyncClient() as client:
-            delimiter = b"\0"
-            buffer = b""
-            url = self.worker_addr + "/generate_stream"
-            logger.debug(f"Send async_generate_stream to url {url}, params: {params}")
+        client = self._http_pool.get_async_client(self.worker_addr, self.timeout)
+        delimiter = b"\0"
+        buffer = b""
+        url = self.worker_addr + "/generate_stream"
+        logger.debug(f"Send async_generate_stream to url {url}, params: {params}")
+        with self._http_pool.track(self.worker_addr, "/generate_stream"):
             async with client.stream(
                 "POST",
                 url,
@@ -74,58 +81,24 @@ class RemoteModelWorker(ModelWorker):
 
     async def async_generate(self, params: Dict) -> ModelOutput:
         """Asynchronous generate non stream"""
-        import httpx
-
-        async with httpx.AsyncClient() as client:
-            url = self.worker_addr + "/generate"
-            logger.debug(f"Send async_generate to url {url}, params: {params}")
-            response = await client.post(
-                url,
-                headers=self._get_trace_headers(),
-                json=params,
-                timeout=self.timeout,
-            )
-            if response.status_code not in [200, 201]:
-                raise Exception(f"Request to {url} failed, error: {response.text}")
-            return ModelOutput(**response.json())
+        logger.debug(f"Send async_generate to {self.worker_addr}, params: {params}")
+        response = await self._async_post("/generate", params)
+        return ModelOutput(**response)
 
     def count_token(self, prompt: str) -> int:
         raise NotImplementedError
 
     async def async_count_token(self, prompt: str) -> int:
-        import httpx
-
-        async with httpx.AsyncClient() as client:
-            url = self.worker_addr + "/count_token"
-            logger.debug(f"Send async_count_token to url {url}, params: {prompt}")
-            response = await client.post(
-                url,
-                headers=self._get_trace_headers(),
-                json={"prompt": prompt},
-                timeout=self.timeout,
-            )
-            if response.status_code not in [200, 201]:
-                raise Exception(f"Request to {url} failed, error: {response.text}")
-            return response.json()
+        logger.debug(f"Send async_count_token to {self.worker_addr}, params: {prompt}")
+        return await self._async_post("/count_token", {"prompt": prompt})
 
     async def async_get_model_metadata(self, params: Dict) -> ModelMetadata:
         """Asynchronously get model metadata"""
-        import httpx
-
-        async with httpx.AsyncClient() as client:
-            url = self.worker_addr + "/model_metadata"
-            logger.debug(
-                f"Send async_get_model_metadata to url {url}, params: {params}"
-            )
-            response = await client.post(
-                url,
-                headers=self._get_trace_headers(),
-                json=params,
-                timeout=self.timeout,
-            )
-            if response.status_code not in [200, 201]:
-                raise Exception(f"Request to {url} failed, error: {response.text}")
-            return ModelMetadata.from_dict(response.json())
+        logger.debug(
+            f"Send async_get_model_metadata to {self.worker_addr}, params: {params}"
+        )
+        response = await self._async_post("/model_metadata", params)
+        return ModelMetadata.from_dict(response)
 
     def get_model_metadata(self, params: Dict) -> ModelMetadata:
         """Get model metadata"""
@@ -133,36 +106,38 @@ class RemoteModelWorker(ModelWorker):
 
     def embeddings(self, params: Dict) -> List[List[float]]:
         """Get embeddings for input"""
-        import requests
-
         url = self.worker_addr + "/embeddings"
         logger.debug(f"Send embeddings to url {url}, params: {params}")
-        response = requests.post(
-            url,
-            headers=self._get_trace_headers(),
-            json=params,
-            timeout=self.timeout,
-        )
+        client = self._http_pool.get_client(self.worker_addr, self.timeout)
+        with self._http_pool.track(self.worker_addr, "/embeddings"):
+            response = client.post(
+                url,
+                headers=self._get_trace_headers(),
+                json=params,
+                timeout=self.timeout,
+            )
         if response.status_code not in [200, 201]:
             raise Exception(f"Request to {url} failed, error: {response.text}")
         return response.json()
 
     async def async_embeddings(self, params: Dict) -> List[List[float]]:
         """Asynchronous get embeddings for input"""
-        import httpx
+        logger.debug(f"Send async_embeddings to {self.worker_addr}")
+        return await self._async_post("/embeddings", params)
 
-        async with httpx.AsyncClient() as client:
-            url = self.worker_addr + "/embeddings"
-            logger.debug(f"Send async_embeddings to url {url}")
+    async def _async_post(self, endpoint: str, params: Dict) -> Any:
+        url = self.worker_addr + endpoint
+        client = self._http_pool.get_async_client(self.worker_addr, self.timeout)
+        with self._http_pool.track(self.worker_addr, endpoint):
             response = await client.post(
                 url,
                 headers=self._get_trace_headers(),
                 json=params,
                 timeout=self.timeout,
             )
-            if response.status_code not in [200, 201]:
-                raise Exception(f"Request to {url} failed, error: {response.text}")
-            return response.json()
+        if response.status_code not in [200, 201]:
+            raise Exception(f"Request to {url} failed, error: {response.text}")
+        return response.json()
 
     def _get_trace_headers(self):
         span_id = root_tracer.get_current_span_id()
@@ -0,0 +1,87 @@
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+
+from dbgpt.model.cluster.manager_base import WorkerRunData
+from dbgpt.model.parameter import WorkerType
+
+from ..batcher import EmbeddingBatcher
+
+
+def _run_data(concurrency: int = 1) -> WorkerRunData:
+    return WorkerRunData(
+        host="127.0.0.1",
+        port=8001,
+        worker_type=WorkerType.TEXT2VEC.value,
+        worker_key="test_model@text2vec",
+        worker=None,
+        worker_params=None,
+        model_params=None,
+        stop_event=asyncio.Event(),
+        semaphore=asyncio.Semaphore(concurrency),
+    )
+
+
+class _FakeEmbeddings:
+    def __init__(self) -> None:
+        self.calls: List[Dict[str, Any]] = []
+
+    async def __call__(self, worker_run_data: WorkerRunData, params: Dict):
+        self.calls.append(params)
+        await asyncio.sleep(0.01)
+        if params.get("worker_type") == WorkerType.RERANKER.value:
+            return [[float(len(t)) for t in params["input"]]]
+        return [[float(len(t))] for t in params["input"]]
+
+
+@pytest.mark.asyncio
+async def test_merge_concurrent_requests():
+    func = _FakeEmbeddings()
+    batcher = EmbeddingBatcher(func, max_batch_size=8, max_wait_ms=50)
+    run_data = _run_data()
+    texts = [["a"], ["bb", "ccc"], ["dddd"]]
+    results = await asyncio.gather(
+        *[batcher.submit(run_data, {"model": "m", "input": t}) for t in texts]
+    )
+    assert results == [[[1.0]], [[2.0], [3.0]], [[4.0]]]
+    assert len(func.calls) == 1
+    stats = list(batcher.stats().values())[0]
+    assert stats["total_requests"] == 3
+    assert stats["total_batches"] == 1
+    assert stats["batch_size"]["buckets"]["le_4"] == 1
+    assert stats["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_max_batch_size_and_rerank_query():
+    func = _FakeEmbeddings()
+    batcher = EmbeddingBatcher(func, max_batch_size=2, max_wait_ms=50)
+    run_data = _run_data()
+    params = [
+        {"input": ["a", "bb"]},
+        {"input": ["ccc"], "query": "q1"},
+        {"input": ["dddd"], "query": "q2"},
+    ]
+    for p in params:
+        p["worker_type"] = WorkerType.RERANKER.value
+    results = await asyncio.gather(*[batcher.submit(run_data, p) for p in params])
+    assert results == [[[1.0, 2.0]], [[3.0]], [[4.0]]]
+    # The first batch is full, the second batch has two different queries
+    assert [c["input"] for c in func.calls] == [["a", "bb"], ["ccc"], ["dddd"]]
+
+
+@pytest.mark.asyncio
+async def test_batch_error():
+    async def _error_func(worker_run_data, params):
+        raise ValueError("model error")
+
+    batcher = EmbeddingBatcher(_error_func, max_batch_size=4, max_wait_ms=10)
+    run_data = _run_data()
+    results = await asyncio.gather(
+        batcher.submit(run_data, {"input": ["a"]}),
+        batcher.submit(run_data, {"input": ["b"]}),
+        return_exceptions=True,
+    )
+    assert all(isinstance(r, ValueError) for r in results)
+    await batcher.close()
@@ -0,0 +1,157 @@
+import asyncio
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+
+from ..continuous_batcher import BatchScheduler, ContinuousBatchingEngine, _Sequence
+
+
+def _seq(prompt_len: int) -> _Sequence:
+    return _Sequence(prompt_ids=[1] * prompt_len, max_new_tokens=8)
+
+
+def _lens(seqs: List[_Sequence]) -> List[int]:
+    return [len(s.prompt_ids) for s in seqs]
+
+
+def test_fcfs_never_overtakes():
+    scheduler = BatchScheduler(max_batch_tokens=100, max_batch_size=3)
+    for prompt_len in [40, 60, 10]:
+        scheduler.add(_seq(prompt_len))
+    assert _lens(scheduler.schedule()) == [40]
+    # The padded batch would be 2 * 60 tokens, the short one waits behind it
+    assert scheduler.schedule() == []
+    scheduler.finish(scheduler.running)
+    assert _lens(scheduler.schedule()) == [60]
+
+
+def test_shortest_first_without_starvation():
+    scheduler = BatchScheduler(
+        max_batch_tokens=100,
+        max_batch_size=3,
+        policy="shortest_first",
+        max_wait_steps=4,
+    )
+    for prompt_len in [60, 40, 10]:
+        scheduler.add(_seq(prompt_len))
+    assert _lens(scheduler.schedule()) == [10, 40]
+    for _ in range(4):
+        scheduler.advance()
+    # The long sequence is starving, the new short one can't overtake it
+    scheduler.add(_seq(5))
+    assert scheduler.schedule() == []
+    scheduler.finish(scheduler.running)
+    assert _lens(scheduler.schedule()) == [60]
+    scheduler.finish(scheduler.running)
+    assert _lens(scheduler.schedule()) == [5]
+
+
+def test_batch_limits():
+    scheduler = BatchScheduler(max_batch_tokens=10, max_batch_size=2)
+    scheduler.add(_seq(50))
+    # Longer than max_batch_tokens, runs alone
+    assert _lens(scheduler.schedule()) == [50]
+    scheduler.finish(scheduler.running)
+    for _ in range(3):
+        scheduler.add(_seq(2))
+    assert _lens(scheduler.schedule()) == [2, 2]
+    cancelled = scheduler.waiting[0]
+    cancelled.cancelled = True
+    scheduler.finish(scheduler.running)
+    assert scheduler.schedule() == []
+    assert not scheduler.has_work()
+    with pytest.raises(ValueError):
+        BatchScheduler(policy="lifo")
+
+
+class _LetterTokenizer:
+    eos_token_id = None
+    pad_token_id = 0
+
+    def __call__(self, text: str):
+        return SimpleNamespace(input_ids=[ord(c) - ord("a") + 1 for c in text])
+
+    def decode(self, ids, skip_special_tokens=True):
+        return "".join(chr(ord("a") + (i - 1) % 26) for i in ids)
+
+
+def _feed(text: str, stop_words: List[str], max_new_tokens: int = 20):
+    tokenizer = _LetterTokenizer()
+    engine = ContinuousBatchingEngine(SimpleNamespace(), tokenizer, device="cpu")
+    deltas = []
+    engine._send = lambda seq, item: deltas.append(item)
+    seq = _Sequence(
+        prompt_ids=[1], max_new_tokens=max_new_tokens, custom_stop_words=stop_words
+    )
+    for token in tokenizer(text).input_ids:
+        engine._on_token(seq, token)
+        if seq.done:
+            break
+    return seq, deltas
+
+
+def test_hold_back_partial_stop_word():
+    seq, deltas = _feed("abstop", ["stop"])
+    # The beginning of the stop word is never sent to the consumer
+    assert deltas == [("a", None), ("b", None), ("", "stop")]
+    assert seq.text == "ab"
+
+    seq, deltas = _feed("abstox", ["stop", "xyz"])
+    # "x" may be the beginning of "xyz"
+    assert deltas == [("a", None), ("b", None), ("sto", None)]
+
+    # The held back text is sent when the generation is finished
+    seq, deltas = _feed("abst", ["stop"], max_new_tokens=4)
+    assert deltas == [("a", None), ("b", None), ("st", "length")]
+
+
+@pytest.mark.asyncio
+async def test_batched_decode_matches_generate():
+    torch = pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+
+    torch.manual_seed(0)
+    config = transformers.GPT2Config(
+        vocab_size=27, n_positions=128, n_embd=32, n_layer=2, n_head=2
+    )
+    model = transformers.GPT2LMHeadModel(config).eval()
+    tokenizer = _LetterTokenizer()
+    prompts = ["abc", "hello", "continuousbatching", "x"]
+
+    expected = []
+    for prompt in prompts:
+        input_ids = torch.tensor([tokenizer(prompt).input_ids])
+        output = model.generate(
+            input_ids,
+            attention_mask=torch.ones_like(input_ids),
+            max_new_tokens=8,
+            do_sample=False,
+            pad_token_id=0,
+        )
+        expected.append(tokenizer.decode(output[0, input_ids.shape[1] :].tolist()))
+
+    engine = ContinuousBatchingEngine(model, tokenizer, device="cpu", max_batch_size=4)
+    engine.start()
+
+    async def _generate(prompt: str, delay: float):
+        await asyncio.sleep(delay)
+        params = {"prompt": prompt, "max_new_tokens": 8, "do_sample": False}
+        outputs = [
+            output async for output in engine.generate_stream(None, None, params, "cpu")
+        ]
+        return outputs[-1]
+
+    try:
+        results = await asyncio.gather(
+            *[_generate(prompt, i * 0.01) for i, prompt in enumerate(prompts)]
+        )
+    finally:
+        engine.stop()
+    assert [r.text for r in results] == expected
+    assert all(r.finish_reason == "length" for r in results)
+    assert all(r.usage["completion_tokens"] == 8 for r in results)
+    metrics = engine.metrics()
+    assert metrics["total_requests"] == 4
+    # The sequences shared the decoding steps
+    assert metrics["batch_size"]["sum"] > metrics["total_steps"]
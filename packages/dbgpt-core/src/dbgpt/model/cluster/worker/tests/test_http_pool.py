@@ -0,0 +1,80 @@
+import pytest
+
+from dbgpt.model.parameter import ModelWorkerParameters
+from dbgpt.util.configure.manager import ConfigurationManager
+
+from ..http_pool import HttpClientPool, HttpPoolParameters
+from ..remote_manager import RemoteWorkerManager
+from ..remote_worker import RemoteModelWorker
+
+_ADDR = "http://127.0.0.1:8001/api/worker"
+
+
+@pytest.mark.asyncio
+async def test_reuse_async_client():
+    pool = HttpClientPool(HttpPoolParameters(max_connections=10))
+    client = pool.get_async_client(_ADDR)
+    assert pool.get_async_client(_ADDR) is client
+    assert pool.get_async_client("http://127.0.0.1:8002/api/worker") is not client
+    await pool.aclose()
+    assert client.is_closed
+    assert pool.get_async_client(_ADDR) is not client
+    await pool.aclose()
+
+
+def test_pool_parameters_from_config():
+    cm = ConfigurationManager(
+        {"worker": {"http_pool": {"max_connections": 8, "keepalive_expiry": 5}}}
+    )
+    params = cm.parse_config(ModelWorkerParameters, prefix="worker")
+    assert isinstance(params.http_pool, HttpPoolParameters)
+    manager = RemoteWorkerManager(http_pool_params=params.http_pool)
+    assert manager._http_pool.params.max_connections == 8
+    assert manager._http_pool.params.keepalive_expiry == 5
+    assert manager._http_pool.params.max_keepalive_connections == 20
+
+
+def test_track_utilization():
+    pool = HttpClientPool()
+    pool.get_client(_ADDR)
+    with pool.track(_ADDR, "/embeddings"):
+        stats = pool.stats(_ADDR)
+        assert stats["in_flight"] == 1
+        assert stats["max_connections"] == 100
+    stats = pool.stats(_ADDR)
+    assert stats["in_flight"] == 0
+    assert stats["total_requests"] == 1
+    pool.close()
+
+
+@pytest.mark.asyncio
+async def test_remote_workers_share_pool():
+    pool = HttpClientPool()
+    worker1 = RemoteModelWorker(http_pool=pool)
+    worker1.load_worker("test", host="127.0.0.1", port=8001)
+    worker2 = RemoteModelWorker(http_pool=pool)
+    worker2.load_worker("test", host="127.0.0.1", port=8001)
+    client = pool.get_async_client(worker1.worker_addr)
+    assert pool.get_async_client(worker2.worker_addr) is client
+    sync_client = pool.get_client(worker1.worker_addr)
+
+    # Stop one worker doesn't close the connections used by the other workers
+    worker1.stop()
+    assert not client.is_closed
+    assert not sync_client.is_closed
+    assert pool.get_async_client(worker2.worker_addr) is client
+    await pool.aclose()
+    assert client.is_closed
+    assert sync_client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_manager_stop_closes_pool():
+    manager = RemoteWorkerManager()
+    worker = RemoteModelWorker(http_pool=manager._http_pool)
+    worker.load_worker("test", host="127.0.0.1", port=8001)
+    client = manager._http_pool.get_async_client(worker.worker_addr)
+    worker.stop()
+    assert not client.is_closed
+    await manager.stop()
+    assert client.is_closed
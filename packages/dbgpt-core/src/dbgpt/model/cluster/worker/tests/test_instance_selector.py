@@ -0,0 +1,122 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from dbgpt.core import ModelInferenceMetrics
+from dbgpt.model.cluster.manager_base import WorkerRunData
+
+from ..instance_selector import (
+    AffinitySelector,
+    EWMALatencySelector,
+    InstanceStatsRegistry,
+    LeastRequestsSelector,
+    affinity_key_from_params,
+    create_instance_selector,
+)
+
+
+def _instances(n: int) -> List[WorkerRunData]:
+    return [
+        WorkerRunData(
+            host="127.0.0.1",
+            port=8000 + i,
+            worker_type="llm",
+            worker_key="test_model@llm",
+            worker=None,
+            worker_params=None,
+            model_params=None,
+            stop_event=asyncio.Event(),
+        )
+        for i in range(n)
+    ]
+
+
+def test_track_stats():
+    stats = InstanceStatsRegistry(ewma_alpha=0.5)
+    ins = _instances(1)[0]
+    with stats.track(ins) as tracker:
+        assert stats.get(ins).in_flight == 1
+        tracker.metrics = ModelInferenceMetrics(
+            start_time_ms=1000, end_time_ms=2000, completion_tokens=10
+        )
+    assert stats.get(ins).in_flight == 0
+    assert stats.get(ins).ewma_latency_ms == 100
+    with pytest.raises(ValueError):
+        with stats.track(ins):
+            raise ValueError("failed")
+    ins_stats = stats.get(ins)
+    assert ins_stats.total_requests == 2
+    assert ins_stats.failed_requests == 1
+    assert ins_stats.ewma_latency_ms == 100
+
+
+@pytest.mark.asyncio
+async def test_track_closed_stream_not_failed():
+    stats = InstanceStatsRegistry()
+    ins = _instances(1)[0]
+
+    def _stream():
+        with stats.track(ins):
+            yield 1
+            yield 2
+
+    stream = _stream()
+    next(stream)
+    # The client stops reading the stream
+    stream.close()
+
+    async def _request():
+        with stats.track(ins):
+            await asyncio.sleep(10)
+
+    task = asyncio.create_task(_request())
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    ins_stats = stats.get(ins)
+    assert ins_stats.total_requests == 2
+    assert ins_stats.in_flight == 0
+    assert ins_stats.failed_requests == 0
+
+
+def test_least_requests_and_ewma():
+    stats = InstanceStatsRegistry()
+    instances = _instances(3)
+    stats.get(instances[0]).in_flight = 2
+    stats.get(instances[1]).in_flight = 1
+    stats.get(instances[2]).in_flight = 3
+    assert LeastRequestsSelector().select(instances, stats) is instances[1]
+
+    stats.get(instances[0]).ewma_latency_ms = 10
+    stats.get(instances[1]).ewma_latency_ms = 100
+    stats.get(instances[2]).ewma_latency_ms = 20
+    # Cost: 10 * 3, 100 * 2, 20 * 4
+    assert EWMALatencySelector().select(instances, stats) is instances[0]
+
+
+def test_affinity_selector():
+    stats = InstanceStatsRegistry()
+    instances = _instances(4)
+    selector = AffinitySelector()
+    preferred = selector.select(instances, stats, "conv-1")
+    for _ in range(10):
+        assert selector.select(instances, stats, "conv-1") is preferred
+    # Removing other instances does not move the key
+    others = [ins for ins in instances if ins is not preferred]
+    assert selector.select([preferred, others[0]], stats, "conv-1") is preferred
+
+    # Fall back to the least loaded instance if the preferred one is overloaded
+    stats.get(preferred).in_flight = 10
+    assert selector.select(instances, stats, "conv-1") is not preferred
+
+
+def test_affinity_key_from_params():
+    assert affinity_key_from_params({"context": {"conv_uid": "c1"}}) == "c1"
+    messages = [{"role": "system", "content": "You are a helpful assistant"}]
+    key = affinity_key_from_params({"messages": messages})
+    assert key and key == affinity_key_from_params({"messages": messages})
+    assert affinity_key_from_params({"messages": []}) is None
+    with pytest.raises(ValueError):
+        create_instance_selector("unknown")
@@ -15,6 +15,15 @@ from dbgpt.util.configure.manager import RegisterParameters
 from dbgpt.util.i18n_utils import _
 from dbgpt.util.parameter_utils import BaseParameters
 
+# The names of the instance selectors, see dbgpt.model.cluster.worker.instance_selector
+_INSTANCE_SELECTORS = [
+    "random",
+    "least_requests",
+    "power_of_two",
+    "ewma_latency",
+    "affinity",
+]
+
 
 class WorkerType(str, Enum):
     LLM = "llm"
@@ -97,6 +106,36 @@ class DBModelRegistryParameters(BaseModelRegistryParameters):
     )
 
 
+@dataclass
+class HttpPoolParameters(BaseParameters):
+    """The parameters of the HTTP connection pool to the remote model workers."""
+
+    __cfg_type__ = "service"
+
+    max_connections: int = field(
+        default=100,
+        metadata={"help": _("The max number of connections of each worker address")},
+    )
+    max_keepalive_connections: int = field(
+        default=20,
+        metadata={"help": _("The max number of idle keep-alive connections")},
+    )
+    keepalive_expiry: float = field(
+        default=60.0,
+        metadata={"help": _("The seconds an idle keep-alive connection is kept")},
+    )
+    http2: bool = field(
+        default=False,
+        metadata={
+            "help": _("Whether to enable HTTP/2, the `h2` package must be installed")
+        },
+    )
+    connect_timeout: float = field(
+        default=10.0,
+        metadata={"help": _("The timeout in seconds to establish a connection")},
+    )
+
+
 @dataclass
 class ModelControllerParameters(BaseServerParameters):
     port: Optional[int] = field(
@@ -144,6 +183,25 @@ class ModelAPIServerParameters(BaseServerParameters):
     ignore_stop_exceeds_error: Optional[bool] = field(
         default=False, metadata={"help": _("Ignore exceeds stop words error")}
     )
+    instance_selector: Optional[str] = field(
+        default="random",
+        metadata={
+            "valid_values": _INSTANCE_SELECTORS,
+            "help": _(
+                "The strategy to select a model instance, random, least_requests, "
+                "power_of_two, ewma_latency or affinity(route the requests of the same "
+                "conversation or prompt prefix to the same instance)"
+            ),
+        },
+    )
+    http_pool: Optional[HttpPoolParameters] = field(
+        default=None,
+        metadata={
+            "help": _(
+                "The HTTP connection pool configuration to the remote model workers"
+            )
+        },
+    )
 
 
 @dataclass
@@ -189,6 +247,42 @@ class ModelWorkerParameters(BaseServerParameters):
         default=20,
         metadata={"help": _("The interval for sending heartbeats (seconds)")},
     )
+    instance_selector: Optional[str] = field(
+        default="random",
+        metadata={
+            "valid_values": _INSTANCE_SELECTORS,
+            "help": _(
+                "The strategy to select a model instance, random, least_requests, "
+                "power_of_two, ewma_latency or affinity(route the requests of the same "
+                "conversation or prompt prefix to the same instance)"
+            ),
+        },
+    )
+    http_pool: Optional[HttpPoolParameters] = field(
+        default=None,
+        metadata={
+            "help": _(
+                "The HTTP connection pool configuration to the remote model workers"
+            )
+        },
+    )
+    micro_batch_max_size: Optional[int] = field(
+        default=None,
+        metadata={
+            "help": _(
+                "The max texts to merge the concurrent requests of text2vec and "
+                "reranker models into one batch, not merge the requests if not set"
+            )
+        },
+    )
+    micro_batch_max_wait_ms: Optional[float] = field(
+        default=5.0,
+        metadata={
+            "help": _(
+                "The max milliseconds to wait for more requests to merge into one batch"
+            )
+        },
+    )
 
 
 @dataclass
@@ -0,0 +1,203 @@
+"""Convert the accumulated outputs of a streaming model to the deltas and back.
+
+Most generate stream functions yield the full text generated so far on every
+step. Shipping and re-diffing the full text on every token is O(n^2) over a long
+generation, so the worker can emit only the new text of every step(the
+incremental outputs), with a full checkpoint now and then.
+"""
+
+from typing import List, Optional, Tuple
+
+from dbgpt.core import ModelOutput
+from dbgpt.core.interface.media import MediaContent
+
+# The replacement character of an incomplete multibyte character
+_REPLACEMENT_CHAR = "\ufffd"
+
+
+def _split_delta(full: str, start: int, hold_back: bool) -> Tuple[str, int]:
+    """Return the new text after `start` and the length consumed.
+
+    The trailing replacement characters are held back if `hold_back` is True,
+    they are usually completed by the next step.
+    """
+    end = len(full)
+    if hold_back:
+        while end > start and full[end - 1] == _REPLACEMENT_CHAR:
+            end -= 1
+    return full[start:end], max(end, start)
+
+
+def _split_checkpoint(full: str, start: int, hold_back: bool) -> Tuple[str, int]:
+    """Return the new text after `start` and the length kept by a full output.
+
+    The consumer of a full output removes the replacement characters, so the
+    trailing ones are not counted as consumed.
+    """
+    _, end = _split_delta(full, 0, hold_back)
+    return full[min(start, end) : end], end
+
+
+class StreamDeltaEncoder:
+    """Turn the accumulated outputs of a model into the incremental outputs.
+
+    The incremental output has `incremental=True` and contains only the new text
+    and thinking text of the step. The first step and every `checkpoint_interval`
+    steps after it, or when the text of the model shrinks, the full output is
+    emitted with `incremental=False`, the consumer should replace its text with
+    it.
+
+    The text of the model is assumed to only grow by appending, like all the
+    built-in generate stream functions.
+    """
+
+    def __init__(self, checkpoint_interval: int = 64):
+        """Create a new StreamDeltaEncoder.
+
+        Args:
+            checkpoint_interval (int): Emit a full output every this many steps,
+                0 to emit only the incremental outputs.
+        """
+        self._checkpoint_interval = checkpoint_interval
+        self._text_len = 0
+        self._thinking_len = 0
+        self._steps = 0
+        self.last_output: Optional[ModelOutput] = None
+        """The last full output of the model."""
+        self.new_text = ""
+        """The new thinking text and text of the last step."""
+
+    def encode(self, output: ModelOutput) -> ModelOutput:
+        """Encode the full output of a step."""
+        self._steps += 1
+        self.last_output = output
+        text = output.text if output.has_text else None
+        thinking = output.thinking_text if output.has_thinking else None
+        if text is None and thinking is None:
+            # Not a text output, pass it through
+            self.new_text = ""
+            return output
+
+        hold_back = output.finish_reason is None
+        is_checkpoint = (
+            self._checkpoint_interval > 0
+            and (self._steps - 1) % self._checkpoint_interval == 0
+        )
+        is_checkpoint = (
+            is_checkpoint
+            or len(text or "") < self._text_len
+            or len(thinking or "") < self._thinking_len
+        )
+        if is_checkpoint:
+            # The held back characters are sent in the full output too, but the
+            # consumer drops them, so the next delta must start before them
+            new_thinking, self._thinking_len = _split_checkpoint(
+                thinking or "", self._thinking_len, hold_back
+            )
+            new_text, self._text_len = _split_checkpoint(
+                text or "", self._text_len, hold_back
+            )
+            self.new_text = new_thinking + new_text
+            output.incremental = False
+            return output
+
+        content: List[MediaContent] = []
+        new_thinking = new_text = ""
+        if thinking is not None:
+            new_thinking, self._thinking_len = _split_delta(
+                thinking, self._thinking_len, hold_back
+            )
+            content.append(MediaContent.build_thinking(new_thinking))
+        if text is not None:
+            new_text, self._text_len = _split_delta(text, self._text_len, hold_back)
+            content.append(MediaContent.build_text(new_text))
+        self.new_text = new_thinking + new_text
+        return ModelOutput(
+            error_code=output.error_code,
+            content=content if len(content) > 1 else content[0],
+            incremental=True,
+            model_context=output.model_context,
+            finish_reason=output.finish_reason,
+            usage=output.usage,
+            metrics=output.metrics,
+        )
+
+    def full_text(self) -> str:
+        """Return the full thinking text and text of the last output."""
+        if not self.last_output:
+            return ""
+        full_text = ""
+        if self.last_output.has_thinking:
+            full_text = self.last_output.thinking_text or ""
+        if self.last_output.has_text:
+            full_text += self.last_output.text
+        return full_text
+
+
+class _TextAccumulator:
+    def __init__(self) -> None:
+        self._parts: List[str] = []
+        self._len = 0
+
+    def append(self, delta: str) -> str:
+        delta = delta.replace(_REPLACEMENT_CHAR, "")
+        if delta:
+            self._parts.append(delta)
+            self._len += len(delta)
+        return delta
+
+    def replace(self, full: str) -> str:
+        full = full.replace(_REPLACEMENT_CHAR, "")
+        delta = full[self._len :]
+        if len(full) > self._len:
+            self._parts = [full]
+            self._len = len(full)
+        return delta
+
+    @property
+    def text(self) -> str:
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+
+class StreamDeltaDecoder:
+    """Return the new text of every output of a stream.
+
+    Both the incremental outputs and the full outputs are supported, so it works
+    with the workers which don't emit the incremental outputs.
+    """
+
+    def __init__(self) -> None:
+        """Create a new StreamDeltaDecoder."""
+        self._text = _TextAccumulator()
+        self._thinking = _TextAccumulator()
+
+    def decode(self, output: ModelOutput) -> Tuple[str, str]:
+        """Return the new text and the new thinking text of the output.
+
+        The replacement characters are removed.
+        """
+        new_text = new_thinking = ""
+        if output.has_text:
+            if output.incremental:
+                new_text = self._text.append(output.text)
+            else:
+                new_text = self._text.replace(output.text)
+        if output.has_thinking:
+            thinking = output.thinking_text or ""
+            if output.incremental:
+                new_thinking = self._thinking.append(thinking)
+            else:
+                new_thinking = self._thinking.replace(thinking)
+        return new_text, new_thinking
+
+    @property
+    def text(self) -> str:
+        """The text received so far."""
+        return self._text.text
+
+    @property
+    def thinking_text(self) -> str:
+        """The thinking text received so far."""
+        return self._thinking.text
@@ -0,0 +1,100 @@
+from typing import List
+
+from dbgpt.core import ModelOutput
+
+from ..stream_utils import StreamDeltaDecoder, StreamDeltaEncoder
+
+
+def _full_outputs(texts: List[str], thinking: bool = False) -> List[ModelOutput]:
+    outputs = []
+    full_text = ""
+    for i, text in enumerate(texts):
+        full_text += text
+        finish_reason = "stop" if i == len(texts) - 1 else None
+        if thinking:
+            output = ModelOutput.build("", thinking=full_text)
+        else:
+            output = ModelOutput.build(full_text)
+        output.finish_reason = finish_reason
+        outputs.append(output)
+    return outputs
+
+
+def test_encode_and_decode():
+    texts = ["Hello", ",", " world", "!", " How", " are", " you?"]
+    encoder = StreamDeltaEncoder(checkpoint_interval=3)
+    decoder = StreamDeltaDecoder()
+    outputs = [encoder.encode(o) for o in _full_outputs(texts)]
+    # The first step and every 3 steps after it are the full outputs
+    assert [o.incremental for o in outputs] == [
+        False,
+        True,
+        True,
+        False,
+        True,
+        True,
+        False,
+    ]
+    assert outputs[1].text == ","
+    assert outputs[3].text == "Hello, world!"
+
+    new_texts = [decoder.decode(o)[0] for o in outputs]
+    assert new_texts == texts
+    assert decoder.text == "".join(texts)
+    assert encoder.full_text() == "".join(texts)
+
+
+def test_hold_back_incomplete_characters():
+    encoder = StreamDeltaEncoder(checkpoint_interval=0)
+    decoder = StreamDeltaDecoder()
+    outputs = [
+        ModelOutput.build("你"),
+        ModelOutput.build("你\ufffd"),
+        ModelOutput.build("你好"),
+    ]
+    new_texts = [decoder.decode(encoder.encode(o))[0] for o in outputs]
+    assert new_texts == ["你", "", "好"]
+    assert decoder.text == "你好"
+
+
+def test_thinking_and_shrink():
+    encoder = StreamDeltaEncoder(checkpoint_interval=0)
+    decoder = StreamDeltaDecoder()
+    for output in _full_outputs(["Let", " me", " think"], thinking=True):
+        decoder.decode(encoder.encode(output))
+    assert decoder.thinking_text == "Let me think"
+
+    output = encoder.encode(ModelOutput.build("Done", thinking="Let me think"))
+    assert output.incremental
+    assert output.thinking_text == ""
+    assert output.text == "Done"
+    # The text shrinks, emit the full output
+    output = encoder.encode(ModelOutput.build("Do", thinking="Let me think"))
+    assert not output.incremental
+    assert output.text == "Do"
+
+
+def test_decode_full_outputs():
+    decoder = StreamDeltaDecoder()
+    new_texts = [decoder.decode(o)[0] for o in _full_outputs(["a", "b\ufffd", "c"])]
+    assert new_texts == ["a", "b", "c"]
+    assert decoder.text == "abc"
+
+
+def test_hold_back_incomplete_characters_on_checkpoint():
+    texts = ["\ufffd", "你", "你好\ufffd", "你好世", "你好世界"]
+    # Split at the first step
+    encoder = StreamDeltaEncoder(checkpoint_interval=0)
+    decoder = StreamDeltaDecoder()
+    for text in texts:
+        decoder.decode(encoder.encode(ModelOutput.build(text)))
+    assert decoder.text == "你好世界"
+
+    # Split at the first step and at a checkpoint(the 3rd step)
+    encoder = StreamDeltaEncoder(checkpoint_interval=2)
+    decoder = StreamDeltaDecoder()
+    outputs = [encoder.encode(ModelOutput.build(text)) for text in texts]
+    assert [o.incremental for o in outputs] == [False, True, False, True, False]
+    new_texts = [decoder.decode(o)[0] for o in outputs]
+    assert new_texts == ["", "你", "好", "世", "界"]
+    assert decoder.text == "你好世界"
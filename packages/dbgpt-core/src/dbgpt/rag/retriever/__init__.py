@@ -2,15 +2,25 @@
 
 from .base import BaseRetriever, RetrieverStrategy  # noqa: F401
 from .embedding import EmbeddingRetriever  # noqa: F401
-from .rerank import DefaultRanker, Ranker, RRFRanker  # noqa: F401
+from .hybrid import HybridRetriever  # noqa: F401
+from .rerank import (  # noqa: F401
+    DefaultRanker,
+    FusionStrategy,
+    Ranker,
+    RRFRanker,
+    fuse_candidates,
+)
 from .rewrite import QueryRewrite  # noqa: F401
 
 __all__ = [
     "RetrieverStrategy",
     "BaseRetriever",
     "EmbeddingRetriever",
+    "HybridRetriever",
     "Ranker",
     "DefaultRanker",
     "RRFRanker",
+    "FusionStrategy",
+    "fuse_candidates",
     "QueryRewrite",
 ]
@@ -1,11 +1,15 @@
 """Embedding retriever."""
 
-from functools import reduce
-from typing import Any, Dict, List, Optional, cast
+from typing import Any, Dict, List, Optional, Union
 
 from dbgpt.core import Chunk
 from dbgpt.rag.retriever.base import BaseRetriever, RetrieverStrategy
-from dbgpt.rag.retriever.rerank import DefaultRanker, Ranker
+from dbgpt.rag.retriever.rerank import (
+    DefaultRanker,
+    FusionStrategy,
+    Ranker,
+    fuse_candidates,
+)
 from dbgpt.rag.retriever.rewrite import QueryRewrite
 from dbgpt.storage.base import IndexStoreBase
 from dbgpt.storage.vector_store.filters import MetadataFilters
@@ -23,6 +27,8 @@ class EmbeddingRetriever(BaseRetriever):
         query_rewrite: Optional[QueryRewrite] = None,
         rerank: Optional[Ranker] = None,
         retrieve_strategy: Optional[RetrieverStrategy] = RetrieverStrategy.EMBEDDING,
+        concurrency_limit: Optional[int] = 5,
+        fusion_strategy: Union[str, FusionStrategy] = FusionStrategy.MAX_SCORE,
     ):
         """Create EmbeddingRetriever.
 
@@ -31,6 +37,10 @@ class EmbeddingRetriever(BaseRetriever):
             top_k (int): top k
             query_rewrite (Optional[QueryRewrite]): query rewrite
             rerank (Ranker): rerank
+            concurrency_limit (Optional[int]): The max similarity searches of the
+                rewritten queries run concurrently, no limit if None.
+            fusion_strategy (Union[str, FusionStrategy]): How to fuse the candidates
+                of the rewritten queries, `max_score` or `rrf`.
 
         Examples:
             .. code-block:: python
@@ -68,6 +78,8 @@ class EmbeddingRetriever(BaseRetriever):
         self._index_store = index_store
         self._rerank = rerank or DefaultRanker(self._top_k)
         self._retrieve_strategy = retrieve_strategy
+        self._concurrency_limit = concurrency_limit
+        self._fusion_strategy = FusionStrategy(fusion_strategy)
 
     def load_document(self, chunks: List[Chunk], **kwargs: Dict[str, Any]) -> List[str]:
         """Load document in vector database.
@@ -95,8 +107,7 @@ class EmbeddingRetriever(BaseRetriever):
             self._index_store.similar_search(query, self._top_k, filters)
             for query in queries
         ]
-        res_candidates = cast(List[Chunk], reduce(lambda x, y: x + y, candidates))
-        return res_candidates
+        return fuse_candidates(candidates, self._fusion_strategy)
 
     def _retrieve_with_score(
         self,
@@ -120,8 +131,8 @@ class EmbeddingRetriever(BaseRetriever):
             )
             for query in queries
         ]
-        new_candidates_with_score = cast(
-            List[Chunk], reduce(lambda x, y: x + y, candidates_with_score)
+        new_candidates_with_score = fuse_candidates(
+            candidates_with_score, self._fusion_strategy
         )
         new_candidates_with_score = self._rerank.rank(new_candidates_with_score, query)
         return new_candidates_with_score
@@ -139,24 +150,13 @@ class EmbeddingRetriever(BaseRetriever):
         """
         queries = [query]
         if self._query_rewrite:
-            candidates_tasks = [
-                self._similarity_search(
-                    query, filters, root_tracer.get_current_span_id()
-                )
-                for query in queries
-            ]
-            chunks = await self._run_async_tasks(candidates_tasks)
+            chunks = await self.amulti_similarity_search(queries, filters=filters)
             context = "\n".join([chunk.content for chunk in chunks])
             new_queries = await self._query_rewrite.rewrite(
                 origin_query=query, context=context, nums=1
             )
             queries.extend(new_queries)
-        candidates = [
-            self._similarity_search(query, filters, root_tracer.get_current_span_id())
-            for query in queries
-        ]
-        new_candidates = await run_async_tasks(tasks=candidates, concurrency_limit=1)
-        return new_candidates
+        return await self.amulti_similarity_search(queries, filters=filters)
 
     async def _aretrieve_with_score(
         self,
@@ -179,13 +179,7 @@ class EmbeddingRetriever(BaseRetriever):
                 "dbgpt.rag.retriever.embeddings.query_rewrite.similarity_search",
                 metadata={"query": query, "score_threshold": score_threshold},
             ):
-                candidates_tasks = [
-                    self._similarity_search(
-                        query, filters, root_tracer.get_current_span_id()
-                    )
-                    for query in queries
-                ]
-                chunks = await self._run_async_tasks(candidates_tasks)
+                chunks = await self.amulti_similarity_search(queries, filters=filters)
                 context = "\n".join([chunk.content for chunk in chunks])
             with root_tracer.start_span(
                 "dbgpt.rag.retriever.embeddings.query_rewrite.rewrite",
@@ -200,17 +194,8 @@ class EmbeddingRetriever(BaseRetriever):
             "dbgpt.rag.retriever.embeddings.similarity_search_with_score",
             metadata={"query": query, "score_threshold": score_threshold},
         ):
-            candidates_with_score = [
-                self._similarity_search_with_score(
-                    query, score_threshold, filters, root_tracer.get_current_span_id()
-                )
-                for query in queries
-            ]
-            res_candidates_with_score = await run_async_tasks(
-                tasks=candidates_with_score, concurrency_limit=1
-            )
-            new_candidates_with_score = cast(
-                List[Chunk], reduce(lambda x, y: x + y, res_candidates_with_score)
+            new_candidates_with_score = await self.amulti_similarity_search(
+                queries, score_threshold, filters
             )
 
         with root_tracer.start_span(
@@ -242,11 +227,42 @@ class EmbeddingRetriever(BaseRetriever):
         ):
             return await self._index_store.asimilar_search(query, self._top_k, filters)
 
-    async def _run_async_tasks(self, tasks) -> List[Chunk]:
-        """Run async tasks."""
-        candidates = await run_async_tasks(tasks=tasks, concurrency_limit=1)
-        candidates = reduce(lambda x, y: x + y, candidates)
-        return cast(List[Chunk], candidates)
+    async def amulti_similarity_search(
+        self,
+        queries: List[str],
+        score_threshold: Optional[float] = None,
+        filters: Optional[MetadataFilters] = None,
+    ) -> List[Chunk]:
+        """Search the queries concurrently and fuse the candidates.
+
+        Args:
+            queries (List[str]): The queries, e.g. the origin query and the
+                rewritten queries.
+            score_threshold (Optional[float]): The score threshold, search without
+                score if None.
+            filters (Optional[MetadataFilters]): metadata filters.
+
+        Return:
+            List[Chunk]: The candidates deduplicated by chunk id and fused by the
+                fusion strategy.
+        """
+        parent_span_id = root_tracer.get_current_span_id()
+        if score_threshold is None:
+            tasks = [
+                self._similarity_search(query, filters, parent_span_id)
+                for query in queries
+            ]
+        else:
+            tasks = [
+                self._similarity_search_with_score(
+                    query, score_threshold, filters, parent_span_id
+                )
+                for query in queries
+            ]
+        candidates = await run_async_tasks(
+            tasks=tasks, concurrency_limit=self._concurrency_limit
+        )
+        return fuse_candidates(candidates, self._fusion_strategy)
 
     async def _similarity_search_with_score(
         self,
@@ -0,0 +1,264 @@
+"""Hybrid retriever, fuse the vector search and the full text search."""
+
+import asyncio
+import logging
+from typing import List, Optional, Union
+
+from dbgpt.core import Chunk
+from dbgpt.rag.retriever.base import BaseRetriever
+from dbgpt.rag.retriever.rerank import (
+    RRF_K,
+    FusionStrategy,
+    Ranker,
+    fuse_candidates,
+)
+from dbgpt.storage.base import IndexStoreBase
+from dbgpt.storage.full_text.base import FullTextStoreBase
+from dbgpt.storage.vector_store.filters import MetadataFilters
+from dbgpt.util.tracer import root_tracer
+
+logger = logging.getLogger(__name__)
+
+
+def _support_full_text_search(index_store: IndexStoreBase) -> bool:
+    try:
+        return index_store.is_support_full_text_search()
+    except NotImplementedError:
+        return False
+
+
+class HybridRetriever(BaseRetriever):
+    """Hybrid retriever.
+
+    Search the vector store and the full text store concurrently, fuse the results
+    by the reciprocal rank fusion(or the weighted score fusion) and deduplicate them
+    by the chunk id, then only the top fused candidates are sent to the reranker.
+    """
+
+    def __init__(
+        self,
+        index_store: IndexStoreBase,
+        full_text_store: Optional[IndexStoreBase] = None,
+        top_k: int = 4,
+        candidate_top_k: Optional[int] = None,
+        fusion_strategy: Union[str, FusionStrategy] = FusionStrategy.RRF,
+        weights: Optional[List[float]] = None,
+        rrf_k: int = RRF_K,
+        rerank: Optional[Ranker] = None,
+        rerank_top_k: Optional[int] = None,
+    ):
+        """Create HybridRetriever.
+
+        Args:
+            index_store (IndexStoreBase): The vector store.
+            full_text_store (Optional[IndexStoreBase]): The full text store, e.g.
+                the elasticsearch document store. If None, use the full text search
+                of `index_store` if it supports.
+            top_k (int): The number of chunks to return.
+            candidate_top_k (Optional[int]): The number of chunks to search from
+                every store, `top_k * 2` if None.
+            fusion_strategy (Union[str, FusionStrategy]): `rrf` or `weighted`.
+            weights (Optional[List[float]]): The weights of the vector search and
+                the full text search.
+            rrf_k (int): The constant k of the reciprocal rank fusion.
+            rerank (Optional[Ranker]): The reranker, e.g. a cross-encoder, applied
+                to the fused candidates.
+            rerank_top_k (Optional[int]): The number of the fused candidates sent to
+                the reranker, `candidate_top_k` if None.
+        """
+        fusion_strategy = FusionStrategy(fusion_strategy)
+        if fusion_strategy == FusionStrategy.MAX_SCORE:
+            raise ValueError(
+                "The scores of the vector search and the full text search are not "
+                "comparable, please use the `rrf` or `weighted` fusion strategy"
+            )
+        if weights is not None and len(weights) != 2:
+            raise ValueError("weights must be the weights of the two searches")
+        self._index_store = index_store
+        self._full_text_store = full_text_store
+        if full_text_store is None and not _support_full_text_search(index_store):
+            logger.warning(
+                "The index store does not support full text search, the hybrid "
+                "retriever only uses the vector search"
+            )
+        self._top_k = top_k
+        self._candidate_top_k = candidate_top_k or top_k * 2
+        self._fusion_strategy = fusion_strategy
+        self._weights = weights
+        self._rrf_k = rrf_k
+        self._rerank = rerank
+        self._rerank_top_k = rerank_top_k or self._candidate_top_k
+
+    def _full_text_search(
+        self, query: str, filters: Optional[MetadataFilters] = None
+    ) -> List[Chunk]:
+        if self._full_text_store is None:
+            if not _support_full_text_search(self._index_store):
+                return []
+            return self._index_store.full_text_search(
+                query, self._candidate_top_k, filters
+            )
+        if isinstance(self._full_text_store, FullTextStoreBase):
+            # The BM25 scores are not in [0, 1], so never filtered by the threshold
+            return self._full_text_store.similar_search_with_scores(
+                query, self._candidate_top_k, 0.0, filters
+            )
+        return self._full_text_store.full_text_search(
+            query, self._candidate_top_k, filters
+        )
+
+    async def _afull_text_search(
+        self, query: str, filters: Optional[MetadataFilters] = None
+    ) -> List[Chunk]:
+        with root_tracer.start_span(
+            "dbgpt.rag.retriever.hybrid.full_text_search",
+            metadata={"query": query},
+        ):
+            if self._full_text_store is None:
+                if not _support_full_text_search(self._index_store):
+                    return []
+                return await self._index_store.afull_text_search(
+                    query, self._candidate_top_k, filters
+                )
+            if isinstance(self._full_text_store, FullTextStoreBase):
+                return await self._full_text_store.asimilar_search_with_scores(
+                    query, self._candidate_top_k, 0.0, filters
+                )
+            return await self._full_text_store.afull_text_search(
+                query, self._candidate_top_k, filters
+            )
+
+    async def _avector_search(
+        self,
+        query: str,
+        score_threshold: Optional[float] = None,
+        filters: Optional[MetadataFilters] = None,
+    ) -> List[Chunk]:
+        with root_tracer.start_span(
+            "dbgpt.rag.retriever.hybrid.vector_search",
+            metadata={"query": query, "score_threshold": score_threshold},
+        ):
+            if score_threshold is None:
+                return await self._index_store.asimilar_search(
+                    query, self._candidate_top_k, filters
+                )
+            return await self._index_store.asimilar_search_with_scores(
+                query, self._candidate_top_k, score_threshold, filters
+            )
+
+    def _fuse(
+        self, vector_candidates: List[Chunk], full_text_candidates: List[Chunk]
+    ) -> List[Chunk]:
+        candidates = fuse_candidates(
+            [vector_candidates, full_text_candidates],
+            self._fusion_strategy,
+            self._rrf_k,
+            self._weights,
+        )
+        return candidates[: self._rerank_top_k]
+
+    def _retrieve(
+        self, query: str, filters: Optional[MetadataFilters] = None
+    ) -> List[Chunk]:
+        """Retrieve knowledge chunks.
+
+        Args:
+            query (str): query text
+            filters: metadata filters.
+        Return:
+            List[Chunk]: list of chunks
+        """
+        vector_candidates = self._index_store.similar_search(
+            query, self._candidate_top_k, filters
+        )
+        full_text_candidates = self._full_text_search(query, filters)
+        candidates = self._fuse(vector_candidates, full_text_candidates)
+        if self._rerank:
+            candidates = self._rerank.rank(candidates, query)
+        return candidates[: self._top_k]
+
+    def _retrieve_with_score(
+        self,
+        query: str,
+        score_threshold: float,
+        filters: Optional[MetadataFilters] = None,
+    ) -> List[Chunk]:
+        """Retrieve knowledge chunks with score.
+
+        The score threshold only filters the vector search.
+
+        Args:
+            query (str): query text
+            score_threshold (float): score threshold
+            filters: metadata filters.
+        Return:
+            List[Chunk]: list of chunks with score
+        """
+        vector_candidates = self._index_store.similar_search_with_scores(
+            query, self._candidate_top_k, score_threshold, filters
+        )
+        full_text_candidates = self._full_text_search(query, filters)
+        candidates = self._fuse(vector_candidates, full_text_candidates)
+        if self._rerank:
+            candidates = self._rerank.rank(candidates, query)
+        return candidates[: self._top_k]
+
+    async def _aretrieve(
+        self, query: str, filters: Optional[MetadataFilters] = None
+    ) -> List[Chunk]:
+        """Retrieve knowledge chunks.
+
+        Args:
+            query (str): query text.
+            filters: metadata filters.
+        Return:
+            List[Chunk]: list of chunks
+        """
+        return await self._aretrieve_candidates(query, None, filters)
+
+    async def _aretrieve_with_score(
+        self,
+        query: str,
+        score_threshold: float,
+        filters: Optional[MetadataFilters] = None,
+    ) -> List[Chunk]:
+        """Retrieve knowledge chunks with score.
+
+        The score threshold only filters the vector search.
+
+        Args:
+            query (str): query text
+            score_threshold (float): score threshold
+            filters: metadata filters.
+        Return:
+            List[Chunk]: list of chunks with score
+        """
+        return await self._aretrieve_candidates(query, score_threshold, filters)
+
+    async def _aretrieve_candidates(
+        self,
+        query: str,
+        score_threshold: Optional[float] = None,
+        filters: Optional[MetadataFilters] = None,
+    ) -> List[Chunk]:
+        vector_candidates, full_text_candidates = await asyncio.gather(
+            self._avector_search(query, score_threshold, filters),
+            self._afull_text_search(query, filters),
+        )
+        candidates = self._fuse(vector_candidates, full_text_candidates)
+        if self._rerank:
+            with root_tracer.start_span(
+                "dbgpt.rag.retriever.hybrid.rerank",
+                metadata={
+                    "query": query,
+                    "candidates": len(candidates),
+                    "rerank_cls": self._rerank.__class__.__name__,
+                },
+            ):
+                candidates = await self._rerank.arank(candidates, query)
+        return candidates[: self._top_k]
+
+    @classmethod
+    def name(cls):
+        """Return retriever name."""
+        return "hybrid_retriever"
@@ -1,7 +1,8 @@
 """Rerank module for RAG retriever."""
 
 from abc import ABC, abstractmethod
-from typing import Callable, List, Optional
+from enum import Enum
+from typing import Callable, Dict, List, Optional, Union
 
 from dbgpt.core import Chunk, RerankEmbeddings
 from dbgpt.core.awel.flow import Parameter, ResourceCategory, register_resource
@@ -10,6 +11,83 @@ from dbgpt.util.i18n_utils import _
 
 RANK_FUNC = Callable[[List[Chunk]], List[Chunk]]
 
+# The constant k of the reciprocal rank fusion
+RRF_K = 60
+
+
+class FusionStrategy(str, Enum):
+    """The strategy to fuse the candidates of multiple queries."""
+
+    MAX_SCORE = "max_score"
+    RRF = "rrf"
+    WEIGHTED = "weighted"
+
+
+def _normalize_scores(candidates: List[Chunk]) -> List[float]:
+    """Min-max normalize the scores of a result list to [0, 1]."""
+    if not candidates:
+        return []
+    scores = [chunk.score for chunk in candidates]
+    low, high = min(scores), max(scores)
+    if high == low:
+        return [1.0] * len(scores)
+    return [(score - low) / (high - low) for score in scores]
+
+
+def fuse_candidates(
+    candidate_lists: List[List[Chunk]],
+    strategy: Union[str, FusionStrategy] = FusionStrategy.MAX_SCORE,
+    rrf_k: int = RRF_K,
+    weights: Optional[List[float]] = None,
+) -> List[Chunk]:
+    """Fuse the candidates of multiple queries, deduplicated by the chunk id.
+
+    Args:
+        candidate_lists (List[List[Chunk]]): The candidates of every query, ordered
+            by relevance.
+        strategy (Union[str, FusionStrategy]): `max_score` keeps the max similarity
+            score of the duplicate chunks, `rrf` replaces the score with the
+            reciprocal rank fusion score, sum(weight / (rrf_k + rank)), `weighted`
+            replaces the score with the weighted sum of the min-max normalized
+            scores, for the lists whose scores are not comparable, e.g. the cosine
+            similarity and the BM25 score.
+        rrf_k (int): The constant k of the reciprocal rank fusion.
+        weights (Optional[List[float]]): The weight of every list, used by `rrf`
+            and `weighted`, 1.0 for all the lists if None.
+
+    Returns:
+        List[Chunk]: The fused candidates, sorted by score in descending order.
+    """
+    strategy = FusionStrategy(strategy)
+    if weights is not None and len(weights) != len(candidate_lists):
+        raise ValueError(
+            f"Expect {len(candidate_lists)} weights, but got {len(weights)}"
+        )
+    fused: Dict[str, Chunk] = {}
+    scores: Dict[str, float] = {}
+    for i, candidates in enumerate(candidate_lists):
+        weight = weights[i] if weights is not None else 1.0
+        normalized = (
+            _normalize_scores(candidates) if strategy == FusionStrategy.WEIGHTED else []
+        )
+        for rank, chunk in enumerate(candidates, start=1):
+            chunk_id = chunk.chunk_id
+            if strategy == FusionStrategy.RRF:
+                score = scores.get(chunk_id, 0.0) + weight / (rrf_k + rank)
+            elif strategy == FusionStrategy.WEIGHTED:
+                score = scores.get(chunk_id, 0.0) + weight * normalized[rank - 1]
+            else:
+                score = max(scores.get(chunk_id, chunk.score), chunk.score)
+            if chunk_id not in fused or chunk.score > fused[chunk_id].score:
+                fused[chunk_id] = chunk
+            scores[chunk_id] = score
+    if len(candidate_lists) == 1 and strategy == FusionStrategy.MAX_SCORE:
+        # Nothing to fuse, keep the order of the index store
+        return list(fused.values())
+    for chunk_id, chunk in fused.items():
+        chunk.score = scores[chunk_id]
+    return sorted(fused.values(), key=lambda x: x.score, reverse=True)
+
 
 class Ranker(ABC):
     """Base Ranker."""
@@ -147,9 +225,22 @@ class RRFRanker(Ranker):
         self,
         topk: int = 4,
         rank_fn: Optional[RANK_FUNC] = None,
+        rrf_k: int = RRF_K,
+        weights: Optional[Dict[str, float]] = None,
     ):
-        """RRF rank algorithm implementation."""
+        """RRF rank algorithm implementation.
+
+        Args:
+            topk (int): The number of top k documents.
+            rank_fn (Optional[RANK_FUNC]): The rank function applied after the
+                fusion.
+            rrf_k (int): The constant k of the reciprocal rank fusion.
+            weights (Optional[Dict[str, float]]): The weight of every retriever,
+                keyed by the retriever name of the chunks, 1.0 if not found.
+        """
         super().__init__(topk, rank_fn)
+        self._rrf_k = rrf_k
+        self._weights = weights or {}
 
     def rank(
         self, candidates_with_scores: List[Chunk], query: Optional[str] = None
@@ -169,9 +260,24 @@ class RRFRanker(Ranker):
                 score += 1.0 / ( k + rank( result(q), d ) )
         return score
         reference:https://www.elastic.co/guide/en/elasticsearch/reference/current/rrf.html
+
+        The result sets are the candidates grouped by `Chunk.retriever`, ranked by
+        their own scores.
         """
-        # it will be implemented soon when multi recall is implemented
-        return candidates_with_scores
+        result_sets: Dict[str, List[Chunk]] = {}
+        for candidate in candidates_with_scores:
+            result_sets.setdefault(candidate.retriever or "", []).append(candidate)
+        candidate_lists = [
+            sorted(candidates, key=lambda x: x.score, reverse=True)
+            for candidates in result_sets.values()
+        ]
+        weights = [self._weights.get(name, 1.0) for name in result_sets]
+        new_candidates = fuse_candidates(
+            candidate_lists, FusionStrategy.RRF, self._rrf_k, weights
+        )
+        if self.rank_fn is not None:
+            new_candidates = self.rank_fn(new_candidates)
+        return new_candidates[: self.topk]
 
 
 @register_resource(
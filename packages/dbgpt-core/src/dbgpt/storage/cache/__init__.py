@@ -1,14 +1,20 @@
 """Module for cache storage."""
 
+from .embedding_cache import CachedEmbeddings, EmbeddingCacheMetrics  # noqa: F401
 from .llm_cache import LLMCacheClient, LLMCacheKey, LLMCacheValue  # noqa: F401
 from .manager import CacheManager, initialize_cache  # noqa: F401
+from .semantic_cache import SemanticCacheMetrics, SemanticLLMCache  # noqa: F401
 from .storage.base import MemoryCacheStorage  # noqa: F401
 
 __all__ = [
+    "CachedEmbeddings",
+    "EmbeddingCacheMetrics",
     "LLMCacheKey",
     "LLMCacheValue",
     "LLMCacheClient",
     "CacheManager",
     "initialize_cache",
+    "SemanticLLMCache",
+    "SemanticCacheMetrics",
     "MemoryCacheStorage",
 ]
@@ -1 +1,380 @@
-"""Embeddings cache."""
+"""Embeddings cache.
+
+Cache the embedding results by the hash of the text content, so the same chunks
+(re-synced documents) and the same queries are not embedded again.
+"""
+
+import hashlib
+import logging
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple, cast
+
+from dbgpt.core import Embeddings, Serializer
+from dbgpt.core.interface.cache import CacheKey, CacheValue
+from dbgpt.util.executor_utils import blocking_func_to_async_no_executor
+
+from .storage.base import CacheStorage, MemoryCacheStorage
+
+logger = logging.getLogger(__name__)
+
+_EMBED_TYPE_DOCUMENT = "document"
+_EMBED_TYPE_QUERY = "query"
+
+
+@dataclass
+class EmbeddingCacheKeyData:
+    """Cache key data for embeddings."""
+
+    model_name: str
+    text_hash: str
+    # Some models embed the query and the document in different ways
+    embed_type: str = _EMBED_TYPE_DOCUMENT
+
+
+class EmbeddingCacheKey(CacheKey[EmbeddingCacheKeyData]):
+    """Cache key for embeddings.
+
+    Only the hash of the text is kept in the key, the text itself is not stored.
+    """
+
+    def __init__(self, **kwargs) -> None:
+        """Create a new instance of EmbeddingCacheKey."""
+        super().__init__()
+        self.config = EmbeddingCacheKeyData(**kwargs)
+        self._hash_bytes = hashlib.sha256(
+            f"{self.config.model_name}\x00{self.config.embed_type}\x00"
+            f"{self.config.text_hash}".encode("utf-8")
+        ).digest()
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        """Return the content hash of the text."""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def __hash__(self) -> int:
+        """Return the hash value of the object."""
+        return int.from_bytes(self._hash_bytes, "big")
+
+    def __eq__(self, other: Any) -> bool:
+        """Check equality with another key."""
+        if not isinstance(other, EmbeddingCacheKey):
+            return False
+        return self.config == other.config
+
+    def get_hash_bytes(self) -> bytes:
+        """Return the byte array of hash value."""
+        return self._hash_bytes
+
+    def to_dict(self) -> Dict:
+        """Convert to dict."""
+        return asdict(self.config)
+
+    def get_value(self) -> EmbeddingCacheKeyData:
+        """Return the real object of current cache key."""
+        return self.config
+
+    def __str__(self) -> str:
+        """Return string representation."""
+        return f"EmbeddingCacheKey({self.config})"
+
+
+class EmbeddingCacheValue(CacheValue[List[float]]):
+    """Cache value for embeddings."""
+
+    def __init__(self, embedding: List[float], **kwargs) -> None:
+        """Create a new instance of EmbeddingCacheValue."""
+        super().__init__()
+        self.embedding = embedding
+
+    def to_dict(self) -> Dict:
+        """Convert to dict."""
+        return {"embedding": self.embedding}
+
+    def get_value(self) -> List[float]:
+        """Return the underlying real value."""
+        return self.embedding
+
+
+@dataclass
+class EmbeddingCacheMetrics:
+    """Hit/miss metrics of the embedding cache."""
+
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    # The number of texts sent to the embedding model
+    embedded_texts: int = 0
+    # The number of calls to the embedding model
+    model_calls: int = 0
+
+    @property
+    def hits(self) -> int:
+        """Return the total hits of all tiers."""
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        """Return the hit rate of the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dict."""
+        data = asdict(self)
+        data["hits"] = self.hits
+        data["hit_rate"] = self.hit_rate
+        return data
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper with a content-hash keyed cache.
+
+    The cache has two tiers, a memory tier and an optional persistent tier (e.g.
+    :class:`DiskCacheStorage`). Only the texts which are not in the cache are sent
+    to the wrapped embedding model, in one batch.
+
+    Examples:
+        .. code-block:: python
+
+            from dbgpt.storage.cache.embedding_cache import CachedEmbeddings
+
+            embeddings = CachedEmbeddings.from_config(
+                embeddings, model_name="bge-large-zh", persist_dir="embedding_cache"
+            )
+            vectors = embeddings.embed_documents(["hello", "world"])
+            print(embeddings.metrics.to_dict())
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model_name: Optional[str] = None,
+        memory_storage: Optional[CacheStorage] = None,
+        persist_storage: Optional[CacheStorage] = None,
+        serializer: Optional[Serializer] = None,
+        cache_query: bool = True,
+    ) -> None:
+        """Create a new CachedEmbeddings.
+
+        Args:
+            embeddings (Embeddings): The embedding model to wrap.
+            model_name (Optional[str]): The model name used as cache namespace, the
+                cached embeddings of different models never mix. Defaults to the
+                `model_name` attribute of the embedding model or its class name.
+            memory_storage (Optional[CacheStorage]): The memory tier, defaults to a
+                :class:`MemoryCacheStorage` of 256 MB.
+            persist_storage (Optional[CacheStorage]): The persistent tier.
+            serializer (Optional[Serializer]): The serializer of the cache keys and
+                values, defaults to :class:`JsonSerializer`.
+            cache_query (bool): Whether to cache the query embeddings.
+        """
+        if not serializer:
+            from dbgpt.util.serialization.json_serialization import JsonSerializer
+
+            serializer = JsonSerializer()
+        self._embeddings = embeddings
+        self._model_name = model_name or _default_model_name(embeddings)
+        self._memory_storage = memory_storage or MemoryCacheStorage()
+        self._persist_storage = persist_storage
+        self._serializer = serializer
+        self._cache_query = cache_query
+        self._metrics = EmbeddingCacheMetrics()
+        self._metrics_lock = threading.Lock()
+
+    @classmethod
+    def from_config(
+        cls,
+        embeddings: Embeddings,
+        model_name: Optional[str] = None,
+        max_memory_mb: int = 256,
+        persist_dir: Optional[str] = None,
+        cache_query: bool = True,
+    ) -> "CachedEmbeddings":
+        """Create a CachedEmbeddings with the default storages.
+
+        Args:
+            embeddings (Embeddings): The embedding model to wrap.
+            model_name (Optional[str]): The model name used as cache namespace.
+            max_memory_mb (int): The max memory of the memory tier in MB.
+            persist_dir (Optional[str]): The directory of the disk tier, if not
+                provided, only the memory tier is used.
+            cache_query (bool): Whether to cache the query embeddings.
+        """
+        persist_storage: Optional[CacheStorage] = None
+        if persist_dir:
+            try:
+                from .storage.disk.disk_storage import DiskCacheStorage
+
+                persist_storage = DiskCacheStorage(persist_dir)
+            except ImportError as e:
+                logger.warning(
+                    f"Can't import DiskCacheStorage, only use memory cache for "
+                    f"embeddings, import error message: {str(e)}"
+                )
+        return cls(
+            embeddings,
+            model_name=model_name,
+            memory_storage=MemoryCacheStorage(max_memory_mb=max_memory_mb),
+            persist_storage=persist_storage,
+            cache_query=cache_query,
+        )
+
+    @property
+    def embeddings(self) -> Embeddings:
+        """Return the wrapped embedding model."""
+        return self._embeddings
+
+    @property
+    def metrics(self) -> EmbeddingCacheMetrics:
+        """Return the hit/miss metrics of the cache."""
+        return self._metrics
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed search docs, only the uncached texts are sent to the model."""
+        results, keys, miss_texts = self._lookup(texts, _EMBED_TYPE_DOCUMENT)
+        if miss_texts:
+            miss_embeddings = self._embeddings.embed_documents(miss_texts)
+            self._fill(results, keys, texts, miss_texts, miss_embeddings)
+        return cast(List[List[float]], results)
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed query text."""
+        if not self._cache_query:
+            return self._embeddings.embed_query(text)
+        results, keys, miss_texts = self._lookup([text], _EMBED_TYPE_QUERY)
+        if miss_texts:
+            embedding = self._embeddings.embed_query(text)
+            self._fill(results, keys, [text], miss_texts, [embedding])
+        return cast(List[float], results[0])
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Asynchronous embed search docs, only the uncached texts are embedded."""
+        results, keys, miss_texts = await blocking_func_to_async_no_executor(
+            self._lookup, texts, _EMBED_TYPE_DOCUMENT
+        )
+        if miss_texts:
+            miss_embeddings = await self._embeddings.aembed_documents(miss_texts)
+            await blocking_func_to_async_no_executor(
+                self._fill, results, keys, texts, miss_texts, miss_embeddings
+            )
+        return cast(List[List[float]], results)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """Asynchronous embed query text."""
+        if not self._cache_query:
+            return await self._embeddings.aembed_query(text)
+        results, keys, miss_texts = await blocking_func_to_async_no_executor(
+            self._lookup, [text], _EMBED_TYPE_QUERY
+        )
+        if miss_texts:
+            embedding = await self._embeddings.aembed_query(text)
+            await blocking_func_to_async_no_executor(
+                self._fill, results, keys, [text], miss_texts, [embedding]
+            )
+        return cast(List[float], results[0])
+
+    def _new_key(self, text: str, embed_type: str) -> EmbeddingCacheKey:
+        key = EmbeddingCacheKey(
+            model_name=self._model_name,
+            text_hash=EmbeddingCacheKey.hash_text(text),
+            embed_type=embed_type,
+        )
+        key.set_serializer(self._serializer)
+        return key
+
+    def _get(self, key: EmbeddingCacheKey) -> Tuple[Optional[List[float]], bool]:
+        """Get the embedding and whether it is read from the persistent tier."""
+        item = self._memory_storage.get(key)
+        from_persist = False
+        if not item and self._persist_storage:
+            item = self._persist_storage.get(key)
+            from_persist = item is not None
+        if not item:
+            return None, False
+        if isinstance(item.value, EmbeddingCacheValue):
+            value = item.value
+        else:
+            value = cast(
+                EmbeddingCacheValue,
+                self._serializer.deserialize(item.value_data, EmbeddingCacheValue),
+            )
+        if from_persist:
+            # Promote the hot item to the memory tier
+            self._memory_storage.set(key, value)
+        return value.get_value(), from_persist
+
+    def _set(self, key: EmbeddingCacheKey, embedding: List[float]) -> None:
+        value = EmbeddingCacheValue(embedding=embedding)
+        value.set_serializer(self._serializer)
+        self._memory_storage.set(key, value)
+        if self._persist_storage:
+            self._persist_storage.set(key, value)
+
+    def _lookup(
+        self, texts: List[str], embed_type: str
+    ) -> Tuple[List[Optional[List[float]]], List[EmbeddingCacheKey], List[str]]:
+        """Look up the texts in the cache.
+
+        Returns:
+            Tuple: The results(None for the missed texts), the cache keys and the
+                deduplicated missed texts.
+        """
+        results: List[Optional[List[float]]] = []
+        keys: List[EmbeddingCacheKey] = []
+        miss_texts: List[str] = []
+        seen_miss = set()
+        memory_hits, disk_hits = 0, 0
+        for text in texts:
+            key = self._new_key(text, embed_type)
+            embedding, from_persist = self._get(key)
+            keys.append(key)
+            results.append(embedding)
+            if embedding is None:
+                if text not in seen_miss:
+                    seen_miss.add(text)
+                    miss_texts.append(text)
+            elif from_persist:
+                disk_hits += 1
+            else:
+                memory_hits += 1
+        with self._metrics_lock:
+            self._metrics.memory_hits += memory_hits
+            self._metrics.disk_hits += disk_hits
+            self._metrics.misses += len(texts) - memory_hits - disk_hits
+            if miss_texts:
+                self._metrics.model_calls += 1
+                self._metrics.embedded_texts += len(miss_texts)
+        return results, keys, miss_texts
+
+    def _fill(
+        self,
+        results: List[Optional[List[float]]],
+        keys: List[EmbeddingCacheKey],
+        texts: List[str],
+        miss_texts: List[str],
+        miss_embeddings: List[List[float]],
+    ) -> None:
+        """Save the new embeddings to the cache and fill them into the results."""
+        if len(miss_texts) != len(miss_embeddings):
+            raise ValueError(
+                f"The embedding model returned {len(miss_embeddings)} embeddings "
+                f"for {len(miss_texts)} texts"
+            )
+        text_to_embedding = dict(zip(miss_texts, miss_embeddings))
+        saved = set()
+        for i, text in enumerate(texts):
+            if results[i] is not None:
+                continue
+            embedding = text_to_embedding[text]
+            results[i] = embedding
+            if text not in saved:
+                saved.add(text)
+                self._set(keys[i], embedding)
+
+
+def _default_model_name(embeddings: Embeddings) -> str:
+    model_name = getattr(embeddings, "model_name", None)
+    if isinstance(model_name, str) and model_name:
+        return model_name
+    return f"{type(embeddings).__module__}.{type(embeddings).__qualname__}"
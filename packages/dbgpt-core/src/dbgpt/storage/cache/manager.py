@@ -4,10 +4,17 @@ import logging
 from abc import ABC, abstractmethod
 from concurrent.futures import Executor
 from dataclasses import dataclass, field
-from typing import Optional, Type, cast
+from typing import TYPE_CHECKING, Optional, Type, cast
 
 from dbgpt.component import BaseComponent, ComponentType, SystemApp
-from dbgpt.core import CacheConfig, CacheKey, CacheValue, Serializable, Serializer
+from dbgpt.core import (
+    CacheConfig,
+    CacheKey,
+    CachePolicy,
+    CacheValue,
+    Serializable,
+    Serializer,
+)
 from dbgpt.core.interface.cache import K, V
 from dbgpt.util.executor_utils import ExecutorFactory, blocking_func_to_async
 from dbgpt.util.i18n_utils import _
@@ -15,6 +22,9 @@ from dbgpt.util.parameter_utils import BaseParameters
 
 from .storage.base import CacheStorage
 
+if TYPE_CHECKING:
+    from .semantic_cache import SemanticLLMCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -33,7 +43,10 @@ class ModelCacheParameters(BaseParameters):
     storage_type: str = field(
         default="memory",
         metadata={
-            "help": _("The storage type, default is memory"),
+            "help": _(
+                "The storage type, memory, disk or tiered(the memory storage spills "
+                "the evicted items to the disk storage), default is memory"
+            ),
         },
     )
     max_memory_mb: int = field(
@@ -42,12 +55,61 @@ class ModelCacheParameters(BaseParameters):
             "help": _("The max memory in MB, default is 256"),
         },
     )
+    cache_policy: str = field(
+        default="lru",
+        metadata={
+            "help": _("The eviction policy of the memory storage, default is lru"),
+            "valid_values": ["lru", "lfu", "fifo"],
+        },
+    )
+    ttl_seconds: Optional[int] = field(
+        default=None,
+        metadata={
+            "help": _(
+                "The seconds to keep an item in the memory storage, default is forever"
+            ),
+        },
+    )
     persist_dir: str = field(
         default="model_cache",
         metadata={
             "help": _("The persist directory, default is model_cache"),
         },
     )
+    enable_semantic_cache: bool = field(
+        default=False,
+        metadata={
+            "help": _(
+                "Whether to reuse the cached model outputs of the similar prompts, "
+                "the prompts are embedded by the default embedding model, default "
+                "is False"
+            ),
+        },
+    )
+    semantic_cache_threshold: float = field(
+        default=0.95,
+        metadata={
+            "help": _(
+                "The min cosine similarity of the prompts to reuse a cached model "
+                "output, default is 0.95"
+            ),
+        },
+    )
+    semantic_cache_max_entries: int = field(
+        default=10000,
+        metadata={
+            "help": _("The max prompts kept in the semantic cache, default is 10000"),
+        },
+    )
+    enable_embedding_cache: bool = field(
+        default=False,
+        metadata={
+            "help": _(
+                "Whether to cache the embeddings of the default embedding model by "
+                "the text content, default is False"
+            ),
+        },
+    )
 
 
 class CacheManager(BaseComponent, ABC):
@@ -86,17 +148,27 @@ class CacheManager(BaseComponent, ABC):
     def serializer(self) -> Serializer:
         """Return serializer to serialize/deserialize cache value."""
 
+    @property
+    def semantic_cache(self) -> Optional["SemanticLLMCache"]:
+        """Return the semantic cache of the LLM outputs, None if not enabled."""
+        return None
+
 
 class LocalCacheManager(CacheManager):
     """Local cache manager."""
 
     def __init__(
-        self, system_app: SystemApp, serializer: Serializer, storage: CacheStorage
+        self,
+        system_app: SystemApp,
+        serializer: Serializer,
+        storage: CacheStorage,
+        semantic_cache: Optional["SemanticLLMCache"] = None,
     ) -> None:
         """Create local cache manager."""
         super().__init__(system_app)
         self._serializer = serializer
         self._storage = storage
+        self._semantic_cache = semantic_cache
 
     @property
     def executor(self) -> Executor:
@@ -134,6 +206,9 @@ class LocalCacheManager(CacheManager):
             )
         if not item_bytes:
             return None
+        if isinstance(item_bytes.value, cls):
+            # The memory hit, no need to deserialize
+            return cast(CacheValue[V], item_bytes.value)
         return cast(
             CacheValue[V], self._serializer.deserialize(item_bytes.value_data, cls)
         )
@@ -143,37 +218,89 @@ class LocalCacheManager(CacheManager):
         """Return serializer to serialize/deserialize cache value."""
         return self._serializer
 
+    @property
+    def semantic_cache(self) -> Optional["SemanticLLMCache"]:
+        """Return the semantic cache of the LLM outputs, None if not enabled."""
+        return self._semantic_cache
+
 
 def initialize_cache(
-    system_app: SystemApp, storage_type: str, max_memory_mb: int, persist_dir: str
+    system_app: SystemApp,
+    storage_type: str,
+    max_memory_mb: int,
+    persist_dir: str,
+    cache_policy: str = "lru",
+    ttl_seconds: Optional[int] = None,
+    enable_semantic_cache: bool = False,
+    semantic_cache_threshold: float = 0.95,
+    semantic_cache_max_entries: int = 10000,
 ):
     """Initialize cache manager.
 
     Args:
         system_app (SystemApp): The system app.
-        storage_type (str): The storage type.
+        storage_type (str): The storage type, memory, disk or tiered.
         max_memory_mb (int): The max memory in MB.
         persist_dir (str): The persist directory.
+        cache_policy (str): The eviction policy of the memory storage.
+        ttl_seconds (Optional[int]): The seconds to keep an item in the memory
+            storage.
+        enable_semantic_cache (bool): Whether to enable the semantic cache, the
+            prompts are embedded by the default embedding model.
+        semantic_cache_threshold (float): The min similarity of the semantic cache.
+        semantic_cache_max_entries (int): The max entries of the semantic cache.
     """
     from dbgpt.util.serialization.json_serialization import JsonSerializer
 
+    from .semantic_cache import SemanticLLMCache
     from .storage.base import MemoryCacheStorage
 
-    if storage_type == "disk":
+    def _memory_storage(spill_storage: Optional[CacheStorage] = None):
+        return MemoryCacheStorage(
+            max_memory_mb=max_memory_mb,
+            cache_policy=CachePolicy(cache_policy or "lru"),
+            default_ttl=ttl_seconds,
+            spill_storage=spill_storage,
+        )
+
+    if storage_type in ("disk", "tiered"):
         try:
             from .storage.disk.disk_storage import DiskCacheStorage
 
-            cache_storage: CacheStorage = DiskCacheStorage(
+            disk_storage = DiskCacheStorage(
                 persist_dir, mem_table_buffer_mb=max_memory_mb
             )
+            if storage_type == "tiered":
+                cache_storage: CacheStorage = _memory_storage(disk_storage)
+            else:
+                cache_storage = disk_storage
         except ImportError as e:
             logger.warn(
                 f"Can't import DiskCacheStorage, use MemoryCacheStorage, import error "
                 f"message: {str(e)}"
             )
-            cache_storage = MemoryCacheStorage(max_memory_mb=max_memory_mb)
+            cache_storage = _memory_storage()
     else:
-        cache_storage = MemoryCacheStorage(max_memory_mb=max_memory_mb)
+        cache_storage = _memory_storage()
+    semantic_cache: Optional[SemanticLLMCache] = None
+    if enable_semantic_cache:
+
+        def _default_embeddings():
+            from dbgpt.rag.embedding.embedding_factory import EmbeddingFactory
+
+            return system_app.get_component(
+                "embedding_factory", EmbeddingFactory
+            ).create()
+
+        semantic_cache = SemanticLLMCache(
+            _default_embeddings,
+            similarity_threshold=semantic_cache_threshold,
+            max_entries=semantic_cache_max_entries,
+            ttl=ttl_seconds,
+        )
     system_app.register(
-        LocalCacheManager, serializer=JsonSerializer(), storage=cache_storage
+        LocalCacheManager,
+        serializer=JsonSerializer(),
+        storage=cache_storage,
+        semantic_cache=semantic_cache,
     )
@@ -1,5 +1,6 @@
 """Operators for processing model outputs with caching support."""
 
+import asyncio
 import logging
 from typing import AsyncIterator, Dict, List, Optional, Union, cast
 
@@ -15,11 +16,15 @@ from dbgpt.core.awel import (
 
 from .llm_cache import LLMCacheClient, LLMCacheKey, LLMCacheValue
 from .manager import CacheManager
+from .semantic_cache import SemanticCacheEntry, SemanticLLMCache
 
 logger = logging.getLogger(__name__)
 
 _LLM_MODEL_INPUT_VALUE_KEY = "llm_model_input_value"
 _LLM_MODEL_OUTPUT_CACHE_KEY = "llm_model_output_cache"
+# The cache key of the hit, differs from the input key for a semantic hit
+_LLM_MODEL_CACHE_HIT_KEY = "llm_model_cache_hit_key"
+_LLM_MODEL_SEMANTIC_ENTRY_KEY = "llm_model_semantic_entry"
 
 
 class CachedModelStreamOperator(StreamifyAbsOperator[ModelRequest, ModelOutput]):
@@ -49,13 +54,15 @@ class CachedModelStreamOperator(StreamifyAbsOperator[ModelRequest, ModelOutput])
         Returns:
             AsyncIterator[ModelOutput]: An asynchronous iterator of model outputs.
         """
-        cache_dict = _parse_cache_key_dict(input_value)
-        llm_cache_key: LLMCacheKey = self._client.new_key(**cache_dict)
+        llm_cache_key = await _get_cache_hit_key(self, self._client, input_value)
         llm_cache_value = await self._client.get(llm_cache_key)
         logger.info(f"llm_cache_value: {llm_cache_value}")
         if not llm_cache_value:
             raise ValueError(f"Cache value not found for key: {llm_cache_key}")
-        outputs = cast(List[ModelOutput], llm_cache_value.get_value().output)
+        outputs = llm_cache_value.get_value().output
+        if not isinstance(outputs, list):
+            # Saved by the non-streaming operator
+            outputs = [outputs]
         for out in outputs:
             yield cast(ModelOutput, out)
 
@@ -86,13 +93,16 @@ class CachedModelOperator(MapOperator[ModelRequest, ModelOutput]):
         Returns:
             ModelOutput: The output from the model.
         """
-        cache_dict = _parse_cache_key_dict(input_value)
-        llm_cache_key: LLMCacheKey = self._client.new_key(**cache_dict)
+        llm_cache_key = await _get_cache_hit_key(self, self._client, input_value)
         llm_cache_value = await self._client.get(llm_cache_key)
         if not llm_cache_value:
             raise ValueError(f"Cache value not found for key: {llm_cache_key}")
         logger.info(f"llm_cache_value: {llm_cache_value}")
-        return cast(ModelOutput, llm_cache_value.get_value().output)
+        output = llm_cache_value.get_value().output
+        if isinstance(output, list):
+            # Saved by the stream operator, the last output is the full output
+            return output[-1]
+        return cast(ModelOutput, output)
 
 
 class ModelCacheBranchOperator(BranchOperator[ModelRequest, Dict]):
@@ -101,10 +111,14 @@ class ModelCacheBranchOperator(BranchOperator[ModelRequest, Dict]):
     A branch operator that decides whether to use cached data or to process data using
     the model.
 
+    The exact cache is checked first, then the semantic cache if enabled.
+
     Args:
         cache_manager (CacheManager): The cache manager for managing cache operations.
         model_task_name (str): The name of the task to process data using the model.
         cache_task_name (str): The name of the task to process data using the cache.
+        semantic_cache (Optional[SemanticLLMCache]): The semantic cache, defaults to
+            the semantic cache of the cache manager.
         **kwargs: Additional keyword arguments.
     """
 
@@ -113,6 +127,7 @@ class ModelCacheBranchOperator(BranchOperator[ModelRequest, Dict]):
         cache_manager: CacheManager,
         model_task_name: str,
         cache_task_name: str,
+        semantic_cache: Optional[SemanticLLMCache] = None,
         **kwargs,
     ):
         """Create a new instance of ModelCacheBranchOperator."""
@@ -121,6 +136,11 @@ class ModelCacheBranchOperator(BranchOperator[ModelRequest, Dict]):
         self._client = LLMCacheClient(cache_manager)
         self._model_task_name = model_task_name
         self._cache_task_name = cache_task_name
+        self._semantic_cache = (
+            semantic_cache
+            if semantic_cache is not None
+            else cache_manager.semantic_cache
+        )
 
     async def branches(
         self,
@@ -133,22 +153,14 @@ class ModelCacheBranchOperator(BranchOperator[ModelRequest, Dict]):
             Dict[BranchFunc[Dict], Union[BaseOperator, str]]: A dictionary mapping
                 branch functions to task names.
         """
+        # Both branch functions share one check
+        check_task: Optional[asyncio.Task] = None
 
         async def check_cache_true(input_value: ModelRequest) -> bool:
-            # Check if the cache contains the result for the given input
-            if input_value.context and not input_value.context.cache_enable:
-                return False
-            cache_dict = _parse_cache_key_dict(input_value)
-            cache_key: LLMCacheKey = self._client.new_key(**cache_dict)
-            cache_value = await self._client.get(cache_key)
-            logger.debug(
-                f"cache_key: {cache_key}, hash key: {hash(cache_key)}, cache_value: "
-                f"{cache_value}"
-            )
-            await self.current_dag_context.save_to_share_data(
-                _LLM_MODEL_INPUT_VALUE_KEY, cache_key, overwrite=True
-            )
-            return bool(cache_value)
+            nonlocal check_task
+            if check_task is None:
+                check_task = asyncio.create_task(self._check_cache(input_value))
+            return await asyncio.shield(check_task)
 
         async def check_cache_false(input_value: ModelRequest):
             # Inverse of check_cache_true
@@ -159,6 +171,59 @@ class ModelCacheBranchOperator(BranchOperator[ModelRequest, Dict]):
             check_cache_false: self._model_task_name,
         }
 
+    async def _check_cache(self, input_value: ModelRequest) -> bool:
+        # Check if the cache contains the result for the given input
+        if input_value.context and not input_value.context.cache_enable:
+            return False
+        cache_dict = _parse_cache_key_dict(input_value)
+        cache_key: LLMCacheKey = self._client.new_key(**cache_dict)
+        cache_value = await self._client.get(cache_key)
+        logger.debug(
+            f"cache_key: {cache_key}, hash key: {hash(cache_key)}, cache_value: "
+            f"{cache_value}"
+        )
+        dag_ctx = self.current_dag_context
+        await dag_ctx.save_to_share_data(
+            _LLM_MODEL_INPUT_VALUE_KEY, cache_key, overwrite=True
+        )
+        semantic_cache = self._semantic_cache
+        if cache_value:
+            await dag_ctx.save_to_share_data(
+                _LLM_MODEL_CACHE_HIT_KEY, cache_key, overwrite=True
+            )
+            if semantic_cache is not None:
+                semantic_cache.record_exact_hit()
+            return True
+        if semantic_cache is None:
+            return False
+
+        try:
+            entry = await semantic_cache.aprepare(input_value)
+        except Exception as e:
+            logger.warning(f"Embed the request for semantic cache failed: {e}")
+            entry = None
+        if not entry:
+            semantic_cache.record_miss()
+            return False
+        # The new output is indexed by the save operators
+        await dag_ctx.save_to_share_data(
+            _LLM_MODEL_SEMANTIC_ENTRY_KEY, entry, overwrite=True
+        )
+        hit_key = semantic_cache.lookup(entry)
+        if hit_key is None:
+            semantic_cache.record_miss()
+            return False
+        if not await self._client.get(hit_key):
+            # The output is evicted from the cache
+            semantic_cache.remove(hit_key)
+            semantic_cache.record_miss(stale=True)
+            return False
+        await dag_ctx.save_to_share_data(
+            _LLM_MODEL_CACHE_HIT_KEY, hit_key, overwrite=True
+        )
+        semantic_cache.record_semantic_hit()
+        return True
+
 
 class ModelStreamSaveCacheOperator(
     TransformStreamAbsOperator[ModelOutput, ModelOutput]
@@ -170,10 +235,20 @@ class ModelStreamSaveCacheOperator(
         **kwargs: Additional keyword arguments.
     """
 
-    def __init__(self, cache_manager: CacheManager, **kwargs):
+    def __init__(
+        self,
+        cache_manager: CacheManager,
+        semantic_cache: Optional[SemanticLLMCache] = None,
+        **kwargs,
+    ):
         """Create a new instance of ModelStreamSaveCacheOperator."""
         self._cache_manager = cache_manager
         self._client = LLMCacheClient(cache_manager)
+        self._semantic_cache = (
+            semantic_cache
+            if semantic_cache is not None
+            else cache_manager.semantic_cache
+        )
         super().__init__(**kwargs)
 
     async def transform_stream(self, input_value: AsyncIterator[ModelOutput]):
@@ -201,6 +276,7 @@ class ModelStreamSaveCacheOperator(
         if llm_cache_key and _is_success_model_output(outputs):
             llm_cache_value: LLMCacheValue = self._client.new_value(output=outputs)
             await self._client.set(llm_cache_key, llm_cache_value)
+            await _index_semantic_entry(self, self._semantic_cache, llm_cache_key)
 
 
 class ModelSaveCacheOperator(MapOperator[ModelOutput, ModelOutput]):
@@ -211,10 +287,20 @@ class ModelSaveCacheOperator(MapOperator[ModelOutput, ModelOutput]):
         **kwargs: Additional keyword arguments.
     """
 
-    def __init__(self, cache_manager: CacheManager, **kwargs):
+    def __init__(
+        self,
+        cache_manager: CacheManager,
+        semantic_cache: Optional[SemanticLLMCache] = None,
+        **kwargs,
+    ):
         """Create a new instance of ModelSaveCacheOperator."""
         self._cache_manager = cache_manager
         self._client = LLMCacheClient(cache_manager)
+        self._semantic_cache = (
+            semantic_cache
+            if semantic_cache is not None
+            else cache_manager.semantic_cache
+        )
         super().__init__(**kwargs)
 
     async def map(self, input_value: ModelOutput) -> ModelOutput:
@@ -232,9 +318,38 @@ class ModelSaveCacheOperator(MapOperator[ModelOutput, ModelOutput]):
         llm_cache_value: LLMCacheValue = self._client.new_value(output=input_value)
         if llm_cache_key and _is_success_model_output(input_value):
             await self._client.set(llm_cache_key, llm_cache_value)
+            await _index_semantic_entry(self, self._semantic_cache, llm_cache_key)
         return input_value
 
 
+async def _get_cache_hit_key(
+    operator: BaseOperator, client: LLMCacheClient, input_value: ModelRequest
+) -> LLMCacheKey:
+    """Return the cache key of the hit decided by the branch operator."""
+    hit_key = await operator.current_dag_context.get_from_share_data(
+        _LLM_MODEL_CACHE_HIT_KEY
+    )
+    if hit_key:
+        return hit_key
+    return client.new_key(**_parse_cache_key_dict(input_value))
+
+
+async def _index_semantic_entry(
+    operator: BaseOperator,
+    semantic_cache: Optional[SemanticLLMCache],
+    llm_cache_key: LLMCacheKey,
+) -> None:
+    if semantic_cache is None:
+        return
+    entry: Optional[
+        SemanticCacheEntry
+    ] = await operator.current_dag_context.get_from_share_data(
+        _LLM_MODEL_SEMANTIC_ENTRY_KEY
+    )
+    if entry:
+        semantic_cache.add(entry, llm_cache_key)
+
+
 def _parse_cache_key_dict(input_value: ModelRequest) -> Dict:
     """Parse and extract relevant fields from input to form a cache key dictionary.
 
@@ -0,0 +1,280 @@
+"""Semantic cache for LLM.
+
+The exact LLM cache misses the prompts with the same meaning but different words,
+e.g. "what were sales last month?" and "show me last month's sales". The semantic
+cache embeds the last user message of a request and looks up the nearest previous
+messages with the same model parameters and the same conversation context, the
+cache key of the most similar one is reused if the similarity is above the
+threshold.
+
+Only the embeddings and the cache keys are kept in the semantic cache, the model
+outputs are still stored by the cache manager.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import numpy as np
+
+from dbgpt.core import Embeddings, ModelMessageRoleType, ModelRequest
+
+from .llm_cache import LLMCacheKey
+
+logger = logging.getLogger(__name__)
+
+EmbeddingsGetter = Callable[[], Embeddings]
+
+
+@dataclass
+class SemanticCacheMetrics:
+    """Hit/miss metrics of the LLM cache with the semantic tier."""
+
+    exact_hits: int = 0
+    semantic_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    # The cached keys whose outputs were evicted by the cache manager
+    stale_entries: int = 0
+
+    @property
+    def hits(self) -> int:
+        """Return the total hits of all tiers."""
+        return self.exact_hits + self.semantic_hits
+
+    @property
+    def hit_rate(self) -> float:
+        """Return the hit rate of the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dict."""
+        data = asdict(self)
+        data["hits"] = self.hits
+        data["hit_rate"] = self.hit_rate
+        return data
+
+
+@dataclass
+class SemanticCacheEntry:
+    """The embedded request, a lookup entry and an index entry of the cache."""
+
+    scope: str
+    text: str
+    embedding: np.ndarray = field(repr=False)
+    cache_key: Optional[LLMCacheKey] = field(default=None, repr=False)
+    expire_at: Optional[float] = None
+
+
+class _ScopeIndex:
+    """The vectors of the entries of a scope, scanned by brute-force.
+
+    The vectors are rows of a preallocated matrix which grows geometrically, a
+    removed row is filled with the last row, so adding and removing an entry never
+    copy the whole matrix.
+    """
+
+    _INITIAL_CAPACITY = 16
+
+    def __init__(self) -> None:
+        self.entries: Dict[bytes, SemanticCacheEntry] = {}
+        # The entry id of every row and the row of every entry id
+        self._ids: List[bytes] = []
+        self._rows: Dict[bytes, int] = {}
+        self._matrix: Optional[np.ndarray] = None
+
+    def add(self, entry_id: bytes, entry: SemanticCacheEntry) -> None:
+        self.entries[entry_id] = entry
+        row = self._rows.get(entry_id)
+        if row is None:
+            row = len(self._ids)
+            self._reserve(row + 1, entry.embedding)
+            self._ids.append(entry_id)
+            self._rows[entry_id] = row
+        self._matrix[row] = entry.embedding  # type: ignore
+
+    def _reserve(self, size: int, embedding: np.ndarray) -> None:
+        if self._matrix is not None and size <= len(self._matrix):
+            return
+        capacity = self._INITIAL_CAPACITY
+        if self._matrix is not None:
+            capacity = max(capacity, len(self._matrix) * 2)
+        matrix = np.empty((capacity, embedding.shape[0]), dtype=embedding.dtype)
+        if self._matrix is not None:
+            matrix[: len(self._ids)] = self._matrix[: len(self._ids)]
+        self._matrix = matrix
+
+    def remove(self, entry_id: bytes) -> None:
+        if self.entries.pop(entry_id, None) is None:
+            return
+        row = self._rows.pop(entry_id)
+        last_id = self._ids.pop()
+        if last_id != entry_id:
+            self._ids[row] = last_id
+            self._rows[last_id] = row
+            self._matrix[row] = self._matrix[len(self._ids)]  # type: ignore
+
+    def nearest(self, embedding: np.ndarray) -> Optional[tuple]:
+        if not self._ids:
+            return None
+        scores = self._matrix[: len(self._ids)] @ embedding  # type: ignore
+        best = int(np.argmax(scores))
+        return self._ids[best], float(scores[best])
+
+
+def normalize_prompt(text: str) -> str:
+    """Normalize the prompt before embedding it, case and spaces are ignored."""
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+class SemanticLLMCache:
+    """Semantic cache for LLM.
+
+    The scope of an entry is the hash of the model name, the temperature, the max
+    new tokens and all the messages before the last user message(the system
+    prompt and the history), the entries of different scopes never match.
+
+    The entries are evicted by LRU when the count reaches `max_entries`, or expired
+    after `ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        embeddings: Union[Embeddings, EmbeddingsGetter],
+        similarity_threshold: float = 0.95,
+        max_entries: int = 10000,
+        ttl: Optional[float] = None,
+    ) -> None:
+        """Create a new SemanticLLMCache.
+
+        Args:
+            embeddings (Union[Embeddings, EmbeddingsGetter]): The embedding model,
+                or a function to get it lazily.
+            similarity_threshold (float): The min cosine similarity to reuse a
+                cached output.
+            max_entries (int): The max entries of all the scopes.
+            ttl (Optional[float]): The seconds to keep an entry, forever if None.
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be greater than 0")
+        self._embeddings = embeddings
+        self._similarity_threshold = similarity_threshold
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        # The LRU order of all the entries, map the entry id to the scope
+        self._lru: "OrderedDict[bytes, str]" = OrderedDict()
+        self._scopes: Dict[str, _ScopeIndex] = {}
+        self._metrics = SemanticCacheMetrics()
+
+    @property
+    def metrics(self) -> SemanticCacheMetrics:
+        """Return the hit/miss metrics of the cache."""
+        return self._metrics
+
+    def __len__(self) -> int:
+        """Return the entries of the cache."""
+        return len(self._lru)
+
+    def _get_embeddings(self) -> Embeddings:
+        if not isinstance(self._embeddings, Embeddings):
+            self._embeddings = self._embeddings()
+        return self._embeddings
+
+    async def aprepare(self, request: ModelRequest) -> Optional[SemanticCacheEntry]:
+        """Embed the request, return None if the request has no user message."""
+        messages = request.get_messages()
+        last_human = None
+        for i in range(len(messages) - 1, -1, -1):
+            if messages[i].role == ModelMessageRoleType.HUMAN:
+                last_human = i
+                break
+        if last_human is None:
+            return None
+        text = normalize_prompt(messages[last_human].content)
+        if not text:
+            return None
+        context = "\n".join(
+            f"{m.role}:{m.content}" for i, m in enumerate(messages) if i != last_human
+        )
+        scope = hashlib.sha256(
+            f"{request.model}\x00{request.temperature}\x00{request.max_new_tokens}"
+            f"\x00{context}".encode("utf-8")
+        ).hexdigest()
+        vector = np.asarray(
+            await self._get_embeddings().aembed_query(text), dtype=np.float32
+        )
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector = vector / norm
+        return SemanticCacheEntry(scope=scope, text=text, embedding=vector)
+
+    def lookup(self, entry: SemanticCacheEntry) -> Optional[LLMCacheKey]:
+        """Return the cache key of the most similar entry above the threshold."""
+        with self._lock:
+            index = self._scopes.get(entry.scope)
+            nearest = index.nearest(entry.embedding) if index else None
+            if not nearest or nearest[1] < self._similarity_threshold:
+                return None
+            entry_id = nearest[0]
+            matched = index.entries[entry_id]  # type: ignore
+            if matched.expire_at is not None and matched.expire_at <= time.time():
+                self._remove(entry_id)
+                return None
+            self._lru.move_to_end(entry_id)
+            logger.debug(
+                f"Semantic cache hit, similarity: {nearest[1]:.4f}, query: "
+                f"{entry.text!r}, cached query: {matched.text!r}"
+            )
+            return matched.cache_key
+
+    def add(self, entry: SemanticCacheEntry, cache_key: LLMCacheKey) -> None:
+        """Add the entry of a cached model output."""
+        entry_id = cache_key.get_hash_bytes()
+        entry.cache_key = cache_key
+        if self._ttl is not None:
+            entry.expire_at = time.time() + self._ttl
+        with self._lock:
+            self._remove(entry_id)
+            self._scopes.setdefault(entry.scope, _ScopeIndex()).add(entry_id, entry)
+            self._lru[entry_id] = entry.scope
+            while len(self._lru) > self._max_entries:
+                self._remove(next(iter(self._lru)))
+                self._metrics.evictions += 1
+
+    def remove(self, cache_key: LLMCacheKey) -> None:
+        """Remove the entry of the cache key, e.g. its output is evicted."""
+        with self._lock:
+            self._remove(cache_key.get_hash_bytes())
+
+    def _remove(self, entry_id: bytes) -> None:
+        scope = self._lru.pop(entry_id, None)
+        if scope is None:
+            return
+        index = self._scopes[scope]
+        index.remove(entry_id)
+        if not index.entries:
+            del self._scopes[scope]
+
+    def record_exact_hit(self) -> None:
+        """Record a hit of the exact cache."""
+        with self._lock:
+            self._metrics.exact_hits += 1
+
+    def record_semantic_hit(self) -> None:
+        """Record a hit of the semantic cache."""
+        with self._lock:
+            self._metrics.semantic_hits += 1
+
+    def record_miss(self, stale: bool = False) -> None:
+        """Record a miss, `stale` means the matched output was evicted."""
+        with self._lock:
+            self._metrics.misses += 1
+            if stale:
+                self._metrics.stale_entries += 1
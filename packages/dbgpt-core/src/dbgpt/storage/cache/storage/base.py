@@ -1,10 +1,12 @@
 """Base cache storage class."""
 
 import logging
+import threading
+import time
 from abc import ABC, abstractmethod
 from collections import OrderedDict
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, cast
 
 import msgpack
 
@@ -21,6 +23,9 @@ from dbgpt.util.memory_utils import _get_object_bytes
 
 logger = logging.getLogger(__name__)
 
+# The fixed bytes of every entry besides the key and value data
+_ENTRY_OVERHEAD_BYTES = 32
+
 
 @dataclass
 class StorageItem:
@@ -40,6 +45,8 @@ class StorageItem:
     key_hash: bytes  # The hash value of the storage item's key
     key_data: bytes  # The data of the storage item's key
     value_data: bytes  # The data of the storage item's value
+    # The value object of the memory cache, to avoid deserializing on every hit
+    value: Optional[CacheValue] = field(default=None, repr=False, compare=False)
 
     @staticmethod
     def build_from(
@@ -191,14 +198,156 @@ class CacheStorage(ABC):
         raise NotImplementedError
 
 
+@dataclass
+class _MemoryEntry:
+    key: CacheKey
+    item: StorageItem
+    expire_at: Optional[float] = None
+    freq: int = 1
+    persisted: bool = False
+    """Whether the entry is already in the spill storage."""
+
+
+class _CacheShard:
+    """A shard of the memory cache, all the operations are O(1).
+
+    The entries are kept in the access order for LRU, in the insertion order for
+    FIFO, and in the buckets of the access frequency for LFU.
+    """
+
+    def __init__(self, max_bytes: int, cache_policy: CachePolicy) -> None:
+        self.lock = threading.Lock()
+        self.max_bytes = max_bytes
+        self.cache_policy = cache_policy
+        self.entries: "OrderedDict[bytes, _MemoryEntry]" = OrderedDict()
+        self.freq_buckets: Dict[int, "OrderedDict[bytes, None]"] = {}
+        self.min_freq = 0
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key_hash: bytes, now: float) -> Optional[_MemoryEntry]:
+        entry = self.entries.get(key_hash)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expire_at is not None and entry.expire_at <= now:
+            self.remove(key_hash)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.cache_policy == CachePolicy.LRU:
+            self.entries.move_to_end(key_hash)
+        elif self.cache_policy == CachePolicy.LFU:
+            emptied = self._remove_from_bucket(key_hash, entry.freq)
+            if emptied and self.min_freq == entry.freq:
+                self.min_freq = entry.freq + 1
+            entry.freq += 1
+            self.freq_buckets.setdefault(entry.freq, OrderedDict())[key_hash] = None
+        return entry
+
+    def put(self, key_hash: bytes, entry: _MemoryEntry) -> List[_MemoryEntry]:
+        """Put the entry and return the evicted entries."""
+        self.remove(key_hash)
+        evicted: List[_MemoryEntry] = []
+        while self.entries and self.bytes + entry.item.length > self.max_bytes:
+            evicted.append(self._evict())
+        self.entries[key_hash] = entry
+        self.bytes += entry.item.length
+        if self.cache_policy == CachePolicy.LFU:
+            entry.freq = 1
+            self.freq_buckets.setdefault(1, OrderedDict())[key_hash] = None
+            self.min_freq = 1
+        self.evictions += len(evicted)
+        return evicted
+
+    def remove(self, key_hash: bytes) -> Optional[_MemoryEntry]:
+        entry = self.entries.pop(key_hash, None)
+        if entry is None:
+            return None
+        self.bytes -= entry.item.length
+        if self.cache_policy == CachePolicy.LFU:
+            emptied = self._remove_from_bucket(key_hash, entry.freq)
+            if emptied and self.min_freq == entry.freq:
+                # Rare, the number of the frequencies is small
+                self.min_freq = min(self.freq_buckets) if self.freq_buckets else 0
+        return entry
+
+    def _evict(self) -> _MemoryEntry:
+        if self.cache_policy == CachePolicy.LFU:
+            # The least recently used one of the least frequently used entries
+            key_hash = next(iter(self.freq_buckets[self.min_freq]))
+        else:
+            # The least recently used(LRU) or the first inserted(FIFO) entry
+            key_hash = next(iter(self.entries))
+        return cast(_MemoryEntry, self.remove(key_hash))
+
+    def _remove_from_bucket(self, key_hash: bytes, freq: int) -> bool:
+        """Remove the key from its frequency bucket, return whether it's emptied."""
+        bucket = self.freq_buckets[freq]
+        del bucket[key_hash]
+        if bucket:
+            return False
+        del self.freq_buckets[freq]
+        return True
+
+
 class MemoryCacheStorage(CacheStorage):
-    """A simple in-memory cache storage implementation."""
+    """An in-memory cache storage with the byte budget and the TTL.
+
+    The entries are spread over the shards by the key hash, every shard has its own
+    lock and an equal part of the byte budget, so the concurrent threads rarely
+    wait for each other. The size of an entry is the exact bytes of its serialized
+    key and value.
+
+    The cached value object is kept with the serialized bytes, so a memory hit
+    returns it without deserializing, treat it as read-only.
+
+    If a spill storage(e.g. :class:`DiskCacheStorage`) is provided, the evicted
+    entries are written to it, and the entries read from it are promoted back to
+    memory. The entries with TTL are not spilled, because the spill storage
+    doesn't expire them.
+    """
 
-    def __init__(self, max_memory_mb: int = 256):
-        """Create a new instance of MemoryCacheStorage."""
-        self.cache: OrderedDict = OrderedDict()
-        self.max_memory = max_memory_mb * 1024 * 1024
-        self.current_memory_usage = 0
+    def __init__(
+        self,
+        max_memory_mb: int = 256,
+        cache_policy: CachePolicy = CachePolicy.LRU,
+        default_ttl: Optional[float] = None,
+        num_shards: int = 16,
+        spill_storage: Optional[CacheStorage] = None,
+    ):
+        """Create a new instance of MemoryCacheStorage.
+
+        Args:
+            max_memory_mb (int): The max memory in MB.
+            cache_policy (CachePolicy): The eviction policy, the cache policy of the
+                CacheConfig is ignored.
+            default_ttl (Optional[float]): The default seconds to keep an entry, if
+                the CacheConfig has no TTL. None means forever.
+            num_shards (int): The number of the shards.
+            spill_storage (Optional[CacheStorage]): The storage to write the
+                evicted entries.
+        """
+        self.max_memory = int(max_memory_mb * 1024 * 1024)
+        self._cache_policy = CachePolicy(cache_policy or CachePolicy.LRU)
+        self._default_ttl = default_ttl
+        num_shards = max(1, num_shards)
+        self._shards = [
+            _CacheShard(self.max_memory // num_shards, self._cache_policy)
+            for _ in range(num_shards)
+        ]
+        self._spill_storage = spill_storage
+        self._spills = 0
+        self._spill_hits = 0
+
+    @property
+    def current_memory_usage(self) -> int:
+        """Return the bytes of all the entries."""
+        return sum(shard.bytes for shard in self._shards)
 
     def check_config(
         self,
@@ -217,22 +366,38 @@ class MemoryCacheStorage(CacheStorage):
             return False
         return True
 
+    def support_async(self) -> bool:
+        """Support async if there is no spill storage, the operations don't block."""
+        return self._spill_storage is None
+
     def get(
         self, key: CacheKey[K], cache_config: Optional[CacheConfig] = None
     ) -> Optional[StorageItem]:
         """Retrieve a storage item from the cache using the provided key."""
         self.check_config(cache_config, raise_error=True)
         # Exact match retrieval
-        key_hash = hash(key)
-        item: Optional[StorageItem] = self.cache.get(key_hash)
-        logger.debug(f"MemoryCacheStorage get key {key}, hash {key_hash}, item: {item}")
-
-        if not item:
+        key_hash = key.get_hash_bytes()
+        shard = self._shard(key_hash)
+        with shard.lock:
+            entry = shard.get(key_hash, time.monotonic())
+        if entry:
+            return entry.item
+        if not self._spill_storage:
             return None
-        # Move the item to the end of the OrderedDict to signify recent use.
-        self.cache.move_to_end(key_hash)
+        item = self._spill_storage.get(key, cache_config)
+        if item:
+            self._spill_hits += 1
+            # Promote the warm item to memory
+            self._put(key, item, None, persisted=True)
+        logger.debug(f"MemoryCacheStorage get key {key} from spill storage: {item}")
         return item
 
+    async def aget(
+        self, key: CacheKey[K], cache_config: Optional[CacheConfig] = None
+    ) -> Optional[StorageItem]:
+        """Retrieve a storage item from the cache asynchronously."""
+        return self.get(key, cache_config)
+
     def set(
         self,
         key: CacheKey[K],
@@ -240,18 +405,33 @@ class MemoryCacheStorage(CacheStorage):
         cache_config: Optional[CacheConfig] = None,
     ) -> None:
         """Set a value in the cache for the provided key."""
-        key_hash = hash(key)
-        item = StorageItem.build_from_kv(key, value)
-        # Calculate memory size of the new entry
-        new_entry_size = _get_object_bytes(item)
-        # Evict entries if necessary
-        while self.current_memory_usage + new_entry_size > self.max_memory:
-            self._apply_cache_policy(cache_config)
-
-        # Store the item in the cache.
-        self.cache[key_hash] = item
-        self.current_memory_usage += new_entry_size
-        logger.debug(f"MemoryCacheStorage set key {key}, hash {key_hash}, item: {item}")
+        key_hash = key.get_hash_bytes()
+        key_data = key.serialize()
+        value_data = value.serialize()
+        item = StorageItem(
+            length=_ENTRY_OVERHEAD_BYTES
+            + len(key_hash)
+            + len(key_data)
+            + len(value_data),
+            key_hash=key_hash,
+            key_data=key_data,
+            value_data=value_data,
+            value=value,
+        )
+        ttl = self._default_ttl
+        if cache_config and cache_config.ttl is not None:
+            ttl = cache_config.ttl
+        self._put(key, item, ttl)
+        logger.debug(f"MemoryCacheStorage set key {key}, item: {item}")
+
+    async def aset(
+        self,
+        key: CacheKey[K],
+        value: CacheValue[V],
+        cache_config: Optional[CacheConfig] = None,
+    ) -> None:
+        """Set a value in the cache asynchronously."""
+        self.set(key, value, cache_config)
 
     def exists(
         self, key: CacheKey[K], cache_config: Optional[CacheConfig] = None
@@ -259,9 +439,60 @@ class MemoryCacheStorage(CacheStorage):
         """Check if the key exists in the cache."""
         return self.get(key, cache_config) is not None
 
-    def _apply_cache_policy(self, cache_config: Optional[CacheConfig] = None):
-        # Remove the oldest/newest item based on the cache policy.
-        if cache_config and cache_config.cache_policy == CachePolicy.FIFO:
-            self.cache.popitem(last=False)
-        else:  # Default is LRU
-            self.cache.popitem(last=True)
+    def stats(self) -> Dict[str, Any]:
+        """Return the statistics of the cache."""
+        stats: Dict[str, Any] = {
+            "entries": 0,
+            "bytes": 0,
+            "max_bytes": self.max_memory,
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+        for shard in self._shards:
+            with shard.lock:
+                stats["entries"] += len(shard.entries)
+                stats["bytes"] += shard.bytes
+                stats["hits"] += shard.hits
+                stats["misses"] += shard.misses
+                stats["evictions"] += shard.evictions
+                stats["expirations"] += shard.expirations
+        stats["spills"] = self._spills
+        stats["spill_hits"] = self._spill_hits
+        return stats
+
+    def _shard(self, key_hash: bytes) -> _CacheShard:
+        index = int.from_bytes(key_hash[:8], "little") % len(self._shards)
+        return self._shards[index]
+
+    def _put(
+        self,
+        key: CacheKey,
+        item: StorageItem,
+        ttl: Optional[float],
+        persisted: bool = False,
+    ) -> None:
+        shard = self._shard(item.key_hash)
+        if item.length > shard.max_bytes:
+            logger.debug(f"The cache item of key {key} is too large: {item.length}")
+            return
+        expire_at = time.monotonic() + ttl if ttl is not None else None
+        entry = _MemoryEntry(
+            key=key, item=item, expire_at=expire_at, persisted=persisted
+        )
+        with shard.lock:
+            evicted = shard.put(item.key_hash, entry)
+        if self._spill_storage:
+            # Write the spill storage out of the lock
+            for evicted_entry in evicted:
+                self._spill(evicted_entry)
+
+    def _spill(self, entry: _MemoryEntry) -> None:
+        if entry.persisted or entry.expire_at is not None or entry.item.value is None:
+            return
+        try:
+            cast(CacheStorage, self._spill_storage).set(entry.key, entry.item.value)
+            self._spills += 1
+        except Exception as e:
+            logger.warning(f"Spill cache item of key {entry.key} failed: {e}")
@@ -1,6 +1,9 @@
+import time
+
+from dbgpt.core.interface.cache import CacheConfig, CachePolicy
 from dbgpt.util.memory_utils import _get_object_bytes
 
-from ..base import StorageItem
+from ..base import MemoryCacheStorage, StorageItem
 
 
 def test_build_from():
@@ -51,3 +54,100 @@ def test_serialize_deserialize():
     assert deserialized.key_data == item.key_data
     assert deserialized.value_data == item.value_data
     assert deserialized.length == item.length
+
+
+def _key(text: str):
+    from dbgpt.util.serialization.json_serialization import JsonSerializer
+
+    from ...embedding_cache import EmbeddingCacheKey
+
+    key = EmbeddingCacheKey(
+        model_name="mock",
+        text_hash=EmbeddingCacheKey.hash_text(text),
+        embed_type="document",
+    )
+    key.set_serializer(JsonSerializer())
+    return key
+
+
+def _value(index: int):
+    from dbgpt.util.serialization.json_serialization import JsonSerializer
+
+    from ...embedding_cache import EmbeddingCacheValue
+
+    value = EmbeddingCacheValue(embedding=[float(index)])
+    value.set_serializer(JsonSerializer())
+    return value
+
+
+def _storage(max_entries: int, **kwargs) -> MemoryCacheStorage:
+    item_size = MemoryCacheStorage(num_shards=1)
+    item_size.set(_key("size"), _value(0))
+    max_bytes = item_size.current_memory_usage * max_entries + 1
+    max_memory_mb = max_bytes / 1024 / 1024
+    return MemoryCacheStorage(max_memory_mb=max_memory_mb, num_shards=1, **kwargs)
+
+
+def test_memory_storage_lru():
+    storage = _storage(3)
+    for i in range(3):
+        storage.set(_key(str(i)), _value(i))
+    value = _value(0)
+    storage.set(_key("0"), value)
+    # The value object is returned without deserializing
+    assert storage.get(_key("0")).value is value
+    storage.set(_key("3"), _value(3))
+    # The least recently used one is evicted
+    assert storage.get(_key("1")) is None
+    assert all(storage.exists(_key(str(i))) for i in [0, 2, 3])
+    stats = storage.stats()
+    assert stats["entries"] == 3
+    assert stats["evictions"] == 1
+    assert stats["bytes"] == storage.current_memory_usage <= storage.max_memory
+
+
+def test_memory_storage_lfu_and_fifo():
+    storage = _storage(3, cache_policy=CachePolicy.LFU)
+    for i in range(3):
+        storage.set(_key(str(i)), _value(i))
+    for _ in range(2):
+        storage.get(_key("0"))
+        storage.get(_key("1"))
+    storage.get(_key("2"))
+    storage.set(_key("3"), _value(3))
+    assert storage.get(_key("2")) is None
+    assert all(storage.exists(_key(str(i))) for i in [0, 1, 3])
+
+    storage = _storage(2, cache_policy=CachePolicy.FIFO)
+    storage.set(_key("0"), _value(0))
+    storage.set(_key("1"), _value(1))
+    storage.get(_key("0"))
+    storage.set(_key("2"), _value(2))
+    assert storage.get(_key("0")) is None
+
+
+def test_memory_storage_ttl(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    storage = MemoryCacheStorage(default_ttl=10)
+    storage.set(_key("0"), _value(0))
+    storage.set(_key("1"), _value(1), CacheConfig(ttl=30))
+    now += 20
+    assert storage.get(_key("0")) is None
+    assert storage.get(_key("1")) is not None
+    assert storage.stats()["expirations"] == 1
+    assert storage.stats()["entries"] == 1
+
+
+def test_memory_storage_spill():
+    spill_storage = MemoryCacheStorage()
+    storage = _storage(2, spill_storage=spill_storage)
+    assert not storage.support_async()
+    for i in range(4):
+        storage.set(_key(str(i)), _value(i))
+    assert spill_storage.stats()["entries"] == 2
+    # Read from the spill storage and promote to memory
+    item = storage.get(_key("0"))
+    assert item.value_data == _value(0).serialize()
+    assert storage.stats()["spills"] == 3
+    assert storage.stats()["spill_hits"] == 1
@@ -0,0 +1,82 @@
+from typing import List
+
+import pytest
+
+from dbgpt.core import Embeddings
+
+from ..embedding_cache import CachedEmbeddings
+from ..storage.base import MemoryCacheStorage
+
+
+class MockEmbeddings(Embeddings):
+    def __init__(self):
+        self.embedded: List[List[str]] = []
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.embedded.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self.embedded.append([text])
+        return [float(len(text)), 0.0]
+
+
+def test_embed_documents_only_misses():
+    model = MockEmbeddings()
+    embeddings = CachedEmbeddings(model, model_name="mock")
+
+    assert embeddings.embed_documents(["a", "bb"]) == [[1.0, 1.0], [2.0, 1.0]]
+    res = embeddings.embed_documents(["bb", "ccc", "ccc", "a"])
+    assert res == [[2.0, 1.0], [3.0, 1.0], [3.0, 1.0], [1.0, 1.0]]
+    # Only the uncached and deduplicated texts are sent to the model
+    assert model.embedded == [["a", "bb"], ["ccc"]]
+
+    metrics = embeddings.metrics
+    assert metrics.memory_hits == 2
+    assert metrics.misses == 4
+    assert metrics.model_calls == 2
+    assert metrics.embedded_texts == 3
+
+
+def test_embed_query_namespace():
+    model = MockEmbeddings()
+    embeddings = CachedEmbeddings(model, model_name="mock")
+    embeddings.embed_documents(["a"])
+    # Query embeddings are cached separately from document embeddings
+    assert embeddings.embed_query("a") == [1.0, 0.0]
+    assert embeddings.embed_query("a") == [1.0, 0.0]
+    assert model.embedded == [["a"], ["a"]]
+
+
+def test_persist_tier_promote():
+    model = MockEmbeddings()
+    persist_storage = MemoryCacheStorage()
+    CachedEmbeddings(
+        model, model_name="mock", persist_storage=persist_storage
+    ).embed_documents(["a", "bb"])
+
+    # A new process, the memory tier is empty
+    embeddings = CachedEmbeddings(
+        model, model_name="mock", persist_storage=persist_storage
+    )
+    assert embeddings.embed_documents(["a", "bb"]) == [[1.0, 1.0], [2.0, 1.0]]
+    assert embeddings.metrics.disk_hits == 2
+    embeddings.embed_documents(["a"])
+    assert embeddings.metrics.memory_hits == 1
+    assert len(model.embedded) == 1
+
+    # Different model never shares the cache
+    other = CachedEmbeddings(model, model_name="other", persist_storage=persist_storage)
+    other.embed_documents(["a"])
+    assert len(model.embedded) == 2
+
+
+@pytest.mark.asyncio
+async def test_aembed_documents():
+    model = MockEmbeddings()
+    embeddings = CachedEmbeddings(model, model_name="mock")
+    assert await embeddings.aembed_documents(["a", "bb"]) == [[1.0, 1.0], [2.0, 1.0]]
+    assert await embeddings.aembed_documents(["bb"]) == [[2.0, 1.0]]
+    assert await embeddings.aembed_query("bb") == [2.0, 0.0]
+    assert model.embedded == [["a", "bb"], ["bb"]]
+    assert embeddings.metrics.hit_rate == 0.25
@@ -0,0 +1,169 @@
+from typing import List
+
+import numpy as np
+import pytest
+
+from dbgpt.component import SystemApp
+from dbgpt.core import Embeddings, ModelOutput, ModelRequest, ModelRequestContext
+from dbgpt.core.awel import (
+    DAG,
+    BranchJoinOperator,
+    InputOperator,
+    MapOperator,
+    SimpleCallDataInputSource,
+)
+from dbgpt.util.serialization.json_serialization import JsonSerializer
+
+from ..llm_cache import LLMCacheKey
+from ..manager import LocalCacheManager
+from ..operators import (
+    CachedModelOperator,
+    ModelCacheBranchOperator,
+    ModelSaveCacheOperator,
+)
+from ..semantic_cache import SemanticCacheEntry, SemanticLLMCache, _ScopeIndex
+from ..storage.base import MemoryCacheStorage
+
+
+class KeywordEmbeddings(Embeddings):
+    """The texts about sales are similar to each other."""
+
+    def __init__(self):
+        self.embedded: List[str] = []
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self.embedded.append(text)
+        if "sales" in text:
+            return [1.0, 0.1 * len(text.split())]
+        return [0.0, 1.0]
+
+
+def _request(prompt: str, model: str = "mock", system: str = "") -> ModelRequest:
+    messages = [{"role": "human", "content": prompt}]
+    if system:
+        messages.insert(0, {"role": "system", "content": system})
+    return ModelRequest.build_request(
+        model,
+        messages,
+        context=ModelRequestContext(cache_enable=True),
+        temperature=0.1,
+    )
+
+
+def _key(prompt: str) -> LLMCacheKey:
+    key = LLMCacheKey(prompt=prompt, model_name="mock")
+    key.set_serializer(JsonSerializer())
+    return key
+
+
+@pytest.mark.asyncio
+async def test_lookup_scopes_and_eviction():
+    cache = SemanticLLMCache(
+        KeywordEmbeddings(), similarity_threshold=0.9, max_entries=2
+    )
+    entry = await cache.aprepare(_request("What were  SALES last month?"))
+    assert entry.text == "what were sales last month?"
+    assert cache.lookup(entry) is None
+    cache.add(entry, _key("a"))
+
+    similar = await cache.aprepare(_request("show me last month's sales"))
+    assert cache.lookup(similar) == _key("a")
+    unrelated = await cache.aprepare(_request("hello"))
+    assert cache.lookup(unrelated) is None
+    # Different model or conversation context never match
+    other_model = await cache.aprepare(_request("show me sales", model="other"))
+    assert cache.lookup(other_model) is None
+    other_context = await cache.aprepare(_request("show me sales", system="be brief"))
+    assert cache.lookup(other_context) is None
+
+    cache.add(other_model, _key("b"))
+    cache.add(unrelated, _key("c"))
+    # The LRU entry "a" was touched by the hit, but "a" is still the oldest
+    assert len(cache) == 2
+    assert cache.lookup(similar) is None
+    assert cache.metrics.evictions == 1
+
+
+@pytest.mark.asyncio
+async def test_branch_operator_semantic_hit():
+    model_calls = []
+
+    class FakeLLMOperator(MapOperator[ModelRequest, ModelOutput]):
+        async def map(self, input_value: ModelRequest) -> ModelOutput:
+            model_calls.append(input_value.messages_to_string())
+            return ModelOutput(error_code=0, text=f"answer {len(model_calls)}")
+
+    semantic_cache = SemanticLLMCache(KeywordEmbeddings(), similarity_threshold=0.9)
+    cache_manager = LocalCacheManager(
+        SystemApp(),
+        serializer=JsonSerializer(),
+        storage=MemoryCacheStorage(),
+        semantic_cache=semantic_cache,
+    )
+    with DAG("test_semantic_cache"):
+        input_task = InputOperator(SimpleCallDataInputSource())
+        llm_task = FakeLLMOperator(task_name="llm_model_node")
+        cache_task = CachedModelOperator(
+            cache_manager, task_name="llm_model_cache_node"
+        )
+        save_cache_task = ModelSaveCacheOperator(cache_manager)
+        branch_task = ModelCacheBranchOperator(
+            cache_manager,
+            model_task_name="llm_model_node",
+            cache_task_name="llm_model_cache_node",
+        )
+        join_task = BranchJoinOperator()
+        input_task >> branch_task
+        branch_task >> llm_task >> save_cache_task >> join_task
+        branch_task >> cache_task >> join_task
+
+    prompts = [
+        "what were sales last month?",
+        "what were sales last month?",
+        "show me last month's sales",
+        "hello",
+    ]
+    outputs = [await join_task.call(call_data=_request(p)) for p in prompts]
+    assert [o.text for o in outputs] == ["answer 1"] * 3 + ["answer 2"]
+    assert len(model_calls) == 2
+    assert semantic_cache.metrics.to_dict() == {
+        "exact_hits": 1,
+        "semantic_hits": 1,
+        "misses": 2,
+        "evictions": 0,
+        "stale_entries": 0,
+        "hits": 2,
+        "hit_rate": 0.5,
+    }
+
+
+def test_scope_index_rows():
+    rng = np.random.default_rng(0)
+    index = _ScopeIndex()
+    vectors = {}
+    for i in range(40):
+        vector = rng.standard_normal(8).astype(np.float32)
+        vectors[bytes([i])] = vector
+        index.add(bytes([i]), SemanticCacheEntry("s", str(i), vector))
+    # The matrix grows geometrically
+    assert index._matrix.shape == (64, 8)
+    matrix = index._matrix
+    for i in range(0, 40, 3):
+        index.remove(bytes([i]))
+        vectors.pop(bytes([i]))
+    index.add(bytes([100]), SemanticCacheEntry("s", "100", vectors[bytes([1])]))
+    vectors[bytes([100])] = vectors[bytes([1])]
+    assert index._matrix is matrix
+
+    for _ in range(10):
+        query = rng.standard_normal(8).astype(np.float32)
+        entry_id, score = index.nearest(query)
+        expected = max(float(v @ query) for v in vectors.values())
+        assert score == pytest.approx(expected)
+        assert float(vectors[entry_id] @ query) == pytest.approx(expected)
+    for entry_id in list(vectors):
+        index.remove(entry_id)
+    assert index.nearest(np.ones(8, dtype=np.float32)) is None
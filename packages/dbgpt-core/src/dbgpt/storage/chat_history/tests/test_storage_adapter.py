@@ -1,8 +1,15 @@
 from typing import List
 
 import pytest
-
-from dbgpt.core.interface.message import AIMessage, HumanMessage, StorageConversation
+from sqlalchemy import event
+
+from dbgpt.core.interface.message import (
+    AIMessage,
+    HumanMessage,
+    MessageIdentifier,
+    MessageStorageItem,
+    StorageConversation,
+)
 from dbgpt.core.interface.storage import QuerySpec
 from dbgpt.storage.chat_history.chat_history_db import (
     ChatHistoryEntity,
@@ -218,3 +225,34 @@ def test_query_with_page(
     assert page_result.page_size == 2
     assert len(page_result.items) == 2
     assert page_result.items[0].conv_uid == "conv0"
+
+
+def test_load_messages_in_one_query(
+    four_round_conversation: StorageConversation, conv_storage, message_storage
+):
+    statements = []
+    event.listen(
+        db.engine,
+        "before_cursor_execute",
+        lambda *args, **kwargs: statements.append(args[2]),
+    )
+    saved_conversation = StorageConversation(
+        conv_uid=four_round_conversation.conv_uid,
+        conv_storage=conv_storage,
+        message_storage=message_storage,
+    )
+    assert [m.content for m in saved_conversation.messages] == [
+        m.content for m in four_round_conversation.messages
+    ]
+    # One query for the conversation and one for all the messages
+    assert len([s for s in statements if s.lstrip().startswith("SELECT")]) == 2
+
+    message_ids = saved_conversation.message_ids
+    saved_conversation.delete()
+    assert (
+        message_storage.load_list(
+            [MessageIdentifier.from_str_identifier(i) for i in message_ids],
+            MessageStorageItem,
+        )
+        == []
+    )
@@ -3,14 +3,30 @@
 import itertools
 import json
 import logging
+import os
 import re
 from abc import ABC, abstractmethod
-from collections import defaultdict
+from array import array
+from collections import defaultdict, deque
 from enum import Enum
-from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    cast,
+)
 
 logger = logging.getLogger(__name__)
 
+_DEFAULT_INDEXED_PROPS = ("vertex_type", "edge_type")
+_SNAPSHOT_FORMAT_VERSION = 1
+
 
 class GraphElemType(Enum):
     """Type of element in graph."""
@@ -283,64 +299,212 @@ class Graph(ABC):
 
 
 class MemoryGraph(Graph):
-    """Graph class."""
+    """Graph class.
+
+    The vertex ids are interned to integers and the edges are kept in columnar
+    arrays(source, target, label) with integer adjacency lists, the edge objects
+    are created when they are read and share the properties with the graph.
+
+    The edges are indexed by label, the vertices and the edges are indexed by the
+    properties in `indexed_props`, the values at the time of the upsert are
+    indexed.
+    """
 
-    def __init__(self):
-        """Initialize MemoryGraph with vertex label and edge label."""
+    def __init__(self, indexed_props: Optional[Iterable[str]] = None):
+        """Initialize MemoryGraph with vertex label and edge label.
+
+        Args:
+            indexed_props (Optional[Iterable[str]]): The property keys to index,
+                defaults to `vertex_type` and `edge_type`.
+        """
         # metadata
-        self._vertex_prop_keys = set()
-        self._edge_prop_keys = set()
+        self._vertex_prop_keys: Set[str] = set()
+        self._edge_prop_keys: Set[str] = set()
         self._edge_count = 0
-
-        # vertices index, out edges index, in edges index
-        self._vs: Any = defaultdict()
-        self._oes: Any = defaultdict(lambda: defaultdict(set))
-        self._ies: Any = defaultdict(lambda: defaultdict(set))
+        self._indexed_props = set(
+            _DEFAULT_INDEXED_PROPS if indexed_props is None else indexed_props
+        )
+        self._init_storage()
+
+    def _init_storage(self):
+        # interned vertex ids, a deleted vertex slot is None
+        self._vid_index: Dict[str, int] = {}
+        self._vs: List[Optional[Vertex]] = []
+        self._free_vs: List[int] = []
+        # columnar edges, a deleted edge has the source -1
+        self._e_src = array("q")
+        self._e_dst = array("q")
+        self._e_label = array("q")
+        self._e_props: List[Optional[Dict[str, Any]]] = []
+        self._free_es: List[int] = []
+        # interned edge labels
+        self._labels: List[str] = []
+        self._label_ids: Dict[str, int] = {}
+        # (source, target, label) -> edge, the identity of an edge
+        self._edge_keys: Dict[int, int] = {}
+        # out edges index, in edges index
+        self._oes: List[List[int]] = []
+        self._ies: List[List[int]] = []
+        # label index and property indexes
+        self._label_es: Dict[int, Set[int]] = defaultdict(set)
+        self._vertex_prop_index: Dict[str, Dict[Any, Set[int]]] = defaultdict(
+            lambda: defaultdict(set)
+        )
+        self._edge_prop_index: Dict[str, Dict[Any, Set[int]]] = defaultdict(
+            lambda: defaultdict(set)
+        )
 
     @property
     def vertex_count(self):
         """Return the number of vertices in the graph."""
-        return len(self._vs)
+        return len(self._vid_index)
 
     @property
     def edge_count(self):
         """Return the count of edges in the graph."""
         return self._edge_count
 
+    @staticmethod
+    def _edge_key(src: int, dst: int, label: int) -> int:
+        return (src << 64) | (dst << 32) | label
+
+    def _intern_vertex(self, vertex: Vertex) -> int:
+        """Return the index of the vertex, add it if not exists."""
+        idx = self._vid_index.get(vertex.vid)
+        if idx is not None:
+            return idx
+        if self._free_vs:
+            idx = self._free_vs.pop()
+            self._vs[idx] = vertex
+        else:
+            idx = len(self._vs)
+            self._vs.append(vertex)
+            self._oes.append([])
+            self._ies.append([])
+        self._vid_index[vertex.vid] = idx
+        return idx
+
+    def _intern_label(self, label: str) -> int:
+        label_id = self._label_ids.get(label)
+        if label_id is None:
+            label_id = len(self._labels)
+            self._labels.append(label)
+            self._label_ids[label] = label_id
+        return label_id
+
+    def _index_props(
+        self, index: Dict[str, Dict[Any, Set[int]]], idx: int, props: Dict[str, Any]
+    ):
+        for key in self._indexed_props.intersection(props):
+            try:
+                index[key][props[key]].add(idx)
+            except TypeError:
+                pass  # unhashable value
+
+    def _unindex_props(
+        self, index: Dict[str, Dict[Any, Set[int]]], idx: int, props: Dict[str, Any]
+    ):
+        for key in self._indexed_props.intersection(props):
+            try:
+                index[key].get(props[key], set()).discard(idx)
+            except TypeError:
+                pass
+
     def upsert_vertex(self, vertex: Vertex):
         """Insert or update a vertex based on its ID."""
-        if vertex.vid in self._vs:
-            if isinstance(self._vs[vertex.vid], IdVertex):
-                self._vs[vertex.vid] = vertex
-            else:
-                self._vs[vertex.vid].props.update(vertex.props)
+        idx = self._vid_index.get(vertex.vid)
+        if idx is None:
+            idx = self._intern_vertex(vertex)
         else:
-            self._vs[vertex.vid] = vertex
+            old = cast(Vertex, self._vs[idx])
+            self._unindex_props(self._vertex_prop_index, idx, old.props)
+            if isinstance(old, IdVertex):
+                self._vs[idx] = vertex
+            else:
+                old.props.update(vertex.props)
+        self._index_props(
+            self._vertex_prop_index, idx, cast(Vertex, self._vs[idx]).props
+        )
 
         # update metadata
         self._vertex_prop_keys.update(vertex.props.keys())
 
     def append_edge(self, edge: Edge) -> bool:
         """Append an edge if it doesn't exist; requires edge label."""
-        sid = edge.sid
-        tid = edge.tid
-
-        if edge in self._oes[sid][tid]:
+        src = self._vid_index.get(edge.sid)
+        dst = self._vid_index.get(edge.tid)
+        label = self._label_ids.get(edge.name)
+        if (
+            src is not None
+            and dst is not None
+            and label is not None
+            and self._edge_key(src, dst, label) in self._edge_keys
+        ):
             return False
 
         # init vertex index
-        self._vs.setdefault(sid, IdVertex(sid))
-        self._vs.setdefault(tid, IdVertex(tid))
+        src = self._intern_vertex(IdVertex(edge.sid)) if src is None else src
+        dst = self._intern_vertex(IdVertex(edge.tid)) if dst is None else dst
+        label = self._intern_label(edge.name) if label is None else label
+
+        # share the properties with the appended edge
+        props = edge.props or None
+        if self._free_es:
+            eid = self._free_es.pop()
+            self._e_src[eid] = src
+            self._e_dst[eid] = dst
+            self._e_label[eid] = label
+            self._e_props[eid] = props
+        else:
+            eid = len(self._e_src)
+            self._e_src.append(src)
+            self._e_dst.append(dst)
+            self._e_label.append(label)
+            self._e_props.append(props)
 
         # update edge index
-        self._oes[sid][tid].add(edge)
-        self._ies[tid][sid].add(edge)
+        self._edge_keys[self._edge_key(src, dst, label)] = eid
+        self._oes[src].append(eid)
+        self._ies[dst].append(eid)
+        self._label_es[label].add(eid)
+        if props:
+            self._index_props(self._edge_prop_index, eid, props)
 
         # update metadata
         self._edge_prop_keys.update(edge.props.keys())
         self._edge_count += 1
         return True
 
+    def _get_edge(self, eid: int) -> Edge:
+        """Create the edge object, its properties are shared with the graph."""
+        edge = Edge(
+            cast(Vertex, self._vs[self._e_src[eid]]).vid,
+            cast(Vertex, self._vs[self._e_dst[eid]]).vid,
+            self._labels[self._e_label[eid]],
+        )
+        props = self._e_props[eid]
+        if props is None:
+            props = self._e_props[eid] = {}
+        edge._props = props
+        return edge
+
+    def _remove_edge(self, eid: int, keep_src: bool = True, keep_dst: bool = True):
+        """Remove an edge, skip the adjacency lists which are cleared later."""
+        src, dst, label = self._e_src[eid], self._e_dst[eid], self._e_label[eid]
+        if keep_src:
+            self._oes[src].remove(eid)
+        if keep_dst:
+            self._ies[dst].remove(eid)
+        del self._edge_keys[self._edge_key(src, dst, label)]
+        self._label_es[label].discard(eid)
+        props = self._e_props[eid]
+        if props:
+            self._unindex_props(self._edge_prop_index, eid, props)
+        self._e_src[eid] = -1
+        self._e_props[eid] = None
+        self._free_es.append(eid)
+        self._edge_count -= 1
+
     def upsert_graph(self, graph: "MemoryGraph"):
         """Upsert a graph."""
         for vertex in graph.vertices():
@@ -351,11 +515,32 @@ class MemoryGraph(Graph):
 
     def has_vertex(self, vid: str) -> bool:
         """Retrieve a vertex by ID."""
-        return vid in self._vs
+        return vid in self._vid_index
 
     def get_vertex(self, vid: str) -> Vertex:
         """Retrieve a vertex by ID."""
-        return self._vs[vid]
+        return cast(Vertex, self._vs[self._vid_index[vid]])
+
+    def _neighbor_eids(
+        self, idx: int, direction: Direction, limit: Optional[int] = None
+    ) -> Iterator[int]:
+        if direction == Direction.OUT:
+            eids: Iterator[int] = iter(self._oes[idx])
+        elif direction == Direction.IN:
+            eids = iter(self._ies[idx])
+        elif direction == Direction.BOTH:
+            # merge, the self-loop edges are in both lists
+            tuples = itertools.zip_longest(self._oes[idx], self._ies[idx])
+            seen: Set[int] = set()
+            eids = (
+                e
+                for t in tuples
+                for e in t
+                if e is not None and e not in seen and not seen.add(e)  # type: ignore
+            )
+        else:
+            raise ValueError(f"Invalid direction: {direction}")
+        return itertools.islice(eids, limit) if limit else eids
 
     def get_neighbor_edges(
         self,
@@ -364,42 +549,21 @@ class MemoryGraph(Graph):
         limit: Optional[int] = None,
     ) -> Iterator[Edge]:
         """Get edges connected to a vertex by direction."""
-        if direction == Direction.OUT:
-            es = (e for es in self._oes[vid].values() for e in es)
-
-        elif direction == Direction.IN:
-            es = iter(e for es in self._ies[vid].values() for e in es)
-
-        elif direction == Direction.BOTH:
-            oes = (e for es in self._oes[vid].values() for e in es)
-            ies = (e for es in self._ies[vid].values() for e in es)
-
-            # merge
-            tuples = itertools.zip_longest(oes, ies)
-            es = (e for t in tuples for e in t if e is not None)
-
-            # distinct
-            seen = set()
-
-            # es = (e for e in es if e not in seen and not seen.add(e))
-            def unique_elements(elements):
-                for element in elements:
-                    if element not in seen:
-                        seen.add(element)
-                        yield element
-
-            es = unique_elements(es)
-        else:
-            raise ValueError(f"Invalid direction: {direction}")
-
-        return itertools.islice(es, limit) if limit else es
+        idx = self._vid_index.get(vid)
+        if idx is None:
+            if direction not in Direction:
+                raise ValueError(f"Invalid direction: {direction}")
+            return iter(())
+        # copy the edge ids, the graph may be changed while iterating
+        eids = list(self._neighbor_eids(idx, direction, limit))
+        return (self._get_edge(eid) for eid in eids)
 
     def vertices(
         self, filter_fn: Optional[Callable[[Vertex], bool]] = None
     ) -> Iterator[Vertex]:
         """Return vertices."""
         # Get all vertices in the graph
-        all_vertices = self._vs.values()
+        all_vertices = (v for v in self._vs if v is not None)
 
         return all_vertices if filter_fn is None else filter(filter_fn, all_vertices)
 
@@ -408,52 +572,85 @@ class MemoryGraph(Graph):
     ) -> Iterator[Edge]:
         """Return edges."""
         # Get all edges in the graph
-        all_edges = (e for nbs in self._oes.values() for es in nbs.values() for e in es)
+        all_edges = (
+            self._get_edge(eid)
+            for eid in range(len(self._e_src))
+            if self._e_src[eid] >= 0
+        )
 
         if filter_fn is None:
             return all_edges
         else:
             return filter(filter_fn, all_edges)
 
+    def vertices_by_prop(self, key: str, value: Any) -> Iterator[Vertex]:
+        """Return the vertices with the property value, use the index if exists."""
+        if key not in self._indexed_props:
+            return self.vertices(lambda v: v.get_prop(key) == value)
+        idxs = sorted(self._vertex_prop_index.get(key, {}).get(value, ()))
+        vertices = (self._vs[i] for i in idxs)
+        # the properties may be changed after indexed
+        return (v for v in vertices if v is not None and v.get_prop(key) == value)
+
+    def edges_by_label(self, name: str) -> Iterator[Edge]:
+        """Return the edges with the label."""
+        label = self._label_ids.get(name)
+        if label is None:
+            return iter(())
+        return (self._get_edge(eid) for eid in sorted(self._label_es[label]))
+
+    def edges_by_prop(self, key: str, value: Any) -> Iterator[Edge]:
+        """Return the edges with the property value, use the index if exists."""
+        if key not in self._indexed_props:
+            return self.edges(lambda e: e.get_prop(key) == value)
+        eids = sorted(self._edge_prop_index.get(key, {}).get(value, ()))
+        edges = (self._get_edge(eid) for eid in eids)
+        return (e for e in edges if e.get_prop(key) == value)
+
     def del_vertices(self, *vids: str):
         """Delete specified vertices."""
         for vid in vids:
+            idx = self._vid_index.get(vid)
+            if idx is None:
+                continue
             self.del_neighbor_edges(vid, Direction.BOTH)
-            self._vs.pop(vid, None)
+            vertex = cast(Vertex, self._vs[idx])
+            self._unindex_props(self._vertex_prop_index, idx, vertex.props)
+            del self._vid_index[vid]
+            self._vs[idx] = None
+            self._free_vs.append(idx)
 
     def del_edges(self, sid: str, tid: str, name: str, **props):
         """Delete edges."""
-        old_edge_cnt = len(self._oes[sid][tid])
-
-        def remove_matches(es: Set[Edge]):
-            return set(
-                filter(
-                    lambda e: not (
-                        (name == e.name if name else True) and e.has_props(**props)
-                    ),
-                    es,
-                )
-            )
-
-        self._oes[sid][tid] = remove_matches(self._oes[sid][tid])
-        self._ies[tid][sid] = remove_matches(self._ies[tid][sid])
-
-        self._edge_count -= old_edge_cnt - len(self._oes[sid][tid])
+        src = self._vid_index.get(sid)
+        dst = self._vid_index.get(tid)
+        if src is None or dst is None:
+            return
+        for eid in list(self._oes[src]):
+            if self._e_dst[eid] != dst:
+                continue
+            if name and self._labels[self._e_label[eid]] != name:
+                continue
+            edge_props = self._e_props[eid] or {}
+            if all(edge_props.get(k) == v for k, v in props.items()):
+                self._remove_edge(eid)
 
     def del_neighbor_edges(self, vid: str, direction: Direction = Direction.OUT):
         """Delete all neighbor edges."""
-
-        def del_index(idx, i_idx):
-            for nid in idx[vid].keys():
-                self._edge_count -= len(i_idx[nid][vid])
-                i_idx[nid].pop(vid, None)
-            idx.pop(vid, None)
+        idx = self._vid_index.get(vid)
+        if idx is None:
+            return
 
         if direction in [Direction.OUT, Direction.BOTH]:
-            del_index(self._oes, self._ies)
+            for eid in self._oes[idx]:
+                # the self-loop edge is also in the in edges of the vertex
+                self._remove_edge(eid, keep_src=False)
+            self._oes[idx] = []
 
         if direction in [Direction.IN, Direction.BOTH]:
-            del_index(self._ies, self._oes)
+            for eid in self._ies[idx]:
+                self._remove_edge(eid, keep_dst=False)
+            self._ies[idx] = []
 
     def search(
         self,
@@ -463,51 +660,113 @@ class MemoryGraph(Graph):
         fan: Optional[int] = None,
         limit: Optional[int] = None,
     ) -> "MemoryGraph":
-        """Search the graph from a vertex with specified parameters."""
+        """Search the graph from a vertex with specified parameters.
+
+        A breadth-first search from every vertex, the vertices whose distance is
+        less than `depth` are visited, at most `fan` edges of a vertex are
+        followed, and the search stops when the subgraph has `limit` edges.
+        """
         subgraph = MemoryGraph()
 
         for vid in vids:
-            self.__search(vid, direct, depth, fan, limit, 0, set(), subgraph)
+            start = self._vid_index.get(vid)
+            if start is None:
+                continue
+            if limit and subgraph.edge_count >= limit:
+                break
+            visited = {start}
+            queue = deque([(start, 0)])
+            while queue:
+                idx, _depth = queue.popleft()
+                # visit vertex
+                subgraph.upsert_vertex(cast(Vertex, self._vs[idx]))
+                if limit and subgraph.edge_count >= limit:
+                    continue
+
+                # visit edges
+                for eid in self._neighbor_eids(idx, direct, fan):
+                    if limit and subgraph.edge_count >= limit:
+                        break
+                    # append edge success then visit new vertex
+                    if subgraph.append_edge(self._get_edge(eid)):
+                        nid = self._e_dst[eid]
+                        if nid == idx:
+                            nid = self._e_src[eid]
+                        if nid not in visited and (not depth or _depth + 1 < depth):
+                            visited.add(nid)
+                            queue.append((nid, _depth + 1))
 
         return subgraph
 
-    def __search(
-        self,
-        vid: str,
-        direct: Direction,
-        depth: Optional[int],
-        fan: Optional[int],
-        limit: Optional[int],
-        _depth: int,
-        _visited: Set,
-        _subgraph: "MemoryGraph",
-    ):
-        if vid in _visited or depth and _depth >= depth:
-            return
+    def save(self, path: str):
+        """Save a snapshot of the graph to a JSON file.
 
-        # visit vertex
-        if not self.has_vertex(vid):
-            return
-        _subgraph.upsert_vertex(self.get_vertex(vid))
-        _visited.add(vid)
-
-        # visit edges
-        nids = set()
-        for edge in self.get_neighbor_edges(vid, direct, fan):
-            if limit and _subgraph.edge_count >= limit:
-                return
-
-            # append edge success then visit new vertex
-            if _subgraph.append_edge(edge):
-                nid = edge.nid(vid)
-                if nid not in _visited:
-                    nids.add(nid)
-
-        # next hop
-        for nid in nids:
-            self.__search(
-                nid, direct, depth, fan, limit, _depth + 1, _visited, _subgraph
+        The deleted slots are compacted, the edges are saved as the columns of the
+        vertex indexes and the label indexes.
+        """
+        vertex_pos: Dict[int, int] = {}
+        vertices = []
+        for idx, vertex in enumerate(self._vs):
+            if vertex is None:
+                continue
+            vertex_pos[idx] = len(vertices)
+            vertices.append(
+                [
+                    vertex.vid,
+                    vertex._name,
+                    vertex.props,
+                    isinstance(vertex, IdVertex),
+                ]
+            )
+        src, dst, labels, props = [], [], [], []
+        for eid in range(len(self._e_src)):
+            if self._e_src[eid] < 0:
+                continue
+            src.append(vertex_pos[self._e_src[eid]])
+            dst.append(vertex_pos[self._e_dst[eid]])
+            labels.append(self._e_label[eid])
+            props.append(self._e_props[eid] or None)
+        data = {
+            "format_version": _SNAPSHOT_FORMAT_VERSION,
+            "indexed_props": sorted(self._indexed_props),
+            "vertex_prop_keys": sorted(self._vertex_prop_keys),
+            "edge_prop_keys": sorted(self._edge_prop_keys),
+            "vertices": vertices,
+            "labels": self._labels,
+            "edges": {"src": src, "dst": dst, "label": labels, "props": props},
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "MemoryGraph":
+        """Load a graph from the snapshot saved by `save`."""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("format_version") != _SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported graph snapshot format: {data.get('format_version')}"
             )
+        graph = cls(indexed_props=data["indexed_props"])
+        for vid, name, props, id_only in data["vertices"]:
+            vertex = IdVertex(vid) if id_only else Vertex(vid, name)
+            # the properties may have the same keys as the arguments
+            vertex._props = props
+            graph.upsert_vertex(vertex)
+        vids = [vertex[0] for vertex in data["vertices"]]
+        labels = data["labels"]
+        edges = data["edges"]
+        for src, dst, label, props in zip(
+            edges["src"], edges["dst"], edges["label"], edges["props"]
+        ):
+            edge = Edge(vids[src], vids[dst], labels[label])
+            edge._props = props or {}
+            graph.append_edge(edge)
+        graph._vertex_prop_keys = set(data["vertex_prop_keys"])
+        graph._edge_prop_keys = set(data["edge_prop_keys"])
+        return graph
 
     def schema(self) -> Dict[str, Any]:
         """Return schema."""
@@ -550,9 +809,7 @@ class MemoryGraph(Graph):
         self._edge_count = 0
 
         # clean data and index
-        self._vs.clear()
-        self._oes.clear()
-        self._ies.clear()
+        self._init_storage()
 
     def graphviz(self, name="g"):
         """View graphviz graph: https://dreampuf.github.io/GraphvizOnline."""
@@ -0,0 +1,108 @@
+import pytest
+
+from ..graph import Direction, Edge, IdVertex, MemoryGraph, Vertex
+
+
+@pytest.fixture
+def g():
+    g = MemoryGraph()
+    g.upsert_vertex(Vertex("A", name="a", vertex_type="entity"))
+    g.upsert_vertex(Vertex("B", vertex_type="entity"))
+    g.append_edge(Edge("A", "A", name="r0", edge_type="relation"))
+    g.append_edge(Edge("A", "B", name="r1", weight=1))
+    g.append_edge(Edge("B", "C", name="r2"))
+    g.append_edge(Edge("B", "D", name="r3", weight=2))
+    g.append_edge(Edge("C", "D", name="r4"))
+    g.append_edge(Edge("C", "B", name="r5"))
+    g.append_edge(Edge("C", "E", name="r6", edge_type="relation"))
+    return g
+
+
+def _names(edges):
+    return sorted(e.name for e in edges)
+
+
+def test_append_and_neighbors(g: MemoryGraph):
+    assert g.vertex_count == 5
+    assert g.edge_count == 7
+    assert not g.append_edge(Edge("A", "B", name="r1", weight=3))
+    assert isinstance(g.get_vertex("C"), IdVertex)
+    g.upsert_vertex(Vertex("C", desc="c"))
+    assert g.get_vertex("C").get_prop("desc") == "c"
+
+    assert _names(g.get_neighbor_edges("A", Direction.OUT)) == ["r0", "r1"]
+    assert _names(g.get_neighbor_edges("A", Direction.BOTH)) == ["r0", "r1"]
+    assert _names(g.get_neighbor_edges("B", Direction.IN)) == ["r1", "r5"]
+    assert len(list(g.get_neighbor_edges("B", Direction.BOTH, limit=3))) == 3
+    assert list(g.get_neighbor_edges("X")) == []
+
+
+def test_delete(g: MemoryGraph):
+    g.del_edges("B", "D", "", weight=1)
+    assert g.edge_count == 7
+    g.del_edges("B", "D", "", weight=2)
+    assert g.edge_count == 6
+    g.del_neighbor_edges("A", Direction.OUT)
+    assert g.edge_count == 4
+    assert g.has_vertex("A")
+    g.del_vertices("C")
+    assert g.edge_count == 0
+    assert not g.has_vertex("C")
+    # The slots are reused
+    g.append_edge(Edge("A", "F", name="r7"))
+    assert _names(g.edges()) == ["r7"]
+    assert g.vertex_count == 5
+
+
+def test_indexes(g: MemoryGraph):
+    assert sorted(v.vid for v in g.vertices_by_prop("vertex_type", "entity")) == [
+        "A",
+        "B",
+    ]
+    assert _names(g.edges_by_prop("edge_type", "relation")) == ["r0", "r6"]
+    assert _names(g.edges_by_prop("weight", 2)) == ["r3"]
+    assert _names(g.edges_by_label("r4")) == ["r4"]
+    g.del_edges("C", "E", "r6")
+    assert _names(g.edges_by_prop("edge_type", "relation")) == ["r0"]
+
+
+def test_edge_props_shared(g: MemoryGraph):
+    for edge in g.edges():
+        edge.set_prop("_chunk_id", "c1")
+    assert all(e.get_prop("_chunk_id") == "c1" for e in g.edges())
+
+
+def test_search(g: MemoryGraph):
+    subgraph = g.search(["A"], Direction.OUT, depth=2)
+    assert _names(subgraph.edges()) == ["r0", "r1", "r2", "r3"]
+    subgraph = g.search(["A"], Direction.OUT)
+    assert subgraph.edge_count == 7
+    subgraph = g.search(["B"], Direction.BOTH, depth=1, fan=2)
+    assert subgraph.edge_count == 2
+    subgraph = g.search(["A"], Direction.OUT, limit=3)
+    assert subgraph.edge_count == 3
+    assert g.search(["X"]).vertex_count == 0
+
+
+def test_deep_search():
+    g = MemoryGraph()
+    for i in range(5000):
+        g.append_edge(Edge(str(i), str(i + 1), name="next"))
+    assert g.search(["0"]).edge_count == 5000
+    assert g.search(["0"], depth=10).edge_count == 10
+
+
+def test_save_and_load(g: MemoryGraph, tmp_path):
+    g.del_vertices("E")
+    path = str(tmp_path / "graph.json")
+    g.save(path)
+    loaded = MemoryGraph.load(path)
+    assert loaded.vertex_count == g.vertex_count
+    assert loaded.edge_count == g.edge_count
+    assert sorted(e.triplet() for e in loaded.edges()) == sorted(
+        e.triplet() for e in g.edges()
+    )
+    assert loaded.get_vertex("A").name == "a"
+    assert isinstance(loaded.get_vertex("D"), IdVertex)
+    assert _names(loaded.edges_by_prop("weight", 1)) == ["r1"]
+    assert loaded.schema() == g.schema()
@@ -1,10 +1,10 @@
 """Database storage implementation using SQLAlchemy."""
 
 from contextlib import contextmanager
-from typing import Dict, Iterator, List, Optional, Type, Union
+from typing import Dict, Iterator, List, Optional, Tuple, Type, Union
 
-from sqlalchemy import URL, inspect
-from sqlalchemy.orm import DeclarativeMeta, Session
+from sqlalchemy import URL, inspect, or_
+from sqlalchemy.orm import DeclarativeMeta, Query, Session
 
 from dbgpt.core import Serializer
 from dbgpt.core.interface.storage import (
@@ -28,6 +28,10 @@ def _copy_public_properties(src: BaseModel, dest: BaseModel):
                 setattr(dest, column.key, value)
 
 
+# The max number of the identifiers in one bulk query
+_BULK_QUERY_SIZE = 500
+
+
 class SQLAlchemyStorage(StorageInterface[T, BaseModel]):
     """Database storage implementation using SQLAlchemy."""
 
@@ -109,6 +113,111 @@ class SQLAlchemyStorage(StorageInterface[T, BaseModel]):
             if model_instance:
                 session.delete(model_instance)
 
+    def save_list(self, data: List[T]) -> None:
+        """Save the data to the storage in one session with a bulk insert."""
+        if not data:
+            return
+        with self.session() as session:
+            session.add_all([self.adapter.to_storage_format(d) for d in data])
+
+    def save_or_update_list(self, data: List[T]) -> None:
+        """Save or update the data to the storage in one session.
+
+        The existing data is loaded with set-based queries, then the new data is
+        inserted and the existing data is updated in one flush.
+        """
+        if not data:
+            return
+        with self.session() as session:
+            loaded = self._load_models(session, [d.identifier for d in data])
+            if loaded is not None:
+                models = {k: model for k, (model, _item) in loaded.items()}
+                new_instances = []
+                for d in data:
+                    instance = self.adapter.to_storage_format(d)
+                    key = d.identifier.str_identifier
+                    if key in models:
+                        _copy_public_properties(instance, models[key])
+                    else:
+                        models[key] = instance
+                        new_instances.append(instance)
+                session.add_all(new_instances)
+                return
+        super().save_or_update_list(data)
+
+    def load_list(self, resource_id: List[ResourceIdentifier], cls: Type[T]) -> List[T]:
+        """Load the data with set-based queries.
+
+        The order of the resource identifiers is preserved, and the data which does
+        not exist in the storage is skipped.
+        """
+        if not resource_id:
+            return []
+        with self.session() as session:
+            loaded = self._load_models(session, resource_id)
+            if loaded is not None:
+                return [
+                    loaded[r.str_identifier][1]
+                    for r in resource_id
+                    if r.str_identifier in loaded
+                ]
+        return super().load_list(resource_id, cls)
+
+    def delete_list(self, resource_id: List[ResourceIdentifier]) -> None:
+        """Delete the data with set-based queries.
+
+        The rows are deleted by the query directly, the ORM cascades are not
+        applied.
+        """
+        if not resource_id:
+            return
+        with self.session() as session:
+            queries = [
+                self._query_for_identifiers(session, chunk)
+                for chunk in _chunks(resource_id)
+            ]
+            if all(query is not None for query in queries):
+                for query in queries:
+                    query.delete(synchronize_session=False)
+                return
+        super().delete_list(resource_id)
+
+    def _query_for_identifiers(
+        self, session: Session, resource_ids: List[ResourceIdentifier]
+    ) -> Optional[Query]:
+        """Return one query for the identifiers, None if it is not supported."""
+        query = self.adapter.get_query_for_identifiers(
+            self._model_class, resource_ids, session=session
+        )
+        if query is not None:
+            return query
+        # Combine the filters of the single identifier queries
+        clauses = []
+        for r in resource_ids:
+            single_query = self.adapter.get_query_for_identifier(
+                self._model_class, r, session=session
+            )
+            clause = getattr(single_query, "whereclause", None)
+            if clause is None:
+                return None
+            clauses.append(clause)
+        return session.query(self._model_class).filter(or_(*clauses))
+
+    def _load_models(
+        self, session: Session, resource_ids: List[ResourceIdentifier]
+    ) -> Optional[Dict[str, Tuple[BaseModel, T]]]:
+        """Load the models and the items keyed by the string identifier."""
+        unique_ids = list({r.str_identifier: r for r in resource_ids}.values())
+        loaded: Dict[str, Tuple[BaseModel, T]] = {}
+        for chunk in _chunks(unique_ids):
+            query = self._query_for_identifiers(session, chunk)
+            if query is None:
+                return None
+            for model in query.all():
+                item = self.adapter.from_storage_format(model)
+                loaded[item.identifier.str_identifier] = (model, item)
+        return loaded
+
     def query(self, spec: QuerySpec, cls: Type[T]) -> List[T]:
         """Query data from the storage.
 
@@ -144,3 +253,10 @@ class SQLAlchemyStorage(StorageInterface[T, BaseModel]):
                 if value is not None:
                     query = query.filter(getattr(self._model_class, key) == value)
             return query.count()
+
+
+def _chunks(
+    resource_ids: List[ResourceIdentifier],
+) -> Iterator[List[ResourceIdentifier]]:
+    for i in range(0, len(resource_ids), _BULK_QUERY_SIZE):
+        yield resource_ids[i : i + _BULK_QUERY_SIZE]
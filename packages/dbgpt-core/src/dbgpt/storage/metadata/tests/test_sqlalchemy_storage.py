@@ -1,7 +1,7 @@
 from typing import Dict, Type
 
 import pytest
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, event
 from sqlalchemy.orm import Session, declarative_base
 
 from dbgpt.core.interface.storage import (
@@ -169,3 +169,49 @@ def test_paginate_query(sqlalchemy_storage):
     assert page_result.page == page_number
     assert page_result.total_pages == 4
     assert page_result.total_count == 10
+
+
+def _count_statements(storage):
+    statements = []
+    event.listen(
+        storage.db_manager.engine,
+        "before_cursor_execute",
+        lambda *args, **kwargs: statements.append(args[2]),
+    )
+    return statements
+
+
+def test_bulk_load_and_save(sqlalchemy_storage):
+    statements = _count_statements(sqlalchemy_storage)
+    sqlalchemy_storage.save_list(
+        [
+            MockStorageItem(MockResourceIdentifier(str(i)), f"test_data_{i}")
+            for i in range(10)
+        ]
+    )
+    ids = [MockResourceIdentifier(str(i)) for i in [7, 100, 3, 5]]
+    statements.clear()
+    items = sqlalchemy_storage.load_list(ids, MockStorageItem)
+    # The order is preserved and the missing item is skipped
+    assert [item.data for item in items] == [
+        "test_data_7",
+        "test_data_3",
+        "test_data_5",
+    ]
+    assert len(statements) == 1
+
+    sqlalchemy_storage.save_or_update_list(
+        [
+            MockStorageItem(MockResourceIdentifier("3"), "updated"),
+            MockStorageItem(MockResourceIdentifier("20"), "new"),
+        ]
+    )
+    items = sqlalchemy_storage.load_list(
+        [MockResourceIdentifier("3"), MockResourceIdentifier("20")], MockStorageItem
+    )
+    assert [item.data for item in items] == ["updated", "new"]
+
+    sqlalchemy_storage.delete_list(
+        [MockResourceIdentifier("3"), MockResourceIdentifier("20")]
+    )
+    assert sqlalchemy_storage.count(QuerySpec(conditions={}), MockStorageItem) == 9
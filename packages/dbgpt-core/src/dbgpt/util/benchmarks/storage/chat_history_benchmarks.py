@@ -0,0 +1,105 @@
+"""Benchmark the database round-trips of a chat turn.
+
+A chat turn loads the conversation with all its messages, appends the new messages
+and saves the conversation. The per-row storage is the behavior of the default
+list methods of :class:`StorageInterface`, which run one query per message.
+
+Usage:
+
+    .. code-block:: shell
+
+        python -m dbgpt.util.benchmarks.storage.chat_history_benchmarks \\
+            --message_nums 10,50,200
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import List
+
+from sqlalchemy import event
+
+from dbgpt.core.interface.message import StorageConversation
+from dbgpt.core.interface.storage import StorageInterface
+from dbgpt.storage.chat_history.chat_history_db import (
+    ChatHistoryEntity,
+    ChatHistoryMessageEntity,
+)
+from dbgpt.storage.chat_history.storage_adapter import (
+    DBMessageStorageItemAdapter,
+    DBStorageConversationItemAdapter,
+)
+from dbgpt.storage.metadata import db
+from dbgpt.storage.metadata.db_storage import SQLAlchemyStorage
+
+
+class _PerRowSQLAlchemyStorage(SQLAlchemyStorage):
+    """The storage which loads and saves the data one by one."""
+
+    def save_list(self, data):
+        StorageInterface.save_list(self, data)
+
+    def save_or_update_list(self, data):
+        StorageInterface.save_or_update_list(self, data)
+
+    def load_list(self, resource_id, cls):
+        return StorageInterface.load_list(self, resource_id, cls)
+
+    def delete_list(self, resource_id):
+        StorageInterface.delete_list(self, resource_id)
+
+
+def _chat_turn(conv_uid: str, conv_storage, message_storage):
+    conversation = StorageConversation(
+        conv_uid,
+        chat_mode="chat_normal",
+        user_name="benchmark",
+        conv_storage=conv_storage,
+        message_storage=message_storage,
+    )
+    conversation.start_new_round()
+    conversation.add_user_message("hello")
+    conversation.add_ai_message("hi")
+    conversation.end_current_round()
+
+
+def run_benchmarks(message_nums: List[int]):
+    statements: List[str] = []
+    event.listen(
+        db.engine,
+        "before_cursor_execute",
+        lambda *args, **kwargs: statements.append(args[2]),
+    )
+    print(f"{'storage':<10}{'messages':>10}{'round-trips':>14}{'latency(ms)':>14}")
+    for storage_cls in [_PerRowSQLAlchemyStorage, SQLAlchemyStorage]:
+        name = "per-row" if storage_cls is _PerRowSQLAlchemyStorage else "bulk"
+        conv_storage = storage_cls(
+            db, ChatHistoryEntity, DBStorageConversationItemAdapter()
+        )
+        message_storage = storage_cls(
+            db, ChatHistoryMessageEntity, DBMessageStorageItemAdapter()
+        )
+        for message_num in message_nums:
+            conv_uid = f"{name}_{message_num}"
+            # Every chat turn adds two messages
+            for _i in range(message_num // 2):
+                _chat_turn(conv_uid, conv_storage, message_storage)
+            statements.clear()
+            start = time.perf_counter()
+            _chat_turn(conv_uid, conv_storage, message_storage)
+            cost_ms = (time.perf_counter() - start) * 1000
+            print(f"{name:<10}{message_num:>10}{len(statements):>14}{cost_ms:>14.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db_url", type=str, default=None)
+    parser.add_argument("--message_nums", type=str, default="10,50,200")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_url = args.db_url or f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+        db.init_db(db_url)
+        db.create_all()
+        run_benchmarks([int(n) for n in args.message_nums.split(",")])
@@ -2,18 +2,42 @@
 
 Adapted from https://github.com/hephex/asyncache/blob/master/asyncache/__init__.py.
 It has stopped updating since 2022. So I copied the code here for future reference.
+
+Extended with single-flight coalescing of the concurrent misses, stale-while-
+revalidate and eviction callbacks.
 """
 
 import asyncio
 import functools
+import inspect
+import logging
+import threading
+import time
 from contextlib import AbstractContextManager
-from typing import Any, Callable, MutableMapping, Optional, Protocol, TypeVar
+from dataclasses import asdict, dataclass
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    MutableMapping,
+    Optional,
+    Protocol,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 from cachetools import keys
 
+logger = logging.getLogger(__name__)
+
 _KT = TypeVar("_KT")
 _T = TypeVar("_T")
 
+EvictCallback = Callable[[Any, Any], Union[None, Awaitable[None]]]
+
 
 class IdentityFunction(Protocol):  # pylint: disable=too-few-public-methods
     """
@@ -43,12 +67,72 @@ class NullContext:
         return None
 
 
+@dataclass
+class CacheStats:
+    """The counters of a cached function."""
+
+    hits: int = 0
+    misses: int = 0
+    # The misses waiting for the computation of another caller
+    coalesced: int = 0
+    # The misses served with a stale value while refreshing in the background
+    stale_hits: int = 0
+    evictions: int = 0
+    refresh_errors: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        """Convert to dict."""
+        return asdict(self)
+
+
+class _SyncCall:
+    """An in-flight computation of a standard function."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+    def wait(self) -> Any:
+        self.event.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def _collect_evicted(
+    cache: MutableMapping[_KT, Any], setting: Optional[_KT] = None
+) -> Tuple[List[Tuple[Any, Any]], Optional[Dict[Any, Any]]]:
+    """Expire the cache, return the expired items and the items before setting.
+
+    The items are only copied when setting a new key to a full cache, which may
+    evict an item.
+    """
+    expired = []
+    expire = getattr(cache, "expire", None)
+    if callable(expire):
+        expired = list(expire() or [])
+    before = None
+    maxsize = getattr(cache, "maxsize", None)
+    if (
+        setting is not None
+        and maxsize is not None
+        and setting not in cache
+        and getattr(cache, "currsize", len(cache)) >= maxsize
+    ):
+        before = dict(cache.items())
+    return expired, before
+
+
 def cached(
     cache: Optional[MutableMapping[_KT, Any]],
     # ignoring the mypy error to be consistent with the type used
     # in https://github.com/python/typeshed/tree/master/stubs/cachetools
     key: Callable[..., _KT] = keys.hashkey,  # type:ignore
     lock: Optional["AbstractContextManager[Any]"] = None,
+    single_flight: bool = True,
+    stale_ttl: Optional[float] = None,
+    on_evict: Optional[EvictCallback] = None,
 ) -> IdentityFunction:
     """
     Decorator to wrap a function or a coroutine with a memoizing callable
@@ -58,54 +142,220 @@ def cached(
     implement ``__enter__`` and ``__exit__`` that will be used to lock
     the cache when gets updated. If it wraps a coroutine, ``lock``
     must implement ``__aenter__`` and ``__aexit__``.
+
+    When ``single_flight`` is True, the concurrent misses of the same key wait
+    for one computation instead of computing it again, an exception is raised to
+    all of them and is not cached.
+
+    When ``stale_ttl`` is set, a value which left the cache (e.g. expired in a
+    ``TTLCache``) is still returned for ``stale_ttl`` seconds after its TTL, and
+    the value is refreshed in the background.
+
+    ``on_evict`` is called with the key and the value of every expired or evicted
+    item, it can be a coroutine function.
+
+    The counters are exposed as ``cache_stats`` of the wrapped function.
     """
     lock = lock or NullContext()
+    stats = CacheStats()
+    # Guard the in-flight calls and the stale values
+    state_lock = threading.Lock()
+    stale_values: Dict[Any, Tuple[Any, float]] = {}
+
+    def _fire_evicted(items: List[Tuple[Any, Any]]) -> None:
+        if not items:
+            return
+        stats.evictions += len(items)
+        if not on_evict:
+            return
+        for k, v in items:
+            try:
+                res = on_evict(k, v)
+                if inspect.isawaitable(res):
+                    try:
+                        asyncio.get_running_loop().create_task(res)  # type: ignore
+                    except RuntimeError:
+                        asyncio.run(res)  # type: ignore
+            except Exception as e:
+                logger.warning(f"Cache eviction callback failed: {e}")
+
+    def _after_set(k: Any, val: Any, before: Optional[Dict[Any, Any]]) -> None:
+        evicted = []
+        if before is not None:
+            evicted = [(bk, bv) for bk, bv in before.items() if bk not in cache]
+        _fire_evicted(evicted)
+        if stale_ttl is None:
+            return
+        now = time.monotonic()
+        deadline = now + getattr(cache, "ttl", 0) + stale_ttl
+        with state_lock:
+            for sk in [sk for sk, (_, d) in stale_values.items() if d <= now]:
+                del stale_values[sk]
+            stale_values[k] = (val, deadline)
+
+    def _get_stale(k: Any) -> Tuple[bool, Any]:
+        if stale_ttl is None:
+            return False, None
+        with state_lock:
+            item = stale_values.get(k)
+            if item is None:
+                return False, None
+            if item[1] <= time.monotonic():
+                del stale_values[k]
+                return False, None
+            return True, item[0]
 
     def decorator(func):
         if asyncio.iscoroutinefunction(func):
+            inflight: Dict[Any, "asyncio.Future"] = {}
 
-            async def wrapper(*args, **kwargs):
-                k = key(*args, **kwargs)
-                try:
-                    async with lock:
-                        return cache[k]
-
-                except KeyError:
-                    pass  # key not found
-
+            async def compute(k, args, kwargs):
                 val = await func(*args, **kwargs)
-
                 try:
                     async with lock:
+                        expired, before = _collect_evicted(cache, k)
                         cache[k] = val
 
                 except ValueError:
-                    pass  # val too large
-
+                    before = None  # val too large
+                _fire_evicted(expired)
+                _after_set(k, val, before)
                 return val
 
-        else:
+            def _running(k) -> Optional["asyncio.Future"]:
+                fut = inflight.get(k)
+                if (
+                    fut is not None
+                    and not fut.done()
+                    and fut.get_loop() is asyncio.get_running_loop()
+                ):
+                    return fut
+                return None
 
-            def wrapper(*args, **kwargs):
+            def _start(k, args, kwargs) -> "asyncio.Future":
+                fut = asyncio.get_running_loop().create_task(compute(k, args, kwargs))
+                inflight[k] = fut
+
+                def _done(f: "asyncio.Future"):
+                    if inflight.get(k) is f:
+                        del inflight[k]
+
+                fut.add_done_callback(_done)
+                return fut
+
+            def _log_refresh_error(f: "asyncio.Future"):
+                if not f.cancelled() and f.exception() is not None:
+                    stats.refresh_errors += 1
+                    logger.warning(f"Refresh cached value failed: {f.exception()}")
+
+            async def wrapper(*args, **kwargs):
                 k = key(*args, **kwargs)
                 try:
-                    with lock:
-                        return cache[k]
+                    async with lock:
+                        expired, _ = _collect_evicted(cache)
+                        val = cache[k]
+                    stats.hits += 1
+                    _fire_evicted(expired)
+                    return val
 
                 except KeyError:
                     pass  # key not found
+                _fire_evicted(expired)
+
+                found, stale = _get_stale(k)
+                if found:
+                    stats.stale_hits += 1
+                    if _running(k) is None:
+                        _start(k, args, kwargs).add_done_callback(_log_refresh_error)
+                    return stale
+
+                if not single_flight:
+                    stats.misses += 1
+                    return await compute(k, args, kwargs)
+                fut = _running(k)
+                if fut is not None:
+                    stats.coalesced += 1
+                else:
+                    stats.misses += 1
+                    fut = _start(k, args, kwargs)
+                return await asyncio.shield(fut)
 
-                val = func(*args, **kwargs)
+        else:
+            sync_inflight: Dict[Any, _SyncCall] = {}
 
+            def compute(k, args, kwargs):
+                val = func(*args, **kwargs)
                 try:
                     with lock:
+                        expired, before = _collect_evicted(cache, k)
                         cache[k] = val
 
                 except ValueError:
-                    pass  # val too large
-
+                    before = None  # val too large
+                _fire_evicted(expired)
+                _after_set(k, val, before)
                 return val
 
-        return functools.wraps(func)(wrapper)
+            def run_call(k, call: _SyncCall, args, kwargs):
+                try:
+                    call.result = compute(k, args, kwargs)
+                except BaseException as e:
+                    call.error = e
+                finally:
+                    with state_lock:
+                        sync_inflight.pop(k, None)
+                    call.event.set()
+
+            def refresh(k, call: _SyncCall, args, kwargs):
+                run_call(k, call, args, kwargs)
+                if call.error is not None:
+                    stats.refresh_errors += 1
+                    logger.warning(f"Refresh cached value failed: {call.error}")
+
+            def wrapper(*args, **kwargs):
+                k = key(*args, **kwargs)
+                try:
+                    with lock:
+                        expired, _ = _collect_evicted(cache)
+                        val = cache[k]
+                    stats.hits += 1
+                    _fire_evicted(expired)
+                    return val
+
+                except KeyError:
+                    pass  # key not found
+                _fire_evicted(expired)
+
+                found, stale = _get_stale(k)
+                if found:
+                    stats.stale_hits += 1
+                    with state_lock:
+                        started = k in sync_inflight
+                        if not started:
+                            call = sync_inflight[k] = _SyncCall()
+                    if not started:
+                        threading.Thread(
+                            target=refresh, args=(k, call, args, kwargs), daemon=True
+                        ).start()
+                    return stale
+
+                if not single_flight:
+                    stats.misses += 1
+                    return compute(k, args, kwargs)
+                with state_lock:
+                    call = sync_inflight.get(k)
+                    leader = call is None
+                    if leader:
+                        call = sync_inflight[k] = _SyncCall()
+                if not leader:
+                    stats.coalesced += 1
+                    return call.wait()
+                stats.misses += 1
+                run_call(k, call, args, kwargs)
+                return call.wait()
+
+        wrapper = functools.wraps(func)(wrapper)
+        wrapper.cache_stats = stats  # type: ignore
+        return wrapper
 
     return decorator
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cachetools
+import pytest
+
+from ..cache_utils import cached
+
+
+@pytest.mark.asyncio
+async def test_async_single_flight():
+    calls = []
+
+    @cached(cachetools.TTLCache(maxsize=10, ttl=10))
+    async def compute(x: int) -> int:
+        calls.append(x)
+        await asyncio.sleep(0.05)
+        return x * 2
+
+    results = await asyncio.gather(*[compute(1) for _ in range(10)], compute(2))
+    assert results == [2] * 10 + [4]
+    assert calls == [1, 2]
+    assert await compute(1) == 2
+    assert compute.cache_stats.to_dict() == {
+        "hits": 1,
+        "misses": 2,
+        "coalesced": 9,
+        "stale_hits": 0,
+        "evictions": 0,
+        "refresh_errors": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_async_error_not_cached():
+    calls = []
+
+    @cached(cachetools.TTLCache(maxsize=10, ttl=10))
+    async def compute(x: int) -> int:
+        calls.append(x)
+        await asyncio.sleep(0.01)
+        if len(calls) == 1:
+            raise ValueError("failed")
+        return x
+
+    results = await asyncio.gather(compute(1), compute(1), return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+    assert await compute(1) == 1
+    assert len(calls) == 2
+
+
+def test_sync_single_flight():
+    calls = []
+    started = threading.Event()
+
+    @cached(cachetools.TTLCache(maxsize=10, ttl=10))
+    def compute(x: int) -> int:
+        calls.append(x)
+        started.set()
+        time.sleep(0.1)
+        return x + 1
+
+    with ThreadPoolExecutor(4) as pool:
+        first = pool.submit(compute, 1)
+        started.wait()
+        others = [pool.submit(compute, 1) for _ in range(3)]
+        assert [f.result() for f in [first] + others] == [2] * 4
+    assert calls == [1]
+    assert compute.cache_stats.coalesced == 3
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate_and_eviction_callback():
+    evicted = []
+    version = {"value": 0}
+
+    async def on_evict(key, value):
+        evicted.append(value)
+
+    @cached(cachetools.TTLCache(maxsize=10, ttl=0.05), stale_ttl=10, on_evict=on_evict)
+    async def compute(x: int) -> str:
+        version["value"] += 1
+        await asyncio.sleep(0.01)
+        return f"{x}-{version['value']}"
+
+    assert await compute(1) == "1-1"
+    await asyncio.sleep(0.1)
+    # Expired, the stale value is returned and refreshed in the background
+    assert await compute(1) == "1-1"
+    assert await compute(1) == "1-1"
+    await asyncio.sleep(0.03)
+    assert await compute(1) == "1-2"
+    assert version["value"] == 2
+    assert evicted == ["1-1"]
+    assert compute.cache_stats.stale_hits == 2
+    assert compute.cache_stats.evictions == 1
+
+
+def test_sync_evict_by_size():
+    evicted = []
+
+    @cached(cachetools.LRUCache(maxsize=1), on_evict=lambda k, v: evicted.append(v))
+    def compute(x: int) -> int:
+        return x * 10
+
+    assert compute(1) == 10
+    assert compute(2) == 20
+    assert compute(2) == 20
+    assert evicted == [10]
+    assert compute.cache_stats.hits == 1
@@ -9,8 +9,10 @@ from dbgpt.util.tracer.base import (
     TracerContext,
 )
 from dbgpt.util.tracer.span_storage import (
+    CompressedFileSpanStorage,
     FileSpanStorage,
     MemorySpanStorage,
+    SpanExportPipeline,
     SpanStorageContainer,
 )
 from dbgpt.util.tracer.tracer_impl import (
@@ -34,6 +36,8 @@ __all__ = [
     "MemorySpanStorage",
     "FileSpanStorage",
     "SpanStorageContainer",
+    "CompressedFileSpanStorage",
+    "SpanExportPipeline",
     "root_tracer",
     "trace",
     "initialize_tracer",
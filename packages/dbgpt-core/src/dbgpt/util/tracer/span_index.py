@@ -0,0 +1,374 @@
+"""The SQLite index of the span files for the trace CLI.
+
+Every query of the CLI used to parse all the spans of all the span files. The
+index keeps the searchable fields of every span(trace id, span type, operation
+name, time, latency, model and AWEL node) in a SQLite database, and it is updated
+incrementally: only the bytes appended to a span file since the last update are
+parsed. A file truncated or replaced(e.g. rolled over by date) is indexed again.
+"""
+
+import fnmatch
+import glob
+import json
+import logging
+import os
+import sqlite3
+import zlib
+from datetime import datetime
+from itertools import groupby
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from dbgpt.util.tracer.span_storage import is_compressed_span_file, read_span_batches
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA_VERSION = 1
+# The bytes to check whether a file is replaced
+_HEAD_BYTES = 256
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS span_files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    indexed_offset INTEGER NOT NULL DEFAULT 0,
+    head_crc INTEGER,
+    head_len INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS spans (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL,
+    trace_id TEXT,
+    span_id TEXT,
+    parent_span_id TEXT,
+    span_type TEXT,
+    operation_name TEXT,
+    start_time TEXT,
+    end_time TEXT,
+    duration_ms REAL,
+    model_name TEXT,
+    node_name TEXT,
+    has_error INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_spans_trace_id ON spans (trace_id, start_time);
+CREATE INDEX IF NOT EXISTS idx_spans_span_id ON spans (span_id);
+CREATE INDEX IF NOT EXISTS idx_spans_type_time ON spans (span_type, start_time);
+CREATE INDEX IF NOT EXISTS idx_spans_operation_time
+    ON spans (operation_name, start_time);
+CREATE INDEX IF NOT EXISTS idx_spans_start_time ON spans (start_time);
+CREATE INDEX IF NOT EXISTS idx_spans_file_id ON spans (file_id);
+"""
+
+GROUP_BY_COLUMNS = {
+    "operation": "e.operation_name",
+    "model": "COALESCE(e.model_name, s.model_name)",
+    "node": "COALESCE(e.node_name, s.node_name)",
+}
+
+
+def _parse_datetime(dt_str: str) -> datetime:
+    return datetime.strptime(dt_str, _TIME_FORMAT)
+
+
+def normalize_time(dt_str: str) -> str:
+    """Normalize the time to the format of the spans, for the string comparison."""
+    return _parse_datetime(dt_str).strftime(_TIME_FORMAT)[:-3]
+
+
+def _head_crc(path: str, length: int) -> int:
+    with open(path, "rb") as f:
+        return zlib.crc32(f.read(length))
+
+
+def _span_row(file_id: int, span: Dict) -> Tuple:
+    metadata = span.get("metadata")
+    if not isinstance(metadata, dict):
+        metadata = {}
+    duration_ms = None
+    if span.get("start_time") and span.get("end_time"):
+        try:
+            duration = _parse_datetime(span["end_time"]) - _parse_datetime(
+                span["start_time"]
+            )
+            duration_ms = duration.total_seconds() * 1000
+        except ValueError:
+            pass
+    model_name = metadata.get("model_name") or metadata.get("model")
+    return (
+        file_id,
+        span.get("trace_id"),
+        span.get("span_id"),
+        span.get("parent_span_id"),
+        span.get("span_type"),
+        span.get("operation_name"),
+        span.get("start_time"),
+        span.get("end_time"),
+        duration_ms,
+        str(model_name) if model_name else None,
+        metadata.get("awel_node_name") or metadata.get("awel_node_type"),
+        1 if "error" in metadata else 0,
+        json.dumps(span, ensure_ascii=False),
+    )
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    # Nearest-rank percentile
+    index = max(0, int(len(sorted_values) * percent / 100 + 0.999999) - 1)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+class SpanIndex:
+    """The incrementally updated SQLite index of the span files."""
+
+    def __init__(self, db_path: str = ":memory:"):
+        """Create a new SpanIndex.
+
+        Args:
+            db_path (str): The path of the SQLite database, in memory by default.
+        """
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != _SCHEMA_VERSION:
+            self._conn.executescript(
+                "DROP TABLE IF EXISTS spans; DROP TABLE IF EXISTS span_files;"
+            )
+            self._conn.execute(f"PRAGMA user_version={_SCHEMA_VERSION}")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        """Close the database."""
+        self._conn.close()
+
+    def update(self, patterns: Iterable[str]) -> List[int]:
+        """Index the new spans of the files matched by the glob patterns.
+
+        Returns:
+            List[int]: The ids of the matched files, to scope the queries.
+        """
+        patterns = [os.path.abspath(p) for p in patterns]
+        paths = sorted(
+            {os.path.abspath(path) for p in patterns for path in glob.glob(p)}
+        )
+        indexed = {
+            path: (file_id, offset, head_crc, head_len)
+            for file_id, path, offset, head_crc, head_len in self._conn.execute(
+                "SELECT id, path, indexed_offset, head_crc, head_len FROM span_files"
+            )
+        }
+        # Remove the deleted files
+        for path, (file_id, *_) in indexed.items():
+            if path not in paths and any(fnmatch.fnmatch(path, p) for p in patterns):
+                self._delete_file(file_id)
+        file_ids = []
+        for path in paths:
+            if not os.path.isfile(path):
+                continue
+            try:
+                file_ids.append(self._update_file(path, indexed.get(path)))
+            except Exception as e:
+                logger.warning(f"Index span file {path} failed: {e}")
+        return file_ids
+
+    def _delete_file(self, file_id: int):
+        with self._conn:
+            self._conn.execute("DELETE FROM spans WHERE file_id = ?", (file_id,))
+            self._conn.execute("DELETE FROM span_files WHERE id = ?", (file_id,))
+
+    def _update_file(self, path: str, indexed: Optional[Tuple]) -> int:
+        size = os.path.getsize(path)
+        if indexed:
+            file_id, offset, head_crc, head_len = indexed
+            if size == offset and size >= head_len:
+                # Nothing appended, skip the checksum if the size doesn't change
+                return file_id
+            if size < offset or _head_crc(path, head_len) != head_crc:
+                logger.info(f"Span file {path} is replaced, index it again")
+                self._delete_file(file_id)
+                indexed = None
+        if not indexed:
+            with self._conn:
+                cursor = self._conn.execute(
+                    "INSERT INTO span_files (path) VALUES (?)", (path,)
+                )
+            file_id, offset = cursor.lastrowid, 0
+
+        if is_compressed_span_file(path):
+            batches = self._read_compressed(path, offset)
+        else:
+            batches = self._read_lines(path, offset)
+        with self._conn:
+            for end_offset, spans in batches:
+                self._conn.executemany(
+                    "INSERT INTO spans (file_id, trace_id, span_id, parent_span_id, "
+                    "span_type, operation_name, start_time, end_time, duration_ms, "
+                    "model_name, node_name, has_error, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [_span_row(file_id, span) for span in spans],
+                )
+                offset = end_offset
+            head_len = min(offset, _HEAD_BYTES)
+            self._conn.execute(
+                "UPDATE span_files SET indexed_offset = ?, head_crc = ?, head_len = ? "
+                "WHERE id = ?",
+                (offset, _head_crc(path, head_len), head_len, file_id),
+            )
+        return file_id
+
+    @staticmethod
+    def _read_lines(
+        path: str, offset: int, batch_lines: int = 5000
+    ) -> Iterator[Tuple[int, List[Dict]]]:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            spans = []
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Being written, index it next time
+                    break
+                offset += len(line)
+                line = line.strip()
+                if line:
+                    try:
+                        spans.append(json.loads(line))
+                    except ValueError as e:
+                        logger.warning(f"Invalid span in {path}: {e}")
+                if len(spans) >= batch_lines:
+                    yield offset, spans
+                    spans = []
+            yield offset, spans
+
+    @staticmethod
+    def _read_compressed(path: str, offset: int) -> Iterator[Tuple[int, List[Dict]]]:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            yield from read_span_batches(f)
+
+    def query(
+        self,
+        file_ids: List[int],
+        trace_id: Optional[str] = None,
+        span_id: Optional[str] = None,
+        span_types: Optional[List[str]] = None,
+        parent_span_id: Optional[str] = None,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        search: Optional[str] = None,
+        desc: bool = False,
+        limit: Optional[int] = None,
+    ) -> Iterator[Dict]:
+        """Query the spans ordered by the start time, the results are streamed.
+
+        Args:
+            search (Optional[str]): The spans which contain the text, it's a
+                superset of the search of the CLI, filter the results again to
+                match the fields exactly.
+        """
+        if not file_ids:
+            return
+        conditions = [f"file_id IN ({','.join('?' * len(file_ids))})"]
+        params: List[Any] = list(file_ids)
+        for column, value in [
+            ("trace_id", trace_id),
+            ("span_id", span_id),
+            ("parent_span_id", parent_span_id),
+        ]:
+            if value:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if span_types:
+            conditions.append(f"span_type IN ({','.join('?' * len(span_types))})")
+            params.extend(span_types)
+        if start_time:
+            conditions.append("start_time >= ?")
+            params.append(normalize_time(start_time))
+        if end_time:
+            conditions.append("start_time <= ?")
+            params.append(normalize_time(end_time))
+        if search:
+            conditions.append("instr(data, ?) > 0")
+            params.append(search)
+        sql = (
+            f"SELECT data FROM spans WHERE {' AND '.join(conditions)} "
+            f"ORDER BY start_time {'DESC' if desc else 'ASC'}, id "
+            f"{'DESC' if desc else 'ASC'}"
+        )
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        for (data,) in self._conn.execute(sql, params):
+            yield json.loads(data)
+
+    def latency_report(
+        self,
+        file_ids: List[int],
+        group_by: str = "operation",
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        operation: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """The latency percentiles of the finished spans.
+
+        Args:
+            group_by (str): Group by the operation, the model or the AWEL node.
+            operation (Optional[str]): Only the spans of the operation.
+
+        Returns:
+            List[Dict[str, Any]]: The count, error count, p50, p95, p99 and max
+                latency(in milliseconds) of every group, the slowest p95 first.
+        """
+        if group_by not in GROUP_BY_COLUMNS:
+            raise ValueError(
+                f"Invalid group_by {group_by}, valid values: {list(GROUP_BY_COLUMNS)}"
+            )
+        if not file_ids:
+            return []
+        key = GROUP_BY_COLUMNS[group_by]
+        conditions = [
+            f"e.file_id IN ({','.join('?' * len(file_ids))})",
+            "e.duration_ms IS NOT NULL",
+        ]
+        params: List[Any] = list(file_ids)
+        if start_time:
+            conditions.append("e.start_time >= ?")
+            params.append(normalize_time(start_time))
+        if end_time:
+            conditions.append("e.start_time <= ?")
+            params.append(normalize_time(end_time))
+        if operation:
+            conditions.append("e.operation_name = ?")
+            params.append(operation)
+        # The metadata of the end span may not have the model and node, read them
+        # from the start span
+        sql = (
+            f"SELECT {key} AS group_key, e.duration_ms, e.has_error FROM spans e "
+            "LEFT JOIN spans s ON s.span_id = e.span_id AND s.end_time IS NULL "
+            f"AND s.file_id = e.file_id WHERE {' AND '.join(conditions)} "
+            f"AND {key} IS NOT NULL ORDER BY group_key, e.duration_ms"
+        )
+        report = []
+        rows = self._conn.execute(sql, params)
+        for group_key, group in groupby(rows, key=lambda row: row[0]):
+            durations = []
+            errors = 0
+            for _key, duration, has_error in group:
+                durations.append(duration)
+                errors += has_error
+            report.append(
+                {
+                    group_by: group_key,
+                    "count": len(durations),
+                    "errors": errors,
+                    "p50": _percentile(durations, 50),
+                    "p95": _percentile(durations, 95),
+                    "p99": _percentile(durations, 99),
+                    "max": durations[-1],
+                }
+            )
+        report.sort(key=lambda item: item["p95"], reverse=True)
+        return report
@@ -3,10 +3,13 @@ import json
 import logging
 import os
 import queue
+import struct
 import threading
 import time
+import zlib
+from collections import OrderedDict, deque
 from concurrent.futures import Executor, ThreadPoolExecutor
-from typing import List
+from typing import Any, BinaryIO, Deque, Dict, Iterator, List, Optional, Tuple
 
 from dbgpt.component import SystemApp
 from dbgpt.util.tracer.base import Span, SpanStorage
@@ -164,3 +167,270 @@ class FileSpanStorage(SpanStorage):
                     logger.warning(
                         f"Write span to file failed: {str(e)}, span_data: {span_data}"
                     )
+
+
+# Every batch is written as: magic(4 bytes) + length(4 bytes, big-endian) + zlib
+# compressed JSON lines of the spans.
+_SPAN_BATCH_MAGIC = b"DBSB"
+_SPAN_BATCH_HEADER = struct.Struct(">4sI")
+COMPRESSED_SPAN_FILE_SUFFIX = ".spans"
+
+
+def is_compressed_span_file(filename: str) -> bool:
+    """Whether the file is written by :class:`CompressedFileSpanStorage`."""
+    with open(filename, "rb") as f:
+        return f.read(len(_SPAN_BATCH_MAGIC)) == _SPAN_BATCH_MAGIC
+
+
+def read_compressed_spans(filename: str) -> Iterator[Dict]:
+    """Read the spans from a file written by :class:`CompressedFileSpanStorage`.
+
+    A batch torn by a crash at the end of the file is skipped.
+    """
+    with open(filename, "rb") as f:
+        for _end_offset, spans in read_span_batches(f):
+            yield from spans
+
+
+def read_span_batches(f: BinaryIO) -> Iterator[Tuple[int, List[Dict]]]:
+    """Read the complete span batches from the current position of the file.
+
+    Returns:
+        Iterator[Tuple[int, List[Dict]]]: The end offset and the spans of every
+            batch.
+    """
+    while True:
+        header = f.read(_SPAN_BATCH_HEADER.size)
+        if len(header) < _SPAN_BATCH_HEADER.size:
+            return
+        magic, length = _SPAN_BATCH_HEADER.unpack(header)
+        if magic != _SPAN_BATCH_MAGIC:
+            logger.warning(f"Invalid span batch in {f.name}, stop reading")
+            return
+        payload = f.read(length)
+        if len(payload) < length:
+            logger.warning(f"Incomplete span batch at the end of {f.name}")
+            return
+        lines = zlib.decompress(payload).decode("utf8").splitlines()
+        yield f.tell(), [json.loads(line) for line in lines if line]
+
+
+class CompressedFileSpanStorage(FileSpanStorage):
+    """Write the spans to a file as compressed, length-prefixed batches.
+
+    The file has the suffix `.spans` instead of the suffix of the given filename,
+    and it is rolled over by date like :class:`FileSpanStorage`.
+    """
+
+    def __init__(self, filename: str, compress_level: int = 6):
+        prefix, _ = os.path.splitext(filename)
+        super().__init__(prefix + COMPRESSED_SPAN_FILE_SUFFIX)
+        self.compress_level = compress_level
+
+    def _write_to_file(self, spans: List[Span]):
+        lines = []
+        for span in spans:
+            span_data = span.to_dict()
+            try:
+                lines.append(json.dumps(span_data, ensure_ascii=False))
+            except Exception as e:
+                logger.warning(
+                    f"Write span to file failed: {str(e)}, span_data: {span_data}"
+                )
+        if not lines:
+            return
+        payload = zlib.compress("\n".join(lines).encode("utf8"), self.compress_level)
+        self._roll_over_if_needed()
+        with open(self.filename, "ab") as file:
+            file.write(_SPAN_BATCH_HEADER.pack(_SPAN_BATCH_MAGIC, len(payload)))
+            file.write(payload)
+
+
+class _PendingTrace:
+    def __init__(self, deadline: float):
+        self.deadline = deadline
+        self.spans: List[Span] = []
+
+
+class SpanExportPipeline(SpanStorage):
+    """Export the spans to the storages in the background with low overhead.
+
+    `append_span` only appends the span to a bounded ring buffer(`deque.append` is
+    atomic, no lock is taken), a flusher thread drains the buffer, samples the
+    traces and writes the spans to the storages in batches. When the storages
+    can't keep up, the oldest spans are dropped once `max_buffered_spans` spans
+    are buffered, so the memory is bounded.
+
+    Sampling:
+        - Head-based: a trace is kept with the probability `sample_rate`, decided
+            by its trace id, so all the services make the same decision.
+        - Tail-based: the spans of the other traces are held for `tail_window`
+            seconds, the whole trace is kept if any of its spans is slower than
+            `slow_threshold` seconds or has an error.
+    """
+
+    def __init__(
+        self,
+        system_app: SystemApp | None = None,
+        sample_rate: float = 1.0,
+        slow_threshold: Optional[float] = 1.0,
+        tail_window: float = 30,
+        max_buffered_spans: int = 10000,
+        batch_size: int = 512,
+        flush_interval: float = 1.0,
+    ):
+        super().__init__(system_app)
+        self.storages: List[SpanStorage] = []
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+        self.tail_window = tail_window
+        self.max_buffered_spans = max_buffered_spans
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._sample_bound = int(max(0.0, min(sample_rate, 1.0)) * 0xFFFFFFFF)
+        self._buffer: Deque[Span] = deque(maxlen=max_buffered_spans)
+        # Accessed by the flusher thread only
+        self._pending: "OrderedDict[str, _PendingTrace]" = OrderedDict()
+        self._pending_spans = 0
+        self._kept_traces: "OrderedDict[str, float]" = OrderedDict()
+        self._stats = {
+            "dropped": 0,
+            "sampled_out": 0,
+            "exported": 0,
+            "batches": 0,
+            "write_errors": 0,
+        }
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._flush_thread = threading.Thread(
+            target=self._run, name="trace_span_exporter", daemon=True
+        )
+        self._flush_thread.start()
+
+    def append_storage(self, storage: SpanStorage):
+        """Append storage to the pipeline
+
+        Args:
+            storage ([`SpanStorage`]): The storage to write the spans
+        """
+        self.storages.append(storage)
+
+    def append_span(self, span: Span):
+        buffer = self._buffer
+        if len(buffer) >= self.max_buffered_spans:
+            # The oldest span is dropped by the ring buffer
+            self._stats["dropped"] += 1
+        buffer.append(span)
+        if len(buffer) >= self.batch_size and not self._wakeup.is_set():
+            self._wakeup.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the statistics of the pipeline."""
+        return {
+            **self._stats,
+            "buffered": len(self._buffer),
+            "pending": self._pending_spans,
+        }
+
+    def flush(self):
+        """Write the buffered spans to the storages in the current thread."""
+        with self._flush_lock:
+            self._export(self._sample(self._drain(), time.monotonic()))
+
+    def before_stop(self):
+        try:
+            self._stop_event.set()
+            self._wakeup.set()
+            self._flush_thread.join()
+        except Exception:
+            pass
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Export spans failed: {str(e)}")
+        self.flush()
+
+    def _drain(self) -> List[Span]:
+        spans = []
+        buffer = self._buffer
+        for _i in range(len(buffer)):
+            try:
+                spans.append(buffer.popleft())
+            except IndexError:
+                break
+        return spans
+
+    def _head_sampled(self, trace_id: str) -> bool:
+        if self._sample_bound >= 0xFFFFFFFF:
+            return True
+        return zlib.crc32(str(trace_id).encode("utf8")) <= self._sample_bound
+
+    def _is_interesting(self, span: Span) -> bool:
+        if span.metadata and "error" in span.metadata:
+            return True
+        if self.slow_threshold is None or not span.end_time:
+            return False
+        duration = (span.end_time - span.start_time).total_seconds()
+        return duration >= self.slow_threshold
+
+    def _sample(self, spans: List[Span], now: float) -> List[Span]:
+        batch = []
+        for span in spans:
+            trace_id = span.trace_id
+            if self._head_sampled(trace_id) or trace_id in self._kept_traces:
+                batch.append(span)
+                continue
+            pending = self._pending.get(trace_id)
+            if self._is_interesting(span):
+                # Keep the whole trace, include the later spans
+                self._kept_traces[trace_id] = now + self.tail_window
+                self._kept_traces.move_to_end(trace_id)
+                if pending:
+                    del self._pending[trace_id]
+                    self._pending_spans -= len(pending.spans)
+                    batch.extend(pending.spans)
+                batch.append(span)
+                continue
+            if pending is None:
+                pending = _PendingTrace(now + self.tail_window)
+                self._pending[trace_id] = pending
+            pending.spans.append(span)
+            self._pending_spans += 1
+
+        # Drop the expired traces, and the oldest traces if too many spans held
+        while self._pending:
+            trace_id, pending = next(iter(self._pending.items()))
+            if (
+                pending.deadline > now
+                and self._pending_spans <= self.max_buffered_spans
+            ):
+                break
+            del self._pending[trace_id]
+            self._pending_spans -= len(pending.spans)
+            self._stats["sampled_out"] += len(pending.spans)
+        while self._kept_traces:
+            trace_id, deadline = next(iter(self._kept_traces.items()))
+            if deadline > now:
+                break
+            del self._kept_traces[trace_id]
+        return batch
+
+    def _export(self, spans: List[Span]):
+        if not spans:
+            return
+        for storage in self.storages:
+            try:
+                storage.append_span_batch(spans)
+            except Exception as e:
+                self._stats["write_errors"] += 1
+                logger.warning(
+                    f"Append spans to storage {str(storage)} failed: {str(e)}"
+                )
+        self._stats["exported"] += len(spans)
+        self._stats["batches"] += 1
@@ -0,0 +1,103 @@
+import json
+import os
+
+import pytest
+
+from dbgpt.util.tracer import CompressedFileSpanStorage, Span, SpanType
+from dbgpt.util.tracer.span_index import SpanIndex
+
+
+def _span(span_id, start, end=None, trace_id="t1", operation="op", **metadata):
+    return {
+        "span_type": "base",
+        "trace_id": trace_id,
+        "span_id": span_id,
+        "parent_span_id": None,
+        "operation_name": operation,
+        "start_time": f"2024-01-01 00:00:{start:06.3f}",
+        "end_time": f"2024-01-01 00:00:{end:06.3f}" if end is not None else None,
+        "metadata": metadata or None,
+    }
+
+
+def _append(path, *spans):
+    with open(path, "a") as f:
+        for span in spans:
+            f.write(json.dumps(span) + "\n")
+
+
+@pytest.fixture
+def index(tmp_path):
+    span_index = SpanIndex(str(tmp_path / "index.db"))
+    yield span_index
+    span_index.close()
+
+
+def test_incremental_update(tmp_path, index):
+    path = str(tmp_path / "dbgpt_1.jsonl")
+    pattern = str(tmp_path / "dbgpt*.jsonl")
+    _append(path, _span("s1", 1), _span("s1", 1, 2))
+    file_ids = index.update([pattern])
+    assert len([s for s in index.query(file_ids)]) == 2
+
+    _append(path, _span("s2", 3, trace_id="t2"))
+    # The line being written is indexed next time
+    with open(path, "a") as f:
+        f.write('{"trace_id": "t3"')
+    file_ids = index.update([pattern])
+    assert [s["span_id"] for s in index.query(file_ids, desc=True)] == [
+        "s2",
+        "s1",
+        "s1",
+    ]
+    assert [s["span_id"] for s in index.query(file_ids, trace_id="t2")] == ["s2"]
+    assert [s["span_id"] for s in index.query(file_ids, search="t2")] == ["s2"]
+    assert (
+        len([s for s in index.query(file_ids, start_time="2024-01-01 00:00:02.000")])
+        == 1
+    )
+
+    # The file is rolled over
+    with open(path, "w") as f:
+        f.write(json.dumps(_span("s9", 9)) + "\n")
+    file_ids = index.update([pattern])
+    assert [s["span_id"] for s in index.query(file_ids)] == ["s9"]
+
+    os.remove(path)
+    assert index.update([pattern]) == []
+
+
+def test_compressed_files(tmp_path, index):
+    path = str(tmp_path / "dbgpt.jsonl")
+    storage = CompressedFileSpanStorage(path)
+    storage.append_span_batch([Span("t1", "s1", SpanType.CHAT, operation_name="chat")])
+    file_ids = index.update([str(tmp_path / "*.spans")])
+    spans = [s for s in index.query(file_ids, span_types=["chat"])]
+    assert [s["span_id"] for s in spans] == ["s1"]
+
+
+def test_latency_report(tmp_path, index):
+    path = str(tmp_path / "dbgpt.jsonl")
+    spans = []
+    for i in range(1, 101):
+        spans.append(_span(f"a{i}", 0, operation="llm", model_name="m1"))
+        # The end span doesn't have the model name
+        spans.append(_span(f"a{i}", 0, i / 1000, operation="llm"))
+    spans.append(_span("b1", 0, operation="rag"))
+    spans.append(_span("b1", 0, 0.5, operation="rag", error="timeout"))
+    _append(path, *spans)
+    file_ids = index.update([path])
+
+    report = index.latency_report(file_ids)
+    assert [item["operation"] for item in report] == ["rag", "llm"]
+    assert report[0]["errors"] == 1
+    llm = report[1]
+    assert llm["count"] == 100
+    assert llm["p50"] == pytest.approx(50)
+    assert llm["p95"] == pytest.approx(95)
+    assert llm["max"] == pytest.approx(100)
+
+    by_model = index.latency_report(file_ids, group_by="model")
+    assert [(item["model"], item["count"]) for item in by_model] == [("m1", 100)]
+    with pytest.raises(ValueError):
+        index.latency_report(file_ids, group_by="user")
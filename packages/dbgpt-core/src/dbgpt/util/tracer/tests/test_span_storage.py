@@ -9,12 +9,19 @@ from unittest.mock import patch
 import pytest
 
 from dbgpt.util.tracer import (
+    CompressedFileSpanStorage,
     FileSpanStorage,
+    MemorySpanStorage,
     Span,
+    SpanExportPipeline,
     SpanStorage,
     SpanStorageContainer,
     SpanType,
 )
+from dbgpt.util.tracer.span_storage import (
+    is_compressed_span_file,
+    read_compressed_spans,
+)
 
 
 @pytest.fixture
@@ -173,3 +180,77 @@ async def test_container_flush_policy(
 
     spans_in_file = read_spans_from_file(filename)
     assert len(spans_in_file) == storage_container.batch_size
+
+
+def _new_span(trace_id: str, span_id: str, duration: float = 0, **metadata) -> Span:
+    span = Span(trace_id, f"{trace_id}:{span_id}", SpanType.BASE, None, "op")
+    span.start_time = datetime.now() - timedelta(seconds=duration)
+    span.end(metadata=metadata or None)
+    return span
+
+
+def test_compressed_storage_round_trip(tmp_path):
+    storage = CompressedFileSpanStorage(str(tmp_path / "tracer.jsonl"))
+    assert storage.filename.endswith(".spans")
+    storage.append_span_batch([_new_span("1", "a"), _new_span("1", "b")])
+    storage.append_span(_new_span("2", "c"))
+    # A batch torn by a crash
+    with open(storage.filename, "ab") as f:
+        f.write(b"DBSB\x00\x00\x01\x00partial")
+
+    assert is_compressed_span_file(storage.filename)
+    spans = list(read_compressed_spans(storage.filename))
+    assert [s["span_id"] for s in spans] == ["1:a", "1:b", "2:c"]
+
+
+def test_pipeline_tail_sampling():
+    storage = MemorySpanStorage()
+    pipeline = SpanExportPipeline(
+        sample_rate=0, slow_threshold=1, tail_window=0.2, flush_interval=100
+    )
+    pipeline.append_storage(storage)
+    try:
+        pipeline.append_span(_new_span("fast", "a"))
+        pipeline.append_span(_new_span("slow", "a"))
+        pipeline.append_span(_new_span("error", "a"))
+        pipeline.flush()
+        assert storage.spans == []
+
+        pipeline.append_span(_new_span("slow", "b", duration=2))
+        pipeline.append_span(_new_span("error", "b", error="failed"))
+        pipeline.flush()
+        assert sorted(s.span_id for s in storage.spans) == [
+            "error:a",
+            "error:b",
+            "slow:a",
+            "slow:b",
+        ]
+        # The later spans of a kept trace are kept too
+        pipeline.append_span(_new_span("slow", "c"))
+        time.sleep(0.3)
+        pipeline.flush()
+        assert len(storage.spans) == 5
+        assert pipeline.stats()["sampled_out"] == 1
+        assert pipeline.stats()["pending"] == 0
+    finally:
+        pipeline.before_stop()
+
+
+def test_pipeline_bounded_buffer(tmp_path):
+    pipeline = SpanExportPipeline(
+        max_buffered_spans=100, batch_size=1000, flush_interval=100
+    )
+    storage = CompressedFileSpanStorage(str(tmp_path / "tracer.jsonl"))
+    pipeline.append_storage(storage)
+    span = _new_span("1", "a")
+    for _ in range(10000):
+        pipeline.append_span(span)
+    # Appending only fills the ring buffer, nothing is written before the flush
+    assert pipeline.stats()["buffered"] == 100
+    assert pipeline.stats()["dropped"] == 9900
+    assert pipeline.stats()["batches"] == 0
+    pipeline.before_stop()
+    assert len(list(read_compressed_spans(storage.filename))) == 100
+    # The buffered spans are written in one batch
+    assert pipeline.stats()["exported"] == 100
+    assert pipeline.stats()["batches"] == 1
@@ -1,19 +1,33 @@
 import glob
+import itertools
 import json
 import logging
 import os
+import sqlite3
 from datetime import datetime
-from typing import Dict, Iterable
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple
 
 import click
 
 from dbgpt.configs.model_config import LOGDIR
 from dbgpt.util.tracer import SpanType, SpanTypeRunName
+from dbgpt.util.tracer.span_storage import (
+    COMPRESSED_SPAN_FILE_SUFFIX,
+    is_compressed_span_file,
+    read_compressed_spans,
+)
+
+if TYPE_CHECKING:
+    from dbgpt.util.tracer.span_index import SpanIndex
 
 logger = logging.getLogger("dbgpt_cli")
 
 
 _DEFAULT_FILE_PATTERN = os.path.join(LOGDIR, "dbgpt*.jsonl")
+_DEFAULT_COMPRESSED_FILE_PATTERN = os.path.join(
+    LOGDIR, f"dbgpt*{COMPRESSED_SPAN_FILE_SUFFIX}"
+)
+_DEFAULT_INDEX_PATH = os.path.join(LOGDIR, "dbgpt_trace_index.db")
 
 
 @click.group("trace")
@@ -154,37 +168,23 @@ def list(
     from prettytable import PrettyTable
 
     # If no files are explicitly specified, use the default pattern to get them
-    spans = read_spans_from_files(files)
-
-    if trace_id:
-        spans = filter(lambda s: s["trace_id"] == trace_id, spans)
-    if span_id:
-        spans = filter(lambda s: s["span_id"] == span_id, spans)
-    if span_type:
-        spans = filter(lambda s: s["span_type"] == span_type, spans)
-    if parent_span_id:
-        spans = filter(lambda s: s["parent_span_id"] == parent_span_id, spans)
-    # Filter spans based on the start and end times
-    if start_time:
-        start_dt = _parse_datetime(start_time)
-        spans = filter(
-            lambda span: _parse_datetime(span["start_time"]) >= start_dt, spans
-        )
-
-    if end_time:
-        end_dt = _parse_datetime(end_time)
-        spans = filter(
-            lambda span: _parse_datetime(span["start_time"]) <= end_dt, spans
-        )
-
+    index, file_ids = _open_span_index(files)
+    spans = index.query(
+        file_ids,
+        trace_id=trace_id,
+        span_id=span_id,
+        span_types=[span_type] if span_type else None,
+        parent_span_id=parent_span_id,
+        start_time=start_time,
+        end_time=end_time,
+        search=search,
+        desc=desc,
+        # The search and the JSON path filter are applied after the query
+        limit=None if search or json_path else limit,
+    )
     if search:
         spans = filter(_new_search_span_func(search), spans)
 
-    # Sort spans based on the start time
-    spans = sorted(
-        spans, key=lambda span: _parse_datetime(span["start_time"]), reverse=desc
-    )
-
     # Handle JSON path extraction if specified
     if json_path:
         try:
@@ -260,12 +260,11 @@ def list(
             print(f"Error while processing JSONPath: {e}")
             return
 
-    spans = spans[:limit]
     table = PrettyTable(
         ["Trace ID", "Span ID", "Operation Name", "Conversation UID"],
     )
 
-    for sp in spans:
+    for sp in itertools.islice(spans, limit):
         conv_uid = None
         if "metadata" in sp and sp:
             metadata = sp["metadata"]
@@ -352,16 +351,16 @@ def chat(
     """Show conversation details"""
     from prettytable import PrettyTable
 
-    spans = read_spans_from_files(files)
-
-    # Sort by start time
-    spans = sorted(
-        spans, key=lambda span: _parse_datetime(span["start_time"]), reverse=True
+    index, file_ids = _open_span_index(files)
+    # Only the run and chat spans are needed to find the services and the trace
+    spans = index.query(
+        file_ids, span_types=[SpanType.RUN.value, SpanType.CHAT.value], desc=True
     )
-    spans = [sp for sp in spans]
-    if not spans:
+    first_span = next(spans, None)
+    if not first_span:
         _print_empty_message(files)
         return
+    spans = itertools.chain([first_span], spans)
     service_spans = {}
     service_names = set(SpanTypeRunName.values())
     found_trace_id = None
@@ -430,8 +429,7 @@ def chat(
         return
     trace_id = found_trace_id
 
-    trace_spans = [span for span in spans if span["trace_id"] == trace_id]
-    trace_spans = [s for s in reversed(trace_spans)]
+    trace_spans = [span for span in index.query(file_ids, trace_id=trace_id)]
     hierarchy = _build_trace_hierarchy(trace_spans)
     if tree:
         print(f"\nInvoke Trace Tree(trace_id: {trace_id}):\n")
@@ -530,15 +528,94 @@ def chat(
     print(table.get_formatted_string(out_format=output, **out_kwargs))
 
 
+@trace_cli_group.command()
+@click.option(
+    "--by",
+    "group_by",
+    required=False,
+    type=click.Choice(["operation", "model", "node"]),
+    default="operation",
+    show_default=True,
+    help="Group the latency by the operation, the model or the AWEL node",
+)
+@click.option(
+    "--operation",
+    required=False,
+    type=str,
+    default=None,
+    help="Only report the spans of the operation",
+)
+@click.option(
+    "--start_time",
+    type=str,
+    help='Filter by start time. Format: "YYYY-MM-DD HH:MM:SS.mmm"',
+)
+@click.option(
+    "--end_time", type=str, help='Filter by end time. Format: "YYYY-MM-DD HH:MM:SS.mmm"'
+)
+@click.option(
+    "-l",
+    "--limit",
+    type=int,
+    default=20,
+    help="Limit the number of groups displayed, the slowest first.",
+)
+@click.option(
+    "--output",
+    required=False,
+    type=click.Choice(["text", "html", "csv", "latex", "json"]),
+    default="text",
+    help="The output format",
+)
+@click.argument("files", nargs=-1, type=click.Path(exists=True, readable=True))
+def report(
+    group_by: str,
+    operation: str,
+    start_time: str,
+    end_time: str,
+    limit: int,
+    output: str,
+    files=None,
+):
+    """Show the latency percentiles(in milliseconds) of your trace spans"""
+    from prettytable import PrettyTable
+
+    index, file_ids = _open_span_index(files)
+    items = index.latency_report(
+        file_ids,
+        group_by=group_by,
+        start_time=start_time,
+        end_time=end_time,
+        operation=operation,
+    )
+    if not items:
+        _print_empty_message(files)
+        return
+    table = PrettyTable(
+        [group_by.capitalize(), "Count", "Errors", "P50", "P95", "P99", "Max"],
+        title=f"Latency by {group_by}",
+    )
+    for item in items[:limit]:
+        table.add_row(
+            [item[group_by], item["count"], item["errors"]]
+            + [round(item[k], 2) for k in ["p50", "p95", "p99", "max"]]
+        )
+    out_kwargs = {"ensure_ascii": False} if output == "json" else {}
+    print(table.get_formatted_string(out_format=output, **out_kwargs))
+
+
 def read_spans_from_files(files=None) -> Iterable[Dict]:
     """
     Reads spans from multiple files based on the provided file paths.
     """
     if not files:
-        files = [_DEFAULT_FILE_PATTERN]
+        files = [_DEFAULT_FILE_PATTERN, _DEFAULT_COMPRESSED_FILE_PATTERN]
 
     for filepath in files:
         for filename in glob.glob(filepath):
+            if is_compressed_span_file(filename):
+                yield from read_compressed_spans(filename)
+                continue
             with open(filename, "r") as file:
                 for line in file:
                     if not line.strip():
@@ -546,6 +623,26 @@ def read_spans_from_files(files=None) -> Iterable[Dict]:
                     yield json.loads(line)
 
 
+def _open_span_index(files=None) -> Tuple["SpanIndex", List[int]]:
+    """Open the span index and index the new spans of the files.
+
+    Returns:
+        Tuple[SpanIndex, List[int]]: The index and the ids of the files to query.
+    """
+    from dbgpt.util.tracer.span_index import SpanIndex
+
+    if not files:
+        files = [_DEFAULT_FILE_PATTERN, _DEFAULT_COMPRESSED_FILE_PATTERN]
+    try:
+        index = SpanIndex(_DEFAULT_INDEX_PATH)
+        return index, index.update(files)
+    except sqlite3.Error as e:
+        # The log directory may be read-only or the index is broken
+        logger.warning(f"Open span index {_DEFAULT_INDEX_PATH} failed: {e}")
+        index = SpanIndex()
+        return index, index.update(files)
+
+
 def _print_empty_message(files=None):
     if not files:
         files = [_DEFAULT_FILE_PATTERN]
@@ -626,8 +723,8 @@ def _build_trace_hierarchy(spans, parent_span_id=None, indent=0):
 
 def _view_trace_hierarchy(trace_id, files=None):
     """Find and display the calls of the entire link based on the given trace_id"""
-    spans = read_spans_from_files(files)
-    trace_spans = [span for span in spans if span["trace_id"] == trace_id]
+    index, file_ids = _open_span_index(files)
+    trace_spans = [span for span in index.query(file_ids, trace_id=trace_id)]
     if not trace_spans:
         return None
     hierarchy = _build_trace_hierarchy(trace_spans)
@@ -382,6 +382,55 @@ class TracerParameters(BaseParameters):
             "help": _("The class of the tracer storage"),
         },
     )
+    batch_export: Optional[bool] = field(
+        default=False,
+        metadata={
+            "help": _(
+                "Whether to export the spans in the background with a bounded ring "
+                "buffer, the spans are written to the compressed `.spans` file "
+                "beside the tracer file in batches"
+            ),
+        },
+    )
+    sample_rate: Optional[float] = field(
+        default=1.0,
+        metadata={
+            "help": _(
+                "The rate of the traces to keep(head-based sampling), only valid "
+                "when batch_export is True"
+            ),
+        },
+    )
+    slow_span_threshold: Optional[float] = field(
+        default=1.0,
+        metadata={
+            "help": _(
+                "The traces with a span slower than it(in seconds) or with an error "
+                "are always kept(tail-based sampling), only valid when batch_export "
+                "is True"
+            ),
+        },
+    )
+    tail_sampling_window: Optional[float] = field(
+        default=30,
+        metadata={
+            "help": _(
+                "The seconds to hold the spans of a trace before the tail-based "
+                "sampling decision, it should be longer than the slowest trace, or "
+                "the early spans of a longer trace are sampled out before it turns "
+                "slow, only valid when batch_export is True"
+            ),
+        },
+    )
+    max_buffered_spans: Optional[int] = field(
+        default=10000,
+        metadata={
+            "help": _(
+                "The max spans buffered in memory, the oldest spans are dropped when "
+                "the storage can't keep up, only valid when batch_export is True"
+            ),
+        },
+    )
 
     def __post_init__(self):
         use_telemetry = os.getenv("TRACER_TO_OPEN_TELEMETRY", "false").lower() == "true"
@@ -405,7 +454,12 @@ def initialize_tracer(
     tracer_parameters: Optional[TracerParameters] = None,
 ):
     """Initialize the tracer with the given filename and system app."""
-    from dbgpt.util.tracer.span_storage import FileSpanStorage, SpanStorageContainer
+    from dbgpt.util.tracer.span_storage import (
+        CompressedFileSpanStorage,
+        FileSpanStorage,
+        SpanExportPipeline,
+        SpanStorageContainer,
+    )
 
     if not system_app and create_system_app:
         system_app = SystemApp()
@@ -418,9 +472,19 @@ def initialize_tracer(
     )
     tracer = DefaultTracer(system_app)
 
-    storage_container = SpanStorageContainer(system_app)
     tracer_filename = resolve_root_path(tracer_filename)
-    storage_container.append_storage(FileSpanStorage(tracer_filename))
+    if tracer_parameters and tracer_parameters.batch_export:
+        storage_container = SpanExportPipeline(
+            system_app,
+            sample_rate=tracer_parameters.sample_rate,
+            slow_threshold=tracer_parameters.slow_span_threshold,
+            tail_window=tracer_parameters.tail_sampling_window,
+            max_buffered_spans=tracer_parameters.max_buffered_spans,
+        )
+        storage_container.append_storage(CompressedFileSpanStorage(tracer_filename))
+    else:
+        storage_container = SpanStorageContainer(system_app)
+        storage_container.append_storage(FileSpanStorage(tracer_filename))
     if tracer_parameters and tracer_parameters.exporter == "telemetry":
         from dbgpt.util.tracer.opentelemetry import OpenTelemetrySpanStorage
 
@@ -0,0 +1,13 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def schema_snapshot_manager(monkeypatch):
+    """Give every test its own in-memory schema snapshot manager."""
+    from dbgpt.datasource.rdbms.schema_snapshot import SchemaSnapshotManager
+
+    manager = SchemaSnapshotManager()
+    monkeypatch.setattr(
+        "dbgpt.datasource.rdbms.schema_snapshot._DEFAULT_MANAGER", manager
+    )
+    return manager
@@ -1,7 +1,9 @@
 """MySQL connector."""
 
 from dataclasses import dataclass, field
-from typing import Type
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from sqlalchemy import bindparam, text
 
 from dbgpt.core.awel.flow import (
     TAGS_ORDER_HIGH,
@@ -9,6 +11,7 @@ from dbgpt.core.awel.flow import (
     auto_register_resource,
 )
 from dbgpt.datasource.rdbms.base import RDBMSConnector, RDBMSDatasourceParameters
+from dbgpt.datasource.rdbms.schema_snapshot import TableSchema
 from dbgpt.util.i18n_utils import _
 
 
@@ -50,3 +53,114 @@ class MySQLConnector(RDBMSConnector):
     def param_class(cls) -> Type[RDBMSDatasourceParameters]:
         """Return the parameter class."""
         return MySQLParameters
+
+    def get_table_ddl_versions(self) -> Optional[Dict[str, str]]:
+        """Return the DDL versions of all the tables in one query.
+
+        The version is the creation time and comment of the table with the
+        checksums of its columns and indexes in information_schema.
+        """
+        sql = """
+            SELECT t.TABLE_NAME, t.CREATE_TIME, t.TABLE_COMMENT,
+                (SELECT SUM(CRC32(CONCAT_WS('|', c.ORDINAL_POSITION, c.COLUMN_NAME,
+                    c.COLUMN_TYPE, c.IS_NULLABLE, c.COLUMN_COMMENT)))
+                 FROM information_schema.COLUMNS c
+                 WHERE c.TABLE_SCHEMA = t.TABLE_SCHEMA
+                    AND c.TABLE_NAME = t.TABLE_NAME),
+                (SELECT SUM(CRC32(CONCAT_WS('|', s.INDEX_NAME, s.SEQ_IN_INDEX,
+                    s.COLUMN_NAME)))
+                 FROM information_schema.STATISTICS s
+                 WHERE s.TABLE_SCHEMA = t.TABLE_SCHEMA
+                    AND s.TABLE_NAME = t.TABLE_NAME)
+            FROM information_schema.TABLES t
+            WHERE t.TABLE_SCHEMA = DATABASE()
+        """
+        with self.session_scope() as session:
+            rows = session.execute(text(sql)).fetchall()
+        return {row[0]: "|".join(str(v) for v in row[1:]) for row in rows}
+
+    def _parse_column_type(self, name: str, column_type: str) -> str:
+        """Parse the COLUMN_TYPE of information_schema to the reflected type.
+
+        The column definition is parsed by the parser of the dialect which the
+        reflection of SQLAlchemy uses, so the type is the same as the per-table
+        reflection, e.g. "int(11) unsigned" to "INTEGER".
+        """
+        from sqlalchemy.dialects.mysql.reflection import ReflectedState
+
+        state = ReflectedState()
+        parser = self._engine.dialect._tabledef_parser
+        parser._parse_column(f"  `{name}` {column_type},", state)
+        if not state.columns:
+            return column_type
+        return str(state.columns[0]["type"])
+
+    def get_table_schemas(
+        self, table_names: Optional[List[str]] = None
+    ) -> Dict[str, TableSchema]:
+        """Return the columns, indexes and comments of the tables.
+
+        Load all the tables with three information_schema queries instead of
+        reflecting them one by one.
+        """
+        if table_names is None:
+            table_names = list(self.get_table_names())
+        schemas = {name: TableSchema(name=name) for name in table_names}
+        if not schemas:
+            return schemas
+        names_filter = " AND TABLE_NAME IN :table_names"
+        params = {"table_names": list(schemas)}
+
+        def _query(sql: str) -> List[Tuple]:
+            stmt = text(sql + names_filter + " ORDER BY TABLE_NAME").bindparams(
+                bindparam("table_names", expanding=True)
+            )
+            with self.session_scope() as session:
+                return session.execute(stmt, params).fetchall()
+
+        columns = _query(
+            "SELECT TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, IS_NULLABLE, "
+            "COLUMN_DEFAULT, COLUMN_COMMENT, ORDINAL_POSITION "
+            "FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE()"
+        )
+        for table_name, name, col_type, nullable, default, comment, _pos in sorted(
+            columns, key=lambda row: (row[0], row[6])
+        ):
+            schemas[table_name].columns.append(
+                {
+                    "name": name,
+                    "type": self._parse_column_type(name, col_type),
+                    "nullable": nullable == "YES",
+                    "default": default,
+                    "comment": comment or None,
+                }
+            )
+
+        # The primary key is not an index in the reflection of sqlalchemy
+        indexes = _query(
+            "SELECT TABLE_NAME, INDEX_NAME, NON_UNIQUE, COLUMN_NAME, SEQ_IN_INDEX "
+            "FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE() "
+            "AND INDEX_NAME != 'PRIMARY'"
+        )
+        table_indexes: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for table_name, index_name, non_unique, column_name, _seq in sorted(
+            indexes, key=lambda row: (row[0], row[1], row[4])
+        ):
+            index = table_indexes.get((table_name, index_name))
+            if index is None:
+                index = {
+                    "name": index_name,
+                    "column_names": [],
+                    "unique": not int(non_unique),
+                }
+                table_indexes[(table_name, index_name)] = index
+                schemas[table_name].indexes.append(index)
+            index["column_names"].append(column_name)
+
+        comments = _query(
+            "SELECT TABLE_NAME, TABLE_COMMENT FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE()"
+        )
+        for table_name, comment in comments:
+            schemas[table_name].comment = comment or None
+        return schemas
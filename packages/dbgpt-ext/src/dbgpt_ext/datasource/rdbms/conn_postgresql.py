@@ -2,18 +2,24 @@
 
 import logging
 from dataclasses import dataclass, field
-from typing import Any, Iterable, List, Optional, Tuple, Type, cast
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, cast
 from urllib.parse import quote
 from urllib.parse import quote_plus as urlquote
 
-from sqlalchemy import text
+from sqlalchemy import bindparam, inspect, text
+from sqlalchemy.engine.reflection import ObjectKind
 
 from dbgpt.core.awel.flow import (
     TAGS_ORDER_HIGH,
     ResourceCategory,
     auto_register_resource,
 )
-from dbgpt.datasource.rdbms.base import RDBMSConnector, RDBMSDatasourceParameters
+from dbgpt.datasource.rdbms.base import (
+    RDBMSConnector,
+    RDBMSDatasourceParameters,
+    _normalize_indexes,
+)
+from dbgpt.datasource.rdbms.schema_snapshot import TableSchema
 from dbgpt.util.i18n_utils import _
 
 logger = logging.getLogger(__name__)
@@ -339,3 +345,96 @@ class PostgreSQLConnector(RDBMSConnector):
             )
             indexes = cursor.fetchall()
             return [(index[0], index[1]) for index in indexes]
+
+    def get_table_ddl_versions(self) -> Optional[Dict[str, str]]:
+        """Return the DDL versions of all the tables in one query.
+
+        PostgreSQL does not record the DDL time, the version is the hash of the
+        columns, the index definitions and the comment in the catalog.
+        """
+        sql = """
+            SELECT c.relname, md5(
+                coalesce((
+                    SELECT string_agg(a.attname || ':'
+                        || format_type(a.atttypid, a.atttypmod) || ':'
+                        || coalesce(col_description(c.oid, a.attnum), ''),
+                        ',' ORDER BY a.attnum)
+                    FROM pg_catalog.pg_attribute a
+                    WHERE a.attrelid = c.oid AND a.attnum > 0
+                        AND NOT a.attisdropped
+                ), '')
+                || '|' || coalesce((
+                    SELECT string_agg(i.indexdef, ',' ORDER BY i.indexname)
+                    FROM pg_catalog.pg_indexes i
+                    WHERE i.schemaname = n.nspname AND i.tablename = c.relname
+                ), '')
+                || '|' || coalesce(obj_description(c.oid, 'pg_class'), '')
+            )
+            FROM pg_catalog.pg_class c
+            JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = :schema AND c.relkind IN ('r', 'p', 'v', 'm')
+        """
+        with self.session_scope() as session:
+            rows = session.execute(
+                text(sql), {"schema": self._schema or "public"}
+            ).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def get_table_schemas(
+        self, table_names: Optional[List[str]] = None
+    ) -> Dict[str, TableSchema]:
+        """Return the columns, indexes and comments of the tables.
+
+        Load all the tables with three catalog queries instead of reflecting them
+        one by one.
+        """
+        if table_names is None:
+            table_names = list(self.get_table_names())
+        schemas = {name: TableSchema(name=name) for name in table_names}
+        if not schemas:
+            return schemas
+        params = {"schema": self._schema or "public", "table_names": list(schemas)}
+
+        def _query(sql: str) -> List[Tuple]:
+            stmt = text(sql).bindparams(bindparam("table_names", expanding=True))
+            with self.session_scope() as session:
+                return session.execute(stmt, params).fetchall()
+
+        # The bulk reflection of SQLAlchemy loads the columns of all the tables in
+        # one query and parses the types the same as the per-table reflection, a
+        # new inspector is used to skip the reflection cache of the connector
+        columns = inspect(self._engine).get_multi_columns(
+            schema=params["schema"],
+            filter_names=params["table_names"],
+            kind=ObjectKind.ANY,
+        )
+        for (_schema, table_name), table_columns in columns.items():
+            for column in table_columns:
+                column = dict(column)
+                column["type"] = str(column["type"])
+                schemas[table_name].columns.append(column)
+
+        indexes = _query(
+            """
+            SELECT tablename, indexname, indexdef FROM pg_catalog.pg_indexes
+            WHERE schemaname = :schema AND tablename IN :table_names
+            ORDER BY tablename, indexname
+            """
+        )
+        table_indexes: Dict[str, List[Any]] = {}
+        for table_name, index_name, index_def in indexes:
+            table_indexes.setdefault(table_name, []).append((index_name, index_def))
+        for table_name, raw_indexes in table_indexes.items():
+            schemas[table_name].indexes = _normalize_indexes(raw_indexes)
+
+        comments = _query(
+            """
+            SELECT c.relname, obj_description(c.oid, 'pg_class')
+            FROM pg_catalog.pg_class c
+            JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = :schema AND c.relname IN :table_names
+            """
+        )
+        for table_name, comment in comments:
+            schemas[table_name].comment = comment
+        return schemas
@@ -1,10 +1,11 @@
 """SQLite connector."""
 
 import dataclasses
+import hashlib
 import logging
 import os
 import tempfile
-from typing import Any, Iterable, List, Optional, Tuple, Type
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
 
 from sqlalchemy import create_engine, text
 
@@ -15,6 +16,7 @@ from dbgpt.core.awel.flow import (
 )
 from dbgpt.datasource.parameter import BaseDatasourceParameters
 from dbgpt.datasource.rdbms.base import RDBMSConnector
+from dbgpt.datasource.rdbms.schema_snapshot import TableSchema
 from dbgpt.util.i18n_utils import _
 
 logger = logging.getLogger(__name__)
@@ -117,6 +119,69 @@ class SQLiteConnector(RDBMSConnector):
                 result.append({"name": index_name, "column_names": column_names})
             return result
 
+    def get_table_ddl_versions(self) -> Optional[Dict[str, str]]:
+        """Return the DDL versions of all the tables in one query."""
+        with self.session_scope() as session:
+            rows = session.execute(
+                text(
+                    "SELECT tbl_name, group_concat(sql, ';') FROM ("
+                    "SELECT tbl_name, sql FROM sqlite_master WHERE sql IS NOT NULL "
+                    "ORDER BY tbl_name, type, name) GROUP BY tbl_name"
+                )
+            ).fetchall()
+        return {row[0]: hashlib.md5(row[1].encode("utf-8")).hexdigest() for row in rows}
+
+    def get_table_schemas(
+        self, table_names: Optional[List[str]] = None
+    ) -> Dict[str, TableSchema]:
+        """Return the columns and indexes of the tables with two queries."""
+        if table_names is None:
+            table_names = list(self.get_table_names())
+        schemas = {name: TableSchema(name=name) for name in table_names}
+        if not schemas:
+            return schemas
+        with self.session_scope() as session:
+            columns = session.execute(
+                text(
+                    'SELECT m.name, p.name, p.type, p."notnull", p.dflt_value, p.pk '
+                    "FROM sqlite_master m JOIN pragma_table_info(m.name) p "
+                    "WHERE m.type IN ('table', 'view') ORDER BY m.name, p.cid"
+                )
+            ).fetchall()
+            indexes = session.execute(
+                text(
+                    'SELECT m.name, il.name, il."unique", ii.name '
+                    "FROM sqlite_master m JOIN pragma_index_list(m.name) il "
+                    "JOIN pragma_index_info(il.name) ii "
+                    "WHERE m.type = 'table' ORDER BY m.name, il.seq, ii.seqno"
+                )
+            ).fetchall()
+        # Resolve the declared types with the type affinity rules of the dialect,
+        # the same as the per-table reflection of SQLAlchemy
+        dialect = self._engine.dialect
+        for table_name, name, col_type, not_null, default, pk in columns:
+            if table_name in schemas:
+                schemas[table_name].columns.append(
+                    {
+                        "name": name,
+                        "type": str(dialect._resolve_type_affinity(col_type)),
+                        "nullable": not not_null,
+                        "default": default,
+                        "primary_key": pk,
+                    }
+                )
+        table_indexes: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for table_name, index_name, unique, column_name in indexes:
+            if table_name not in schemas:
+                continue
+            index = table_indexes.get((table_name, index_name))
+            if index is None:
+                index = {"name": index_name, "column_names": [], "unique": bool(unique)}
+                table_indexes[(table_name, index_name)] = index
+                schemas[table_name].indexes.append(index)
+            index["column_names"].append(column_name)
+        return schemas
+
     def get_show_create_table(self, table_name):
         """Get table show create table about specified table."""
         with self.session_scope() as session:
@@ -250,6 +315,11 @@ class SQLiteTempConnector(SQLiteConnector):
         super().__init__(engine, *args, **kwargs)
         self.temp_file_path = temp_file_path
 
+    @property
+    def is_temporary(self) -> bool:
+        """Whether the database is temporary."""
+        return True
+
     @classmethod
     def create_temporary_db(
         cls, engine_args: Optional[dict] = None, **kwargs: Any
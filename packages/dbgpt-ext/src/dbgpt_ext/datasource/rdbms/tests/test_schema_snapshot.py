@@ -0,0 +1,124 @@
+import pytest
+
+from dbgpt.datasource.rdbms.base import RDBMSConnector
+from dbgpt.datasource.rdbms.schema_snapshot import SchemaSnapshotManager
+from dbgpt_ext.datasource.rdbms.conn_sqlite import SQLiteConnector
+from dbgpt_ext.rag.summary.rdbms_db_summary import (
+    _parse_db_summary,
+    _parse_db_summary_with_metadata,
+)
+
+
+@pytest.fixture
+def db(tmp_path):
+    conn = SQLiteConnector.from_file_path(str(tmp_path / "test.db"))
+    conn.run("CREATE TABLE user (id INTEGER PRIMARY KEY, name VARCHAR(20));")
+    conn.run("CREATE INDEX idx_user_name ON user (name, id);")
+    conn.run("CREATE TABLE orders (id INTEGER, user_id INTEGER, amount REAL);")
+    conn._sync_tables_from_db()
+    yield conn
+    conn.close()
+
+
+def _refresh(manager, conn):
+    manager.invalidate(conn)
+    return manager.get_snapshot(conn)
+
+
+def test_bulk_schemas_match_reflection(db):
+    bulk = db.get_table_schemas()
+    reflected = RDBMSConnector.get_table_schemas(db)
+    assert set(bulk) == set(reflected) == {"user", "orders"}
+    for name, table in bulk.items():
+        assert [c["name"] for c in table.columns] == [
+            c["name"] for c in reflected[name].columns
+        ]
+        assert [(i["name"], i["column_names"]) for i in table.indexes] == [
+            (i["name"], i["column_names"]) for i in reflected[name].indexes
+        ]
+
+
+def test_bulk_column_types_match_reflection(db):
+    db.run(
+        "CREATE TABLE types (a NVARCHAR(10), b UNSIGNED BIG INT, c DECIMAL(10,2), "
+        "d DATETIME, e BLOB, f);"
+    )
+    db._sync_tables_from_db()
+    bulk = db.get_table_schemas(["types"])["types"]
+    reflected = RDBMSConnector.get_table_schemas(db, ["types"])["types"]
+    assert [c["type"] for c in bulk.columns] == [c["type"] for c in reflected.columns]
+    assert bulk.columns[0]["type"] == "NVARCHAR(10)"
+
+
+def test_mysql_column_type_match_reflection():
+    from types import SimpleNamespace
+
+    from sqlalchemy.dialects.mysql.pymysql import MySQLDialect_pymysql
+
+    from dbgpt_ext.datasource.rdbms.conn_mysql import MySQLConnector
+
+    conn = SimpleNamespace(_engine=SimpleNamespace(dialect=MySQLDialect_pymysql()))
+    assert MySQLConnector._parse_column_type(conn, "id", "int(11) unsigned") == (
+        "INTEGER"
+    )
+    assert MySQLConnector._parse_column_type(conn, "name", "varchar(20)") == (
+        "VARCHAR(20)"
+    )
+    assert MySQLConnector._parse_column_type(conn, "amount", "decimal(10,2)") == (
+        "DECIMAL(10, 2)"
+    )
+
+
+def test_snapshot_persist_and_incremental_refresh(db, tmp_path, mocker):
+    manager = SchemaSnapshotManager(persist_dir=str(tmp_path / "snapshots"))
+    snapshot = manager.get_snapshot(db)
+    assert snapshot.version == 1
+    assert snapshot.tables["user"].indexes[0]["column_names"] == ["name", "id"]
+
+    spy = mocker.spy(db, "get_table_schemas")
+    # Reloaded from disk, unchanged tables are not introspected again
+    reloaded = SchemaSnapshotManager(persist_dir=str(tmp_path / "snapshots"))
+    assert reloaded.get_snapshot(db).version == 1
+    assert spy.call_count == 0
+
+    db.run("ALTER TABLE orders ADD COLUMN status TEXT;")
+    db.run("CREATE TABLE items (id INTEGER);")
+    db.run("DROP TABLE user;")
+    db._sync_tables_from_db()
+    snapshot = _refresh(reloaded, db)
+    assert snapshot.version == 2
+    assert sorted(spy.call_args.args[0]) == ["items", "orders"]
+    assert set(snapshot.tables) == {"items", "orders"}
+    assert snapshot.tables["orders"].columns[-1]["name"] == "status"
+    assert _refresh(reloaded, db).version == 2
+
+
+def test_summary_from_snapshot(db):
+    summaries = _parse_db_summary(db)
+    assert sorted(summaries) == [
+        "orders(id, user_id, amount)",
+        "user(id, name), and index keys: idx_user_name(`name, id`) ",
+    ]
+    summaries = dict(
+        (metadata["table_name"], summary)
+        for summary, metadata in _parse_db_summary_with_metadata(db)
+    )
+    assert "table_comment: \r\n" in summaries["user"]
+    assert '"name" VARCHAR(20)' in summaries["user"]
+
+
+def test_temporary_database_not_persisted(tmp_path):
+    from dbgpt_ext.datasource.rdbms.conn_sqlite import SQLiteTempConnector
+
+    persist_dir = tmp_path / "snapshots"
+    manager = SchemaSnapshotManager(persist_dir=str(persist_dir))
+    with SQLiteTempConnector.create_temporary_db() as conn:
+        conn.create_temp_tables({"test": {"columns": {"id": "INTEGER"}}})
+        assert conn.is_temporary
+        assert set(manager.get_snapshot(conn).tables) == {"test"}
+    memory_conn = SQLiteConnector.from_uri("sqlite://")
+    memory_conn.run("CREATE TABLE test (id INTEGER);")
+    memory_conn._sync_tables_from_db()
+    assert memory_conn.is_temporary
+    assert set(manager.get_snapshot(memory_conn).tables) == {"test"}
+    assert not persist_dir.exists()
@@ -1,9 +1,11 @@
+import asyncio
 from unittest.mock import MagicMock
 
 import pytest
 
 from dbgpt.core import Chunk
 from dbgpt.rag.retriever.embedding import EmbeddingRetriever
+from dbgpt.rag.retriever.rerank import FusionStrategy, fuse_candidates
 
 
 @pytest.fixture
@@ -37,3 +39,38 @@ def test_retrieve(query, top_k, mock_vector_store_connector, embedding_retriever
     retrieved_chunks = embedding_retriever._retrieve(query)
 
     assert len(retrieved_chunks) == top_k
+
+
+@pytest.mark.asyncio
+async def test_multi_similarity_search_concurrently(mock_vector_store_connector):
+    running = 0
+    max_running = 0
+    shared = Chunk(chunk_id="shared", content="shared")
+
+    async def _search(query, top_k, score_threshold, filters):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        score = 0.9 if query == "q1" else 0.5
+        return [
+            Chunk(chunk_id=shared.chunk_id, content="shared", score=score),
+            Chunk(chunk_id=f"{query}-only", content=query, score=0.6),
+        ]
+
+    mock_vector_store_connector.asimilar_search_with_scores = _search
+    retriever = EmbeddingRetriever(
+        index_store=mock_vector_store_connector, concurrency_limit=2
+    )
+    chunks = await retriever.amulti_similarity_search(["q1", "q2", "q3"], 0.0)
+    assert max_running == 2
+    assert [c.chunk_id for c in chunks] == ["shared", "q1-only", "q2-only", "q3-only"]
+    assert chunks[0].score == 0.9
+
+
+def test_fuse_candidates_rrf():
+    a, b, c = (Chunk(chunk_id=i, score=0.5) for i in "abc")
+    fused = fuse_candidates([[a, b], [c, b]], FusionStrategy.RRF, rrf_k=1)
+    assert [chunk.chunk_id for chunk in fused] == ["b", "a", "c"]
+    assert fused[0].score == pytest.approx(1 / 3 + 1 / 3)
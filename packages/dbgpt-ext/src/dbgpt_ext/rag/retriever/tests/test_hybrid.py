@@ -0,0 +1,109 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from dbgpt.core import Chunk
+from dbgpt.rag.retriever.hybrid import HybridRetriever
+from dbgpt.rag.retriever.rerank import (
+    FusionStrategy,
+    Ranker,
+    RRFRanker,
+    fuse_candidates,
+)
+from dbgpt.storage.full_text.base import FullTextStoreBase
+
+
+def _chunks(scores):
+    return [Chunk(chunk_id=i, content=i, score=s) for i, s in scores]
+
+
+@pytest.fixture
+def vector_store():
+    store = MagicMock()
+
+    async def _search(query, top_k, score_threshold, filters):
+        return _chunks([("a", 0.9), ("b", 0.8), ("c", 0.7)])[:top_k]
+
+    store.asimilar_search_with_scores = _search
+    store.similar_search.return_value = _chunks([("a", 0.9), ("b", 0.8)])
+    return store
+
+
+@pytest.fixture
+def full_text_store():
+    store = MagicMock(spec=FullTextStoreBase)
+
+    async def _search(query, top_k, score_threshold, filters):
+        return _chunks([("c", 12.0), ("d", 10.0), ("b", 3.0)])[:top_k]
+
+    store.asimilar_search_with_scores = _search
+    store.similar_search_with_scores.return_value = _chunks([("d", 12.0)])
+    return store
+
+
+class _RecordRanker(Ranker):
+    def __init__(self):
+        super().__init__(topk=10)
+        self.candidates = []
+
+    def rank(self, candidates_with_scores, query=None):
+        self.candidates = list(candidates_with_scores)
+        return sorted(candidates_with_scores, key=lambda x: x.chunk_id)
+
+
+@pytest.mark.asyncio
+async def test_hybrid_rrf_and_rerank(vector_store, full_text_store):
+    ranker = _RecordRanker()
+    retriever = HybridRetriever(
+        vector_store,
+        full_text_store,
+        top_k=2,
+        candidate_top_k=3,
+        rrf_k=1,
+        rerank=ranker,
+        rerank_top_k=3,
+    )
+    chunks = await retriever.aretrieve_with_scores("query", 0.0)
+    # b: 1/3 + 1/4, c: 1/4 + 1/2, a: 1/2, d: 1/3
+    assert [c.chunk_id for c in ranker.candidates] == ["c", "b", "a"]
+    assert ranker.candidates[0].score == pytest.approx(1 / 4 + 1 / 2)
+    assert [c.chunk_id for c in chunks] == ["a", "b"]
+
+
+def test_hybrid_sync_weighted(vector_store, full_text_store):
+    retriever = HybridRetriever(
+        vector_store,
+        full_text_store,
+        top_k=3,
+        fusion_strategy=FusionStrategy.WEIGHTED,
+        weights=[1.0, 2.0],
+    )
+    chunks = retriever.retrieve("query")
+    assert [c.chunk_id for c in chunks] == ["d", "a", "b"]
+    assert chunks[0].score == pytest.approx(2.0)
+
+
+def test_hybrid_without_full_text(vector_store):
+    vector_store.is_support_full_text_search.side_effect = NotImplementedError
+    retriever = HybridRetriever(vector_store, top_k=4)
+    chunks = retriever.retrieve("query")
+    assert [c.chunk_id for c in chunks] == ["a", "b"]
+    with pytest.raises(ValueError):
+        HybridRetriever(vector_store, fusion_strategy=FusionStrategy.MAX_SCORE)
+
+
+def test_rrf_ranker():
+    candidates = _chunks([("a", 0.9), ("b", 0.8)]) + _chunks([("b", 9.0), ("c", 8.0)])
+    for chunk in candidates[:2]:
+        chunk.retriever = "embedding_retriever"
+    for chunk in candidates[2:]:
+        chunk.retriever = "bm25_retriever"
+    ranker = RRFRanker(topk=2, rrf_k=1, weights={"bm25_retriever": 0.5})
+    chunks = ranker.rank(candidates)
+    # b: 1/3 + 0.5/2, a: 1/2, c: 0.5/3
+    assert [c.chunk_id for c in chunks] == ["b", "a"]
+
+
+def test_fuse_candidates_weights_mismatch():
+    with pytest.raises(ValueError):
+        fuse_candidates([[], []], FusionStrategy.RRF, weights=[1.0])
@@ -1,15 +1,20 @@
 """Summary for rdbms database."""
 
+import logging
 import re
 from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 from dbgpt._private.config import Config
 from dbgpt.datasource import BaseConnector
+from dbgpt.datasource.rdbms.base import RDBMSConnector
+from dbgpt.datasource.rdbms.schema_snapshot import get_schema_snapshot_manager
 from dbgpt.rag.summary.db_summary import DBSummary
 
 if TYPE_CHECKING:
     from dbgpt.datasource.manages import ConnectorManager
 
+logger = logging.getLogger(__name__)
+
 CFG = Config()
 
 
@@ -26,6 +31,21 @@ _DEFAULT_SUMMARY_TEMPLATE_PATTEN = (
 _DEFAULT_COLUMN_SEPARATOR = ",\r\n    "
 
 
+def _schema_source(conn: BaseConnector) -> Any:
+    """Return the schema snapshot view of the RDBMS connectors.
+
+    The snapshot is loaded by the bulk introspection and refreshed incrementally,
+    the other connectors are read directly.
+    """
+    if not isinstance(conn, RDBMSConnector):
+        return conn
+    try:
+        return get_schema_snapshot_manager().get_snapshot(conn).view()
+    except Exception as e:
+        logger.warning(f"Load schema snapshot failed, reflect the tables: {e}")
+        return conn
+
+
 def _parse_table_detail(table_desc_str: str) -> Dict[str, Any]:
     """Parse table detail string.
 
@@ -74,7 +94,8 @@ class RdbmsSummary(DBSummary):
             charset=self.db.get_charset(),
             collation=self.db.get_collation(),
         )
-        tables = self.db.get_table_names()
+        self._schema = _schema_source(self.db)
+        tables = self._schema.get_table_names()
         self.table_info_summaries = [
             self.get_table_summary(table_name) for table_name in tables
         ]
@@ -86,7 +107,7 @@ class RdbmsSummary(DBSummary):
             table_name(column1(column1 comment),column2(column2 comment),
             column3(column3 comment) and index keys, and table comment: {table_comment})
         """
-        return _parse_table_summary(self.db, self.summary_template, table_name)
+        return _parse_table_summary(self._schema, self.summary_template, table_name)
 
     def table_summaries(self):
         """Get table summaries."""
@@ -102,6 +123,7 @@ def _parse_db_summary(
         conn (BaseConnector): database connection
         summary_template (str): summary template
     """
+    conn = _schema_source(conn)
     tables = conn.get_table_names()
     table_info_summaries = [
         _parse_table_summary(conn, summary_template, table_name)
@@ -126,6 +148,7 @@ def _parse_db_summary_with_metadata(
             basic info and fields. defaults to `-- table-field-separator--`
         model_dimension(int, optional): The threshold for splitting field string
     """
+    conn = _schema_source(conn)
     tables = conn.get_table_names()
     table_info_summaries = [
         _parse_table_summary_with_metadata(
@@ -246,7 +269,7 @@ def _parse_table_summary_with_metadata(
 
     try:
         comment = conn.get_table_comment(table_name)
-        table_comment = comment.get("text")
+        table_comment = comment.get("text") or ""
     except Exception:
         pass
 
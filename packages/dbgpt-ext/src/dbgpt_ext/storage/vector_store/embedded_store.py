@@ -0,0 +1,770 @@
+"""Embedded vector store, runs in the process without any server.
+
+The vectors are appended to a memory-mapped file, the contents and the metadata of
+the chunks are stored in a sidecar SQLite table. The search is an exact
+brute-force scan with NumPy, or an IVF(inverted file) approximate search which
+only scans the clusters nearest to the query.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from functools import reduce
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from dbgpt.configs.model_config import PILOT_PATH, resolve_root_path
+from dbgpt.core import Chunk, Embeddings
+from dbgpt.core.awel.flow import Parameter, ResourceCategory, register_resource
+from dbgpt.storage.vector_store.base import (
+    _VECTOR_STORE_COMMON_PARAMETERS,
+    VectorStoreBase,
+    VectorStoreConfig,
+)
+from dbgpt.storage.vector_store.filters import (
+    FilterCondition,
+    FilterOperator,
+    MetadataFilter,
+    MetadataFilters,
+)
+from dbgpt.util.i18n_utils import _
+
+logger = logging.getLogger(__name__)
+
+# The rows scored in one block, bound the memory of the float16 to float32 copies
+_SCORE_BLOCK_ROWS = 65536
+# The min training rows of every IVF cluster
+_IVF_MIN_ROWS_PER_LIST = 8
+_IVF_TRAIN_ITERATIONS = 10
+# Retrain the IVF index when the rows grow by this factor since the last training
+_IVF_RETRAIN_GROWTH = 2
+# Don't compact the small stores
+_COMPACTION_MIN_ROWS = 64
+
+
+@register_resource(
+    _("Embedded Vector Config"),
+    "embedded_vector_config",
+    category=ResourceCategory.VECTOR_STORE,
+    description=_("Embedded vector store config."),
+    parameters=[
+        Parameter.build_from(
+            _("Persist Path"),
+            "persist_path",
+            str,
+            description=_("the persist path of vector store."),
+            optional=True,
+            default=None,
+        ),
+        Parameter.build_from(
+            _("Index Type"),
+            "index_type",
+            str,
+            description=_("The index type, flat(exact search) or ivf."),
+            optional=True,
+            default="flat",
+        ),
+    ],
+)
+@dataclass
+class EmbeddedVectorConfig(VectorStoreConfig):
+    """Embedded vector store config."""
+
+    __type__ = "embedded"
+
+    persist_path: Optional[str] = field(
+        default=None,
+        metadata={
+            "help": _("The persist path of vector store."),
+        },
+    )
+    dtype: str = field(
+        default="float32",
+        metadata={
+            "help": _(
+                "The data type of the stored vectors, float16 halves the disk and "
+                "memory usage with a little precision loss."
+            ),
+            "valid_values": ["float32", "float16"],
+        },
+    )
+    index_type: str = field(
+        default="flat",
+        metadata={
+            "help": _(
+                "The index type, flat is the exact brute-force search, ivf only "
+                "scans the clusters nearest to the query."
+            ),
+            "valid_values": ["flat", "ivf"],
+        },
+    )
+    ivf_nlist: Optional[int] = field(
+        default=None,
+        metadata={
+            "help": _(
+                "The number of the IVF clusters, the square root of the rows if not "
+                "set."
+            ),
+        },
+    )
+    ivf_nprobe: Optional[int] = field(
+        default=None,
+        metadata={
+            "help": _(
+                "The number of the nearest IVF clusters to scan, "
+                "ivf_nprobe_ratio of the clusters if not set."
+            ),
+        },
+    )
+    ivf_nprobe_ratio: float = field(
+        default=0.1,
+        metadata={
+            "help": _(
+                "The ratio of the nearest IVF clusters to scan, only used when "
+                "ivf_nprobe is not set."
+            ),
+        },
+    )
+    compaction_threshold: float = field(
+        default=0.2,
+        metadata={
+            "help": _(
+                "Compact the vector file in background when the ratio of the deleted "
+                "rows exceeds it."
+            ),
+        },
+    )
+
+    def create_store(self, **kwargs) -> "EmbeddedVectorStore":
+        """Create index store."""
+        return EmbeddedVectorStore(vector_store_config=self, **kwargs)
+
+
+class _BitmapIndex:
+    """The bitmap index of the metadata, map every key and value to the rows."""
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, Dict[Any, List[int]]] = {}
+        self._bitmaps: Dict[Tuple[str, Any], np.ndarray] = {}
+
+    def add(self, row: int, metadata: Dict[str, Any]) -> None:
+        for key, value in metadata.items():
+            if isinstance(value, (str, int, float, bool)):
+                self._postings.setdefault(key, {}).setdefault(value, []).append(row)
+        self._bitmaps.clear()
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._bitmaps.clear()
+
+    def mask(self, filters: MetadataFilters, num_rows: int) -> np.ndarray:
+        """Return the rows matched by the filters as a boolean mask."""
+        masks = [self._filter_mask(f, num_rows) for f in filters.filters]
+        if not masks:
+            return np.ones(num_rows, dtype=bool)
+        if filters.condition == FilterCondition.OR:
+            return reduce(np.logical_or, masks)
+        return reduce(np.logical_and, masks)
+
+    def _bitmap(self, key: str, value: Any, num_rows: int) -> np.ndarray:
+        bitmap = self._bitmaps.get((key, value))
+        if bitmap is None or len(bitmap) != num_rows:
+            bitmap = np.zeros(num_rows, dtype=bool)
+            bitmap[self._postings[key][value]] = True
+            self._bitmaps[(key, value)] = bitmap
+        return bitmap
+
+    def _union(self, key: str, values: List[Any], num_rows: int) -> np.ndarray:
+        mask = np.zeros(num_rows, dtype=bool)
+        postings = self._postings.get(key, {})
+        for value in values:
+            if value in postings:
+                mask |= self._bitmap(key, value, num_rows)
+        return mask
+
+    def _filter_mask(self, f: MetadataFilter, num_rows: int) -> np.ndarray:
+        op = f.operator
+        values = f.value if isinstance(f.value, list) else [f.value]
+        postings = self._postings.get(f.key, {})
+        if op == FilterOperator.EQ:
+            return self._union(f.key, values, num_rows)
+        elif op == FilterOperator.NE:
+            return ~self._union(f.key, values, num_rows)
+        elif op == FilterOperator.IN:
+            return self._union(f.key, values, num_rows)
+        elif op == FilterOperator.NIN:
+            return ~self._union(f.key, values, num_rows)
+        elif op == FilterOperator.EXISTS:
+            return self._union(f.key, list(postings), num_rows)
+        compare = {
+            FilterOperator.GT: lambda v: v > f.value,
+            FilterOperator.LT: lambda v: v < f.value,
+            FilterOperator.GTE: lambda v: v >= f.value,
+            FilterOperator.LTE: lambda v: v <= f.value,
+        }.get(op)
+        if compare is None:
+            raise ValueError(f"Embedded vector store operator {op} not supported")
+        matched = []
+        for value in postings:
+            try:
+                if compare(value):
+                    matched.append(value)
+            except TypeError:
+                # Not comparable, e.g. a string value with a number filter
+                continue
+        return self._union(f.key, matched, num_rows)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class _IVFIndex:
+    """The IVF index, the vectors are clustered by the spherical k-means."""
+
+    def __init__(self, centroids: np.ndarray) -> None:
+        self.centroids = centroids.astype(np.float32)
+        self.assignments = np.zeros(0, dtype=np.int32)
+
+    @classmethod
+    def train(cls, vectors: np.ndarray, nlist: int, seed: int = 0) -> "_IVFIndex":
+        rng = np.random.default_rng(seed)
+        sample_size = min(len(vectors), nlist * 256)
+        sample = vectors[np.sort(rng.choice(len(vectors), sample_size, False))]
+        sample = np.asarray(sample, dtype=np.float32)
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _step in range(_IVF_TRAIN_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for i in range(nlist):
+                members = sample[labels == i]
+                if len(members):
+                    centroids[i] = members.mean(axis=0)
+            centroids = _normalize(centroids)
+        return cls(centroids)
+
+    def assign(self, vectors: np.ndarray) -> np.ndarray:
+        labels = [
+            np.argmax(
+                np.asarray(vectors[i : i + _SCORE_BLOCK_ROWS], np.float32)
+                @ self.centroids.T,
+                axis=1,
+            )
+            for i in range(0, len(vectors), _SCORE_BLOCK_ROWS)
+        ]
+        if not labels:
+            return np.zeros(0, dtype=np.int32)
+        return np.concatenate(labels).astype(np.int32)
+
+    def append(self, vectors: np.ndarray) -> None:
+        self.assignments = np.concatenate([self.assignments, self.assign(vectors)])
+
+    def probe(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        """Return the rows in the nearest `nprobe` clusters as a boolean mask."""
+        nprobe = min(nprobe, len(self.centroids))
+        lists = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        return np.isin(self.assignments, lists)
+
+
+def _collection_dir_name(name: str) -> str:
+    if re.match(r"^[a-zA-Z0-9_][-a-zA-Z0-9_.]{0,62}$", name) and ".." not in name:
+        return name
+    return hashlib.sha256(name.encode("utf-8")).hexdigest()[:32]
+
+
+@register_resource(
+    _("Embedded Vector Store"),
+    "embedded_vector_store",
+    category=ResourceCategory.VECTOR_STORE,
+    description=_("Embedded vector store, runs in the process without any server."),
+    parameters=[
+        Parameter.build_from(
+            _("Embedded Config"),
+            "vector_store_config",
+            EmbeddedVectorConfig,
+            description=_("the embedded config of vector store."),
+            optional=True,
+            default=None,
+        ),
+        *_VECTOR_STORE_COMMON_PARAMETERS,
+    ],
+)
+class EmbeddedVectorStore(VectorStoreBase):
+    """Embedded vector store.
+
+    The vectors are normalized and stored in `vectors.<generation>.bin`, the row
+    `i` of the file is the row `i` of the SQLite table `chunks`. A deleted or
+    replaced chunk is only marked as deleted(a tombstone), the deleted rows are
+    removed by the compaction, which writes a file of the next generation.
+
+    The store is safe to use from multiple threads of a process, but not from
+    multiple processes.
+    """
+
+    def __init__(
+        self,
+        vector_store_config: EmbeddedVectorConfig,
+        name: Optional[str],
+        embedding_fn: Optional[Embeddings] = None,
+        max_chunks_once_load: Optional[int] = None,
+        max_threads: Optional[int] = None,
+    ) -> None:
+        """Create an EmbeddedVectorStore instance.
+
+        Args:
+            vector_store_config(EmbeddedVectorConfig): vector store config.
+            name(str): collection name.
+            embedding_fn(Embeddings): embedding function.
+            max_chunks_once_load(int): max chunks once load.
+            max_threads(int): max threads.
+        """
+        super().__init__(
+            max_chunks_once_load=max_chunks_once_load, max_threads=max_threads
+        )
+        self._vector_store_config = vector_store_config
+        self.embeddings = embedding_fn
+        if not self.embeddings:
+            raise ValueError("Embeddings is None")
+        self._collection_name = name or "dbgpt_collection"
+        persist_path = vector_store_config.persist_path or os.path.join(
+            PILOT_PATH, "data"
+        )
+        self.persist_dir = os.path.join(
+            resolve_root_path(persist_path),
+            "embedded_vector",
+            _collection_dir_name(self._collection_name),
+        )
+        os.makedirs(self.persist_dir, exist_ok=True)
+        self._lock = threading.RLock()
+        self._compaction_thread: Optional[threading.Thread] = None
+        self._db = sqlite3.connect(
+            os.path.join(self.persist_dir, "meta.db"), check_same_thread=False
+        )
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS info (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS chunks (
+                row INTEGER PRIMARY KEY,
+                chunk_id TEXT NOT NULL,
+                content TEXT,
+                metadata TEXT,
+                deleted INTEGER NOT NULL DEFAULT 0
+            );
+            """
+        )
+        self._dim: Optional[int] = None
+        self._dtype = np.dtype(vector_store_config.dtype)
+        self._generation = 0
+        self._num_rows = 0
+        self._deleted = np.zeros(0, dtype=bool)
+        self._id_to_row: Dict[str, int] = {}
+        self._bitmap_index = _BitmapIndex()
+        self._ivf: Optional[_IVFIndex] = None
+        # The live rows when the IVF index was trained
+        self._ivf_trained_rows = 0
+        self._mmap: Optional[np.memmap] = None
+        with self._lock:
+            self._load_state()
+
+    def get_config(self) -> EmbeddedVectorConfig:
+        """Get the vector store config."""
+        return self._vector_store_config
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.persist_dir, f"vectors.{self._generation}.bin")
+
+    def _get_info(self, key: str) -> Optional[str]:
+        row = self._db.execute(
+            "SELECT value FROM info WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set_info(self, key: str, value: Any) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO info (key, value) VALUES (?, ?)", (key, str(value))
+        )
+
+    def _load_state(self) -> None:
+        """Load the in-memory state from the SQLite table and the vector file."""
+        dim = self._get_info("dim")
+        self._dim = int(dim) if dim else None
+        dtype = self._get_info("dtype")
+        if dtype:
+            # The existing vectors keep their data type
+            self._dtype = np.dtype(dtype)
+        self._generation = int(self._get_info("generation") or 0)
+        self._remove_stale_files()
+        self._num_rows = 0
+        self._id_to_row = {}
+        self._bitmap_index.clear()
+        self._mmap = None
+        deleted = []
+        cursor = self._db.execute(
+            "SELECT row, chunk_id, metadata, deleted FROM chunks ORDER BY row"
+        )
+        for row, chunk_id, metadata, is_deleted in cursor:
+            deleted.append(bool(is_deleted))
+            if not is_deleted:
+                self._id_to_row[chunk_id] = row
+            self._bitmap_index.add(row, json.loads(metadata) if metadata else {})
+            self._num_rows = row + 1
+        self._deleted = np.array(deleted, dtype=bool)
+        if self._dim and os.path.exists(self._vectors_path):
+            # Drop the vectors appended by an interrupted load
+            expected_size = self._num_rows * self._dim * self._dtype.itemsize
+            if os.path.getsize(self._vectors_path) > expected_size:
+                with open(self._vectors_path, "r+b") as f:
+                    f.truncate(expected_size)
+        self._ivf = None
+        self._load_ivf()
+
+    def _remove_stale_files(self) -> None:
+        """Remove the vector files and the IVF files of the other generations."""
+        current = {f"vectors.{self._generation}.bin", f"ivf.{self._generation}.npy"}
+        for file_name in os.listdir(self.persist_dir):
+            if file_name.startswith(("vectors.", "ivf.")) and file_name not in current:
+                os.remove(os.path.join(self.persist_dir, file_name))
+
+    def _vectors(self) -> np.ndarray:
+        if self._num_rows == 0 or not self._dim:
+            return np.zeros((0, self._dim or 0), dtype=self._dtype)
+        if self._mmap is None or len(self._mmap) != self._num_rows:
+            self._mmap = np.memmap(
+                self._vectors_path,
+                dtype=self._dtype,
+                mode="r",
+                shape=(self._num_rows, self._dim),
+            )
+        return self._mmap
+
+    def _load_ivf(self) -> None:
+        if self._vector_store_config.index_type != "ivf":
+            return
+        path = os.path.join(self.persist_dir, f"ivf.{self._generation}.npy")
+        if not os.path.exists(path):
+            self._maybe_train_ivf()
+            return
+        self._ivf = _IVFIndex(np.load(path))
+        self._ivf.append(self._vectors())
+        # Not recorded by the older versions, retrain it now
+        self._ivf_trained_rows = int(self._get_info("ivf_trained_rows") or 0)
+        self._maybe_train_ivf()
+
+    def _maybe_train_ivf(self) -> None:
+        """Train the IVF index, or retrain it if the rows grew a lot.
+
+        The clusters trained with few rows are too few and too coarse for the grown
+        collection, retraining with a geometric growth keeps the amortized cost
+        constant per row.
+        """
+        if self._vector_store_config.index_type != "ivf":
+            return
+        if self._ivf is not None and (
+            len(self._id_to_row) < self._ivf_trained_rows * _IVF_RETRAIN_GROWTH
+        ):
+            return
+        live_rows = np.flatnonzero(~self._deleted)
+        nlist = self._vector_store_config.ivf_nlist or int(np.sqrt(len(live_rows)))
+        if nlist < 2 or len(live_rows) < nlist * _IVF_MIN_ROWS_PER_LIST:
+            return
+        vectors = self._vectors()
+        ivf = _IVFIndex.train(vectors[live_rows], nlist)
+        ivf.append(vectors)
+        path = os.path.join(self.persist_dir, f"ivf.{self._generation}.npy")
+        with open(f"{path}.tmp", "wb") as f:
+            np.save(f, ivf.centroids)
+        os.replace(f"{path}.tmp", path)
+        self._set_info("ivf_trained_rows", len(live_rows))
+        self._db.commit()
+        self._ivf = ivf
+        self._ivf_trained_rows = len(live_rows)
+        logger.info(
+            f"Train the IVF index of {self._collection_name} with {nlist} lists"
+        )
+
+    def _ivf_nprobe(self) -> int:
+        if self._vector_store_config.ivf_nprobe:
+            return self._vector_store_config.ivf_nprobe
+        nlist = len(self._ivf.centroids) if self._ivf is not None else 1
+        return max(1, math.ceil(nlist * self._vector_store_config.ivf_nprobe_ratio))
+
+    def vector_name_exists(self) -> bool:
+        """Whether vector name exists."""
+        with self._lock:
+            return len(self._id_to_row) > 0
+
+    def load_document(self, chunks: List[Chunk]) -> List[str]:
+        """Load document to vector store.
+
+        The chunks with the existing chunk ids replace the old ones.
+        """
+        if not chunks:
+            return []
+        texts = [chunk.content for chunk in chunks]
+        vectors = _normalize(
+            np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32)
+        )
+        with self._lock:
+            if self._dim is None:
+                self._dim = vectors.shape[1]
+                self._set_info("dim", self._dim)
+                self._set_info("dtype", self._dtype.name)
+                self._set_info("generation", self._generation)
+            elif vectors.shape[1] != self._dim:
+                raise ValueError(
+                    f"The dimension of the embeddings is {vectors.shape[1]}, but the "
+                    f"dimension of the collection {self._collection_name} is "
+                    f"{self._dim}"
+                )
+            start = self._num_rows
+            # Append the vectors before the rows, the vectors without rows are
+            # dropped when loading
+            with open(self._vectors_path, "ab") as f:
+                f.write(vectors.astype(self._dtype).tobytes())
+            replaced: List[int] = []
+            rows = []
+            for i, chunk in enumerate(chunks):
+                if chunk.chunk_id in self._id_to_row:
+                    replaced.append(self._id_to_row[chunk.chunk_id])
+                self._id_to_row[chunk.chunk_id] = start + i
+                rows.append(
+                    (
+                        start + i,
+                        chunk.chunk_id,
+                        chunk.content,
+                        json.dumps(chunk.metadata, ensure_ascii=False),
+                    )
+                )
+            self._db.executemany(
+                "INSERT INTO chunks (row, chunk_id, content, metadata) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._mark_deleted(replaced)
+            self._db.commit()
+            self._num_rows += len(chunks)
+            self._deleted = np.concatenate(
+                [self._deleted, np.zeros(len(chunks), dtype=bool)]
+            )
+            self._deleted[replaced] = True
+            for i, chunk in enumerate(chunks):
+                self._bitmap_index.add(start + i, chunk.metadata)
+            if self._ivf is not None:
+                self._ivf.append(vectors)
+            self._maybe_train_ivf()
+            self._maybe_compact()
+        return [chunk.chunk_id for chunk in chunks]
+
+    def _mark_deleted(self, rows: List[int]) -> None:
+        if rows:
+            self._db.executemany(
+                "UPDATE chunks SET deleted = 1 WHERE row = ?", [(r,) for r in rows]
+            )
+
+    def similar_search(
+        self, text, topk, filters: Optional[MetadataFilters] = None
+    ) -> List[Chunk]:
+        """Search similar documents."""
+        return self._query(text, topk, filters)
+
+    def similar_search_with_scores(
+        self, text, topk, score_threshold, filters: Optional[MetadataFilters] = None
+    ) -> List[Chunk]:
+        """Search similar documents with scores.
+
+        Return the chunks and the cosine similarity scores.
+
+        Args:
+            text(str): query text
+            topk(int): return docs nums. Defaults to 4.
+            score_threshold(float): score_threshold: Optional, a floating point value
+                between 0 to 1 to filter the resulting set of retrieved docs,0 is
+                dissimilar, 1 is most similar.
+            filters(MetadataFilters): metadata filters, defaults to None
+        """
+        chunks = self._query(text, topk, filters)
+        return self.filter_by_score_threshold(chunks, score_threshold)
+
+    def convert_metadata_filters(self, filters: MetadataFilters) -> np.ndarray:
+        """Convert metadata filters to the boolean mask of the rows.
+
+        Args:
+            filters(MetadataFilters): metadata filters.
+        Returns:
+            np.ndarray: The rows matched by the filters.
+        """
+        with self._lock:
+            return self._bitmap_index.mask(filters, self._num_rows)
+
+    def _query(
+        self, text: str, topk: int, filters: Optional[MetadataFilters] = None
+    ) -> List[Chunk]:
+        if not text:
+            return []
+        query = _normalize(
+            np.asarray(self.embeddings.embed_query(text), dtype=np.float32)
+        )
+        with self._lock:
+            if self._num_rows == 0:
+                return []
+            mask = ~self._deleted
+            if filters:
+                mask &= self._bitmap_index.mask(filters, self._num_rows)
+            if self._ivf is not None:
+                probe_mask = mask & self._ivf.probe(query, self._ivf_nprobe())
+                # Too few candidates in the nearest clusters, scan all the rows
+                if np.count_nonzero(probe_mask) >= topk:
+                    mask = probe_mask
+            rows = np.flatnonzero(mask)
+            if len(rows) == 0:
+                return []
+            vectors = self._vectors()
+            scores = np.concatenate(
+                [
+                    np.asarray(
+                        vectors[rows[i : i + _SCORE_BLOCK_ROWS]], dtype=np.float32
+                    )
+                    @ query
+                    for i in range(0, len(rows), _SCORE_BLOCK_ROWS)
+                ]
+            )
+            topk = min(topk, len(rows))
+            top = np.argpartition(-scores, topk - 1)[:topk]
+            top = top[np.argsort(-scores[top])]
+            top_rows = [int(rows[i]) for i in top]
+            records = {
+                row: (chunk_id, content, metadata)
+                for row, chunk_id, content, metadata in self._db.execute(
+                    "SELECT row, chunk_id, content, metadata FROM chunks "
+                    f"WHERE row IN ({','.join('?' * len(top_rows))})",
+                    top_rows,
+                )
+            }
+        chunks = []
+        for row, i in zip(top_rows, top):
+            chunk_id, content, metadata = records[row]
+            chunks.append(
+                Chunk(
+                    chunk_id=chunk_id,
+                    content=content,
+                    metadata=json.loads(metadata) if metadata else {},
+                    score=float(scores[i]),
+                )
+            )
+        return chunks
+
+    def delete_by_ids(self, ids: str) -> List[str]:
+        """Delete vector by ids.
+
+        Args:
+            ids (str): Comma-separated string of IDs to delete.
+        """
+        deleted_ids = []
+        with self._lock:
+            rows = []
+            for chunk_id in ids.split(","):
+                row = self._id_to_row.pop(chunk_id, None)
+                if row is not None:
+                    rows.append(row)
+                    deleted_ids.append(chunk_id)
+            self._mark_deleted(rows)
+            self._db.commit()
+            self._deleted[rows] = True
+            self._maybe_compact()
+        return deleted_ids
+
+    def _maybe_compact(self) -> None:
+        if self._num_rows < _COMPACTION_MIN_ROWS:
+            return
+        ratio = np.count_nonzero(self._deleted) / self._num_rows
+        if ratio <= self._vector_store_config.compaction_threshold:
+            return
+        if self._compaction_thread and self._compaction_thread.is_alive():
+            return
+        self._compaction_thread = threading.Thread(
+            target=self.compact, name="embedded-vector-compaction", daemon=True
+        )
+        self._compaction_thread.start()
+
+    def compact(self) -> None:
+        """Remove the deleted rows from the vector file and the SQLite table."""
+        with self._lock:
+            live_rows = np.flatnonzero(~self._deleted)
+            if len(live_rows) == self._num_rows:
+                return
+            vectors = self._vectors()
+            generation = self._generation + 1
+            new_path = os.path.join(self.persist_dir, f"vectors.{generation}.bin")
+            with open(new_path, "wb") as f:
+                for i in range(0, len(live_rows), _SCORE_BLOCK_ROWS):
+                    f.write(
+                        np.ascontiguousarray(
+                            vectors[live_rows[i : i + _SCORE_BLOCK_ROWS]]
+                        ).tobytes()
+                    )
+            # The rows and the generation are switched in one transaction
+            self._db.executescript(
+                f"""
+                BEGIN;
+                CREATE TABLE chunks_new (
+                    row INTEGER PRIMARY KEY,
+                    chunk_id TEXT NOT NULL,
+                    content TEXT,
+                    metadata TEXT,
+                    deleted INTEGER NOT NULL DEFAULT 0
+                );
+                INSERT INTO chunks_new (row, chunk_id, content, metadata)
+                    SELECT ROW_NUMBER() OVER (ORDER BY row) - 1, chunk_id, content,
+                        metadata
+                    FROM chunks WHERE deleted = 0;
+                DROP TABLE chunks;
+                ALTER TABLE chunks_new RENAME TO chunks;
+                INSERT OR REPLACE INTO info (key, value)
+                    VALUES ('generation', '{generation}');
+                COMMIT;
+                """
+            )
+            removed = self._num_rows - len(live_rows)
+            self._mmap = None
+            self._load_state()
+        logger.info(
+            f"Compact the embedded vector store {self._collection_name}, remove "
+            f"{removed} deleted rows"
+        )
+
+    def truncate(self) -> List[str]:
+        """Truncate data index_name."""
+        with self._lock:
+            ids = list(self._id_to_row)
+            self._db.execute("DELETE FROM chunks")
+            self._db.execute("DELETE FROM info")
+            # Switch to a new generation, the old files are removed when loading
+            self._set_info("generation", self._generation + 1)
+            self._db.commit()
+            self._dtype = np.dtype(self._vector_store_config.dtype)
+            self._load_state()
+        logger.info(
+            f"truncate embedded vector store {self._collection_name} "
+            f"{len(ids)} chunks success"
+        )
+        return ids
+
+    def delete_vector_name(self, vector_name: str):
+        """Delete vector name."""
+        logger.info(f"embedded vector_name:{vector_name} begin delete...")
+        with self._lock:
+            self._db.close()
+            self._mmap = None
+            for file_name in os.listdir(self.persist_dir):
+                os.remove(os.path.join(self.persist_dir, file_name))
+            os.rmdir(self.persist_dir)
+        return True
@@ -0,0 +1,143 @@
+from typing import List
+
+import numpy as np
+import pytest
+
+from dbgpt.core import Chunk, Embeddings
+from dbgpt.storage.vector_store.filters import (
+    FilterCondition,
+    FilterOperator,
+    MetadataFilter,
+    MetadataFilters,
+)
+
+from ..embedded_store import EmbeddedVectorConfig, EmbeddedVectorStore
+
+
+class _HashEmbeddings(Embeddings):
+    """Deterministic random embeddings, the same text has the same vector."""
+
+    def __init__(self, dim: int = 16):
+        self._dim = dim
+
+    def _embed(self, text: str) -> List[float]:
+        seed = sum(ord(c) * (i + 1) for i, c in enumerate(text))
+        return np.random.default_rng(seed).normal(size=self._dim).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+def _store(path, **kwargs) -> EmbeddedVectorStore:
+    config = EmbeddedVectorConfig(persist_path=str(path), **kwargs)
+    return config.create_store(name="test", embedding_fn=_HashEmbeddings())
+
+
+def _chunks(n: int, start: int = 0) -> List[Chunk]:
+    return [
+        Chunk(
+            chunk_id=f"id{i}",
+            content=f"content {i}",
+            metadata={"source": f"doc{i % 3}", "page": i},
+        )
+        for i in range(start, start + n)
+    ]
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_exact_search_and_reopen(tmp_path, dtype):
+    store = _store(tmp_path, dtype=dtype)
+    store.load_document(_chunks(20))
+    chunks = store.similar_search_with_scores("content 7", 3, 0.0)
+    assert chunks[0].chunk_id == "id7"
+    assert chunks[0].score == pytest.approx(1.0, abs=1e-2)
+    assert chunks[0].metadata == {"source": "doc1", "page": 7}
+    assert chunks[0].content == "content 7"
+
+    reopened = _store(tmp_path, dtype=dtype)
+    assert reopened.vector_name_exists()
+    assert reopened.similar_search("content 7", 1)[0].chunk_id == "id7"
+
+
+def test_metadata_filters(tmp_path):
+    store = _store(tmp_path)
+    store.load_document(_chunks(20))
+    filters = MetadataFilters(
+        filters=[
+            MetadataFilter(key="source", value="doc1"),
+            MetadataFilter(key="page", operator=FilterOperator.GT, value=10),
+        ]
+    )
+    chunks = store.similar_search("content 7", 10, filters)
+    assert sorted(c.chunk_id for c in chunks) == ["id13", "id16", "id19"]
+
+    filters = MetadataFilters(
+        condition=FilterCondition.OR,
+        filters=[
+            MetadataFilter(key="page", operator=FilterOperator.IN, value=[1, 2]),
+            MetadataFilter(key="page", operator=FilterOperator.LTE, value=0),
+        ],
+    )
+    chunks = store.similar_search("content 7", 10, filters)
+    assert sorted(c.chunk_id for c in chunks) == ["id0", "id1", "id2"]
+
+
+def test_upsert_delete_and_compact(tmp_path):
+    store = _store(tmp_path, compaction_threshold=0.2)
+    store.load_document(_chunks(100))
+    # Replace a chunk with new content
+    store.load_document([Chunk(chunk_id="id5", content="new content", metadata={})])
+    assert store.similar_search("new content", 1)[0].chunk_id == "id5"
+    assert store.similar_search("content 5", 1)[0].chunk_id != "id5"
+
+    deleted = store.delete_by_ids(",".join(f"id{i}" for i in range(50)) + ",missing")
+    assert len(deleted) == 50
+    store._compaction_thread.join()
+    assert store._num_rows == 50
+    assert len(list(tmp_path.rglob("vectors.*.bin"))) == 1
+    assert store.similar_search("content 70", 1)[0].chunk_id == "id70"
+    assert store.similar_search("content 7", 100)[0].chunk_id != "id7"
+
+    reopened = _store(tmp_path)
+    assert reopened._num_rows == 50
+    assert reopened.similar_search("content 70", 1)[0].chunk_id == "id70"
+
+    assert len(store.truncate()) == 50
+    assert not store.vector_name_exists()
+    store.load_document(_chunks(2))
+    assert store.similar_search("content 1", 1)[0].chunk_id == "id1"
+
+
+def test_ivf_search(tmp_path):
+    store = _store(tmp_path, index_type="ivf", ivf_nlist=4, ivf_nprobe=2)
+    store.load_document(_chunks(200))
+    assert store._ivf is not None
+    assert len(store._ivf.assignments) == 200
+    for i in (3, 42, 150):
+        assert store.similar_search(f"content {i}", 1)[0].chunk_id == f"id{i}"
+
+    reopened = _store(tmp_path, index_type="ivf", ivf_nlist=4, ivf_nprobe=2)
+    assert reopened._ivf is not None
+    np.testing.assert_array_equal(reopened._ivf.assignments, store._ivf.assignments)
+
+
+def test_ivf_retrain_when_rows_grow(tmp_path):
+    store = _store(tmp_path, index_type="ivf")
+    for start in range(0, 1000, 50):
+        store.load_document(_chunks(50, start))
+    # Retrained when the rows doubled, the lists grow with the rows
+    assert store._ivf_trained_rows == 800
+    assert len(store._ivf.centroids) == 28
+    # Only a fraction of the lists is probed
+    assert store._ivf_nprobe() == 3
+    probed = store._ivf.probe(store._ivf.centroids[0], store._ivf_nprobe())
+    assert np.count_nonzero(probed) < 1000 / 2
+    for i in (3, 420, 999):
+        assert store.similar_search(f"content {i}", 1)[0].chunk_id == f"id{i}"
+
+    reopened = _store(tmp_path, index_type="ivf")
+    assert reopened._ivf_trained_rows == 800
+    np.testing.assert_array_equal(reopened._ivf.centroids, store._ivf.centroids)
@@ -630,17 +630,8 @@ class MultiAgents(BaseComponent, ABC):
         user_code: str = None,
         system_app: str = None,
     ):
-        while True:
-            queue = self.memory.queue(conv_id)
-            if not queue:
-                break
-            item = await queue.get()
-            if item == "[DONE]":
-                queue.task_done()
-                break
-            else:
-                yield item
-                await asyncio.sleep(0.005)
+        async for item in self.memory.chat_messages(conv_id):
+            yield item
 
     async def stable_message(
         self, conv_id: str, user_code: str = None, system_app: str = None
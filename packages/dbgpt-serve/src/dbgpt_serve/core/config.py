@@ -84,6 +84,15 @@ class TokenBufferGPTsAppMemoryConfig(BaseGPTsAppMemoryConfig):
         default=100 * 1024,
         metadata={"help": _("The max token limit. Default is 100k")},
     )
+    summarize_evicted: bool = field(
+        default=False,
+        metadata={
+            "help": _(
+                "Whether to fold the rounds evicted from the token window into a "
+                "rolling summary"
+            )
+        },
+    )
 
 
 @dataclass
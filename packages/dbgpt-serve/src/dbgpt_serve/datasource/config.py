@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Optional
 
 from dbgpt.core.awel.flow import (
     TAGS_ORDER_HIGH,
@@ -27,3 +28,13 @@ class ServeConfig(BaseServeConfig):
     """Parameters for the serve command"""
 
     __type__ = APP_NAME
+
+    schema_snapshot_dir: Optional[str] = field(
+        default=None,
+        metadata={
+            "help": _(
+                "The directory to persist the schema snapshots of the datasources, "
+                "only kept in memory if not set"
+            )
+        },
+    )
@@ -50,6 +50,14 @@ class Serve(BaseServe):
         self._config = self._config or ServeConfig.from_app_config(
             system_app.config, SERVE_CONFIG_KEY_PREFIX
         )
+        if self._config.schema_snapshot_dir:
+            from dbgpt.datasource.rdbms.schema_snapshot import (
+                initialize_schema_snapshot_manager,
+            )
+
+            initialize_schema_snapshot_manager(
+                persist_dir=self._config.schema_snapshot_dir
+            )
         init_endpoints(self._system_app, self._config)
         self._app_has_initiated = True
 
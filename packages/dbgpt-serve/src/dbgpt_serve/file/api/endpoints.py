@@ -1,12 +1,12 @@
 import asyncio
 import logging
 from functools import cache
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from urllib.parse import quote
 
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, UploadFile
 from fastapi.security.http import HTTPAuthorizationCredentials, HTTPBearer
-from starlette.responses import StreamingResponse
+from starlette.responses import Response, StreamingResponse
 
 from dbgpt.component import SystemApp
 from dbgpt_serve.core import Result, blocking_func_to_async
@@ -127,29 +127,64 @@ async def upload_files(
     return Result.succ(results)
 
 
+def _parse_range(range_header: Optional[str]) -> Optional[Tuple[int, Optional[int]]]:
+    """Parse the HTTP Range header to the start and the end(exclusive) offsets.
+
+    Only a single range with the start offset is supported, None is returned for the
+    others, then the whole file is sent.
+    """
+    if not range_header or not range_header.startswith("bytes="):
+        return None
+    start_str, sep, end_str = range_header[len("bytes=") :].partition("-")
+    if not sep or not start_str.isdigit() or (end_str and not end_str.isdigit()):
+        return None
+    start = int(start_str)
+    end = int(end_str) + 1 if end_str else None
+    if end is not None and end <= start:
+        return None
+    return start, end
+
+
 @router.get("/files/{bucket}/{file_id}", dependencies=[Depends(check_api_key)])
 async def download_file(
-    bucket: str, file_id: str, service: Service = Depends(get_service)
+    bucket: str,
+    file_id: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    service: Service = Depends(get_service),
 ):
-    """Download a file by file_id."""
+    """Download a file by file_id.
+
+    The file is streamed while its hash is verified, and a single byte range is
+    supported with the ``Range`` header.
+    """
     logger.info(f"download_file: bucket={bucket}, file_id={file_id}")
-    file_data, file_metadata = await blocking_func_to_async(
-        global_system_app, service.download_file, bucket, file_id
-    )
+    file_range = _parse_range(range_header)
+    start, end = file_range or (0, None)
+    file_stream, file_metadata = await service.aopen_file(bucket, file_id, start, end)
+    file_size = file_metadata.file_size
+    if file_range and start >= file_size:
+        # The range is not satisfiable
+        await file_stream.aclose()
+        return Response(
+            status_code=416, headers={"Content-Range": f"bytes */{file_size}"}
+        )
     file_name_encoded = quote(file_metadata.file_name)
 
-    def file_iterator(raw_iter):
-        with raw_iter:
-            while chunk := raw_iter.read(service.config.download_chunk_size):
-                yield chunk
-
-    response = StreamingResponse(
-        file_iterator(file_data), media_type="application/octet-stream"
-    )
-    response.headers["Content-Disposition"] = (
-        f"attachment; filename={file_name_encoded}"
+    headers = {
+        "Content-Disposition": f"attachment; filename={file_name_encoded}",
+        "Accept-Ranges": "bytes",
+    }
+    status_code = 200
+    if file_range:
+        last = file_size - 1 if end is None else min(end, file_size) - 1
+        headers["Content-Range"] = f"bytes {start}-{last}/{file_size}"
+        status_code = 206
+    return StreamingResponse(
+        file_stream,
+        media_type="application/octet-stream",
+        headers=headers,
+        status_code=status_code,
     )
-    return response
 
 
 @router.delete("/files/{bucket}/{file_id}", dependencies=[Depends(check_api_key)])
@@ -4,10 +4,15 @@ from typing import BinaryIO, List, Optional, Tuple
 from fastapi import HTTPException, UploadFile
 
 from dbgpt.component import SystemApp
-from dbgpt.core.interface.file import FileMetadata, FileStorageClient, FileStorageURI
+from dbgpt.core.interface.file import (
+    AsyncFileStream,
+    FileMetadata,
+    FileStorageClient,
+    FileStorageURI,
+)
 from dbgpt.storage.metadata import BaseDao
 from dbgpt.util.tracer import trace
-from dbgpt_serve.core import BaseService
+from dbgpt_serve.core import BaseService, blocking_func_to_async
 
 from ..api.schemas import (
     FileMetadataResponse,
@@ -115,6 +120,25 @@ class Service(BaseService[ServeEntity, ServeRequest, ServerResponse]):
         """Download a file by file_id."""
         return self.file_storage_client.get_file_by_id(bucket, file_id)
 
+    async def aopen_file(
+        self, bucket: str, file_id: str, start: int = 0, end: Optional[int] = None
+    ) -> Tuple[AsyncFileStream, FileMetadata]:
+        """Open a file by file_id as an async stream.
+
+        The hash of the whole file is verified while it's streamed.
+        """
+        metadata = await blocking_func_to_async(
+            self._system_app,
+            self.file_storage_client.storage_system.get_file_metadata,
+            bucket,
+            file_id,
+        )
+        if not metadata:
+            raise FileNotFoundError(f"File {file_id} not found in bucket {bucket}")
+        return await self.file_storage_client.aget_file(
+            metadata.uri, start, end, chunk_size=self.config.download_chunk_size
+        )
+
     def delete_file(self, bucket: str, file_id: str) -> None:
         """Delete a file by file_id."""
         self.file_storage_client.delete_file_by_id(bucket, file_id)
@@ -1,3 +1,5 @@
+from unittest.mock import MagicMock
+
 import pytest
 from fastapi import FastAPI
 from httpx import AsyncClient
@@ -12,7 +14,7 @@ from dbgpt_serve.core.tests.conftest import (  # noqa: F401
     system_app,
 )
 
-from ..api.endpoints import init_endpoints, router
+from ..api.endpoints import get_service, init_endpoints, router
 from ..config import SERVE_CONFIG_KEY_PREFIX
 
 
@@ -126,3 +128,62 @@ async def test_api_query_by_page(client: AsyncClient):
 
 
 # Add more test cases according to your own logic
+
+
+def _mock_file_service(data: bytes):
+    from dbgpt.core.interface.file import AsyncFileStream
+
+    service = MagicMock()
+    service.config.api_keys = None
+    metadata = MagicMock(file_name="test.txt", file_size=len(data))
+
+    async def aopen_file(bucket, file_id, start=0, end=None):
+        async def _chunks():
+            yield data[start:end]
+
+        return AsyncFileStream(_chunks(), metadata, verify=False), metadata
+
+    service.aopen_file = aopen_file
+    return service
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "client", [{"app_caller": client_init_caller}], indirect=["client"]
+)
+async def test_api_download_range(client: AsyncClient, asystem_app):
+    asystem_app.app.dependency_overrides[get_service] = lambda: _mock_file_service(
+        b"Hello, world!"
+    )
+    response = await client.get("/files/bucket/file_id")
+    assert response.status_code == 200
+    assert response.content == b"Hello, world!"
+
+    response = await client.get("/files/bucket/file_id", headers={"Range": "bytes=7-"})
+    assert response.status_code == 206
+    assert response.headers["Content-Range"] == "bytes 7-12/13"
+    assert response.content == b"world!"
+
+    response = await client.get(
+        "/files/bucket/file_id", headers={"Range": "bytes=7-10"}
+    )
+    assert response.status_code == 206
+    assert response.headers["Content-Range"] == "bytes 7-10/13"
+    assert response.content == b"worl"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "client", [{"app_caller": client_init_caller}], indirect=["client"]
+)
+async def test_api_download_unsatisfiable_range(client: AsyncClient, asystem_app):
+    asystem_app.app.dependency_overrides[get_service] = lambda: _mock_file_service(
+        b"Hello, world!"
+    )
+    for range_header in ["bytes=13-", "bytes=100-200"]:
+        response = await client.get(
+            "/files/bucket/file_id", headers={"Range": range_header}
+        )
+        assert response.status_code == 416
+        assert response.headers["Content-Range"] == "bytes */13"
+        assert response.content == b""
@@ -18,6 +18,7 @@ from dbgpt_serve.core import Result, blocking_func_to_async
 from dbgpt_serve.rag.api.schemas import (
     DocumentServeRequest,
     DocumentServeResponse,
+    IngestionJobResponse,
     KnowledgeRetrieveRequest,
     KnowledgeSyncRequest,
     SpaceServeRequest,
@@ -358,6 +359,64 @@ async def sync_document(
     return Result.succ(service.sync_document([request]))
 
 
+@router.get(
+    "/ingestion/jobs",
+    dependencies=[Depends(check_api_key)],
+    response_model=Result[List[IngestionJobResponse]],
+)
+async def get_ingestion_jobs(
+    space_id: Optional[str] = Query(default=None, description="space id"),
+    status: Optional[str] = Query(default=None, description="job status"),
+    limit: int = Query(default=100, description="max jobs"),
+    service: Service = Depends(get_service),
+) -> Result[List[IngestionJobResponse]]:
+    """Get the knowledge ingestion jobs, the latest first
+
+    Args:
+        space_id (Optional[str]): The space id
+        status (Optional[str]): The job status, TODO, RUNNING, FINISHED or FAILED
+        limit (int): The max jobs to return
+        service (Service): The service
+    Returns:
+        ServerResponse: The response
+    """
+    return Result.succ(await service.get_ingestion_jobs(space_id, status, limit))
+
+
+@router.get(
+    "/ingestion/jobs/{job_id}",
+    dependencies=[Depends(check_api_key)],
+    response_model=Result[IngestionJobResponse],
+)
+async def get_ingestion_job(
+    job_id: int, service: Service = Depends(get_service)
+) -> Result[IngestionJobResponse]:
+    """Get a knowledge ingestion job and its progress
+
+    Args:
+        job_id (int): The job id
+        service (Service): The service
+    Returns:
+        ServerResponse: The response
+    """
+    job = await service.get_ingestion_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"job {job_id} not found")
+    return Result.succ(job)
+
+
+@router.get("/ingestion/metrics", dependencies=[Depends(check_api_key)])
+async def get_ingestion_metrics(service: Service = Depends(get_service)) -> Result:
+    """Get the status counts and throughput of the knowledge ingestion queue
+
+    Args:
+        service (Service): The service
+    Returns:
+        ServerResponse: The response
+    """
+    return Result.succ(await service.ingestion_metrics())
+
+
 @router.delete(
     "/documents/{document_id}",
     dependencies=[Depends(check_api_key)],
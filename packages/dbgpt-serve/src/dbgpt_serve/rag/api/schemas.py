@@ -215,3 +215,26 @@ class KnowledgeConfigResponse(BaseModel):
     """Knowledge config response"""
 
     storage: List[KnowledgeStorageType] = Field(..., description="The storage types")
+
+
+class IngestionJobResponse(BaseModel):
+    """Knowledge ingestion job response"""
+
+    id: int = Field(..., description="The job id")
+    space_id: Optional[str] = Field(None, description="The space id")
+    space_name: Optional[str] = Field(None, description="The space name")
+    doc_id: int = Field(..., description="The document id")
+    doc_name: Optional[str] = Field(None, description="The document name")
+    status: str = Field(..., description="The job status, TODO,RUNNING,FINISHED")
+    chunk_parameters: Optional[str] = Field(
+        None, description="The chunk parameters, JSON format"
+    )
+    total_chunks: int = Field(0, description="The total chunks of the document")
+    processed_chunks: int = Field(0, description="The chunks persisted")
+    vector_ids: Optional[str] = Field(None, description="The persisted vector ids")
+    attempts: int = Field(0, description="The times the job has been started")
+    error: Optional[str] = Field(None, description="The error message")
+    gmt_started: Optional[str] = Field(None, description="The last start time")
+    gmt_finished: Optional[str] = Field(None, description="The finish time")
+    gmt_created: Optional[str] = Field(None, description="The create time")
+    gmt_modified: Optional[str] = Field(None, description="The modify time")
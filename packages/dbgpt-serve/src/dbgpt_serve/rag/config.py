@@ -74,6 +74,19 @@ class ServeConfig(BaseServeConfig):
         default=3,
         metadata={"help": _("knowledge rerank top k")},
     )
+    ingestion_max_concurrent_documents: Optional[int] = field(
+        default=2,
+        metadata={"help": _("The max documents to sync into the index store at once")},
+    )
+    ingestion_max_concurrent_embeddings: Optional[int] = field(
+        default=4,
+        metadata={
+            "help": _(
+                "The max concurrent embedding calls of all the documents to sync, "
+                "one call embeds max_chunks_once_load chunks"
+            )
+        },
+    )
 
 
 @dataclass
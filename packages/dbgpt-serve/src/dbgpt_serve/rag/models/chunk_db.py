@@ -18,6 +18,10 @@ class DocumentChunkEntity(Model):
     content = Column(Text)
     questions = Column(Text)
     meta_info = Column(String(500))
+    # The content hash of the chunk, see `Service._diff_chunks`
+    chunk_hash = Column(String(64))
+    # The chunk id in the index store
+    vector_id = Column(String(255))
     gmt_created = Column(DateTime)
     gmt_modified = Column(DateTime)
 
@@ -27,6 +31,7 @@ class DocumentChunkEntity(Model):
             f"doc_type='{self.doc_type}', "
             f"document_id='{self.document_id}', content='{self.content}', "
             f"questions='{self.questions}', meta_info='{self.meta_info}', "
+            f"chunk_hash='{self.chunk_hash}', vector_id='{self.vector_id}', "
             f"gmt_created='{self.gmt_created}', gmt_modified='{self.gmt_modified}')"
         )
 
@@ -39,6 +44,8 @@ class DocumentChunkEntity(Model):
             "content": self.content,
             "questions": self.questions,
             "meta_info": self.meta_info,
+            "chunk_hash": self.chunk_hash,
+            "vector_id": self.vector_id,
             "gmt_created": self.gmt_created,
             "gmt_modified": self.gmt_modified,
         }
@@ -54,6 +61,8 @@ class DocumentChunkDao(BaseDao):
                 document_id=document.document_id,
                 content=document.content or "",
                 meta_info=document.meta_info or "",
+                chunk_hash=document.chunk_hash,
+                vector_id=document.vector_id,
                 gmt_created=datetime.now(),
                 gmt_modified=datetime.now(),
             )
@@ -160,6 +169,42 @@ class DocumentChunkDao(BaseDao):
         finally:
             session.close()
 
+    def get_chunk_fingerprints(self, document_id: int) -> List[DocumentChunkEntity]:
+        """Get the id, chunk_hash and vector_id of the chunks of a document"""
+        session = self.get_raw_session()
+        try:
+            rows = (
+                session.query(
+                    DocumentChunkEntity.id,
+                    DocumentChunkEntity.chunk_hash,
+                    DocumentChunkEntity.vector_id,
+                )
+                .filter(DocumentChunkEntity.document_id == document_id)
+                .order_by(DocumentChunkEntity.id.asc())
+                .all()
+            )
+            return [
+                DocumentChunkEntity(
+                    id=row.id, chunk_hash=row.chunk_hash, vector_id=row.vector_id
+                )
+                for row in rows
+            ]
+        finally:
+            session.close()
+
+    def delete_chunks(self, chunk_ids: List[int]):
+        """Delete the chunks by ids"""
+        if not chunk_ids:
+            return
+        session = self.get_raw_session()
+        try:
+            session.query(DocumentChunkEntity).filter(
+                DocumentChunkEntity.id.in_(chunk_ids)
+            ).delete(synchronize_session=False)
+            session.commit()
+        finally:
+            session.close()
+
     def get_document_chunks_count(self, query: DocumentChunkEntity):
         session = self.get_raw_session()
         document_chunks = session.query(func.count(DocumentChunkEntity.id))
@@ -0,0 +1,231 @@
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Column, DateTime, Integer, String, Text, func
+
+from dbgpt.storage.metadata import BaseDao, Model
+from dbgpt_serve.rag.api.schemas import IngestionJobResponse
+
+
+class IngestionJobStatus(str, Enum):
+    TODO = "TODO"
+    RUNNING = "RUNNING"
+    FINISHED = "FINISHED"
+    FAILED = "FAILED"
+
+
+_ACTIVE_STATUSES = [IngestionJobStatus.TODO.value, IngestionJobStatus.RUNNING.value]
+
+
+class IngestionJobEntity(Model):
+    __tablename__ = "knowledge_ingestion_job"
+    id = Column(Integer, primary_key=True)
+    space_id = Column(String(100), index=True)
+    space_name = Column(String(100))
+    doc_id = Column(Integer, index=True)
+    doc_name = Column(String(100))
+    status = Column(String(50), index=True)
+    chunk_parameters = Column(Text)
+    total_chunks = Column(Integer, default=0)
+    processed_chunks = Column(Integer, default=0)
+    vector_ids = Column(Text)
+    attempts = Column(Integer, default=0)
+    error = Column(Text)
+    gmt_started = Column(DateTime)
+    gmt_finished = Column(DateTime)
+    gmt_created = Column(DateTime, default=datetime.now)
+    gmt_modified = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+    def __repr__(self):
+        return (
+            f"IngestionJobEntity(id={self.id}, space_id='{self.space_id}', "
+            f"doc_id='{self.doc_id}', status='{self.status}', "
+            f"processed_chunks='{self.processed_chunks}', "
+            f"total_chunks='{self.total_chunks}')"
+        )
+
+
+class IngestionJobDao(BaseDao):
+    """The persistent queue of the knowledge ingestion jobs."""
+
+    def create_job(
+        self,
+        space_id: str,
+        space_name: str,
+        doc_id: int,
+        doc_name: str,
+        chunk_parameters: Optional[str] = None,
+    ) -> IngestionJobResponse:
+        """Enqueue a new job, fail if the document already has an active job."""
+        with self.session() as session:
+            active = (
+                session.query(IngestionJobEntity)
+                .filter(IngestionJobEntity.doc_id == doc_id)
+                .filter(IngestionJobEntity.status.in_(_ACTIVE_STATUSES))
+                .first()
+            )
+            if active:
+                raise ValueError(
+                    f"Document {doc_name} already has an active ingestion job "
+                    f"{active.id}"
+                )
+            entity = IngestionJobEntity(
+                space_id=str(space_id),
+                space_name=space_name,
+                doc_id=doc_id,
+                doc_name=doc_name,
+                status=IngestionJobStatus.TODO.value,
+                chunk_parameters=chunk_parameters,
+                total_chunks=0,
+                processed_chunks=0,
+                attempts=0,
+            )
+            session.add(entity)
+            session.flush()
+            return self.to_response(entity)
+
+    def latest_job(self, doc_id: int) -> Optional[IngestionJobResponse]:
+        """Return the latest job of the document."""
+        with self.session(commit=False) as session:
+            entity = (
+                session.query(IngestionJobEntity)
+                .filter(IngestionJobEntity.doc_id == doc_id)
+                .order_by(IngestionJobEntity.id.desc())
+                .first()
+            )
+            return self.to_response(entity) if entity else None
+
+    def resume_failed_job(
+        self, doc_id: int, chunk_parameters: Optional[str] = None
+    ) -> Optional[IngestionJobResponse]:
+        """Requeue the latest job of the document if it failed with some progress.
+
+        The chunk parameters must be the same, otherwise the persisted chunks don't
+        match the new chunks. Return None if the job can't be resumed.
+        """
+        with self.session() as session:
+            entity = (
+                session.query(IngestionJobEntity)
+                .filter(IngestionJobEntity.doc_id == doc_id)
+                .order_by(IngestionJobEntity.id.desc())
+                .first()
+            )
+            if (
+                not entity
+                or entity.status != IngestionJobStatus.FAILED.value
+                or not entity.processed_chunks
+                or entity.chunk_parameters != chunk_parameters
+            ):
+                return None
+            entity.status = IngestionJobStatus.TODO.value
+            entity.error = None
+            entity.gmt_finished = None
+            session.flush()
+            return self.to_response(entity)
+
+    def get_job(self, job_id: int) -> Optional[IngestionJobResponse]:
+        with self.session(commit=False) as session:
+            entity = session.get(IngestionJobEntity, job_id)
+            return self.to_response(entity) if entity else None
+
+    def list_jobs(
+        self,
+        space_id: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[IngestionJobResponse]:
+        with self.session(commit=False) as session:
+            query = session.query(IngestionJobEntity)
+            if space_id is not None:
+                query = query.filter(IngestionJobEntity.space_id == str(space_id))
+            if status:
+                query = query.filter(IngestionJobEntity.status == status)
+            entities = query.order_by(IngestionJobEntity.id.desc()).limit(limit).all()
+            return [self.to_response(e) for e in entities]
+
+    def todo_jobs(self, limit: int = 100) -> List[IngestionJobResponse]:
+        """Return the waiting jobs, the oldest first."""
+        with self.session(commit=False) as session:
+            entities = (
+                session.query(IngestionJobEntity)
+                .filter(IngestionJobEntity.status == IngestionJobStatus.TODO.value)
+                .order_by(IngestionJobEntity.id.asc())
+                .limit(limit)
+                .all()
+            )
+            return [self.to_response(e) for e in entities]
+
+    def update_job(self, job_id: int, **fields: Any) -> None:
+        with self.session() as session:
+            fields["gmt_modified"] = datetime.now()
+            session.query(IngestionJobEntity).filter(
+                IngestionJobEntity.id == job_id
+            ).update(fields, synchronize_session=False)
+
+    def start_job(self, job_id: int) -> bool:
+        """Mark a waiting job as running, return False if it is not waiting."""
+        now = datetime.now()
+        with self.session() as session:
+            updated = (
+                session.query(IngestionJobEntity)
+                .filter(IngestionJobEntity.id == job_id)
+                .filter(IngestionJobEntity.status == IngestionJobStatus.TODO.value)
+                .update(
+                    {
+                        "status": IngestionJobStatus.RUNNING.value,
+                        "attempts": IngestionJobEntity.attempts + 1,
+                        "gmt_started": now,
+                        "gmt_modified": now,
+                    },
+                    synchronize_session=False,
+                )
+            )
+            return updated > 0
+
+    def requeue_running_jobs(self) -> int:
+        """Requeue the jobs interrupted by a restart, they resume from the progress."""
+        with self.session() as session:
+            return (
+                session.query(IngestionJobEntity)
+                .filter(IngestionJobEntity.status == IngestionJobStatus.RUNNING.value)
+                .update(
+                    {"status": IngestionJobStatus.TODO.value},
+                    synchronize_session=False,
+                )
+            )
+
+    def status_counts(self, space_id: Optional[str] = None) -> Dict[str, int]:
+        with self.session(commit=False) as session:
+            query = session.query(
+                IngestionJobEntity.status, func.count(IngestionJobEntity.id)
+            )
+            if space_id is not None:
+                query = query.filter(IngestionJobEntity.space_id == str(space_id))
+            return {
+                status: count
+                for status, count in query.group_by(IngestionJobEntity.status).all()
+            }
+
+    def to_response(self, entity: IngestionJobEntity) -> IngestionJobResponse:
+        def _time(value: Optional[datetime]) -> Optional[str]:
+            return value.strftime("%Y-%m-%d %H:%M:%S") if value else None
+
+        return IngestionJobResponse(
+            id=entity.id,
+            space_id=entity.space_id,
+            space_name=entity.space_name,
+            doc_id=entity.doc_id,
+            doc_name=entity.doc_name,
+            status=entity.status,
+            chunk_parameters=entity.chunk_parameters,
+            total_chunks=entity.total_chunks or 0,
+            processed_chunks=entity.processed_chunks or 0,
+            vector_ids=entity.vector_ids,
+            attempts=entity.attempts or 0,
+            error=entity.error,
+            gmt_started=_time(entity.gmt_started),
+            gmt_finished=_time(entity.gmt_finished),
+            gmt_created=_time(entity.gmt_created),
+            gmt_modified=_time(entity.gmt_modified),
+        )
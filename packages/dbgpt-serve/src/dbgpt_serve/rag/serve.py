@@ -61,7 +61,8 @@ class Serve(BaseServe):
         """
         # import your own module here to ensure the module is loaded before the
         # application starts
-        from .models.models import KnowledgeSpaceEntity as _  # noqa: F401
+        from .models.ingestion_db import IngestionJobEntity  # noqa: F401
+        from .models.models import KnowledgeSpaceEntity  # noqa: F401
 
     def before_start(self):
         """Called before the start of the application."""
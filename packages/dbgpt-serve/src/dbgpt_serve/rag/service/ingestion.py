@@ -0,0 +1,362 @@
+"""The background queue to ingest the knowledge documents.
+
+The jobs are persisted in the metadata database, so the waiting jobs survive a
+restart and the interrupted jobs resume from the last persisted chunk batch.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from dbgpt.component import SystemApp
+from dbgpt_serve.core import blocking_func_to_async
+
+from ..api.schemas import IngestionJobResponse
+from ..models.ingestion_db import IngestionJobDao, IngestionJobStatus
+
+logger = logging.getLogger(__name__)
+
+# The window in seconds to compute the throughput
+_THROUGHPUT_WINDOW = 60
+
+
+class IngestionJobContext:
+    """The context of a running ingestion job."""
+
+    def __init__(self, queue: "IngestionQueue", job: IngestionJobResponse):
+        self._queue = queue
+        self.job = job
+
+    @property
+    def processed_chunks(self) -> int:
+        """Return the chunks already persisted, skip them when resuming."""
+        return self.job.processed_chunks
+
+    @property
+    def vector_ids(self) -> List[str]:
+        """Return the vector ids already persisted."""
+        return self.job.vector_ids.split(",") if self.job.vector_ids else []
+
+    @asynccontextmanager
+    async def embedding_slot(self) -> AsyncIterator[None]:
+        """Acquire a slot to call the embedding model.
+
+        The slots are shared by all the running jobs, to cap the concurrent embedding
+        calls.
+        """
+        async with self._queue._embedding_semaphore:
+            self._queue._embedding_in_flight += 1
+            try:
+                yield
+            finally:
+                self._queue._embedding_in_flight -= 1
+
+    async def report_progress(
+        self, total_chunks: int, processed_chunks: int, new_vector_ids: List[str]
+    ) -> None:
+        """Persist the progress after a chunk batch is persisted.
+
+        Args:
+            total_chunks (int): The total chunks of the document.
+            processed_chunks (int): The chunks persisted, including the new ones.
+            new_vector_ids (List[str]): The vector ids of the new chunks.
+        """
+        vector_ids = ",".join(self.vector_ids + list(new_vector_ids))
+        new_chunks = processed_chunks - self.job.processed_chunks
+        await self._queue._update_job(
+            self.job.id,
+            total_chunks=total_chunks,
+            processed_chunks=processed_chunks,
+            vector_ids=vector_ids,
+        )
+        self.job.total_chunks = total_chunks
+        self.job.processed_chunks = processed_chunks
+        self.job.vector_ids = vector_ids
+        self._queue._record_chunks(new_chunks)
+
+
+ProcessFunc = Callable[[IngestionJobContext], Awaitable[Any]]
+
+
+class IngestionQueue:
+    """Run the ingestion jobs in background with bounded concurrency.
+
+    At most `max_concurrent_documents` jobs run at the same time, and the next job
+    is picked from the space with the fewest running jobs, so a large upload to
+    one space does not starve the others.
+
+    The queue assumes one process dispatches the jobs of a metadata database, the
+    running jobs are requeued when it starts.
+    """
+
+    def __init__(
+        self,
+        system_app: SystemApp,
+        job_dao: IngestionJobDao,
+        process_func: ProcessFunc,
+        max_concurrent_documents: int = 2,
+        max_concurrent_embeddings: int = 4,
+        poll_interval: float = 5.0,
+    ):
+        """Create a new IngestionQueue.
+
+        Args:
+            system_app (SystemApp): The system app.
+            job_dao (IngestionJobDao): The dao of the jobs.
+            process_func (ProcessFunc): The function to process a job, raise an
+                exception if the job failed.
+            max_concurrent_documents (int): The max jobs run at the same time.
+            max_concurrent_embeddings (int): The max concurrent embedding calls of
+                all the jobs.
+            poll_interval (float): The seconds to poll the waiting jobs, the jobs
+                enqueued by current process are dispatched immediately.
+        """
+        self._system_app = system_app
+        self._job_dao = job_dao
+        self._process_func = process_func
+        self._max_concurrent_documents = max(1, max_concurrent_documents)
+        self._max_concurrent_embeddings = max(1, max_concurrent_embeddings)
+        self._poll_interval = poll_interval
+        self._embedding_semaphore = asyncio.Semaphore(self._max_concurrent_embeddings)
+        self._embedding_in_flight = 0
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._running: Dict[int, Tuple[str, asyncio.Task]] = {}
+        # The last dispatch sequence of every space, for round-robin between spaces
+        self._last_dispatch: Dict[str, int] = {}
+        self._dispatch_seq = 0
+        self._started_at: Optional[float] = None
+        self._finished_jobs = 0
+        self._failed_jobs = 0
+        self._processed_chunks = 0
+        self._chunk_events: Deque[Tuple[float, int]] = deque()
+
+    async def start(self) -> None:
+        """Start the dispatcher, the interrupted jobs are requeued."""
+        if self._dispatcher and not self._dispatcher.done():
+            return
+        requeued = await blocking_func_to_async(
+            self._system_app, self._job_dao.requeue_running_jobs
+        )
+        if requeued:
+            logger.info(f"Requeue {requeued} interrupted knowledge ingestion jobs")
+        self._stopping = False
+        self._started_at = time.time()
+        self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def stop(self, timeout: float = 10) -> None:
+        """Stop the dispatcher and cancel the running jobs.
+
+        The cancelled jobs are left running in the database and resumed by the next
+        start.
+
+        Args:
+            timeout (float): The max seconds to wait for the dispatcher and for the
+                cancelled jobs.
+        """
+        # The dispatcher exits by the flag, a cancel may be swallowed by
+        # `asyncio.wait_for` if the wakeup event is set at the same time
+        self._stopping = True
+        self._wakeup.set()
+        dispatcher, self._dispatcher = self._dispatcher, None
+        if dispatcher:
+            await asyncio.wait([dispatcher], timeout=timeout)
+            if not dispatcher.done():
+                dispatcher.cancel()
+        tasks: List[asyncio.Task] = [task for _, task in self._running.values()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=timeout)
+            if pending:
+                logger.warning(
+                    f"{len(pending)} knowledge ingestion jobs not stopped in "
+                    f"{timeout} seconds"
+                )
+        self._running.clear()
+
+    async def enqueue(
+        self,
+        space_id: str,
+        space_name: str,
+        doc_id: int,
+        doc_name: str,
+        chunk_parameters: Optional[str] = None,
+    ) -> IngestionJobResponse:
+        """Enqueue a document to ingest.
+
+        If the last job of the document failed with the same chunk parameters, it
+        is requeued and resumes from its progress instead.
+        """
+        job = await blocking_func_to_async(
+            self._system_app,
+            self._job_dao.resume_failed_job,
+            doc_id,
+            chunk_parameters,
+        )
+        if job:
+            logger.info(
+                f"Resume the failed ingestion job {job.id} from chunk "
+                f"{job.processed_chunks}, doc:{doc_name}"
+            )
+        else:
+            job = await blocking_func_to_async(
+                self._system_app,
+                self._job_dao.create_job,
+                space_id,
+                space_name,
+                doc_id,
+                doc_name,
+                chunk_parameters,
+            )
+        await self.start()
+        self._wakeup.set()
+        return job
+
+    async def metrics(self) -> Dict[str, Any]:
+        """Return the metrics of the queue and the jobs."""
+        status_counts = await blocking_func_to_async(
+            self._system_app, self._job_dao.status_counts
+        )
+        now = time.time()
+        self._trim_chunk_events(now)
+        window = min(_THROUGHPUT_WINDOW, now - (self._started_at or now)) or 1
+        window_chunks = sum(n for _, n in self._chunk_events)
+        running_per_space: Dict[str, int] = {}
+        for space_id, _ in self._running.values():
+            running_per_space[space_id] = running_per_space.get(space_id, 0) + 1
+        return {
+            "status_counts": status_counts,
+            "running_jobs": len(self._running),
+            "running_jobs_per_space": running_per_space,
+            "max_concurrent_documents": self._max_concurrent_documents,
+            "embedding_in_flight": self._embedding_in_flight,
+            "max_concurrent_embeddings": self._max_concurrent_embeddings,
+            "finished_jobs": self._finished_jobs,
+            "failed_jobs": self._failed_jobs,
+            "processed_chunks": self._processed_chunks,
+            "chunks_per_second": round(window_chunks / window, 3),
+        }
+
+    async def _dispatch(self) -> None:
+        while not self._stopping:
+            try:
+                await self._dispatch_waiting_jobs()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Dispatch knowledge ingestion jobs failed: {e}")
+            if self._stopping:
+                break
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _dispatch_waiting_jobs(self) -> None:
+        while (
+            not self._stopping and len(self._running) < self._max_concurrent_documents
+        ):
+            jobs = await blocking_func_to_async(
+                self._system_app, self._job_dao.todo_jobs, 100
+            )
+            job = self._pick_job(jobs)
+            if not job:
+                return
+            started = await blocking_func_to_async(
+                self._system_app, self._job_dao.start_job, job.id
+            )
+            if not started:
+                # Taken by another process
+                continue
+            job.status = IngestionJobStatus.RUNNING.value
+            job.attempts += 1
+            self._dispatch_seq += 1
+            self._last_dispatch[job.space_id] = self._dispatch_seq
+            task = asyncio.create_task(self._run_job(job))
+            self._running[job.id] = (job.space_id, task)
+
+    def _pick_job(
+        self, jobs: List[IngestionJobResponse]
+    ) -> Optional[IngestionJobResponse]:
+        """Pick the oldest job of the space with the fewest running jobs."""
+        running_per_space: Dict[str, int] = {}
+        for space_id, _ in self._running.values():
+            running_per_space[space_id] = running_per_space.get(space_id, 0) + 1
+        seen: Set[str] = set()
+        candidates = []
+        for job in jobs:
+            if job.id in self._running or job.space_id in seen:
+                continue
+            seen.add(job.space_id)
+            candidates.append(job)
+        if not candidates:
+            return None
+        return min(
+            candidates,
+            key=lambda j: (
+                running_per_space.get(j.space_id, 0),
+                self._last_dispatch.get(j.space_id, 0),
+                j.id,
+            ),
+        )
+
+    async def _run_job(self, job: IngestionJobResponse) -> None:
+        ctx = IngestionJobContext(self, job)
+        try:
+            await self._process_func(ctx)
+            await self._update_job(
+                job.id,
+                status=IngestionJobStatus.FINISHED.value,
+                error=None,
+                gmt_finished=datetime.now(),
+            )
+            self._finished_jobs += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Knowledge ingestion job {job.id} failed: {e}")
+            self._failed_jobs += 1
+            await self._update_job(
+                job.id,
+                status=IngestionJobStatus.FAILED.value,
+                error=str(e),
+                gmt_finished=datetime.now(),
+            )
+        finally:
+            self._running.pop(job.id, None)
+            self._wakeup.set()
+
+    async def _update_job(self, job_id: int, **fields: Any) -> None:
+        await blocking_func_to_async(
+            self._system_app, self._job_dao.update_job, job_id, **fields
+        )
+
+    def _record_chunks(self, n: int) -> None:
+        now = time.time()
+        self._processed_chunks += n
+        self._chunk_events.append((now, n))
+        self._trim_chunk_events(now)
+
+    def _trim_chunk_events(self, now: float) -> None:
+        while self._chunk_events and self._chunk_events[0][0] < (
+            now - _THROUGHPUT_WINDOW
+        ):
+            self._chunk_events.popleft()
@@ -1,13 +1,14 @@
-import asyncio
+import hashlib
 import json
 import logging
 import os
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional, cast
+from typing import Any, Dict, List, Optional, Tuple, cast
 
 from fastapi import HTTPException
 
+from dbgpt._private.pydantic import model_to_json
 from dbgpt.component import ComponentType, SystemApp
 from dbgpt.configs import TAG_KEY_KNOWLEDGE_FACTORY_DOMAIN_TYPE
 from dbgpt.configs.model_config import (
@@ -35,6 +36,7 @@ from ..api.schemas import (
     ChunkServeRequest,
     DocumentServeRequest,
     DocumentServeResponse,
+    IngestionJobResponse,
     KnowledgeRetrieveRequest,
     KnowledgeSyncRequest,
     SpaceServeRequest,
@@ -46,13 +48,23 @@ from ..models.document_db import (
     KnowledgeDocumentDao,
     KnowledgeDocumentEntity,
 )
+from ..models.ingestion_db import IngestionJobDao, IngestionJobStatus
 from ..models.models import KnowledgeSpaceDao, KnowledgeSpaceEntity
 from ..retriever.knowledge_space import KnowledgeSpaceRetriever
 from ..storage_manager import StorageManager
+from .ingestion import IngestionJobContext, IngestionQueue
 
 logger = logging.getLogger(__name__)
 
 
+def _chunk_hash(chunk: Chunk) -> str:
+    """the content hash of the chunk, the metadata is stored in the index store too"""
+    metadata = json.dumps(
+        chunk.metadata, sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(f"{chunk.content}\x00{metadata}".encode("utf-8")).hexdigest()
+
+
 class SyncStatus(Enum):
     TODO = "TODO"
     FAILED = "FAILED"
@@ -72,11 +84,14 @@ class Service(BaseService[KnowledgeSpaceEntity, SpaceServeRequest, SpaceServeRes
         dao: Optional[KnowledgeSpaceDao] = None,
         document_dao: Optional[KnowledgeDocumentDao] = None,
         chunk_dao: Optional[DocumentChunkDao] = None,
+        ingestion_job_dao: Optional[IngestionJobDao] = None,
     ):
         self._system_app = system_app
         self._dao: KnowledgeSpaceDao = dao
         self._document_dao: KnowledgeDocumentDao = document_dao
         self._chunk_dao: DocumentChunkDao = chunk_dao
+        self._ingestion_job_dao: IngestionJobDao = ingestion_job_dao
+        self._ingestion_queue: Optional[IngestionQueue] = None
         self._serve_config = config
 
         super().__init__(system_app)
@@ -91,12 +106,39 @@ class Service(BaseService[KnowledgeSpaceEntity, SpaceServeRequest, SpaceServeRes
         self._dao = self._dao or KnowledgeSpaceDao()
         self._document_dao = self._document_dao or KnowledgeDocumentDao()
         self._chunk_dao = self._chunk_dao or DocumentChunkDao()
+        self._ingestion_job_dao = self._ingestion_job_dao or IngestionJobDao()
         self._system_app = system_app
 
+    async def async_after_start(self):
+        """Resume the waiting and interrupted ingestion jobs"""
+        await self.ingestion_queue.start()
+
+    async def async_before_stop(self):
+        """Stop the ingestion jobs, they are resumed by the next start"""
+        if self._ingestion_queue:
+            await self._ingestion_queue.stop()
+
     @property
     def storage_manager(self):
         return StorageManager.get_instance(self._system_app)
 
+    @property
+    def ingestion_queue(self) -> IngestionQueue:
+        """Returns the queue of the knowledge ingestion jobs."""
+        if self._ingestion_queue is None:
+            self._ingestion_queue = IngestionQueue(
+                self._system_app,
+                self._ingestion_job_dao,
+                self._process_ingestion_job,
+                max_concurrent_documents=(
+                    self._serve_config.ingestion_max_concurrent_documents or 2
+                ),
+                max_concurrent_embeddings=(
+                    self._serve_config.ingestion_max_concurrent_embeddings or 4
+                ),
+            )
+        return self._ingestion_queue
+
     @property
     def dao(
         self,
@@ -223,10 +265,9 @@ class Service(BaseService[KnowledgeSpaceEntity, SpaceServeRequest, SpaceServeRes
                     f"there are document called, doc_id: {sync_request.doc_id}"
                 )
             doc = docs[0]
-            if (
-                doc.status == SyncStatus.RUNNING.name
-                or doc.status == SyncStatus.FINISHED.name
-            ):
+            # The finished documents are re-synced incrementally, only the changed
+            # chunks are embedded again
+            if doc.status == SyncStatus.RUNNING.name:
                 raise Exception(
                     f" doc:{doc.doc_name} status is {doc.status}, can not sync"
                 )
@@ -458,10 +499,9 @@ class Service(BaseService[KnowledgeSpaceEntity, SpaceServeRequest, SpaceServeRes
                     f"there are document called, doc_id: {sync_request.doc_id}"
                 )
             doc = docs[0]
-            if (
-                doc.status == SyncStatus.RUNNING.name
-                or doc.status == SyncStatus.FINISHED.name
-            ):
+            # The finished documents are re-synced incrementally, only the changed
+            # chunks are embedded again
+            if doc.status == SyncStatus.RUNNING.name:
                 raise Exception(
                     f" doc:{doc.doc_name} status is {doc.status}, can not sync"
                 )
@@ -488,53 +528,146 @@ class Service(BaseService[KnowledgeSpaceEntity, SpaceServeRequest, SpaceServeRes
         doc: KnowledgeDocumentEntity,
         chunk_parameters: ChunkParameters,
     ) -> None:
-        """sync knowledge document chunk into vector store"""
+        """enqueue the knowledge document to sync its chunks into vector store"""
         space = self.get({"id": space_id})
-        storage_connector = self.storage_manager.get_storage_connector(
-            space.name, space.vector_type
+        doc.status = SyncStatus.RUNNING.name
+        doc.gmt_modified = datetime.now()
+        await blocking_func_to_async(
+            self.system_app, self._document_dao.update_knowledge_document, doc
+        )
+        chunk_parameters_json = model_to_json(
+            chunk_parameters, exclude={"text_splitter"}
+        )
+        last_job = await blocking_func_to_async(
+            self.system_app, self._ingestion_job_dao.latest_job, doc.id
         )
-        knowledge_content = doc.content
         if (
-            doc.doc_type == KnowledgeType.DOCUMENT.value
-            and knowledge_content.startswith(_SCHEMA)
+            last_job
+            and last_job.status == IngestionJobStatus.FAILED.value
+            and last_job.vector_ids
+            and last_job.chunk_parameters != chunk_parameters_json
         ):
-            logger.info(
-                f"Download file from file storage, doc: {doc.doc_name}, file url: "
-                f"{doc.content}"
+            # The failed job can't be resumed with other chunk parameters, delete
+            # the vectors it persisted
+            storage_connector = self.storage_manager.get_storage_connector(
+                space.name, space.vector_type
             )
-            local_file_path, file_meta = await blocking_func_to_async(
-                self.system_app,
-                self.get_fs().download_file,
-                knowledge_content,
-                dest_dir=KNOWLEDGE_CACHE_ROOT_PATH,
+            storage_connector.delete_by_ids(last_job.vector_ids)
+        job = await self.ingestion_queue.enqueue(
+            str(space.id),
+            space.name,
+            doc.id,
+            doc.doc_name,
+            chunk_parameters_json,
+        )
+        logger.info(f"enqueue document ingestion job {job.id}, doc:{doc.doc_name}")
+
+    async def _process_ingestion_job(self, ctx: IngestionJobContext) -> None:
+        """process a knowledge ingestion job in the ingestion queue"""
+        job = ctx.job
+        docs = await blocking_func_to_async(
+            self.system_app, self._document_dao.documents_by_ids, [job.doc_id]
+        )
+        if not docs:
+            raise ValueError(f"document {job.doc_id} not found")
+        doc = docs[0]
+        try:
+            space = self.get({"id": job.space_id})
+            chunk_parameters = ChunkParameters(
+                **json.loads(job.chunk_parameters or "{}")
             )
-            logger.info(f"Downloaded file to {local_file_path}")
-            knowledge_content = local_file_path
-        knowledge = None
-        if not space.domain_type or (
-            space.domain_type.lower() == BusinessFieldType.NORMAL.value.lower()
-        ):
-            knowledge = KnowledgeFactory.create(
-                datasource=knowledge_content,
-                knowledge_type=KnowledgeType.get_by_value(doc.doc_type),
+            storage_connector = self.storage_manager.get_storage_connector(
+                space.name, space.vector_type
             )
-        doc.status = SyncStatus.RUNNING.name
-
-        doc.gmt_modified = datetime.now()
-        await blocking_func_to_async(
-            self.system_app, self._document_dao.update_knowledge_document, doc
+            knowledge_content = doc.content
+            if (
+                doc.doc_type == KnowledgeType.DOCUMENT.value
+                and knowledge_content.startswith(_SCHEMA)
+            ):
+                logger.info(
+                    f"Download file from file storage, doc: {doc.doc_name}, file "
+                    f"url: {doc.content}"
+                )
+                local_file_path, file_meta = await blocking_func_to_async(
+                    self.system_app,
+                    self.get_fs().download_file,
+                    knowledge_content,
+                    dest_dir=KNOWLEDGE_CACHE_ROOT_PATH,
+                )
+                logger.info(f"Downloaded file to {local_file_path}")
+                knowledge_content = local_file_path
+            knowledge = None
+            if not space.domain_type or (
+                space.domain_type.lower() == BusinessFieldType.NORMAL.value.lower()
+            ):
+                knowledge = KnowledgeFactory.create(
+                    datasource=knowledge_content,
+                    knowledge_type=KnowledgeType.get_by_value(doc.doc_type),
+                )
+        except Exception as e:
+            doc.status = SyncStatus.FAILED.name
+            doc.result = "document embedding failed" + str(e)
+            await blocking_func_to_async(
+                self.system_app, self._document_dao.update_knowledge_document, doc
+            )
+            raise
+        logger.info(f"begin save document chunks, doc:{doc.doc_name}")
+        await self.async_doc_process(
+            knowledge,
+            chunk_parameters,
+            storage_connector,
+            doc,
+            space,
+            knowledge_content,
+            ingestion_ctx=ctx,
         )
-        asyncio.create_task(
-            self.async_doc_process(
-                knowledge,
-                chunk_parameters,
-                storage_connector,
-                doc,
-                space,
-                knowledge_content,
+        if doc.status == SyncStatus.FAILED.name:
+            raise Exception(doc.result)
+
+    async def _persist_chunks_in_batches(
+        self,
+        ctx: IngestionJobContext,
+        storage_connector,
+        chunks: List[Chunk],
+        batch_size: int,
+    ) -> List[str]:
+        """persist the chunks batch by batch, skip the batches already persisted"""
+        batch_size = max(1, batch_size or 1)
+        if ctx.processed_chunks:
+            logger.info(
+                f"resume ingestion job {ctx.job.id} from chunk {ctx.processed_chunks}"
             )
+        for start in range(ctx.processed_chunks, len(chunks), batch_size):
+            batch = chunks[start : start + batch_size]
+            async with ctx.embedding_slot():
+                vector_ids = await storage_connector.aload_document(batch)
+            await ctx.report_progress(len(chunks), start + len(batch), vector_ids)
+        return ctx.vector_ids
+
+    async def get_ingestion_jobs(
+        self,
+        space_id: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[IngestionJobResponse]:
+        """Get the knowledge ingestion jobs, the latest first"""
+        return await blocking_func_to_async(
+            self.system_app,
+            self._ingestion_job_dao.list_jobs,
+            space_id,
+            status,
+            limit,
         )
-        logger.info(f"begin save document chunks, doc:{doc.doc_name}")
+
+    async def get_ingestion_job(self, job_id: int) -> Optional[IngestionJobResponse]:
+        """Get a knowledge ingestion job"""
+        return await blocking_func_to_async(
+            self.system_app, self._ingestion_job_dao.get_job, job_id
+        )
+
+    async def ingestion_metrics(self) -> Dict[str, Any]:
+        """Get the status and throughput metrics of the ingestion queue"""
+        return await self.ingestion_queue.metrics()
 
     @trace("async_doc_process")
     async def async_doc_process(
@@ -545,6 +678,7 @@ class Service(BaseService[KnowledgeSpaceEntity, SpaceServeRequest, SpaceServeRes
         doc,
         space,
         knowledge_content: str,
+        ingestion_ctx: Optional[IngestionJobContext] = None,
     ):
         """async document process into storage
         Args:
@@ -552,10 +686,13 @@ class Service(BaseService[KnowledgeSpaceEntity, SpaceServeRequest, SpaceServeRes
             - chunk_parameters: ChunkParameters
             - vector_store_connector: vector_store_connector
             - doc: doc
+            - ingestion_ctx: the ingestion job context, persist the chunks batch by
+                batch and record the progress if given
         """
 
         logger.info(f"async doc persist sync, doc:{doc.doc_name}")
         try:
+            sync_stats = None
             with root_tracer.start_span(
                 "app.knowledge.assembler.persist",
                 metadata={"doc": doc.doc_name},
@@ -576,6 +713,10 @@ class Service(BaseService[KnowledgeSpaceEntity, SpaceServeRequest, SpaceServeRes
                     )
                     doc.chunk_size = len(chunk_docs)
                     vector_ids = [chunk.chunk_id for chunk in chunk_docs]
+                    chunk_entities = [
+                        self._to_chunk_entity(doc, chunk_doc)
+                        for chunk_doc in chunk_docs
+                    ]
                 else:
                     max_chunks_once_load = self.config.max_chunks_once_load
                     max_threads = self.config.max_threads
@@ -587,28 +728,33 @@ class Service(BaseService[KnowledgeSpaceEntity, SpaceServeRequest, SpaceServeRes
 
                     chunk_docs = assembler.get_chunks()
                     doc.chunk_size = len(chunk_docs)
-                    vector_ids = await assembler.apersist(
-                        max_chunks_once_load=max_chunks_once_load,
-                        max_threads=max_threads,
+                    (
+                        vector_ids,
+                        chunk_entities,
+                        sync_stats,
+                    ) = await self._incremental_persist_chunks(
+                        doc,
+                        storage_connector,
+                        chunk_docs,
+                        max_chunks_once_load,
+                        max_threads,
+                        ingestion_ctx,
                     )
             doc.status = SyncStatus.FINISHED.name
             doc.result = "document persist into index store success"
+            if sync_stats:
+                doc.result += (
+                    f", reused chunks: {sync_stats['reused']}, embedded chunks: "
+                    f"{sync_stats['embedded']}, deleted chunks: "
+                    f"{sync_stats['deleted']}"
+                )
             if vector_ids is not None:
                 doc.vector_ids = ",".join(vector_ids)
-            logger.info(f"async document persist index store success:{doc.doc_name}")
+            logger.info(
+                f"async document persist index store success:{doc.doc_name}, "
+                f"stats: {sync_stats}"
+            )
             # save chunk details
-            chunk_entities = [
-                DocumentChunkEntity(
-                    doc_name=doc.doc_name,
-                    doc_type=doc.doc_type,
-                    document_id=doc.id,
-                    content=chunk_doc.content,
-                    meta_info=str(chunk_doc.metadata),
-                    gmt_created=datetime.now(),
-                    gmt_modified=datetime.now(),
-                )
-                for chunk_doc in chunk_docs
-            ]
             self._chunk_dao.create_documents_chunks(chunk_entities)
         except Exception as e:
             doc.status = SyncStatus.FAILED.name
@@ -616,6 +762,125 @@ class Service(BaseService[KnowledgeSpaceEntity, SpaceServeRequest, SpaceServeRes
             logger.error(f"document embedding, failed:{doc.doc_name}, {str(e)}")
         return self._document_dao.update_knowledge_document(doc)
 
+    @staticmethod
+    def _to_chunk_entity(
+        doc,
+        chunk: Chunk,
+        chunk_hash: Optional[str] = None,
+        vector_id: Optional[str] = None,
+    ) -> DocumentChunkEntity:
+        return DocumentChunkEntity(
+            doc_name=doc.doc_name,
+            doc_type=doc.doc_type,
+            document_id=doc.id,
+            content=chunk.content,
+            meta_info=str(chunk.metadata),
+            chunk_hash=chunk_hash,
+            vector_id=vector_id,
+            gmt_created=datetime.now(),
+            gmt_modified=datetime.now(),
+        )
+
+    @staticmethod
+    def _diff_chunks(
+        chunk_hashes: List[str], existing_chunks: List[DocumentChunkEntity]
+    ) -> Tuple[Dict[int, str], List[DocumentChunkEntity]]:
+        """diff the hashes of the new chunks with the persisted chunks
+
+        Returns:
+            - the vector ids of the reused chunks, keyed by the chunk index
+            - the persisted chunks vanished from the document
+        """
+        persisted: Dict[str, List[DocumentChunkEntity]] = {}
+        for entity in existing_chunks:
+            persisted.setdefault(entity.chunk_hash, []).append(entity)
+        reused: Dict[int, str] = {}
+        for i, chunk_hash in enumerate(chunk_hashes):
+            same_chunks = persisted.get(chunk_hash)
+            if same_chunks:
+                reused[i] = same_chunks.pop(0).vector_id
+        vanished = [entity for entities in persisted.values() for entity in entities]
+        return reused, vanished
+
+    async def _incremental_persist_chunks(
+        self,
+        doc,
+        storage_connector,
+        chunks: List[Chunk],
+        max_chunks_once_load: int,
+        max_threads: int,
+        ingestion_ctx: Optional[IngestionJobContext] = None,
+    ) -> Tuple[List[str], List[DocumentChunkEntity], Dict[str, int]]:
+        """persist the changed chunks of the document into the index store
+
+        Only the chunks whose content hash is not persisted yet are embedded, the
+        persisted chunks vanished from the document are deleted from the index store
+        in bulk.
+
+        Returns:
+            - the vector ids of all the chunks of the document
+            - the chunk entities to create
+            - the sync stats, the number of reused, embedded and deleted chunks
+        """
+        existing_chunks = await blocking_func_to_async(
+            self.system_app, self._chunk_dao.get_chunk_fingerprints, doc.id
+        )
+        if any(not e.chunk_hash or not e.vector_id for e in existing_chunks):
+            # Synced before the chunk hashes were recorded, can't diff the chunks
+            logger.info(f"no chunk hashes found, fully re-sync doc:{doc.doc_name}")
+            if doc.vector_ids:
+                storage_connector.delete_by_ids(doc.vector_ids)
+            existing_chunks = []
+            await blocking_func_to_async(
+                self.system_app, self._chunk_dao.raw_delete, doc.id
+            )
+
+        chunk_hashes = [_chunk_hash(chunk) for chunk in chunks]
+        reused, vanished = self._diff_chunks(chunk_hashes, existing_chunks)
+        new_indexes = [i for i in range(len(chunks)) if i not in reused]
+        new_chunks = [chunks[i] for i in new_indexes]
+        if ingestion_ctx:
+            new_ids = await self._persist_chunks_in_batches(
+                ingestion_ctx, storage_connector, new_chunks, max_chunks_once_load
+            )
+        else:
+            new_ids = await storage_connector.aload_document_with_limit(
+                new_chunks, max_chunks_once_load, max_threads
+            )
+        if len(new_ids) == len(new_chunks):
+            new_vector_ids = dict(zip(new_indexes, new_ids))
+        else:
+            # Can't map the ids to the chunks, the chunks without vector id will be
+            # fully re-synced next time
+            logger.warning(
+                f"index store returned {len(new_ids)} ids for {len(new_chunks)} "
+                f"chunks, doc:{doc.doc_name}"
+            )
+            new_vector_ids = {}
+
+        if vanished:
+            storage_connector.delete_by_ids(
+                ",".join(entity.vector_id for entity in vanished)
+            )
+            await blocking_func_to_async(
+                self.system_app,
+                self._chunk_dao.delete_chunks,
+                [entity.id for entity in vanished],
+            )
+        chunk_entities = [
+            self._to_chunk_entity(
+                doc, chunks[i], chunk_hashes[i], new_vector_ids.get(i)
+            )
+            for i in new_indexes
+        ]
+        all_ids = list(reused.values()) + list(new_ids)
+        sync_stats = {
+            "reused": len(reused),
+            "embedded": len(new_chunks),
+            "deleted": len(vanished),
+        }
+        return all_ids, chunk_entities, sync_stats
+
     def get_space_context(self, space_id):
         """get space contect
         Args:
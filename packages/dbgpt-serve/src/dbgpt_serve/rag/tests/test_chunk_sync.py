@@ -0,0 +1,188 @@
+import asyncio
+from typing import List
+from unittest.mock import MagicMock
+
+import pytest
+
+from dbgpt.core import Chunk
+from dbgpt.storage.metadata import db
+from dbgpt.util.executor_utils import DefaultExecutorFactory
+from dbgpt_ext.rag.chunk_manager import ChunkParameters
+from dbgpt_serve.core.tests.conftest import config, system_app  # noqa: F401
+
+from ..api.schemas import KnowledgeSyncRequest
+from ..config import ServeConfig
+from ..models.chunk_db import DocumentChunkDao, DocumentChunkEntity
+from ..models.document_db import KnowledgeDocumentDao, KnowledgeDocumentEntity
+from ..models.models import KnowledgeSpaceDao, KnowledgeSpaceEntity
+from ..service.service import Service
+
+
+class _FakeIndexStore:
+    def __init__(self):
+        self.vectors = {}
+        self.embedded: List[str] = []
+
+    async def aload_document_with_limit(
+        self, chunks: List[Chunk], max_chunks_once_load=None, max_threads=None
+    ) -> List[str]:
+        for chunk in chunks:
+            self.vectors[chunk.chunk_id] = chunk.content
+            self.embedded.append(chunk.content)
+        return [chunk.chunk_id for chunk in chunks]
+
+    async def aload_document(self, chunks: List[Chunk]) -> List[str]:
+        return await self.aload_document_with_limit(chunks)
+
+    def delete_by_ids(self, ids: str):
+        for vector_id in ids.split(","):
+            self.vectors.pop(vector_id)
+
+
+@pytest.fixture(autouse=True)
+def setup_and_teardown(tmp_path):
+    db.init_db(f"sqlite:///{tmp_path}/test.db")
+    db.create_all()
+
+    yield
+
+
+@pytest.fixture
+def service(system_app, config):  # noqa: F811
+    system_app.register(DefaultExecutorFactory)
+    return Service(system_app, config, chunk_dao=DocumentChunkDao())
+
+
+async def _sync(service: Service, store, doc, contents: List[str]):
+    chunks = [
+        Chunk(content=content, metadata={"source": "a.md"}) for content in contents
+    ]
+    vector_ids, chunk_entities, stats = await service._incremental_persist_chunks(
+        doc, store, chunks, 10, 1
+    )
+    doc.vector_ids = ",".join(vector_ids)
+    service._chunk_dao.create_documents_chunks(chunk_entities)
+    return stats
+
+
+@pytest.mark.asyncio
+async def test_incremental_sync(service):
+    store = _FakeIndexStore()
+    doc = KnowledgeDocumentEntity(id=1, doc_name="a.md", doc_type="DOCUMENT")
+    stats = await _sync(service, store, doc, ["a", "b", "c"])
+    assert stats == {"reused": 0, "embedded": 3, "deleted": 0}
+
+    store.embedded.clear()
+    stats = await _sync(service, store, doc, ["a", "b2", "c", "d"])
+    assert stats == {"reused": 2, "embedded": 2, "deleted": 1}
+    assert store.embedded == ["b2", "d"]
+    assert sorted(store.vectors.values()) == ["a", "b2", "c", "d"]
+    assert sorted(doc.vector_ids.split(",")) == sorted(store.vectors)
+    rows = service._chunk_dao.get_document_chunks(
+        DocumentChunkEntity(document_id=doc.id)
+    )
+    assert sorted(row.content for row in rows) == ["a", "b2", "c", "d"]
+    assert {row.vector_id for row in rows} == set(store.vectors)
+
+    stats = await _sync(service, store, doc, ["a", "b2", "c", "d"])
+    assert stats == {"reused": 4, "embedded": 0, "deleted": 0}
+
+
+@pytest.mark.asyncio
+async def test_full_sync_without_chunk_hashes(service):
+    store = _FakeIndexStore()
+    store.vectors = {"v1": "a", "v2": "b"}
+    doc = KnowledgeDocumentEntity(
+        id=1, doc_name="a.md", doc_type="DOCUMENT", vector_ids="v1,v2"
+    )
+    # The chunks synced by the older version
+    service._chunk_dao.create_documents_chunks(
+        [
+            DocumentChunkEntity(
+                document_id=doc.id, doc_name="a.md", doc_type="DOCUMENT", content=c
+            )
+            for c in ["a", "b"]
+        ]
+    )
+    stats = await _sync(service, store, doc, ["a", "b"])
+    assert stats == {"reused": 0, "embedded": 2, "deleted": 0}
+    assert sorted(store.vectors.values()) == ["a", "b"]
+    assert "v1" not in store.vectors
+    assert len(service._chunk_dao.get_chunk_fingerprints(doc.id)) == 2
+
+
+async def _sync_document(service: Service, space_id: str, doc_id: int):
+    chunk_parameters = ChunkParameters(
+        chunk_strategy="CHUNK_BY_SEPARATOR", separator="\n", enable_merge=False
+    )
+    await service.sync_document(
+        [
+            KnowledgeSyncRequest(
+                doc_id=doc_id, space_id=space_id, chunk_parameters=chunk_parameters
+            )
+        ]
+    )
+    for _ in range(500):
+        doc = service._document_dao.documents_by_ids([doc_id])[0]
+        if doc.status != "RUNNING":
+            return doc
+        await asyncio.sleep(0.01)
+    raise TimeoutError("document not synced")
+
+
+@pytest.mark.asyncio
+async def test_resync_finished_document(system_app, tmp_path, monkeypatch):  # noqa: F811
+    system_app.register(DefaultExecutorFactory)
+    service = Service(
+        system_app,
+        ServeConfig(api_keys=None),
+        dao=KnowledgeSpaceDao(),
+        document_dao=KnowledgeDocumentDao(),
+        chunk_dao=DocumentChunkDao(),
+    )
+    system_app.register_instance(service)
+    store = _FakeIndexStore()
+    storage_manager = MagicMock()
+    storage_manager.get_storage_connector.return_value = store
+    monkeypatch.setattr(Service, "storage_manager", storage_manager)
+    dag_manager = MagicMock()
+    dag_manager.get_dags_by_tag.return_value = []
+    monkeypatch.setattr(Service, "dag_manager", dag_manager)
+
+    space_id = str(
+        service._dao.create_knowledge_space(
+            KnowledgeSpaceEntity(name="space1", vector_type="Chroma", desc="test")
+        )
+    )
+    file_path = tmp_path / "a.txt"
+    file_path.write_text("a\nb\nc")
+    doc_id = service._document_dao.create_knowledge_document(
+        KnowledgeDocumentEntity(
+            doc_name="a.txt",
+            doc_type="DOCUMENT",
+            space="space1",
+            status="TODO",
+            content=str(file_path),
+        )
+    )
+    try:
+        doc = await _sync_document(service, space_id, doc_id)
+        assert doc.status == "FINISHED", doc.result
+        assert sorted(store.vectors.values()) == ["a", "b", "c"]
+
+        # The finished document is re-synced incrementally
+        store.embedded.clear()
+        file_path.write_text("a\nb2\nc\nd")
+        doc = await _sync_document(service, space_id, doc_id)
+        assert doc.status == "FINISHED", doc.result
+        assert sorted(store.embedded) == ["b2", "d"]
+        assert sorted(store.vectors.values()) == ["a", "b2", "c", "d"]
+        assert "reused chunks: 2" in doc.result
+
+        # The running document can't be synced
+        doc.status = "RUNNING"
+        service._document_dao.update_knowledge_document(doc)
+        with pytest.raises(Exception, match="can not sync"):
+            await _sync_document(service, space_id, doc_id)
+    finally:
+        await service.async_before_stop()
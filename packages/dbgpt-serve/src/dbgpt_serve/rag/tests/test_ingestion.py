@@ -0,0 +1,174 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from dbgpt.storage.metadata import db
+from dbgpt.util.executor_utils import DefaultExecutorFactory
+from dbgpt_serve.core.tests.conftest import system_app  # noqa: F401
+
+from ..models.ingestion_db import IngestionJobDao, IngestionJobStatus
+from ..service.ingestion import IngestionJobContext, IngestionQueue
+
+
+@pytest.fixture(autouse=True)
+def setup_and_teardown(tmp_path):
+    # The jobs are accessed in the executor threads, so use a file database
+    db.init_db(f"sqlite:///{tmp_path}/test.db")
+    db.create_all()
+
+    yield
+
+
+@pytest.fixture
+def dao():
+    return IngestionJobDao()
+
+
+@pytest.fixture
+def app(system_app):  # noqa: F811
+    system_app.register(DefaultExecutorFactory)
+    return system_app
+
+
+async def _wait_all_done(dao: IngestionJobDao, timeout: float = 5):
+    for _ in range(int(timeout / 0.01)):
+        counts = dao.status_counts()
+        if not counts.get("TODO") and not counts.get("RUNNING"):
+            return counts
+        await asyncio.sleep(0.01)
+    raise TimeoutError("jobs not finished")
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_and_fairness(app, dao):
+    running = 0
+    max_running = 0
+    started: List[str] = []
+
+    async def _process(ctx: IngestionJobContext):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        started.append(ctx.job.space_id)
+        await asyncio.sleep(0.02)
+        running -= 1
+
+    # Four documents of space 1 are queued before the document of space 2
+    for i in range(4):
+        dao.create_job("1", "space1", i, f"doc{i}")
+    dao.create_job("2", "space2", 10, "doc10")
+    queue = IngestionQueue(app, dao, _process, max_concurrent_documents=2)
+    await queue.start()
+    counts = await _wait_all_done(dao)
+    await queue.stop()
+
+    assert counts == {"FINISHED": 5}
+    assert max_running == 2
+    assert started[:2] == ["1", "2"]
+    metrics = await queue.metrics()
+    assert metrics["finished_jobs"] == 5
+    assert metrics["running_jobs"] == 0
+
+
+@pytest.mark.asyncio
+async def test_resume_from_progress(app, dao):
+    chunks = [f"chunk{i}" for i in range(5)]
+    persisted: List[str] = []
+    fail_at = {"index": 3}
+
+    async def _process(ctx: IngestionJobContext):
+        for start in range(ctx.processed_chunks, len(chunks), 2):
+            batch = chunks[start : start + 2]
+            if start >= fail_at["index"]:
+                raise ValueError("embedding service unavailable")
+            async with ctx.embedding_slot():
+                persisted.extend(batch)
+            await ctx.report_progress(len(chunks), start + len(batch), batch)
+
+    job = dao.create_job("1", "space1", 1, "doc1")
+    queue = IngestionQueue(app, dao, _process)
+    await queue.start()
+    await _wait_all_done(dao)
+    job = dao.get_job(job.id)
+    assert job.status == IngestionJobStatus.FAILED.value
+    assert job.processed_chunks == 4
+    assert job.error == "embedding service unavailable"
+
+    # Simulate the job interrupted by a restart
+    dao.update_job(job.id, status=IngestionJobStatus.RUNNING.value)
+    fail_at["index"] = len(chunks)
+    await queue.stop()
+    await queue.start()
+    await _wait_all_done(dao)
+    await queue.stop()
+
+    job = dao.get_job(job.id)
+    assert job.status == IngestionJobStatus.FINISHED.value
+    assert job.attempts == 2
+    assert job.processed_chunks == job.total_chunks == 5
+    assert job.vector_ids.split(",") == chunks
+    assert persisted == chunks
+
+
+@pytest.mark.asyncio
+async def test_resume_failed_job_on_enqueue(app, dao):
+    chunks = [f"chunk{i}" for i in range(5)]
+    persisted: List[str] = []
+    fail_at = {"index": 3}
+
+    async def _process(ctx: IngestionJobContext):
+        for start in range(ctx.processed_chunks, len(chunks), 2):
+            batch = chunks[start : start + 2]
+            if start >= fail_at["index"]:
+                raise ValueError("embedding service unavailable")
+            persisted.extend(batch)
+            await ctx.report_progress(len(chunks), start + len(batch), batch)
+
+    queue = IngestionQueue(app, dao, _process)
+    job = await queue.enqueue("1", "space1", 1, "doc1", '{"chunk_size": 512}')
+    await _wait_all_done(dao)
+    assert dao.get_job(job.id).status == IngestionJobStatus.FAILED.value
+
+    # Synced again with the same chunk parameters, resume the failed job
+    fail_at["index"] = len(chunks)
+    resumed = await queue.enqueue("1", "space1", 1, "doc1", '{"chunk_size": 512}')
+    await _wait_all_done(dao)
+    assert resumed.id == job.id
+    job = dao.get_job(job.id)
+    assert job.status == IngestionJobStatus.FINISHED.value
+    assert job.error is None
+    assert job.vector_ids.split(",") == chunks
+    assert persisted == chunks
+
+    # A finished job is not resumed
+    new_job = await queue.enqueue("1", "space1", 1, "doc1", '{"chunk_size": 512}')
+    await _wait_all_done(dao)
+    await queue.stop()
+    assert new_job.id != job.id
+    assert dao.latest_job(1).id == new_job.id
+
+
+@pytest.mark.asyncio
+async def test_stop_while_jobs_finish(app, dao):
+    async def _process(ctx: IngestionJobContext):
+        await asyncio.sleep(0)
+
+    queue = IngestionQueue(app, dao, _process, poll_interval=0.01)
+    for i in range(30):
+        await queue.enqueue("1", "space1", i, f"doc{i}")
+        # Stop at different points of the job, the stop must not hang
+        for _ in range(i % 5):
+            await asyncio.sleep(0)
+        await asyncio.wait_for(queue.stop(), 5)
+
+    # The stopped queue doesn't take the new jobs
+    job = dao.create_job("1", "space1", 100, "doc100")
+    await asyncio.sleep(0.05)
+    assert dao.get_job(job.id).status == IngestionJobStatus.TODO.value
+
+
+def test_reject_duplicate_active_job(dao):
+    dao.create_job("1", "space1", 1, "doc1")
+    with pytest.raises(ValueError):
+        dao.create_job("1", "space1", 1, "doc1")